@@ -110,7 +110,13 @@ setup(
             'user_update = tracim.command.user:UpdateUserCommand',
             'db_init = tracim.command.database:InitializeDBCommand',
             'db_delete = tracim.command.database:DeleteDBCommand',
+            'db_update_current_revision = tracim.command.database:UpdateCurrentRevisionCommand',  # nopep8
+            'db_update_label_path = tracim.command.database:UpdateLabelPathCommand',  # nopep8
+            'depot_gc = tracim.command.depot:CollectDepotGarbageCommand',
+            'depot_update_file_infos = tracim.command.depot:UpdateFileInfosCommand',  # nopep8
+            'search_index = tracim.command.search:IndexContentsCommand',
             'webdav start = tracim.command.webdav:WebdavRunnerCommand',
+            'mail sender start = tracim.command.mail:MailSenderRunnerCommand',  # nopep8
         ]
     },
 )
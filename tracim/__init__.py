@@ -7,7 +7,6 @@ except ImportError:
     from http import client as HTTPStatus
 
 from pyramid.config import Configurator
-from pyramid.authentication import BasicAuthAuthenticationPolicy
 from hapic.ext.pyramid import PyramidContext
 from pyramid.exceptions import NotFound
 from sqlalchemy.exc import OperationalError
@@ -15,7 +14,7 @@ from sqlalchemy.exc import OperationalError
 from tracim.extensions import hapic
 from tracim.config import CFG
 from tracim.lib.utils.request import TracimRequest
-from tracim.lib.utils.authentification import basic_auth_check_credentials
+from tracim.lib.utils.authentification import TracimAuthenticationPolicy
 from tracim.lib.utils.authentification import BASIC_AUTH_WEBUI_REALM
 from tracim.lib.utils.authorization import AcceptAllAuthorizationPolicy
 from tracim.lib.utils.authorization import TRACIM_DEFAULT_PERM
@@ -24,6 +23,7 @@ from tracim.lib.webdav import WebdavAppFactory
 from tracim.views import BASE_API_V2
 from tracim.views.contents_api.html_document_controller import HTMLDocumentController  # nopep8
 from tracim.views.contents_api.threads_controller import ThreadController
+from tracim.views.core_api.search_controller import SearchController
 from tracim.views.core_api.session_controller import SessionController
 from tracim.views.core_api.system_controller import SystemController
 from tracim.views.core_api.user_controller import UserController
@@ -56,9 +56,8 @@ def web(global_config, **local_settings):
     app_config.configure_filedepot()
     settings['CFG'] = app_config
     configurator = Configurator(settings=settings, autocommit=True)
-    # Add BasicAuthPolicy
-    authn_policy = BasicAuthAuthenticationPolicy(
-        basic_auth_check_credentials,
+    # Add BasicAuthPolicy (and session tokens)
+    authn_policy = TracimAuthenticationPolicy(
         realm=BASIC_AUTH_WEBUI_REALM,
     )
     configurator.include(add_cors_support)
@@ -115,6 +114,7 @@ def web(global_config, **local_settings):
     html_document_controller = HTMLDocumentController()
     thread_controller = ThreadController()
     file_controller = FileController()
+    search_controller = SearchController()
     configurator.include(session_controller.bind, route_prefix=BASE_API_V2)
     configurator.include(system_controller.bind, route_prefix=BASE_API_V2)
     configurator.include(user_controller.bind, route_prefix=BASE_API_V2)
@@ -123,6 +123,7 @@ def web(global_config, **local_settings):
     configurator.include(html_document_controller.bind, route_prefix=BASE_API_V2)  # nopep8
     configurator.include(thread_controller.bind, route_prefix=BASE_API_V2)
     configurator.include(file_controller.bind, route_prefix=BASE_API_V2)
+    configurator.include(search_controller.bind, route_prefix=BASE_API_V2)
 
     hapic.add_documentation_view(
         '/api/v2/doc',
@@ -8,6 +8,7 @@ from pyramid.paster import (
     get_appsettings,
     setup_logging,
     )
+from pyramid.scripting import AppEnvironment
 
 from tracim import CFG
 from tracim.fixtures import FixturesLoader
@@ -15,6 +16,7 @@ from tracim.fixtures.users_and_groups import Base as BaseFixture
 from tracim.fixtures.content import Content as ContentFixture
 from sqlalchemy.exc import IntegrityError
 from tracim.command import AppContextCommand
+from tracim.lib.core.content import ContentApi
 from tracim.models.meta import DeclarativeBase
 from tracim.models import (
     get_engine,
@@ -130,8 +132,67 @@ class DeleteDBCommand(AppContextCommand):
             depot = DepotManager.get()
             depot_files = depot.list()
             for file_ in depot_files:
-                depot.delete(file_)
+                depot.purge(file_)
             print('Cleaning depot done.')
         else:
             print('Warning, You should use --force if you really want to'
                   ' delete database.')
+
+
+class UpdateCurrentRevisionCommand(AppContextCommand):
+
+    def get_description(self) -> str:
+        return "Update current revision pointer of contents"
+
+    def get_parser(self, prog_name: str) -> argparse.ArgumentParser:
+        parser = super().get_parser(prog_name)
+        parser.add_argument(
+            "--all",
+            help='update all contents, not only contents without pointer',
+            dest='all',
+            required=False,
+            action='store_true',
+            default=False,
+        )
+        return parser
+
+    def take_app_action(
+            self,
+            parsed_args: argparse.Namespace,
+            app_context: AppEnvironment
+    ) -> None:
+        session = app_context['request'].dbsession
+        app_config = app_context['registry'].settings['CFG']
+        content_api = ContentApi(
+            current_user=None,
+            session=session,
+            config=app_config,
+        )
+        updated = content_api.update_current_revision_ids(
+            only_missing=not parsed_args.all,
+        )
+        print('{} content(s) updated.'.format(updated))
+
+
+class UpdateLabelPathCommand(AppContextCommand):
+
+    def get_description(self) -> str:
+        return "Update label path of all contents"
+
+    def take_app_action(
+            self,
+            parsed_args: argparse.Namespace,
+            app_context: AppEnvironment
+    ) -> None:
+        session = app_context['request'].dbsession
+        app_config = app_context['registry'].settings['CFG']
+        content_api = ContentApi(
+            current_user=None,
+            session=session,
+            config=app_config,
+            show_archived=True,
+            show_deleted=True,
+            show_temporary=True,
+        )
+        updated = content_api.update_label_paths()
+        print('{} content(s) updated.'.format(updated))
@@ -0,0 +1,92 @@
+# -*- coding: utf-8 -*-
+import argparse
+import datetime
+
+from pyramid.scripting import AppEnvironment
+
+from tracim.command import AppContextCommand
+from tracim.lib.core.depot import DepotApi
+
+
+class CollectDepotGarbageCommand(AppContextCommand):
+
+    def get_description(self) -> str:
+        return "Delete stored files not used by any revision"
+
+    def get_parser(self, prog_name: str) -> argparse.ArgumentParser:
+        parser = super().get_parser(prog_name)
+        parser.add_argument(
+            "--grace-delay",
+            help='keep files stored or used again less than this number of '
+                 'seconds ago (default: 3600)',
+            dest='grace_delay',
+            required=False,
+            type=int,
+            default=3600,
+        )
+        parser.add_argument(
+            "--dry-run",
+            help='only list files to delete',
+            dest='dry_run',
+            required=False,
+            action='store_true',
+            default=False,
+        )
+        return parser
+
+    def take_app_action(
+            self,
+            parsed_args: argparse.Namespace,
+            app_context: AppEnvironment
+    ) -> None:
+        session = app_context['request'].dbsession
+        app_config = app_context['registry'].settings['CFG']
+        depot_api = DepotApi(
+            session=session,
+            config=app_config,
+        )
+        deleted_file_ids = depot_api.collect_garbage(
+            grace_delay=datetime.timedelta(seconds=parsed_args.grace_delay),
+            dry_run=parsed_args.dry_run,
+        )
+        for file_id in deleted_file_ids:
+            print(file_id)
+        if parsed_args.dry_run:
+            print('{} file(s) to delete.'.format(len(deleted_file_ids)))
+        else:
+            print('{} file(s) deleted.'.format(len(deleted_file_ids)))
+
+
+class UpdateFileInfosCommand(AppContextCommand):
+
+    def get_description(self) -> str:
+        return "Update file size and hash of revisions from stored files"
+
+    def get_parser(self, prog_name: str) -> argparse.ArgumentParser:
+        parser = super().get_parser(prog_name)
+        parser.add_argument(
+            "--all",
+            help='update all revisions, not only revisions without size or '
+                 'hash',
+            dest='all',
+            required=False,
+            action='store_true',
+            default=False,
+        )
+        return parser
+
+    def take_app_action(
+            self,
+            parsed_args: argparse.Namespace,
+            app_context: AppEnvironment
+    ) -> None:
+        session = app_context['request'].dbsession
+        app_config = app_context['registry'].settings['CFG']
+        depot_api = DepotApi(
+            session=session,
+            config=app_config,
+        )
+        updated = depot_api.update_revisions_file_infos(
+            only_missing=not parsed_args.all,
+        )
+        print('{} revision(s) updated.'.format(updated))
@@ -0,0 +1,24 @@
+# -*- coding: utf-8 -*-
+import argparse
+
+from pyramid.paster import bootstrap
+
+from tracim.command import AppContextCommand
+from tracim.lib.mail_notifier.daemon import MailSenderDaemon
+
+
+class MailSenderRunnerCommand(AppContextCommand):
+    auto_setup_context = False
+
+    def get_description(self) -> str:
+        return "run mail sender daemon (async emails and notifications)"
+
+    def take_action(self, parsed_args: argparse.Namespace) -> None:
+        super(MailSenderRunnerCommand, self).take_action(parsed_args)
+        with bootstrap(parsed_args.config_file) as app_context:
+            registry = app_context['registry']
+            daemon = MailSenderDaemon(
+                registry.settings['CFG'],
+                session_factory=registry['dbsession_factory'],
+            )
+            daemon.run()
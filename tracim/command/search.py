@@ -0,0 +1,27 @@
+# -*- coding: utf-8 -*-
+import argparse
+
+from pyramid.scripting import AppEnvironment
+
+from tracim.command import AppContextCommand
+from tracim.lib.core.search import SearchApi
+
+
+class IndexContentsCommand(AppContextCommand):
+
+    def get_description(self) -> str:
+        return "Rebuild full text search index of all contents"
+
+    def take_app_action(
+            self,
+            parsed_args: argparse.Namespace,
+            app_context: AppEnvironment
+    ) -> None:
+        session = app_context['request'].dbsession
+        app_config = app_context['registry'].settings['CFG']
+        search_api = SearchApi(
+            session=session,
+            config=app_config,
+        )
+        indexed = search_api.index_all_contents()
+        print('{} content(s) indexed.'.format(indexed))
@@ -129,6 +129,46 @@ class CFG(object):
             'user.auth_token.validity',
             '604800',
         ))
+        # INFO - G.M - 2018-08-10 - Session tokens and verified credentials
+        # are kept in redis (shared between processes, see
+        # email.async.redis.* parameters) or in memory (per process).
+        # Memory is default store, as redis is not required by default
+        # config (it is only needed for async emails).
+        self.USER_SESSION_STORE = settings.get(
+            'user.session.store',
+            'memory',
+        ).lower()
+        if self.USER_SESSION_STORE not in ('memory', 'redis'):
+            raise Exception(
+                'user.session.store can be "memory" or "redis", '
+                'not "{}"'.format(self.USER_SESSION_STORE)
+            )
+        if self.USER_SESSION_STORE == 'memory':
+            # INFO - G.M - 2018-08-10 - Invalidation of sessions (password
+            # change, disabled user) only applies to the process doing it.
+            logger.warning(
+                self,
+                'user.session.store is "memory": sessions of a disabled user '
+                'or changed password are only revoked in current process, '
+                'use "redis" store with several processes',
+            )
+        self.USER_SESSION_STORE_MAX_SIZE = int(settings.get(
+            'user.session.store.max_size',
+            10000,
+        ))
+        self.USER_SESSION_VALIDITY = int(settings.get(
+            'user.session.validity',
+            604800,
+        ))
+        # INFO - G.M - 2018-08-10 - Key used to hash credentials kept in
+        # store, random one (by process) if not set.
+        self.USER_SESSION_SECRET = settings.get('user.session.secret', '')
+        # INFO - G.M - 2018-08-10 - Delay (in seconds) during which verified
+        # credentials are accepted without checking password, 0 to disable.
+        self.USER_AUTH_CACHE_VALIDITY = int(settings.get(
+            'user.auth_cache.validity',
+            60,
+        ))
 
         self.DEBUG = asbool(settings.get('debug', False))
         # TODO - G.M - 27-03-2018 - [Email] Restore email config
@@ -184,6 +224,26 @@ class CFG(object):
             'email.notification.created_account.template.text',
             './tracim/templates/mail/created_account_body_text.mak',
         )
+        self.EMAIL_NOTIFICATION_TEMPLATE_MODULE_DIRECTORY = settings.get(
+            'email.notification.template.module_directory',
+            None,
+        )
+        self.EMAIL_NOTIFICATION_RENDER_CACHE_SIZE = int(settings.get(
+            'email.notification.render_cache.size',
+            256,
+        ))
+        self.EMAIL_NOTIFICATION_DIGEST_TEMPLATE_HTML = settings.get(
+            'email.notification.digest.template.html',
+            './tracim/templates/mail/digest_body_html.mak',
+        )
+        self.EMAIL_NOTIFICATION_DIGEST_TEMPLATE_TEXT = settings.get(
+            'email.notification.digest.template.text',
+            './tracim/templates/mail/digest_body_text.mak',
+        )
+        self.EMAIL_NOTIFICATION_DIGEST_SUBJECT = settings.get(
+            'email.notification.digest.subject',
+            '[{website_title}] {content_count} updated content(s)',
+        )
         self.EMAIL_NOTIFICATION_CONTENT_UPDATE_SUBJECT = settings.get(
             'email.notification.content_update.subject',
         )
@@ -193,7 +253,51 @@ class CFG(object):
         )
         self.EMAIL_NOTIFICATION_PROCESSING_MODE = settings.get(
             'email.notification.processing_mode',
-        )
+            'sync',
+        ).upper()
+        if self.EMAIL_NOTIFICATION_PROCESSING_MODE not in (
+                self.CST.ASYNC,
+                self.CST.SYNC,
+        ):
+            raise Exception(
+                'email.notification.processing_mode '
+                'can be "{}" or "{}", not "{}"'.format(
+                    self.CST.ASYNC,
+                    self.CST.SYNC,
+                    self.EMAIL_NOTIFICATION_PROCESSING_MODE,
+                )
+            )
+        # INFO - G.M - 2018-08-17 - Content updates are held during this
+        # delay (in seconds), then notified at once in a single email by
+        # content and recipient (0 to disable).
+        self.EMAIL_NOTIFICATION_COALESCING_DELAY = int(settings.get(
+            'email.notification.coalescing.delay',
+            0,
+        ))
+        self.EMAIL_NOTIFICATION_DIGEST = settings.get(
+            'email.notification.digest',
+            'none',
+        ).lower()
+        if self.EMAIL_NOTIFICATION_DIGEST not in ('none', 'hourly', 'daily'):
+            raise Exception(
+                'email.notification.digest can be "none", "hourly" or '
+                '"daily", not "{}"'.format(self.EMAIL_NOTIFICATION_DIGEST)
+            )
+        # INFO - G.M - 2018-08-17 - Delay (in seconds) between checks of
+        # held notifications to send, by mail sender daemon.
+        self.EMAIL_NOTIFICATION_PENDING_CHECK_INTERVAL = int(settings.get(
+            'email.notification.pending.check_interval',
+            60,
+        ))
+        self.EMAIL_NOTIFICATION_QUEUE_BACKEND = settings.get(
+            'email.notification.queue_backend',
+            'rq',
+        ).lower()
+        if self.EMAIL_NOTIFICATION_QUEUE_BACKEND not in ('rq', 'memory'):
+            raise Exception(
+                'email.notification.queue_backend can be "rq" or "memory", '
+                'not "{}"'.format(self.EMAIL_NOTIFICATION_QUEUE_BACKEND)
+            )
 
         self.EMAIL_NOTIFICATION_ACTIVATED = asbool(settings.get(
             'email.notification.activated',
@@ -210,6 +314,28 @@ class CFG(object):
         self.EMAIL_NOTIFICATION_SMTP_PASSWORD = settings.get(
             'email.notification.smtp.password',
         )
+        self.EMAIL_NOTIFICATION_SMTP_POOL_SIZE = int(settings.get(
+            'email.notification.smtp.pool.size',
+            2,
+        ))
+        self.EMAIL_NOTIFICATION_SMTP_POOL_IDLE_TIMEOUT = float(settings.get(
+            'email.notification.smtp.pool.idle_timeout',
+            60,
+        ))
+        self.EMAIL_NOTIFICATION_SMTP_MAX_MESSAGES_BY_CONNECTION = int(
+            settings.get(
+                'email.notification.smtp.max_messages_by_connection',
+                100,
+            )
+        )
+        self.EMAIL_NOTIFICATION_SMTP_RETRY_ATTEMPTS = int(settings.get(
+            'email.notification.smtp.retry.attempts',
+            3,
+        ))
+        self.EMAIL_NOTIFICATION_SMTP_RETRY_BACKOFF = float(settings.get(
+            'email.notification.smtp.retry.backoff',
+            1,
+        ))
         self.EMAIL_NOTIFICATION_LOG_FILE_PATH = settings.get(
             'email.notification.log_file_path',
             None,
@@ -305,6 +431,25 @@ class CFG(object):
         # WSGIDAV (Webdav server)
         ###
 
+        # INFO - G.M - 2018-08-20 - Rendered html of pages and threads is
+        # kept in memory by revision. Validity is short because html contains
+        # relative dates ("2 minutes ago").
+        self.WEBDAV_RENDER_CACHE_SIZE = int(settings.get(
+            'wsgidav.render_cache.size',
+            256,
+        ))
+        self.WEBDAV_RENDER_CACHE_VALIDITY = int(settings.get(
+            'wsgidav.render_cache.validity',
+            60,
+        ))
+
+        # INFO - G.M - 2018-08-24 - Locks are kept in database, expired ones
+        # are purged at most once by interval (in seconds).
+        self.WEBDAV_LOCK_CLEANUP_INTERVAL = int(settings.get(
+            'wsgidav.lock.cleanup_interval',
+            600,
+        ))
+
         # TODO - G.M - 27-03-2018 - [WebDav] Restore wsgidav config
         #self.WSGIDAV_CONFIG_PATH = settings.get(
         #    'wsgidav.config_path',
@@ -432,10 +577,54 @@ class CFG(object):
 
         self.PREVIEW_JPG_ALLOWED_DIMS = allowed_dims
 
+        self.PREVIEW_GENERATION_PROCESSING_MODE = settings.get(
+            'preview.generation.processing_mode',
+            'sync',
+        ).upper()
+        if self.PREVIEW_GENERATION_PROCESSING_MODE not in (
+                self.CST.ASYNC,
+                self.CST.LOCAL,
+                self.CST.SYNC,
+        ):
+            raise Exception(
+                'preview.generation.processing_mode '
+                'can be "{}", "{}" or "{}", not "{}"'.format(
+                    self.CST.ASYNC,
+                    self.CST.LOCAL,
+                    self.CST.SYNC,
+                    self.PREVIEW_GENERATION_PROCESSING_MODE,
+                )
+            )
+        # INFO - G.M - 2018-08-08 - Delay (in seconds) after which a
+        # preview generation not ended is considered as failed.
+        self.PREVIEW_GENERATION_PENDING_TIMEOUT = int(settings.get(
+            'preview.generation.pending_timeout',
+            600,
+        ))
+
+        self.SEARCH_ENGINE = settings.get('search.engine', 'auto').lower()
+        if self.SEARCH_ENGINE not in ('auto', 'postgresql', 'sqlite', 'python'):  # nopep8
+            raise Exception(
+                'search.engine can be "auto", "postgresql", "sqlite" or '
+                '"python", not "{}"'.format(self.SEARCH_ENGINE)
+            )
+        # INFO - G.M - 2018-08-09 - Text of bigger files is not indexed
+        self.SEARCH_FILE_TEXT_MAX_SIZE = int(settings.get(
+            'search.file_text.max_size',
+            1024 * 1024,
+        ))
+        self.SEARCH_POSTGRESQL_TEXT_SEARCH_CONFIG = settings.get(
+            'search.postgresql.text_search_config',
+            'simple',
+        )
+
     def configure_filedepot(self):
         depot_storage_name = self.DEPOT_STORAGE_NAME
         depot_storage_path = self.DEPOT_STORAGE_DIR
-        depot_storage_settings = {'depot.storage_path': depot_storage_path}
+        depot_storage_settings = {
+            'depot.backend': 'tracim.lib.utils.depot.ContentAddressedFileStorage',  # nopep8
+            'depot.storage_path': depot_storage_path,
+        }
         DepotManager.configure(
             depot_storage_name,
             depot_storage_settings,
@@ -443,6 +632,7 @@ class CFG(object):
 
     class CST(object):
         ASYNC = 'ASYNC'
+        LOCAL = 'LOCAL'
         SYNC = 'SYNC'
 
         TREEVIEW_FOLDERS = 'folders'
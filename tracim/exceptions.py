@@ -153,6 +153,14 @@ class WorkspacesDoNotMatch(TracimException):
     pass
 
 
+class ConflictingMoveInItself(TracimException):
+    pass
+
+
+class ContentLabelAlreadyUsedHere(TracimException):
+    pass
+
+
 class PasswordDoNotMatch(TracimException):
     pass
 
@@ -203,3 +211,7 @@ class PageOfPreviewNotFound(NotFound):
 
 class PreviewDimNotAllowed(TracimException):
     pass
+
+
+class PreviewPending(TracimException):
+    pass
@@ -1,9 +1,11 @@
 # -*- coding: utf-8 -*-
 from contextlib import contextmanager
+import io
 import os
 import datetime
 import re
 import typing
+import uuid
 from operator import itemgetter
 
 import transaction
@@ -14,6 +16,7 @@ from depot.manager import DepotManager
 from depot.io.utils import FileIntent
 import sqlalchemy
 from sqlalchemy.orm import aliased
+from sqlalchemy.orm import contains_eager
 from sqlalchemy.orm import joinedload
 from sqlalchemy.orm.attributes import get_history
 from sqlalchemy.orm.exc import NoResultFound
@@ -25,15 +28,25 @@ from sqlalchemy.sql.elements import and_
 
 from tracim.lib.utils.utils import cmp_to_key
 from tracim.lib.core.notifications import NotifierFactory
+from tracim.lib.core.preview import PreviewGenerationApi
+from tracim.lib.core.search import SearchApi
+from tracim.lib.core.userworkspace import WorkspaceAccessIndex
 from tracim.exceptions import SameValueError
 from tracim.exceptions import PageOfPreviewNotFound
 from tracim.exceptions import PreviewDimNotAllowed
+from tracim.exceptions import PreviewPending
 from tracim.exceptions import RevisionDoesNotMatchThisContent
 from tracim.exceptions import EmptyCommentContentNotAllowed
 from tracim.exceptions import EmptyLabelNotAllowed
 from tracim.exceptions import ContentNotFound
 from tracim.exceptions import WorkspacesDoNotMatch
+from tracim.exceptions import ConflictingMoveInItself
+from tracim.exceptions import ContentLabelAlreadyUsedHere
 from tracim.lib.utils.utils import current_date_for_filename
+from tracim.lib.utils.utils import get_file_hash_and_size
+from tracim.lib.utils.utils import get_keyset_cursor
+from tracim.lib.utils.utils import get_label_keyset_cursor
+from tracim.lib.utils.utils import get_spooled_file
 from tracim.models.revision_protection import new_revision
 from tracim.models.auth import User
 from tracim.models.data import ActionDescription
@@ -43,7 +56,6 @@ from tracim.models.data import Content
 from tracim.models.data import ContentType
 from tracim.models.data import NodeTreeItem
 from tracim.models.data import RevisionReadStatus
-from tracim.models.data import UserRoleInWorkspace
 from tracim.models.data import Workspace
 from tracim.lib.utils.translation import fake_translator as _
 from tracim.models.context_models import RevisionInContext
@@ -104,6 +116,8 @@ class ContentApi(object):
 
     SEARCH_SEPARATORS = ',| '
     SEARCH_DEFAULT_RESULT_NB = 50
+    # Max number of contents modified by one query of bulk operations
+    BULK_BATCH_SIZE = 500
 
     DISPLAYABLE_CONTENTS = (
         ContentType.Folder,
@@ -172,6 +186,62 @@ class ContentApi(object):
     def get_content_in_context(self, content: Content) -> ContentInContext:
         return ContentInContext(content, self._session, self._config, self._user)  # nopep8
 
+    def get_contents_in_context(
+            self,
+            contents: typing.List[Content],
+    ) -> typing.List[ContentInContext]:
+        """
+        Return ContentInContext of given contents. Authors, last modifiers
+        and read status are loaded for all contents at once instead of once
+        per content.
+        :param contents: contents to return in context
+        :return: list of ContentInContext, in same order as contents
+        """
+        content_ids = [content.id for content in contents]
+        if not content_ids:
+            return []
+
+        revisions_bounds = self._session.query(
+            ContentRevisionRO.content_id,
+            func.min(ContentRevisionRO.revision_id),
+            func.max(ContentRevisionRO.revision_id),
+        ).filter(
+            ContentRevisionRO.content_id.in_(content_ids),
+        ).group_by(
+            ContentRevisionRO.content_id,
+        ).all()
+        first_revision_ids = {}
+        last_revision_ids = {}
+        for content_id, first_revision_id, last_revision_id in revisions_bounds:  # nopep8
+            first_revision_ids[content_id] = first_revision_id
+            last_revision_ids[content_id] = last_revision_id
+
+        revision_ids = set(first_revision_ids.values())
+        revision_ids.update(last_revision_ids.values())
+        owners = dict(
+            self._session.query(ContentRevisionRO.revision_id, User)
+            .join(User, User.user_id == ContentRevisionRO.owner_id)
+            .filter(ContentRevisionRO.revision_id.in_(revision_ids))
+            .all()
+        )
+
+        unread_content_ids = set()
+        if self._user:
+            unread_content_ids = self.get_unread_content_ids(content_ids)
+
+        return [
+            ContentInContext(
+                content,
+                self._session,
+                self._config,
+                self._user,
+                author=owners.get(first_revision_ids.get(content.id)),
+                last_modifier=owners.get(last_revision_ids.get(content.id)),
+                read_by_user=content.id not in unread_content_ids if self._user else None,  # nopep8
+            )
+            for content in contents
+        ]
+
     def get_revision_in_context(self, revision: ContentRevisionRO) -> RevisionInContext:  # nopep8
         # TODO - G.M - 2018-06-173 - create revision in context object
         return RevisionInContext(revision, self._session, self._config)
@@ -181,13 +251,7 @@ class ContentApi(object):
         Return the Content/ContentRevision query join condition
         :return: Content/ContentRevision query join condition
         """
-        return and_(Content.id == ContentRevisionRO.content_id,
-                    ContentRevisionRO.revision_id == self._session.query(
-                        ContentRevisionRO.revision_id)
-                    .filter(ContentRevisionRO.content_id == Content.id)
-                    .order_by(ContentRevisionRO.revision_id.desc())
-                    .limit(1)
-                    .correlate(Content))
+        return ContentRevisionRO.revision_id == Content.current_revision_id
 
     def get_canonical_query(self) -> Query:
         """
@@ -195,7 +259,34 @@ class ContentApi(object):
         :return: Content/ContentRevision Query
         """
         return self._session.query(Content)\
-            .join(ContentRevisionRO, self._get_revision_join())
+            .join(ContentRevisionRO, self._get_revision_join())\
+            .options(contains_eager(Content.current_revision))
+
+    def update_current_revision_ids(
+            self,
+            only_missing: bool=True,
+            content_ids: typing.List[int]=None,
+    ) -> int:
+        """
+        Set content.current_revision_id to the most recent revision of each
+        content. Used to fill the denormalized pointer for contents created
+        before its introduction, or whose revisions are inserted in bulk.
+        :param only_missing: only update contents without pointer
+        :param content_ids: only update these contents
+        :return: number of updated contents
+        """
+        last_revision_id = sqlalchemy.select(
+            [func.max(ContentRevisionRO.revision_id)]
+        ).where(ContentRevisionRO.content_id == Content.id).as_scalar()
+        query = self._session.query(Content)
+        if only_missing:
+            query = query.filter(Content.current_revision_id == None)
+        if content_ids is not None:
+            query = query.filter(Content.id.in_(content_ids))
+        return query.update(
+            {Content.current_revision_id: last_revision_id},
+            synchronize_session=False,
+        )
 
     # TODO - G.M - 2018-07-24 - [Cleanup] Is this method already needed ?
     @classmethod
@@ -238,12 +329,10 @@ class ContentApi(object):
         # Security layer: if user provided, filter
         # with user workspaces privileges
         if self._user and not self._disable_user_workspaces_filter:
-            user = self._session.query(User).get(self._user_id)
+            access = WorkspaceAccessIndex.get(self._session, self._user_id)
             # Filter according to user workspaces
-            workspace_ids = [r.workspace_id for r in user.roles \
-                             if r.role>=UserRoleInWorkspace.READER]
             result = result.filter(or_(
-                Content.workspace_id.in_(workspace_ids),
+                access.get_workspace_filter(Content.workspace_id),
                 # And allow access to non workspace document when he is owner
                 and_(
                     Content.workspace_id == None,
@@ -286,11 +375,11 @@ class ContentApi(object):
             result = result.filter(ContentRevisionRO.workspace_id==workspace.workspace_id)
 
         if self._user:
-            user = self._session.query(User).get(self._user_id)
+            access = WorkspaceAccessIndex.get(self._session, self._user_id)
             # Filter according to user workspaces
-            workspace_ids = [r.workspace_id for r in user.roles \
-                             if r.role>=UserRoleInWorkspace.READER]
-            result = result.filter(ContentRevisionRO.workspace_id.in_(workspace_ids))
+            result = result.filter(
+                access.get_workspace_filter(ContentRevisionRO.workspace_id)
+            )
 
         return result
 
@@ -441,6 +530,8 @@ class ContentApi(object):
         ):
             content.file_extension = '.html'
 
+        self.update_label_path(content)
+
         if do_save:
             self._session.add(content)
             self.save(content, ActionDescription.CREATION, do_notify=do_notify)
@@ -509,6 +600,30 @@ class ContentApi(object):
             raise ContentNotFound('Content "{}" not found in database'.format(content_id)) from exc  # nopep8
         return content
 
+    def get_many(
+            self,
+            content_ids: typing.List[int],
+            workspace: Workspace=None,
+    ) -> typing.List[Content]:
+        """
+        Get contents of given ids, in one query.
+        :param content_ids: ids of contents
+        :param workspace: workspace filter
+        :return: contents, in ids order
+        """
+        contents = {
+            content.content_id: content
+            for content in self._base_query(workspace).filter(
+                Content.id.in_(content_ids),
+            )
+        }
+        missing_ids = set(content_ids) - set(contents.keys())
+        if missing_ids:
+            raise ContentNotFound('Contents "{}" not found in database'.format(  # nopep8
+                ', '.join(str(content_id) for content_id in sorted(missing_ids)),  # nopep8
+            ))
+        return [contents[content_id] for content_id in dict.fromkeys(content_ids)]  # nopep8
+
     def get_one_revision(self, revision_id: int = None, content: Content= None) -> ContentRevisionRO:  # nopep8
         """
         This method allow us to get directly any revision with its id
@@ -612,14 +727,6 @@ class ContentApi(object):
         :return: Found Content
         """
         query = self._base_query(workspace)
-        parent_folder = None
-
-        # Grab content parent folder if parent path given
-        if content_parent_labels:
-            parent_folder = self.get_folder_with_workspace_path_labels(
-                content_parent_labels,
-                workspace,
-            )
 
         # Build query for found content by label
         content_query = self.filter_query_for_content_label_as_path(
@@ -627,10 +734,17 @@ class ContentApi(object):
             content_label_as_file=content_label,
         )
 
-        # Modify query to apply parent folder filter if any
-        if parent_folder:
-            content_query = content_query.filter(
-                Content.parent_id == parent_folder.content_id,
+        # Modify query to apply parent folder filter: parent folder is found
+        # with its label path in the same query.
+        if content_parent_labels:
+            parent_folder = aliased(Content)
+            content_query = content_query.join(
+                parent_folder,
+                Content.parent_id == parent_folder.id,
+            ).filter(
+                parent_folder.label_path == self.get_label_path_from_labels(
+                    content_parent_labels,
+                ),
             )
         else:
             content_query = content_query.filter(
@@ -664,34 +778,85 @@ class ContentApi(object):
         :param workspace: workspace of folders
         :return: Content folder
         """
-        query = self._base_query(workspace)
-        folder = None
+        if not path_labels:
+            return None
 
-        for label in path_labels:
-            # Filter query on label
-            folder_query = query \
-                .filter(
-                    Content.type == ContentType.Folder,
-                    Content.label == label,
-                    Content.workspace_id == workspace.workspace_id,
-                )
+        return self._base_query(workspace) \
+            .filter(
+                Content.type == ContentType.Folder,
+                Content.label_path == self.get_label_path_from_labels(
+                    path_labels,
+                ),
+                Content.workspace_id == workspace.workspace_id,
+            ) \
+            .order_by(Content.revision_id.desc()) \
+            .one()
 
-            # Search into parent folder (if already deep)
-            if folder:
-                folder_query = folder_query\
-                    .filter(
-                        Content.parent_id == folder.content_id,
-                    )
-            else:
-                folder_query = folder_query \
-                    .filter(Content.parent_id == None)
+    @classmethod
+    def get_label_path_from_labels(cls, labels: typing.List[str]) -> str:
+        """
+        Return label path for given labels as file
+        E.g.: "/foo/bar" for ['foo', 'bar']
+        :param labels: Ordered list of labels as file (without workspace label)
+        :return: label path
+        """
+        return ''.join('/{}'.format(label) for label in labels)
 
-            # Get thirst corresponding folder
-            folder = folder_query \
-                .order_by(Content.revision_id.desc()) \
-                .one()
+    def _get_label_path(self, content: Content) -> str:
+        parent = content.parent
+        parent_label_path = ''
+        if parent:
+            parent_label_path = parent.label_path
+            if parent_label_path is None:
+                parent_label_path = self._get_label_path(parent)
+        return '{}/{}'.format(parent_label_path, content.get_label_as_file())
+
+    def update_label_path(
+            self,
+            content: Content,
+            force_children: bool=False,
+    ) -> int:
+        """
+        Update materialized label path of content and, if it changed, label
+        path of its children recursively. Comments have no label path.
+        :param content: content to update
+        :param force_children: update children even if content path did not
+        change
+        :return: number of updated contents
+        """
+        if content.type == ContentType.Comment:
+            return 0
 
-        return folder
+        updated = 0
+        label_path = self._get_label_path(content)
+        if content.label_path != label_path:
+            content.label_path = label_path
+            updated += 1
+        elif not force_children:
+            return updated
+
+        if content.id is not None:
+            children = self.get_canonical_query().filter(
+                Content.parent_id == content.id,
+                Content.type != ContentType.Comment,
+            )
+            for child in children:
+                updated += self.update_label_path(child, force_children)
+        return updated
+
+    def update_label_paths(self) -> int:
+        """
+        Recompute label path of all contents
+        :return: number of updated contents
+        """
+        updated = 0
+        roots = self.get_canonical_query().filter(
+            Content.parent_id == None,
+            Content.type != ContentType.Comment,
+        )
+        for content in roots:
+            updated += self.update_label_path(content, force_children=True)
+        return updated
 
     def filter_query_for_content_label_as_path(
             self,
@@ -744,6 +909,22 @@ class ContentApi(object):
         ))
 
 
+    def _check_preview_not_pending(self, revision_id: int) -> None:
+        """
+        :raise PreviewPending: if previews of revision are being generated
+        in background
+        """
+        preview_generation_api = PreviewGenerationApi(
+            session=self._session,
+            config=self._config,
+        )
+        if preview_generation_api.is_pending(revision_id):
+            raise PreviewPending(
+                'preview of revision {} is being generated'.format(
+                    revision_id,
+                ),
+            )
+
     def get_pdf_preview_path(
             self,
             content_id: int,
@@ -756,7 +937,9 @@ class ContentApi(object):
         :param revision_id: id of content revision
         :param page: page number of the preview, useful for multipage content
         :return: preview_path as string
+        :raise PreviewPending: if previews are being generated
         """
+        self._check_preview_not_pending(revision_id)
         file_path = self.get_one_revision_filepath(revision_id)
         if page >= self.preview_manager.get_page_nb(file_path):
             raise PageOfPreviewNotFound(
@@ -776,7 +959,9 @@ class ContentApi(object):
         Get full(multiple page) pdf preview of revision of content
         :param revision_id: id of revision
         :return: path of the full pdf preview of this revision
+        :raise PreviewPending: if previews are being generated
         """
+        self._check_preview_not_pending(revision_id)
         file_path = self.get_one_revision_filepath(revision_id)
         pdf_preview_path = self.preview_manager.get_pdf_preview(file_path)
         return pdf_preview_path
@@ -806,7 +991,9 @@ class ContentApi(object):
         :param width: width in pixel
         :param height: height in pixel
         :return: preview_path as string
+        :raise PreviewPending: if previews are being generated
         """
+        self._check_preview_not_pending(revision_id)
         file_path = self.get_one_revision_filepath(revision_id)
         if page >= self.preview_manager.get_page_nb(file_path):
             raise Exception(
@@ -871,8 +1058,64 @@ class ContentApi(object):
 
         return resultset
 
-    def get_all(self, parent_id: int=None, content_type: str=ContentType.Any, workspace: Workspace=None) -> typing.List[Content]:
-        return self._get_all_query(parent_id, content_type, workspace).all()
+    def get_all(
+            self,
+            parent_id: int=None,
+            content_type: str=ContentType.Any,
+            workspace: Workspace=None,
+            limit: typing.Optional[int]=None,
+            after: typing.Optional[typing.Tuple[str, str, int]]=None,
+    ) -> typing.List[Content]:
+        """
+        Get contents. When paginated (limit or after given), contents are
+        sorted by type, label then id.
+        :param parent_id: filter by parent_id
+        :param content_type: filter by content_type slug
+        :param workspace: filter by workspace
+        :param limit: maximum number of contents to return
+        :param after: keyset cursor of last content of previous page, as
+        type, label and id (see parse_label_keyset_cursor())
+        :return: list of content
+        """
+        resultset = self._get_all_query(parent_id, content_type, workspace)
+        if not limit and not after:
+            return resultset.all()
+
+        resultset = resultset.order_by(
+            Content.type,
+            Content.label,
+            Content.content_id,
+        )
+        if after:
+            after_type, after_label, after_id = after
+            resultset = resultset.filter(or_(
+                Content.type > after_type,
+                and_(
+                    Content.type == after_type,
+                    Content.label > after_label,
+                ),
+                and_(
+                    Content.type == after_type,
+                    Content.label == after_label,
+                    Content.content_id > after_id,
+                ),
+            ))
+        if limit:
+            resultset = resultset.limit(limit)
+        return resultset.all()
+
+    def get_all_cursor(self, content: Content) -> str:
+        """
+        Return keyset cursor of content, to get next contents after it
+        with get_all().
+        :param content: last content of previous page
+        :return: cursor as string, see parse_label_keyset_cursor()
+        """
+        return get_label_keyset_cursor(
+            content.type,
+            content.label,
+            content.content_id,
+        )
 
     # TODO - G.M - 2018-07-17 - [Cleanup] Drop this method if unneeded
     # def get_children(self, parent_id: int, content_types: list, workspace: Workspace=None) -> typing.List[Content]:
@@ -985,12 +1228,46 @@ class ContentApi(object):
     #
     #     return resultset.all()
 
+    def _get_last_active_query(
+            self,
+            workspace: Workspace=None,
+            content_ids: typing.Optional[typing.List[int]] = None,
+    ) -> Query:
+        """
+        Return query of (active content id, last activity datetime) where
+        comments are grouped with their parent content: activity of a content
+        is the last update of content itself or of one of its comments.
+        """
+        active_content_id = sqlalchemy.case(
+            [(ContentRevisionRO.type == ContentType.Comment, ContentRevisionRO.parent_id)],  # nopep8
+            else_=ContentRevisionRO.content_id,
+        )
+        last_activity = func.max(ContentRevisionRO.updated)
+        resultset = self._get_all_query(
+            workspace=workspace,
+        )
+        if content_ids:
+            resultset = resultset.filter(
+                or_(
+                    Content.content_id.in_(content_ids),
+                    and_(
+                        Content.parent_id.in_(content_ids),
+                        Content.type == ContentType.Comment
+                    )
+                )
+            )
+        return resultset.with_entities(
+            active_content_id.label('content_id'),
+            last_activity.label('last_activity'),
+        ).group_by(active_content_id)
+
     def get_last_active(
             self,
             workspace: Workspace=None,
             limit: typing.Optional[int]=None,
             before_datetime: typing.Optional[datetime.datetime]= None,
             content_ids: typing.Optional[typing.List[int]] = None,
+            before_content_id: typing.Optional[int] = None,
     ) -> typing.List[Content]:
         """
         get contents list sorted by last update
@@ -1000,50 +1277,73 @@ class ContentApi(object):
         :param before_datetime: date from where we check older content.
         :param content_ids: restrict selection to some content ids and
         related Comments
+        :param before_content_id: with before_datetime, keyset cursor of
+        last content of previous page: contents with same last activity date
+        are returned only if their id is lower.
         :return: list of content
         """
-
-        resultset = self._get_all_query(
+        last_active_query = self._get_last_active_query(
             workspace=workspace,
+            content_ids=content_ids,
         )
-        if content_ids:
-            resultset = resultset.filter(
-                or_(
-                    Content.content_id.in_(content_ids),
+        last_active = last_active_query.subquery()
+        resultset = self._session.query(
+            last_active.c.content_id,
+        ).order_by(
+            desc(last_active.c.last_activity),
+            desc(last_active.c.content_id),
+        )
+        if before_datetime:
+            if before_content_id:
+                resultset = resultset.filter(or_(
+                    last_active.c.last_activity < before_datetime,
                     and_(
-                        Content.parent_id.in_(content_ids),
-                        Content.type == ContentType.Comment
+                        last_active.c.last_activity == before_datetime,
+                        last_active.c.content_id < before_content_id,
                     )
-                )
-            )
-
-        resultset = resultset.order_by(desc(Content.updated))
-
-        active_contents = []
-        too_recent_content = []
-        for content in resultset:
-            related_active_content = None
-            if ContentType.Comment == content.type:
-                related_active_content = content.parent
+                ))
             else:
-                related_active_content = content
-
-            if not before_datetime:
-                before_datetime = datetime.datetime.now()
-            # INFO - D.A. - 2015-05-20
-            # We do not want to show only one item if the last 10 items are
-            # comments about one thread for example
-            if related_active_content not in active_contents and related_active_content not in too_recent_content:  # nopep8
-                # we verify that content is old enough
-                if content.updated < before_datetime:
-                    active_contents.append(related_active_content)
-                else:
-                    too_recent_content.append(related_active_content)
-
-            if limit and len(active_contents) >= limit:
-                break
+                resultset = resultset.filter(
+                    last_active.c.last_activity < before_datetime,
+                )
+        if limit:
+            resultset = resultset.limit(limit)
+
+        active_content_ids = [row.content_id for row in resultset]
+        if not active_content_ids:
+            return []
+        # INFO - G.M - 2018-08-03 - Parent of comments may not be in
+        # filtered contents (deleted, archived...), get them without filter.
+        contents = self.get_canonical_query().filter(
+            Content.id.in_(active_content_ids),
+        )
+        contents_by_id = {content.id: content for content in contents}
+        return [
+            contents_by_id[content_id] for content_id in active_content_ids
+        ]
 
-        return active_contents
+    def get_last_active_cursor(
+            self,
+            content: Content,
+            workspace: Workspace=None,
+    ) -> str:
+        """
+        Return keyset cursor of content, to get next last active contents
+        after it.
+        :param content: last content of previous page
+        :param workspace: Workspace to check
+        :return: cursor as string, see parse_keyset_cursor()
+        """
+        last_active = self._get_last_active_query(
+            workspace=workspace,
+            content_ids=[content.content_id],
+        ).subquery()
+        last_activity = self._session.query(
+            last_active.c.last_activity,
+        ).filter(
+            last_active.c.content_id == content.content_id,
+        ).scalar()
+        return get_keyset_cursor(last_activity, content.content_id)
 
     # TODO - G.M - 2018-07-19 - Find a way to update this method to something
     # usable and efficient for tracim v2 to get content with read/unread status
@@ -1150,6 +1450,7 @@ class ContentApi(object):
                 item.workspace = new_parent.workspace
 
         item.revision_type = ActionDescription.MOVE
+        self.update_label_path(item)
 
     def copy(
         self,
@@ -1195,6 +1496,7 @@ class ContentApi(object):
                 'content': item.id,
                 'revision': item.last_revision.revision_id,
             }
+        self.update_label_path(content)
         if do_save:
             self.save(content, ActionDescription.COPY, do_notify=do_notify)
         return content
@@ -1205,17 +1507,508 @@ class ContentApi(object):
 
     def move_recursively(self, item: Content,
                          new_parent: Content, new_workspace: Workspace):
-        self.move(item, new_parent, False, new_workspace)
-        self.save(item, do_notify=False)
+        """
+        Move item and all its children to new workspace, see bulk_move.
+        """
+        self.bulk_move([item], new_parent, new_workspace)
 
-        for child in item.children:
-            with new_revision(
-                session=self._session,
-                tm=transaction.manager,
-                content=child
-            ):
-                self.move_recursively(child, item, new_workspace)
-        return
+    @classmethod
+    def _get_batches(
+            cls,
+            ids: typing.List[int],
+    ) -> typing.Iterator[typing.List[int]]:
+        for index in range(0, len(ids), cls.BULK_BATCH_SIZE):
+            yield ids[index:index + cls.BULK_BATCH_SIZE]
+
+    def _get_contents_tree_ids(
+            self,
+            content_ids: typing.List[int],
+    ) -> typing.List[int]:
+        """
+        :return: ids of given contents and of all their children
+        (deleted and archived ones included), recursively
+        """
+        tree = self._get_content_tree_cte(content_ids, valid_only=False)
+        return list({
+            row.content_id
+            for row in self._session.query(tree.c.content_id)
+        })
+
+    def _insert_revisions(
+            self,
+            revisions: Query,
+            values: typing.Dict[str, typing.Any],
+    ) -> None:
+        """
+        Insert new revisions, copied from given ones, with one
+        INSERT ... SELECT query.
+        :param revisions: ContentRevisionRO query of revisions to copy
+        :param values: new values (python values or sql expressions) of
+        revisions by column name
+        """
+        columns = [
+            column for column in ContentRevisionRO.__table__.columns
+            if not column.primary_key
+        ]
+        selected_values = []
+        for column in columns:
+            value = values.get(column.name, column)
+            if not isinstance(value, sqlalchemy.sql.ClauseElement):
+                value = sqlalchemy.literal(value, type_=column.type)
+            selected_values.append(value)
+        revisions = revisions \
+            .with_entities(*selected_values) \
+            .order_by(ContentRevisionRO.revision_id)
+        self._session.execute(
+            ContentRevisionRO.__table__.insert().from_select(
+                [column.name for column in columns],
+                revisions,
+            )
+        )
+
+    def _insert_current_revisions(
+            self,
+            content_ids: typing.List[int],
+            values: typing.Dict[str, typing.Any],
+    ) -> None:
+        """
+        Add a new revision to given contents, built from their current
+        revision with given values, by batches of BULK_BATCH_SIZE contents.
+        """
+        for batch in self._get_batches(content_ids):
+            self._insert_revisions(
+                self._session.query(ContentRevisionRO).join(
+                    Content,
+                    self._get_revision_join(),
+                ).filter(Content.id.in_(batch)),
+                values,
+            )
+            self.update_current_revision_ids(
+                only_missing=False,
+                content_ids=batch,
+            )
+
+    def _update_label_paths_prefix(
+            self,
+            content_ids: typing.List[int],
+            old_label_path: str,
+            new_label_path: str,
+    ) -> None:
+        """
+        Replace old_label_path prefix by new_label_path in label path of
+        given contents.
+        """
+        if old_label_path == new_label_path:
+            return
+        for batch in self._get_batches(content_ids):
+            self._session.query(Content).filter(
+                Content.id.in_(batch),
+                Content.label_path != None,
+            ).update(
+                {
+                    Content.label_path: sqlalchemy.literal(new_label_path) +
+                    func.substr(Content.label_path, len(old_label_path) + 1),
+                },
+                synchronize_session=False,
+            )
+
+    def _update_subtree_label_paths(
+            self,
+            content: Content,
+            old_label_path: typing.Optional[str],
+    ) -> None:
+        """
+        Update label path of content and of its children once content
+        label or parent changed.
+        """
+        if content.type == ContentType.Comment:
+            return
+        if old_label_path is None:
+            self.update_label_path(content, force_children=True)
+            return
+        self._update_label_paths_prefix(
+            self._get_content_tree_ids(content.content_id, valid_only=False),
+            old_label_path,
+            self._get_label_path(content),
+        )
+
+    def _expire_contents(self) -> None:
+        """
+        Contents revisions and label paths are updated with bulk queries,
+        expire their ORM representation so they are reloaded.
+        """
+        for instance in list(self._session.identity_map.values()):
+            if isinstance(instance, Content):
+                self._session.expire(instance)
+
+    def _index_contents(self, content_ids: typing.List[int]) -> None:
+        search_api = SearchApi(session=self._session, config=self._config)
+        for batch in self._get_batches(content_ids):
+            contents = self.get_canonical_query().filter(
+                Content.id.in_(batch),
+                ContentRevisionRO.type != ContentType.Comment,
+            )
+            for content in contents:
+                search_api.index_content(content)
+
+    def bulk_move(
+            self,
+            contents: typing.List[Content],
+            new_parent: Content=None,
+            new_workspace: Workspace=None,
+    ) -> None:
+        """
+        Move contents with their children, with set-based queries: one new
+        revision is inserted for each moved content and, if workspace
+        changes, for each of their children (recursively), then label paths
+        of the whole subtrees are updated at once.
+        One notification is sent for the whole move.
+        :param contents: contents to move
+        :param new_parent: new parent of contents, None for workspace root
+        :param new_workspace: new workspace of contents, parent workspace by
+        default
+        """
+        if new_parent:
+            if new_workspace and \
+                    new_parent.workspace_id != new_workspace.workspace_id:
+                raise WorkspacesDoNotMatch(
+                    'new parent workspace and new workspace should be the same.'  # nopep8
+                )
+            new_workspace = new_parent.workspace
+        if not contents:
+            return
+
+        self._session.flush()
+        content_ids = [content.content_id for content in contents]
+        old_label_paths = [content.label_path for content in contents]
+        tree_ids = self._get_contents_tree_ids(content_ids)
+        if new_parent and new_parent.content_id in tree_ids:
+            raise ConflictingMoveInItself(
+                'Content {} can not be moved in itself or in its children'.format(  # nopep8
+                    new_parent.content_id,
+                )
+            )
+
+        now = datetime.datetime.utcnow()
+        values = {
+            'parent_id': new_parent.content_id if new_parent else None,
+            'revision_type': ActionDescription.MOVE,
+            'updated': now,
+        }
+        if new_workspace:
+            values['workspace_id'] = new_workspace.workspace_id
+        self._insert_current_revisions(content_ids, values)
+        if new_workspace and any(
+            content.workspace_id != new_workspace.workspace_id
+            for content in contents
+        ):
+            self._insert_current_revisions(
+                [
+                    content_id for content_id in tree_ids
+                    if content_id not in content_ids
+                ],
+                {
+                    'workspace_id': new_workspace.workspace_id,
+                    'revision_type': ActionDescription.MOVE,
+                    'updated': now,
+                },
+            )
+        self._expire_contents()
+        for content, old_label_path in zip(contents, old_label_paths):
+            self._update_subtree_label_paths(content, old_label_path)
+        self._expire_contents()
+        self.do_notify_contents(contents)
+
+    def _bulk_set_flag(
+            self,
+            contents: typing.List[Content],
+            flag: str,
+            action: str,
+            action_description: str,
+    ) -> None:
+        if not contents:
+            return
+        self._session.flush()
+        content_ids = [content.content_id for content in contents]
+        old_label_paths = [content.label_path for content in contents]
+        # INFO - G.M - 12-03-2018 - Set label name to avoid trouble when
+        # un-deleting or un-archiving file.
+        label_suffix = '-{action}-{date}'.format(
+            action=action,
+            date=current_date_for_filename(),
+        )
+        self._insert_current_revisions(
+            content_ids,
+            {
+                flag: True,
+                'owner_id': self._user_id,
+                'label': ContentRevisionRO.__table__.c.label + label_suffix,
+                'revision_type': action_description,
+                'updated': datetime.datetime.utcnow(),
+            },
+        )
+        self._expire_contents()
+        for content, old_label_path in zip(contents, old_label_paths):
+            self._update_subtree_label_paths(content, old_label_path)
+        self._expire_contents()
+        self._index_contents(content_ids)
+        self.do_notify_contents(contents)
+
+    def bulk_delete(self, contents: typing.List[Content]) -> None:
+        """
+        Delete contents, with one INSERT ... SELECT query by batch of
+        contents. Like delete(), children are not modified: they are not
+        visible anymore because their parent is deleted.
+        One notification is sent for the whole deletion.
+        """
+        self._bulk_set_flag(
+            contents,
+            'is_deleted',
+            'deleted',
+            ActionDescription.DELETION,
+        )
+
+    def bulk_archive(self, contents: typing.List[Content]) -> None:
+        """
+        Archive contents, with one INSERT ... SELECT query by batch of
+        contents. Like archive(), children are not modified.
+        One notification is sent for the whole archiving.
+        """
+        self._bulk_set_flag(
+            contents,
+            'is_archived',
+            'archived',
+            ActionDescription.ARCHIVING,
+        )
+
+    def bulk_copy(
+            self,
+            contents: typing.List[Content],
+            new_parent: Content=None,
+            new_workspace: Workspace=None,
+            new_label: str=None,
+    ) -> typing.List[Content]:
+        """
+        Copy contents with their valid children, recursively, revisions
+        included, with set-based queries:
+        - content rows are inserted with INSERT ... SELECT,
+        - revisions are copied with INSERT ... SELECT by batch of contents,
+        - a "copy" revision is added to each copied content.
+        Files are not read again: copies share stored files.
+        One notification is sent for the whole copy.
+        :param contents: contents to copy
+        :param new_parent: parent of copies, None for workspace root
+        :param new_workspace: workspace of copies, parent workspace by default
+        :param new_label: label of copies, same label by default
+        :return: copies of given contents
+        """
+        if new_parent:
+            if new_workspace and \
+                    new_parent.workspace_id != new_workspace.workspace_id:
+                raise WorkspacesDoNotMatch(
+                    'new parent workspace and new workspace should be the same.'  # nopep8
+                )
+            new_workspace = new_parent.workspace
+        if not new_workspace:
+            raise ValueError('Copy need a parent or a workspace')
+        if not contents:
+            return []
+
+        self._session.flush()
+        tree = self._get_content_tree_cte(
+            [content.content_id for content in contents],
+        )
+        tree_rows = self._session.query(
+            tree.c.root_id,
+            tree.c.content_id,
+            ContentRevisionRO.parent_id,
+            Content.label_path,
+        ).select_from(tree).join(
+            Content,
+            Content.id == tree.c.content_id,
+        ).join(
+            ContentRevisionRO,
+            self._get_revision_join(),
+        ).all()
+        # INFO - G.M - 2018-08-13 - Contents which are children of other
+        # copied contents are copied with them.
+        nested_ids = {
+            row.content_id for row in tree_rows
+            if row.root_id != row.content_id
+        }
+        contents = [
+            content for content in contents
+            if content.content_id not in nested_ids
+        ]
+        roots = {content.content_id: content for content in contents}
+        tree_rows = [row for row in tree_rows if row.root_id in roots]
+        copied_ids = [row.content_id for row in tree_rows]
+        if any(
+            new_parent and row.content_id == new_parent.content_id
+            for row in tree_rows
+        ):
+            raise ConflictingMoveInItself(
+                'Content {} can not be copied in itself or in its children'.format(  # nopep8
+                    new_parent.content_id,
+                )
+            )
+
+        parent_label_path = ''
+        if new_parent:
+            parent_label_path = new_parent.label_path
+            if parent_label_path is None:
+                parent_label_path = self._get_label_path(new_parent)
+        root_label_paths = {}
+        for root_id, root in roots.items():
+            label_as_file = root.get_label_as_file()
+            if new_label:
+                label_as_file = new_label + label_as_file[len(root.label):]
+            root_label_paths[root_id] = '{}/{}'.format(
+                parent_label_path,
+                label_as_file,
+            )
+        self._check_copy_label_paths(
+            [
+                label_path for root_id, label_path in root_label_paths.items()
+                if roots[root_id].label_path is not None
+            ],
+            new_workspace,
+        )
+
+        # INFO - G.M - 2018-08-13 - Content rows are inserted with a
+        # temporary label path made of a marker and id of copied content to
+        # get ids of copies without a query by content.
+        marker = 'bulk-copy:{}:'.format(uuid.uuid4().hex)
+        for batch in self._get_batches(copied_ids):
+            self._session.execute(
+                Content.__table__.insert().from_select(
+                    ['label_path'],
+                    self._session.query(
+                        sqlalchemy.literal(marker) +
+                        sqlalchemy.cast(Content.id, sqlalchemy.Unicode),
+                    ).filter(Content.id.in_(batch)),
+                )
+            )
+        copy_ids = {}  # type: typing.Dict[int, int]
+        for copy_id, label_path in self._session.query(
+            Content.id,
+            Content.label_path,
+        ).filter(Content.label_path.startswith(marker)):
+            copy_ids[int(label_path[len(marker):])] = copy_id
+
+        copy_parent_ids = {}
+        copy_label_paths = {}
+        for row in tree_rows:
+            root = roots[row.root_id]
+            if row.content_id == row.root_id:
+                copy_parent_ids[row.content_id] = \
+                    new_parent.content_id if new_parent else None
+            else:
+                copy_parent_ids[row.content_id] = copy_ids[row.parent_id]
+            if row.label_path is not None and root.label_path is not None:
+                copy_label_paths[copy_ids[row.content_id]] = \
+                    root_label_paths[row.root_id] + \
+                    row.label_path[len(root.label_path):]
+
+        for batch in self._get_batches(copied_ids):
+            batch_parent_ids = {
+                content_id: copy_parent_ids[content_id]
+                for content_id in batch
+                if copy_parent_ids[content_id] is not None
+            }
+            self._insert_revisions(
+                self._session.query(ContentRevisionRO).filter(
+                    ContentRevisionRO.content_id.in_(batch),
+                ),
+                {
+                    'content_id': sqlalchemy.case(
+                        {content_id: copy_ids[content_id] for content_id in batch},  # nopep8
+                        value=ContentRevisionRO.content_id,
+                    ),
+                    'parent_id': sqlalchemy.case(
+                        batch_parent_ids,
+                        value=ContentRevisionRO.content_id,
+                    ) if batch_parent_ids else sqlalchemy.null(),
+                },
+            )
+        new_ids = [copy_ids[content_id] for content_id in copied_ids]
+        for batch in self._get_batches(new_ids):
+            self.update_current_revision_ids(
+                only_missing=False,
+                content_ids=batch,
+            )
+            batch_label_paths = {
+                content_id: copy_label_paths[content_id]
+                for content_id in batch
+                if content_id in copy_label_paths
+            }
+            self._session.query(Content).filter(
+                Content.id.in_(batch),
+            ).update(
+                {
+                    Content.label_path: sqlalchemy.case(
+                        batch_label_paths,
+                        value=Content.id,
+                    ) if batch_label_paths else sqlalchemy.null(),
+                },
+                synchronize_session=False,
+            )
+
+        copy_values = {
+            'workspace_id': new_workspace.workspace_id,
+            'revision_type': ActionDescription.COPY,
+            'updated': datetime.datetime.utcnow(),
+        }
+        if new_label:
+            copy_values['label'] = sqlalchemy.case(
+                {copy_ids[root_id]: new_label for root_id in roots},
+                value=ContentRevisionRO.content_id,
+                else_=ContentRevisionRO.__table__.c.label,
+            )
+        self._insert_current_revisions(new_ids, copy_values)
+
+        self._expire_contents()
+        copies = self.get_canonical_query().filter(
+            Content.id.in_([copy_ids[root_id] for root_id in roots]),
+        ).all()
+        for copy in copies:
+            if copy.label_path is None:
+                self.update_label_path(copy, force_children=True)
+        for batch in self._get_batches(new_ids):
+            self._mark_read__content_ids(batch)
+        self._index_contents(new_ids)
+        self.do_notify_contents(copies)
+        return copies
+
+    def _check_copy_label_paths(
+            self,
+            label_paths: typing.List[str],
+            workspace: Workspace,
+    ) -> None:
+        """
+        Raise ContentLabelAlreadyUsedHere if copies would have the label path
+        of another content (or of another copy): contents are found by their
+        label path (webdav, api), which must be unique in workspace.
+        :param label_paths: label paths of copies
+        :param workspace: workspace of copies
+        """
+        duplicated_label_paths = {
+            label_path for label_path in label_paths
+            if label_paths.count(label_path) > 1
+        }
+        if label_paths:
+            duplicated_label_paths.update(
+                label_path for label_path, in self._base_query(workspace)
+                .filter(Content.workspace_id == workspace.workspace_id)
+                .filter(Content.label_path.in_(label_paths))
+                .with_entities(Content.label_path)
+            )
+        if duplicated_label_paths:
+            raise ContentLabelAlreadyUsedHere(
+                'Copies can not be created, label path already used: {}'.format(  # nopep8
+                    ', '.join(sorted(duplicated_label_paths)),
+                )
+            )
 
     def update_content(self, item: Content, new_label: str, new_content: str=None) -> Content:
         if item.label==new_label and item.description==new_content:
@@ -1230,9 +2023,66 @@ class ContentApi(object):
         item.revision_type = ActionDescription.EDITION
         return item
 
-    def update_file_data(self, item: Content, new_filename: str, new_mimetype: str, new_content: bytes) -> Content:
+    def _is_same_file(
+            self,
+            item: Content,
+            file_hash: str,
+            file_size: int,
+    ) -> bool:
+        """
+        Check if current file of item has given hash. Without persisted
+        hash, stored file is read by chunks, and only if its size is the
+        same.
+        """
+        if not item.depot_file:
+            return False
+        if item.file_hash is not None:
+            return item.file_hash == file_hash
+        with item.depot_file.file as stored_file:
+            if stored_file.content_length is not None \
+                    and stored_file.content_length != file_size:
+                return False
+            stored_file_hash, _ = get_file_hash_and_size(stored_file)
+        return stored_file_hash == file_hash
+
+    def update_file_data(
+            self,
+            item: Content,
+            new_filename: str,
+            new_mimetype: str,
+            new_content: typing.Union[bytes, typing.BinaryIO],
+    ) -> Content:
+        """
+        Update file of item. File object content is never loaded in memory:
+        it is hashed by chunks (and spooled in a temporary file if it is not
+        seekable) then streamed to depot.
+        :param new_content: new file as bytes or file object
+        :raise SameValueError: if neither mimetype nor file content changed
+        """
+        if isinstance(new_content, bytes):
+            new_content = io.BytesIO(new_content)
+        # INFO - G.M - 2018-08-06 - SpooledTemporaryFile has no seekable()
+        # method with python < 3.11, but can be seeked.
+        seekable = getattr(
+            new_content,
+            'seekable',
+            lambda: hasattr(new_content, 'seek'),
+        )()
+        if seekable:
+            start_position = new_content.tell()
+            new_hash, new_size = get_file_hash_and_size(new_content)
+            new_content.seek(start_position)
+        else:
+            spooled_file = get_spooled_file()
+            new_hash, new_size = get_file_hash_and_size(
+                new_content,
+                spooled_file,
+            )
+            spooled_file.seek(0)
+            new_content = spooled_file
+
         if new_mimetype == item.file_mimetype and \
-                new_content == item.depot_file.file.read():
+                self._is_same_file(item, new_hash, new_size):
             raise SameValueError('The content did not changed')
         item.owner = self._user
         item.file_name = new_filename
@@ -1242,7 +2092,13 @@ class ContentApi(object):
             new_filename,
             new_mimetype,
         )
+        item.file_size = new_size
+        item.file_hash = new_hash
         item.revision_type = ActionDescription.REVISION
+        PreviewGenerationApi(
+            session=self._session,
+            config=self._config,
+        ).schedule_generation(item.revision)
         return item
 
     def archive(self, content: Content):
@@ -1257,6 +2113,7 @@ class ContentApi(object):
             date=current_date_for_filename()
         )
         content.revision_type = ActionDescription.ARCHIVING
+        self.update_label_path(content)
 
     def unarchive(self, content: Content):
         content.owner = self._user
@@ -1275,6 +2132,7 @@ class ContentApi(object):
             date=current_date_for_filename()
         )
         content.revision_type = ActionDescription.DELETION
+        self.update_label_path(content)
 
     def undelete(self, content: Content):
         content.owner = self._user
@@ -1294,74 +2152,220 @@ class ContentApi(object):
                        do_flush: bool=True,
                        recursive: bool=True
                        ):
-        itemset = self.get_last_active(workspace)
-        for item in itemset:
-            if item.has_new_information_for(self._user):
-                self.mark_read(item, read_datetime, do_flush, recursive)
+        # INFO - G.M - 2018-08-02 - All visible contents of workspace are
+        # marked as read at once, no need to walk through children.
+        content_ids = self._base_query(workspace).with_entities(Content.id)
+        self._mark_read__content_ids(content_ids, read_datetime)
 
-    def mark_read(self, content: Content,
-                  read_datetime: datetime=None,
-                  do_flush: bool=True, recursive: bool=True) -> Content:
+    def _get_content_tree_cte(
+            self,
+            content_ids: typing.Union[typing.List[int], Query],
+            valid_only: bool=True,
+    ) -> sqlalchemy.sql.expression.CTE:
+        """
+        Return a recursive CTE of (root_id, content_id) rows: given contents
+        with themselves as root and all their valid (not deleted,
+        not archived) children, recursively, with the given content they
+        belong to as root.
+        :param content_ids: ids of root contents (list or query)
+        :param valid_only: if False, deleted and archived children (and
+        their children) are included too
+        :return: content tree CTE
+        """
+        tree = self._session.query(
+            Content.id.label('root_id'),
+            Content.id.label('content_id'),
+        ).filter(
+            Content.id.in_(content_ids),
+        ).cte('content_tree', recursive=True)
+        children = self._session.query(
+            tree.c.root_id,
+            ContentRevisionRO.content_id,
+        ).select_from(Content).join(
+            ContentRevisionRO,
+            self._get_revision_join(),
+        ).join(
+            tree,
+            ContentRevisionRO.parent_id == tree.c.content_id,
+        )
+        if valid_only:
+            children = children.filter(
+                ContentRevisionRO.is_deleted == False,
+                ContentRevisionRO.is_archived == False,
+            )
+        return tree.union_all(children)
+
+    def _get_content_tree_ids(
+            self,
+            content_id: int,
+            valid_only: bool=True,
+    ) -> typing.List[int]:
+        """
+        Return ids of content and of all its valid children, recursively.
+        Ids are fetched before being used in bulk UPDATE/INSERT/DELETE
+        because some databases (mySQL) do not support CTE before them.
+        """
+        tree = self._get_content_tree_cte([content_id], valid_only)
+        return [row.content_id for row in self._session.query(tree.c.content_id)]  # nopep8
 
+    def get_unread_content_ids(
+            self,
+            content_ids: typing.List[int],
+    ) -> typing.Set[int]:
+        """
+        Return ids of given contents having new information for current
+        user: content current revision or one of its valid children
+        (recursively) is not read by user. This is the batch equivalent of
+        Content.has_new_information_for(), done in one query.
+        :param content_ids: ids of contents to check
+        :return: set of ids of unread contents
+        """
         assert self._user
-        assert content
+        if not content_ids:
+            return set()
+        tree = self._get_content_tree_cte(content_ids)
+        query = self._session.query(
+            distinct(tree.c.root_id),
+        ).select_from(tree).join(
+            Content,
+            Content.id == tree.c.content_id,
+        ).outerjoin(
+            RevisionReadStatus,
+            and_(
+                RevisionReadStatus.revision_id == Content.current_revision_id,  # nopep8
+                RevisionReadStatus.user_id == self._user_id,
+            )
+        ).filter(
+            RevisionReadStatus.user_id == None,
+        )
+        return {root_id for root_id, in query}
 
-        # The algorithm is:
-        # 1. define the read datetime
-        # 2. update all revisions related to current Content
-        # 3. do the same for all child revisions
-        #    (ie parent_id is content_id of current content)
+    def _get_read_status_revision_ids(
+            self,
+            content_ids: typing.Union[typing.List[int], Query],
+    ) -> Query:
+        return self._session.query(
+            ContentRevisionRO.revision_id,
+        ).filter(
+            ContentRevisionRO.content_id.in_(content_ids),
+        )
 
+    def _expire_read_status(self) -> None:
+        """
+        Read status are updated with bulk queries, expire their ORM
+        representation (revision.read_by, ...) so they are reloaded.
+        """
+        for instance in list(self._session.identity_map.values()):
+            if isinstance(instance, ContentRevisionRO):
+                self._session.expire(instance, ['revision_read_statuses'])
+            elif isinstance(instance, RevisionReadStatus):
+                self._session.expire(instance)
+            elif isinstance(instance, User) and instance.user_id == self._user_id:  # nopep8
+                self._session.expire(instance, ['revision_readers'])
+
+    def _mark_read__content_ids(
+            self,
+            content_ids: typing.Union[typing.List[int], Query],
+            read_datetime: datetime=None,
+    ) -> None:
+        """
+        Mark all revisions of given contents as read by current user, with
+        one UPDATE of already existing read status and one
+        INSERT ... SELECT for missing ones.
+        :param content_ids: ids of contents to mark (list or query)
+        :param read_datetime: read datetime, now by default
+        """
+        assert self._user
         if not read_datetime:
             read_datetime = datetime.datetime.now()
 
-        viewed_revisions = self._session.query(ContentRevisionRO) \
-            .filter(ContentRevisionRO.content_id==content.content_id).all()
-
-        for revision in viewed_revisions:
-            revision.read_by[self._user] = read_datetime
-
-        if recursive:
-            # mark read :
-            # - all children
-            # - parent stuff (if you mark a comment as read,
-            #                 then you have seen the parent)
-            # - parent comments
-            for child in content.get_valid_children():
-                self.mark_read(child, read_datetime=read_datetime,
-                               do_flush=False)
-
-            if ContentType.Comment == content.type:
-                self.mark_read(content.parent, read_datetime=read_datetime,
-                               do_flush=False, recursive=False)
-                for comment in content.parent.get_comments():
-                    if comment != content:
-                        self.mark_read(comment, read_datetime=read_datetime,
-                                       do_flush=False, recursive=False)
-
-        if do_flush:
-            self.flush()
+        # INFO - G.M - 2018-08-02 - Pending changes (new revisions, ...) must
+        # be in database before bulk queries.
+        self._session.flush()
 
-        return content
+        revision_ids = self._get_read_status_revision_ids(content_ids)
+        self._session.query(RevisionReadStatus).filter(
+            RevisionReadStatus.user_id == self._user_id,
+            RevisionReadStatus.revision_id.in_(revision_ids.subquery()),
+        ).update(
+            {RevisionReadStatus.view_datetime: read_datetime},
+            synchronize_session=False,
+        )
+        already_read_revision_ids = self._session.query(
+            RevisionReadStatus.revision_id,
+        ).filter(
+            RevisionReadStatus.user_id == self._user_id,
+        )
+        unread_revisions = self._session.query(
+            ContentRevisionRO.revision_id,
+            sqlalchemy.literal(self._user_id, type_=sqlalchemy.Integer),
+            sqlalchemy.literal(read_datetime, type_=sqlalchemy.DateTime),
+        ).filter(
+            ContentRevisionRO.content_id.in_(content_ids),
+            ~ContentRevisionRO.revision_id.in_(already_read_revision_ids.subquery()),  # nopep8
+        )
+        self._session.execute(
+            RevisionReadStatus.__table__.insert().from_select(
+                ['revision_id', 'user_id', 'view_datetime'],
+                unread_revisions,
+            )
+        )
+        self._expire_read_status()
 
-    def mark_unread(self, content: Content, do_flush=True) -> Content:
+    def mark_read(self, content: Content,
+                  read_datetime: datetime=None,
+                  do_flush: bool=True, recursive: bool=True) -> Content:
+        """
+        Mark all revisions of content as read by current user. If recursive:
+        - all valid children, recursively
+        - parent stuff (if you mark a comment as read, then you have seen
+          the parent and its comments)
+        Read status are written with bulk queries, so do_flush is only kept
+        for compatibility.
+        """
         assert self._user
         assert content
 
-        revisions = self._session.query(ContentRevisionRO) \
-            .filter(ContentRevisionRO.content_id==content.content_id).all()
+        if not recursive:
+            content_ids = [content.content_id]
+        elif ContentType.Comment == content.type:
+            content_ids = self._session.query(
+                Content.id,
+            ).join(
+                ContentRevisionRO,
+                self._get_revision_join(),
+            ).filter(or_(
+                Content.id.in_([content.content_id, content.parent_id]),
+                and_(
+                    ContentRevisionRO.parent_id == content.parent_id,
+                    ContentRevisionRO.type == ContentType.Comment,
+                    ContentRevisionRO.is_deleted == False,
+                    ContentRevisionRO.is_archived == False,
+                ),
+            ))
+        else:
+            content_ids = self._get_content_tree_ids(content.content_id)
 
-        for revision in revisions:
-            try:
-                del revision.read_by[self._user]
-            except KeyError:
-                pass
+        self._mark_read__content_ids(content_ids, read_datetime)
+        return content
 
-        for child in content.get_valid_children():
-            self.mark_unread(child, do_flush=False)
+    def mark_unread(self, content: Content, do_flush=True) -> Content:
+        """
+        Mark all revisions of content and of its valid children
+        (recursively) as not read by current user.
+        """
+        assert self._user
+        assert content
 
-        if do_flush:
-            self.flush()
+        self._session.flush()
+        revision_ids = self._get_read_status_revision_ids(
+            self._get_content_tree_ids(content.content_id),
+        )
+        self._session.query(RevisionReadStatus).filter(
+            RevisionReadStatus.user_id == self._user_id,
+            RevisionReadStatus.revision_id.in_(revision_ids.subquery()),
+        ).delete(synchronize_session=False)
+        self._expire_read_status()
 
         return content
 
@@ -1386,6 +2390,10 @@ class ContentApi(object):
         if action_description:
             content.revision_type = action_description
 
+        # INFO - G.M - 2018-07-30 - Label or file extension can be modified
+        # directly, ensure label path stay up to date.
+        self.update_label_path(content)
+
         if do_flush:
             # INFO - 2015-09-03 - D.A.
             # There are 2 flush because of the use
@@ -1403,6 +2411,13 @@ class ContentApi(object):
             # This would help managing view/not viewed status
             self.mark_read(content, do_flush=True)
 
+            # INFO - G.M - 2018-08-09 - Update search index with saved
+            # revision, in same transaction.
+            SearchApi(
+                session=self._session,
+                config=self._config,
+            ).index_content(content)
+
         if do_notify:
             self.do_notify(content)
 
@@ -1419,6 +2434,17 @@ class ContentApi(object):
             session=self._session,
         ).notify_content_update(content)
 
+    def do_notify_contents(self, contents: typing.List[Content]):
+        """
+        Notify update of several contents modified by one operation, at once
+        :param contents: modified contents
+        """
+        NotifierFactory.create(
+            config=self._config,
+            current_user=self._user,
+            session=self._session,
+        ).notify_contents_update(contents)
+
     def get_keywords(self, search_string, search_string_separators=None) -> [str]:
         """
         :param search_string: a list of coma-separated keywords
@@ -1450,6 +2476,43 @@ class ContentApi(object):
 
         return title_keyworded_items
 
+    def search_contents(
+            self,
+            search_string: str,
+            workspace: Workspace=None,
+            limit: int=None,
+            offset: int=0,
+    ) -> typing.List[Content]:
+        """
+        Full text search of contents (label, description, comments and
+        text files content), using search index.
+        :param search_string: words to search, contents must match all of
+        them (words are matched as prefix)
+        :param workspace: search only in this workspace
+        :param limit: max number of contents to return
+        :param offset: number of contents to skip (pagination)
+        :return: contents from most to less relevant
+        """
+        rank_query = SearchApi(
+            session=self._session,
+            config=self._config,
+        ).get_rank_query(search_string)
+        if rank_query is None:
+            return []
+        ranks = rank_query.alias('search_ranks')
+        query = self._base_query(workspace).join(
+            ranks,
+            ranks.c.content_id == Content.id,
+        ).order_by(
+            desc(ranks.c.rank),
+            desc(Content.id),
+        )
+        if offset:
+            query = query.offset(offset)
+        if limit:
+            query = query.limit(limit)
+        return query.all()
+
     def get_all_types(self) -> typing.List[ContentType]:
         labels = ContentType.all()
         content_types = []
@@ -0,0 +1,139 @@
+# -*- coding: utf-8 -*-
+import datetime
+import typing
+from collections import Counter
+from collections import defaultdict
+
+from depot.manager import DepotManager
+from sqlalchemy import or_
+from sqlalchemy.orm import Session
+
+from tracim import CFG
+from tracim.lib.utils.depot import is_content_addressed_id
+from tracim.lib.utils.logger import logger
+from tracim.lib.utils.utils import get_file_hash_and_size
+from tracim.models.data import ContentRevisionRO
+
+
+class DepotApi(object):
+    """
+    Manage files stored in depot, shared between revisions.
+    """
+
+    def __init__(
+            self,
+            session: Session,
+            config: CFG,
+    ):
+        self._session = session
+        self._config = config
+
+    def get_file_references(self) -> typing.Dict[str, int]:
+        """
+        :return: number of revisions using each stored file, by file id (0
+        for unknown file ids)
+        """
+        references = Counter()
+        depot_files = self._session.query(
+            ContentRevisionRO.depot_file,
+        ).filter(
+            ContentRevisionRO.depot_file != None,
+        ).yield_per(1000)
+        for depot_file, in depot_files:
+            references[depot_file.file_id] += 1
+        return references
+
+    def collect_garbage(
+            self,
+            grace_delay: datetime.timedelta,
+            dry_run: bool=False,
+    ) -> typing.List[str]:
+        """
+        Delete stored files not used by any revision.
+        :param grace_delay: files modified (stored or used again) more
+        recently are kept, they may be used by a not yet committed revision.
+        :param dry_run: only return files to delete
+        :return: ids of deleted files
+        """
+        depot = DepotManager.get()
+        references = self.get_file_references()
+        deleted_file_ids = []
+        for file_id in depot.list():
+            if references[file_id]:
+                continue
+            # INFO - G.M - 2018-08-07 - last modification date is checked
+            # after references, as a file can be used again meanwhile
+            modified_since = datetime.datetime.utcnow() - grace_delay
+            try:
+                with depot.get(file_id) as stored_file:
+                    last_modified = stored_file.last_modified
+            except (IOError, ValueError) as exc:
+                # INFO - G.M - 2018-08-07 - Legacy (uuid1) files may be
+                # partially written
+                if is_content_addressed_id(file_id):
+                    logger.warning(
+                        self,
+                        'Stored file {} not readable: {}'.format(file_id, exc),
+                    )
+                continue
+            if last_modified and last_modified > modified_since:
+                continue
+            if not dry_run and not depot.purge_if_unmodified(
+                    file_id,
+                    modified_since,
+            ):
+                continue
+            deleted_file_ids.append(file_id)
+        return deleted_file_ids
+
+    def update_revisions_file_infos(self, only_missing: bool=True) -> int:
+        """
+        Set file size and hash of revisions from their stored file, for
+        revisions stored before these columns were introduced. Each stored
+        file is read once, whatever the number of revisions using it.
+        :param only_missing: only update revisions without size or hash
+        :return: number of updated revisions
+        """
+        query = self._session.query(
+            ContentRevisionRO.revision_id,
+            ContentRevisionRO.depot_file,
+        ).filter(
+            ContentRevisionRO.depot_file != None,
+        )
+        if only_missing:
+            query = query.filter(or_(
+                ContentRevisionRO.file_size == None,
+                ContentRevisionRO.file_hash == None,
+            ))
+        revision_ids_by_file_id = defaultdict(list)
+        for revision_id, depot_file in query.yield_per(1000):
+            revision_ids_by_file_id[depot_file.file_id].append(revision_id)
+
+        depot = DepotManager.get()
+        updated = 0
+        for file_id, revision_ids in revision_ids_by_file_id.items():
+            try:
+                with depot.get(file_id) as stored_file:
+                    file_hash, file_size = get_file_hash_and_size(stored_file)  # nopep8
+            except IOError as exc:
+                logger.warning(
+                    self,
+                    'Stored file {} of {} revision(s) not readable: {}'.format(
+                        file_id,
+                        len(revision_ids),
+                        exc,
+                    ),
+                )
+                continue
+            # INFO - G.M - 2018-08-23 - Revisions are immutable for orm, file
+            # infos are set by a bulk update.
+            updated += self._session.query(ContentRevisionRO).filter(
+                ContentRevisionRO.revision_id.in_(revision_ids),
+            ).update(
+                {
+                    ContentRevisionRO.file_size: file_size,
+                    ContentRevisionRO.file_hash: file_hash,
+                },
+                synchronize_session=False,
+            )
+        return updated
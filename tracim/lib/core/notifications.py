@@ -1,4 +1,6 @@
 # -*- coding: utf-8 -*-
+import typing
+
 from sqlalchemy.orm import Session
 
 from tracim import CFG
@@ -21,6 +23,13 @@ class INotifier(object):
     def notify_content_update(self, content: Content):
         raise NotImplementedError
 
+    def notify_contents_update(self, contents: typing.List[Content]):
+        """
+        Notify update of several contents modified by one operation (bulk
+        move, copy, ...), their children changes are not notified.
+        """
+        raise NotImplementedError
+
 
 class NotifierFactory(object):
 
@@ -55,3 +64,12 @@ class DummyNotifier(INotifier):
             self,
             'Fake notifier, do not send notification for update of content {}'.format(content.content_id)  # nopep8
         )
+
+    def notify_contents_update(self, contents: typing.List[Content]):
+        type(self).send_count += 1
+        logger.info(
+            self,
+            'Fake notifier, do not send notification for update of contents {}'.format(  # nopep8
+                ', '.join(str(content.content_id) for content in contents),
+            )
+        )
@@ -0,0 +1,222 @@
+# -*- coding: utf-8 -*-
+import os
+import time
+import typing
+from concurrent.futures import ThreadPoolExecutor
+
+from depot.manager import DepotManager
+from preview_generator.manager import PreviewManager
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from tracim import CFG
+from tracim.lib.utils.logger import logger
+from tracim.lib.utils.utils import get_redis_connection
+from tracim.lib.utils.utils import get_rq_queue
+from tracim.models.data import ContentRevisionRO
+
+PREVIEW_GENERATION_QUEUE_NAME = 'preview_generator'
+PENDING_PREVIEWS_DIR_NAME = 'pending'
+# INFO - G.M - 2018-08-08 - Keys of session info used to keep revisions to
+# generate previews for until transaction commit.
+SESSION_REVISIONS_KEY = 'tracim_preview_generation_revisions'
+SESSION_JOBS_KEY = 'tracim_preview_generation_jobs'
+SESSION_LISTENED_KEY = 'tracim_preview_generation_listened'
+SESSION_CONFIG_KEY = 'tracim_preview_generation_config'
+
+_local_executor = None  # type: ThreadPoolExecutor
+
+
+def _get_local_executor() -> ThreadPoolExecutor:
+    global _local_executor
+    if _local_executor is None:
+        _local_executor = ThreadPoolExecutor(max_workers=1)
+    return _local_executor
+
+
+def generate_previews(
+        preview_cache_dir: str,
+        file_path: str,
+        dims: typing.List[typing.Tuple[int, int]],
+        pending_marker_path: str,
+) -> None:
+    """
+    Preview generation job: generate jpg previews of all pages of file, in
+    all given dimensions. This function only use its parameters (no database
+    nor depot access) so it can be run by any rq worker.
+    :param preview_cache_dir: preview generator cache directory
+    :param file_path: path of file to generate previews of
+    :param dims: list of (width, height) of previews
+    :param pending_marker_path: marker of generation in progress, removed
+    when generation ends
+    """
+    try:
+        preview_manager = PreviewManager(preview_cache_dir, create_folder=True)
+        page_nb = preview_manager.get_page_nb(file_path)
+        for page in range(page_nb):
+            for width, height in dims:
+                preview_manager.get_jpeg_preview(
+                    file_path,
+                    page=page,
+                    width=width,
+                    height=height,
+                )
+    except Exception as exc:
+        # INFO - G.M - 2018-08-08 - Preview will be generated (or error
+        # returned) when requested.
+        logger.error(
+            generate_previews,
+            'Preview generation of {} failed: {}'.format(file_path, exc),
+        )
+    finally:
+        try:
+            os.remove(pending_marker_path)
+        except FileNotFoundError:
+            pass
+
+
+def _before_commit(session: Session) -> None:
+    # INFO - G.M - 2018-08-08 - Revision id and file path are known once
+    # flushed, they can't be loaded after commit.
+    revisions = session.info.pop(SESSION_REVISIONS_KEY, [])
+    if not revisions:
+        return
+    session.flush()
+    depot = DepotManager.get()
+    jobs = session.info.setdefault(SESSION_JOBS_KEY, [])
+    for revision in revisions:
+        if not revision.depot_file:
+            continue
+        stored_file = depot.get(revision.depot_file)
+        # INFO - G.M - 2018-08-08 - Only files stored on local disk can
+        # be previewed.
+        file_path = getattr(stored_file, '_file_path', None)
+        if file_path:
+            jobs.append((revision.revision_id, file_path))
+
+
+def _after_commit(session: Session) -> None:
+    jobs = session.info.pop(SESSION_JOBS_KEY, [])
+    if not jobs:
+        return
+    api = PreviewGenerationApi(
+        session=session,
+        config=session.info[SESSION_CONFIG_KEY],
+    )
+    for revision_id, file_path in jobs:
+        api.run_generation(revision_id, file_path)
+
+
+def _after_transaction_end(session: Session, transaction) -> None:
+    # INFO - G.M - 2018-08-08 - Nothing to generate once transaction ended
+    # without commit (rollback, session closed).
+    if transaction.parent is not None:
+        return
+    session.info.pop(SESSION_REVISIONS_KEY, None)
+    session.info.pop(SESSION_JOBS_KEY, None)
+
+
+class PreviewGenerationApi(object):
+    """
+    Generate previews of new file revisions in background, after transaction
+    commit, according to preview.generation.processing_mode.
+    """
+
+    def __init__(
+            self,
+            session: Session,
+            config: CFG,
+    ):
+        self._session = session
+        self._config = config
+
+    def _get_pending_marker_path(self, revision_id: int) -> str:
+        return os.path.join(
+            self._config.PREVIEW_CACHE_DIR,
+            PENDING_PREVIEWS_DIR_NAME,
+            str(revision_id),
+        )
+
+    def is_pending(self, revision_id: int) -> bool:
+        """
+        :return: True if previews of revision are being generated
+        """
+        if self._config.PREVIEW_GENERATION_PROCESSING_MODE == self._config.CST.SYNC:  # nopep8
+            return False
+        try:
+            marker_time = os.path.getmtime(
+                self._get_pending_marker_path(revision_id)
+            )
+        except OSError:
+            return False
+        return time.time() - marker_time < self._config.PREVIEW_GENERATION_PENDING_TIMEOUT  # nopep8
+
+    def mark_pending(self, revision_id: int) -> str:
+        """
+        Mark previews of revision as being generated.
+        :return: pending marker path
+        """
+        marker_path = self._get_pending_marker_path(revision_id)
+        os.makedirs(os.path.dirname(marker_path), exist_ok=True)
+        with open(marker_path, 'w'):
+            pass
+        return marker_path
+
+    def schedule_generation(self, revision: ContentRevisionRO) -> None:
+        """
+        Generate previews of revision file once transaction is committed.
+        Nothing is done in sync mode: previews are generated when requested.
+        """
+        if self._config.PREVIEW_GENERATION_PROCESSING_MODE == self._config.CST.SYNC:  # nopep8
+            return
+        self._listen_session()
+        self._session.info[SESSION_CONFIG_KEY] = self._config
+        self._session.info.setdefault(SESSION_REVISIONS_KEY, []).append(
+            revision,
+        )
+
+    def _listen_session(self) -> None:
+        if self._session.info.get(SESSION_LISTENED_KEY):
+            return
+        event.listen(self._session, 'before_commit', _before_commit)
+        event.listen(self._session, 'after_commit', _after_commit)
+        event.listen(
+            self._session,
+            'after_transaction_end',
+            _after_transaction_end,
+        )
+        self._session.info[SESSION_LISTENED_KEY] = True
+
+    def run_generation(self, revision_id: int, file_path: str) -> None:
+        """
+        Start background generation of previews of revision file.
+        """
+        pending_marker_path = self.mark_pending(revision_id)
+        job_args = (
+            self._config.PREVIEW_CACHE_DIR,
+            file_path,
+            [
+                (dim.width, dim.height)
+                for dim in self._config.PREVIEW_JPG_ALLOWED_DIMS
+            ],
+            pending_marker_path,
+        )
+        try:
+            if self._config.PREVIEW_GENERATION_PROCESSING_MODE == self._config.CST.ASYNC:  # nopep8
+                redis_connection = get_redis_connection(self._config)
+                queue = get_rq_queue(
+                    redis_connection,
+                    PREVIEW_GENERATION_QUEUE_NAME,
+                )
+                queue.enqueue(generate_previews, *job_args)
+            else:
+                _get_local_executor().submit(generate_previews, *job_args)
+        except Exception as exc:
+            os.remove(pending_marker_path)
+            logger.error(
+                self,
+                'Unable to schedule preview generation of revision {}: {}'.format(  # nopep8
+                    revision_id,
+                    exc,
+                ),
+            )
@@ -0,0 +1,399 @@
+# -*- coding: utf-8 -*-
+import re
+import typing
+from collections import Counter
+
+from bs4 import BeautifulSoup
+from depot.manager import DepotManager
+from sqlalchemy import and_
+from sqlalchemy import case
+from sqlalchemy import Float
+from sqlalchemy import func
+from sqlalchemy import Integer
+from sqlalchemy import or_
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+from sqlalchemy.sql import text
+from sqlalchemy.sql.selectable import Selectable
+from zope.sqlalchemy import mark_changed
+
+from tracim import CFG
+from tracim.lib.utils.logger import logger
+from tracim.models.data import Content
+from tracim.models.data import ContentRevisionRO
+from tracim.models.data import ContentType
+from tracim.models.search import ContentSearchTerm
+from tracim.models.search import is_fts5_available
+from tracim.models.search import SEARCH_TERM_MAX_LENGTH
+
+SEARCH_ENGINE_AUTO = 'auto'
+SEARCH_ENGINE_POSTGRESQL = 'postgresql'
+SEARCH_ENGINE_SQLITE = 'sqlite'
+SEARCH_ENGINE_PYTHON = 'python'
+
+TERM_PATTERN = re.compile(r'\w+', re.UNICODE)
+TEXT_MIMETYPES = (
+    'application/javascript',
+    'application/json',
+    'application/xml',
+)
+
+
+def get_terms(value: str) -> typing.List[str]:
+    """
+    :return: lower case words of text, as indexed by search engines
+    """
+    return [
+        term[:SEARCH_TERM_MAX_LENGTH]
+        for term in TERM_PATTERN.findall((value or '').lower())
+    ]
+
+
+def get_html_text(html: str) -> str:
+    # INFO - G.M - 2018-08-09 - 'html.parser' as in Content
+    # description_as_raw_text
+    return BeautifulSoup(html or '', 'html.parser').get_text(' ')
+
+
+class SearchDocument(object):
+    """
+    Indexed text of a content, by field (from more to less relevant).
+    """
+    def __init__(
+            self,
+            content_id: int,
+            label: str,
+            description: str,
+            file_text: str,
+    ) -> None:
+        self.content_id = content_id
+        self.label = label
+        self.description = description
+        self.file_text = file_text
+
+
+class SearchEngine(object):
+    """
+    Full text index of contents. Search engines return a query of ids of
+    contents matching all search terms with their rank: security and
+    content status filters are applied by joining it to a content query.
+    """
+
+    def __init__(self, session: Session, config: CFG) -> None:
+        self._session = session
+        self._config = config
+
+    def index(self, document: SearchDocument) -> None:
+        raise NotImplementedError()
+
+    def clear(self) -> None:
+        raise NotImplementedError()
+
+    def get_rank_query(self, terms: typing.List[str]) -> Selectable:
+        """
+        :return: query with content_id and rank (higher is better) columns
+        """
+        raise NotImplementedError()
+
+
+class PostgresqlSearchEngine(SearchEngine):
+    """
+    Search with postgresql tsvector, indexed with GIN index.
+    """
+
+    def index(self, document: SearchDocument) -> None:
+        self._session.execute(
+            text(
+                'DELETE FROM content_search_index '
+                'WHERE content_id = :content_id'
+            ),
+            {'content_id': document.content_id},
+        )
+        self._session.execute(
+            text(
+                'INSERT INTO content_search_index (content_id, document) '
+                'VALUES (:content_id, '
+                "setweight(to_tsvector(CAST(:config AS regconfig), :label), 'A') || "  # nopep8
+                "setweight(to_tsvector(CAST(:config AS regconfig), :description), 'B') || "  # nopep8
+                "setweight(to_tsvector(CAST(:config AS regconfig), :file_text), 'C'))"  # nopep8
+            ),
+            {
+                'content_id': document.content_id,
+                'config': self._config.SEARCH_POSTGRESQL_TEXT_SEARCH_CONFIG,
+                'label': document.label,
+                'description': document.description,
+                'file_text': document.file_text,
+            },
+        )
+
+    def clear(self) -> None:
+        self._session.execute(text('DELETE FROM content_search_index'))
+
+    def get_rank_query(self, terms: typing.List[str]) -> Selectable:
+        # INFO - G.M - 2018-08-09 - terms only contains word characters,
+        # so they can't be interpreted as tsquery operators.
+        query = ' & '.join("'{}':*".format(term) for term in terms)
+        return text(
+            'SELECT content_id, '
+            'ts_rank(document, to_tsquery(CAST(:config AS regconfig), :query)) AS rank '  # nopep8
+            'FROM content_search_index '
+            'WHERE document @@ to_tsquery(CAST(:config AS regconfig), :query)'  # nopep8
+        ).bindparams(
+            config=self._config.SEARCH_POSTGRESQL_TEXT_SEARCH_CONFIG,
+            query=query,
+        ).columns(content_id=Integer, rank=Float)
+
+
+class SqliteSearchEngine(SearchEngine):
+    """
+    Search with sqlite fts5 virtual table, ranked with bm25.
+    """
+
+    def index(self, document: SearchDocument) -> None:
+        self._session.execute(
+            text('DELETE FROM content_search_index WHERE rowid = :content_id'),  # nopep8
+            {'content_id': document.content_id},
+        )
+        self._session.execute(
+            text(
+                'INSERT INTO content_search_index '
+                '(rowid, label, description, file_text) '
+                'VALUES (:content_id, :label, :description, :file_text)'
+            ),
+            {
+                'content_id': document.content_id,
+                'label': document.label,
+                'description': document.description,
+                'file_text': document.file_text,
+            },
+        )
+
+    def clear(self) -> None:
+        self._session.execute(text('DELETE FROM content_search_index'))
+
+    def get_rank_query(self, terms: typing.List[str]) -> Selectable:
+        query = ' '.join('"{}"*'.format(term) for term in terms)
+        # INFO - G.M - 2018-08-09 - bm25 is lower for better match, label
+        # matches are more relevant than description and file ones.
+        return text(
+            'SELECT rowid AS content_id, '
+            '-bm25(content_search_index, 10.0, 5.0, 1.0) AS rank '
+            'FROM content_search_index '
+            'WHERE content_search_index MATCH :query'
+        ).bindparams(query=query).columns(content_id=Integer, rank=Float)
+
+
+class PythonSearchEngine(SearchEngine):
+    """
+    Search with an inverted index (term weights by content) built in python,
+    available with any database.
+    """
+    LABEL_WEIGHT = 10
+    DESCRIPTION_WEIGHT = 5
+    FILE_TEXT_WEIGHT = 1
+
+    def index(self, document: SearchDocument) -> None:
+        weights = Counter()
+        for value, weight in (
+                (document.label, self.LABEL_WEIGHT),
+                (document.description, self.DESCRIPTION_WEIGHT),
+                (document.file_text, self.FILE_TEXT_WEIGHT),
+        ):
+            for term in get_terms(value):
+                weights[term] += weight
+        table = ContentSearchTerm.__table__
+        self._session.execute(
+            table.delete().where(table.c.content_id == document.content_id)
+        )
+        if weights:
+            self._session.execute(
+                table.insert(),
+                [
+                    {
+                        'content_id': document.content_id,
+                        'term': term,
+                        'weight': weight,
+                    }
+                    for term, weight in weights.items()
+                ],
+            )
+
+    def clear(self) -> None:
+        self._session.execute(ContentSearchTerm.__table__.delete())
+
+    def get_rank_query(self, terms: typing.List[str]) -> Selectable:
+        table = ContentSearchTerm.__table__
+        matches = [
+            table.c.term.like(
+                '{}%'.format(term.replace('\\', '\\\\').replace('_', '\\_')),
+                escape='\\',
+            )
+            for term in terms
+        ]
+        return select([
+            table.c.content_id.label('content_id'),
+            func.sum(table.c.weight).label('rank'),
+        ]).where(
+            or_(*matches)
+        ).group_by(
+            table.c.content_id
+        ).having(
+            # INFO - G.M - 2018-08-09 - each term must match
+            and_(*[
+                func.sum(case([(match, 1)], else_=0)) > 0
+                for match in matches
+            ])
+        )
+
+
+SEARCH_ENGINES = {
+    SEARCH_ENGINE_POSTGRESQL: PostgresqlSearchEngine,
+    SEARCH_ENGINE_SQLITE: SqliteSearchEngine,
+    SEARCH_ENGINE_PYTHON: PythonSearchEngine,
+}
+# INFO - G.M - 2018-08-09 - Database urls supporting sqlite fts5
+_fts5_availability = {}  # type: typing.Dict[str, bool]
+
+
+class SearchApi(object):
+    """
+    Maintain full text index of contents (updated when content is saved) and
+    search in it. Search engine is set by search.engine config parameter.
+    """
+
+    def __init__(
+            self,
+            session: Session,
+            config: CFG,
+    ) -> None:
+        self._session = session
+        self._config = config
+
+    def _get_engine_name(self) -> str:
+        if self._config.SEARCH_ENGINE != SEARCH_ENGINE_AUTO:
+            return self._config.SEARCH_ENGINE
+        bind = self._session.get_bind()
+        if bind.dialect.name == 'postgresql':
+            return SEARCH_ENGINE_POSTGRESQL
+        if bind.dialect.name == 'sqlite':
+            url = str(bind.url)
+            if url not in _fts5_availability:
+                _fts5_availability[url] = is_fts5_available(
+                    self._session.connection()
+                )
+            if _fts5_availability[url]:
+                return SEARCH_ENGINE_SQLITE
+        return SEARCH_ENGINE_PYTHON
+
+    def get_engine(self) -> SearchEngine:
+        return SEARCH_ENGINES[self._get_engine_name()](
+            session=self._session,
+            config=self._config,
+        )
+
+    def _get_comments_text(self, content: Content) -> typing.List[str]:
+        comments = self._session.query(ContentRevisionRO.description).join(
+            Content,
+            Content.current_revision_id == ContentRevisionRO.revision_id,
+        ).filter(
+            ContentRevisionRO.parent_id == content.content_id,
+            ContentRevisionRO.type == ContentType.Comment,
+            ContentRevisionRO.is_deleted == False,
+            ContentRevisionRO.is_archived == False,
+        ).order_by(ContentRevisionRO.revision_id)
+        return [get_html_text(description) for description, in comments]
+
+    def _get_file_text(self, content: Content) -> str:
+        """
+        :return: text of file of content, if file is a text file smaller
+        than search.file_text.max_size
+        """
+        mimetype = content.file_mimetype or ''
+        if not content.depot_file or not (
+                mimetype.startswith('text/') or mimetype in TEXT_MIMETYPES
+        ):
+            return ''
+        try:
+            stored_file = DepotManager.get().get(content.depot_file)
+        except IOError:
+            return ''
+        if stored_file.content_length is not None \
+                and stored_file.content_length > self._config.SEARCH_FILE_TEXT_MAX_SIZE:  # nopep8
+            return ''
+        try:
+            file_text = stored_file.read(
+                self._config.SEARCH_FILE_TEXT_MAX_SIZE
+            ).decode('utf-8', errors='replace')
+        finally:
+            stored_file.close()
+        if mimetype == 'text/html':
+            file_text = get_html_text(file_text)
+        return file_text
+
+    def get_document(self, content: Content) -> SearchDocument:
+        """
+        :return: indexed text of content, comments text being part of
+        their parent content.
+        """
+        return SearchDocument(
+            content_id=content.content_id,
+            label=content.label or '',
+            description=' '.join(
+                [get_html_text(content.description)] +
+                self._get_comments_text(content)
+            ),
+            file_text=self._get_file_text(content),
+        )
+
+    def index_content(self, content: Content) -> None:
+        """
+        Update index of content, must be called after content (and new
+        revision) is flushed.
+        """
+        if content.type == ContentType.Comment:
+            if not content.parent:
+                return
+            content = content.parent
+        self.get_engine().index(self.get_document(content))
+
+    def index_all_contents(self) -> int:
+        """
+        Rebuild whole index.
+        :return: number of indexed contents
+        """
+        # FIXME - G.M - 2018-08-13 - Dirty import. It's here in order to
+        # avoid circular import
+        from tracim.lib.core.content import ContentApi
+        engine = self.get_engine()
+        engine.clear()
+        content_api = ContentApi(
+            session=self._session,
+            current_user=None,
+            config=self._config,
+        )
+        # INFO - G.M - 2018-08-13 - Comments are indexed with their parent
+        contents = content_api.get_canonical_query().filter(
+            ContentRevisionRO.type != ContentType.Comment,
+        ).order_by(Content.id)
+        indexed = 0
+        for content in contents:
+            engine.index(self.get_document(content))
+            indexed += 1
+        # INFO - G.M - 2018-08-13 - Index is written with core statements,
+        # which are not tracked by zope transaction: without this, session
+        # transaction is ended with 'no work' and index is not saved.
+        mark_changed(self._session)
+        logger.info(self, '{} content(s) indexed'.format(indexed))
+        return indexed
+
+    def get_rank_query(self, search_string: str) -> typing.Optional[Selectable]:  # nopep8
+        """
+        :param search_string: words to search, contents must match all of
+        them (words are matched as prefix)
+        :return: query of content_id and rank of matching contents, None if
+        there is no word to search
+        """
+        terms = get_terms(search_string)
+        if not terms:
+            return None
+        return self.get_engine().get_rank_query(terms)
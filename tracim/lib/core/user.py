@@ -18,6 +18,7 @@ from tracim.exceptions import AuthenticationFailed
 from tracim.exceptions import NotificationNotSend
 from tracim.exceptions import UserNotActive
 from tracim.models.context_models import UserInContext
+from tracim.lib.core.user_session import UserSessionApi
 from tracim.lib.mail_notifier.notifier import get_email_manager
 from tracim.models.context_models import TypeUser
 
@@ -54,10 +55,11 @@ class UserApi(object):
         """
         Get one user by user id
         """
-        try:
-            user = self._base_query().filter(User.user_id == user_id).one()
-        except NoResultFound as exc:
-            raise UserDoesNotExist('User "{}" not found in database'.format(user_id)) from exc  # nopep8
+        # INFO - G.M - 2018-08-10 - get() use session identity map, user
+        # loaded for authentication is not queried again.
+        user = self._base_query().get(user_id)
+        if user is None:
+            raise UserDoesNotExist('User "{}" not found in database'.format(user_id))  # nopep8
         return user
 
     def get_one_by_email(self, email: str) -> User:
@@ -259,6 +261,11 @@ class UserApi(object):
         if password is not None:
             user.password = password
 
+        if email is not None or password is not None:
+            # INFO - G.M - 2018-08-10 - Old credentials must not be accepted
+            # anymore
+            self._get_user_session_api().invalidate_user(user)
+
         if timezone is not None:
             user.timezone = timezone
 
@@ -341,12 +348,16 @@ class UserApi(object):
 
     def disable(self, user:User, do_save=False):
         user.is_active = False
+        self._get_user_session_api().invalidate_user(user)
         if do_save:
             self.save(user)
 
     def save(self, user: User):
         self._session.flush()
 
+    def _get_user_session_api(self) -> UserSessionApi:
+        return UserSessionApi(session=self._session, config=self._config)
+
     def execute_created_user_actions(self, created_user: User) -> None:
         """
         Execute actions when user just been created
@@ -0,0 +1,160 @@
+# -*- coding: utf-8 -*-
+import base64
+import hashlib
+import hmac
+import os
+import time
+import typing
+
+from sqlalchemy.orm import Session
+
+from tracim import CFG
+from tracim.lib.utils.auth_store import AuthStore
+from tracim.lib.utils.auth_store import get_auth_store
+from tracim.models.auth import User
+
+# INFO - G.M - 2018-08-10 - Fallback key of credentials digests, by process
+_PROCESS_SECRET = os.urandom(32)
+
+
+class UserSessionApi(object):
+    """
+    Authenticate users without database query nor password hashing for
+    known clients:
+    - session tokens, given at login, are valid during user.session.validity
+    - verified credentials (email and password) are accepted during
+    user.auth_cache.validity.
+    Tokens and credentials are only kept hashed in store. They are
+    invalidated when user password, email or status change.
+    """
+
+    def __init__(
+            self,
+            session: Session,
+            config: CFG,
+            store: AuthStore=None,
+    ) -> None:
+        self._session = session
+        self._config = config
+        self._auth_store = store
+
+    @property
+    def _store(self) -> AuthStore:
+        if self._auth_store is None:
+            self._auth_store = get_auth_store(self._config)
+        return self._auth_store
+
+    def _get_token_key(self, token: str) -> str:
+        return 'token:{}'.format(
+            hashlib.sha256(token.encode('utf-8')).hexdigest()
+        )
+
+    def _get_credentials_key(self, login: str, password: str) -> str:
+        secret = self._config.USER_SESSION_SECRET.encode('utf-8') \
+            or _PROCESS_SECRET
+        digest = hmac.new(
+            secret,
+            '{}\0{}'.format(login, password).encode('utf-8'),
+            hashlib.sha256,
+        ).hexdigest()
+        return 'credentials:{}'.format(digest)
+
+    def _get_invalidation_key(self, user_id: int) -> str:
+        return 'invalidated:{}'.format(user_id)
+
+    def _get_valid_user_id(self, key: str) -> typing.Optional[int]:
+        """
+        :return: user id of store entry, None if there is no entry or if
+        it was created before user invalidation.
+        """
+        entry = self._store.get(key)
+        if not entry:
+            return None
+        invalidation = self._store.get(
+            self._get_invalidation_key(entry['user_id'])
+        )
+        if invalidation and invalidation['at'] >= entry['created']:
+            self._store.delete(key)
+            return None
+        return entry['user_id']
+
+    def create_token(self, user: User) -> str:
+        """
+        Open a session for user.
+        :return: session token
+        """
+        # INFO - G.M - 2018-08-10 - Same as secrets.token_urlsafe(32), which
+        # is not available before python 3.6
+        token = base64.urlsafe_b64encode(os.urandom(32)) \
+            .rstrip(b'=') \
+            .decode('ascii')
+        self._store.set(
+            self._get_token_key(token),
+            {'user_id': user.user_id, 'created': time.time()},
+            self._config.USER_SESSION_VALIDITY,
+        )
+        return token
+
+    def get_token_user_id(self, token: str) -> typing.Optional[int]:
+        """
+        :return: id of user of session, None if token is unknown or expired
+        """
+        return self._get_valid_user_id(self._get_token_key(token))
+
+    def delete_token(self, token: str) -> None:
+        """
+        Close session.
+        """
+        self._store.delete(self._get_token_key(token))
+
+    def authenticate(
+            self,
+            login: str,
+            password: str,
+    ) -> typing.Optional[int]:
+        """
+        Check credentials, from verified credentials cache if possible.
+        When checked in database, user is kept in session identity map:
+        it can be loaded with session.query(User).get(user_id) without
+        new query.
+        :param login: user email
+        :param password: cleartext password
+        :return: id of authenticated user, None if authentication failed
+        """
+        cache_enabled = self._config.USER_AUTH_CACHE_VALIDITY > 0
+        if cache_enabled:
+            credentials_key = self._get_credentials_key(login, password)
+            user_id = self._get_valid_user_id(credentials_key)
+            if user_id is not None:
+                return user_id
+
+        user = self._session.query(User) \
+            .filter(User.email == login) \
+            .one_or_none()
+        if not user \
+                or not user.is_active \
+                or not user.validate_password(password):
+            return None
+        if cache_enabled:
+            self._store.set(
+                credentials_key,
+                {'user_id': user.user_id, 'created': time.time()},
+                self._config.USER_AUTH_CACHE_VALIDITY,
+            )
+        return user.user_id
+
+    def invalidate_user(self, user: User) -> None:
+        """
+        Invalidate sessions and cached credentials of user, which must
+        authenticate again.
+        """
+        if user.user_id is None:
+            return
+        self._store.set(
+            self._get_invalidation_key(user.user_id),
+            {'at': time.time()},
+            max(
+                self._config.USER_SESSION_VALIDITY,
+                self._config.USER_AUTH_CACHE_VALIDITY,
+            ),
+        )
@@ -7,12 +7,151 @@ from tracim.models.roles import WorkspaceRoles
 
 __author__ = 'damien'
 
+from sqlalchemy import and_
+from sqlalchemy import event
+from sqlalchemy import exists
+from sqlalchemy import inspect
 from sqlalchemy.orm import Session
 from sqlalchemy.orm import Query
+from sqlalchemy.sql.elements import ClauseElement
 from tracim.models.auth import User
 from tracim.models.data import Workspace
 from tracim.models.data import UserRoleInWorkspace
 
+# INFO - G.M - 2018-08-13 - Keys of session info used to keep workspace access
+# indexes of users during transaction.
+SESSION_WORKSPACE_ACCESS_KEY = 'tracim_workspace_access_indexes'
+SESSION_WORKSPACE_ACCESS_LISTENED_KEY = 'tracim_workspace_access_listened'
+
+
+def _after_flush(session: Session, flush_context) -> None:
+    for obj in list(session.new) + list(session.dirty) + list(session.deleted):
+        if isinstance(obj, UserRoleInWorkspace):
+            WorkspaceAccessIndex.invalidate(session, obj.user_id)
+
+
+def _after_transaction_end(session: Session, transaction) -> None:
+    if transaction.parent is None:
+        WorkspaceAccessIndex.invalidate(session)
+
+
+class WorkspaceAccessIndex(object):
+    """
+    Roles of a user in workspaces, loaded once by database session and kept
+    until user roles change or transaction ends.
+    Workspace access security filter is a semi-join on user_workspace table:
+    statements size does not depend on number of workspaces of user.
+    """
+
+    def __init__(self, session: Session, user_id: int) -> None:
+        self._session = session
+        self._user_id = user_id
+        self._roles = None  # type: typing.Dict[int, int]
+
+    @classmethod
+    def get(cls, session: Session, user_id: int) -> 'WorkspaceAccessIndex':
+        """
+        :return: cached workspace access index of user
+        """
+        indexes = session.info.setdefault(SESSION_WORKSPACE_ACCESS_KEY, {})
+        if user_id not in indexes:
+            cls._listen_session(session)
+            indexes[user_id] = cls(session, user_id)
+        return indexes[user_id]
+
+    @classmethod
+    def get_for_user(
+            cls,
+            session: Session,
+            user: User,
+    ) -> 'WorkspaceAccessIndex':
+        """
+        Same as get, but use user roles if they are already loaded.
+        :return: cached workspace access index of user
+        """
+        index = cls.get(session, user.user_id)
+        if index._roles is None and 'roles' not in inspect(user).unloaded:
+            index._roles = {
+                role.workspace_id: role.role
+                for role in user.roles
+            }
+        return index
+
+    @classmethod
+    def invalidate(cls, session: Session, user_id: int=None) -> None:
+        """
+        Drop cached index of user, or of all users if user_id is None.
+        """
+        indexes = session.info.get(SESSION_WORKSPACE_ACCESS_KEY)
+        if not indexes:
+            return
+        if user_id is None:
+            indexes.clear()
+        else:
+            indexes.pop(user_id, None)
+
+    @classmethod
+    def _listen_session(cls, session: Session) -> None:
+        if session.info.get(SESSION_WORKSPACE_ACCESS_LISTENED_KEY):
+            return
+        event.listen(session, 'after_flush', _after_flush)
+        event.listen(session, 'after_transaction_end', _after_transaction_end)
+        session.info[SESSION_WORKSPACE_ACCESS_LISTENED_KEY] = True
+
+    @property
+    def roles(self) -> typing.Dict[int, int]:
+        """
+        :return: role level of user by workspace id
+        """
+        if self._roles is None:
+            self._roles = dict(
+                self._session.query(
+                    UserRoleInWorkspace.workspace_id,
+                    UserRoleInWorkspace.role,
+                ).filter(UserRoleInWorkspace.user_id == self._user_id)
+            )
+        return self._roles
+
+    def get_role(self, workspace_id: int) -> int:
+        """
+        :return: role level of user in workspace, NOT_APPLICABLE if user is
+        not member of workspace
+        """
+        return self.roles.get(
+            workspace_id,
+            UserRoleInWorkspace.NOT_APPLICABLE,
+        )
+
+    def get_workspace_ids(
+            self,
+            minimal_role: int=UserRoleInWorkspace.READER,
+    ) -> typing.Set[int]:
+        """
+        :return: ids of workspaces where user has at least minimal_role
+        """
+        return {
+            workspace_id
+            for workspace_id, role in self.roles.items()
+            if role >= minimal_role
+        }
+
+    def get_workspace_filter(
+            self,
+            workspace_id_column: ClauseElement,
+            minimal_role: int=UserRoleInWorkspace.READER,
+    ) -> ClauseElement:
+        """
+        :param workspace_id_column: workspace id column of filtered query
+        :param minimal_role: minimal role of user in workspace
+        :return: sql criterion, true if user has at least minimal_role in
+        workspace of workspace_id_column
+        """
+        return exists().where(and_(
+            UserRoleInWorkspace.workspace_id == workspace_id_column,
+            UserRoleInWorkspace.user_id == self._user_id,
+            UserRoleInWorkspace.role >= minimal_role,
+        ))
+
 
 class RoleApi(object):
 
@@ -116,6 +255,7 @@ class RoleApi(object):
         role.role = role_level
         if with_notif is not None:
             role.do_notify == with_notif
+        WorkspaceAccessIndex.invalidate(self._session, role.user_id)
         if save_now:
             self.save(role)
 
@@ -134,12 +274,14 @@ class RoleApi(object):
         role.workspace = workspace
         role.role = role_level
         role.do_notify = with_notif
+        WorkspaceAccessIndex.invalidate(self._session, user.user_id)
         if flush:
             self._session.flush()
         return role
 
     def delete_one(self, user_id: int, workspace_id: int, flush=True) -> None:
         self._get_one_rsc(user_id, workspace_id).delete()
+        WorkspaceAccessIndex.invalidate(self._session, user_id)
         if flush:
             self._session.flush()
 
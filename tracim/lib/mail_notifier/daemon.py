@@ -1,12 +1,18 @@
+import threading
+
 from sqlalchemy.orm import collections
 
+from tracim.lib.mail_notifier.notification_queue import MAIL_SENDER_QUEUE_NAME
+from tracim.lib.mail_notifier.notification_queue import send_pending_notifications  # nopep8
+from tracim.lib.mail_notifier.notification_queue import set_notification_worker_context  # nopep8
+from tracim.lib.mail_notifier.sender import close_smtp_connection_pools
 from tracim.lib.utils.logger import logger
 from tracim.lib.utils.utils import get_rq_queue
 from tracim.lib.utils.utils import get_redis_connection
 from rq.dummy import do_nothing
 from rq.worker import StopRequested
 from rq import Connection as RQConnection
-from rq import Worker as BaseRQWorker
+from rq import SimpleWorker as BaseRQWorker
 
 
 class FakeDaemon(object):
@@ -20,10 +26,16 @@ class FakeDaemon(object):
 class MailSenderDaemon(FakeDaemon):
     # NOTE: use *args and **kwargs because parent __init__ use strange
     # * parameter
-    def __init__(self, config, *args, **kwargs):
+    def __init__(self, config, *args, session_factory=None, **kwargs):
+        """
+        :param session_factory: sqlalchemy session factory used by content
+        notification jobs, they can't be run without it.
+        """
         super().__init__(*args, **kwargs)
         self.config = config
+        self.session_factory = session_factory
         self.worker = None  # type: RQWorker
+        self._stopped = threading.Event()
 
     def append_thread_callback(self, callback: collections.Callable) -> None:
         logger.warning('MailSenderDaemon not implement append_thread_callback')
@@ -33,19 +45,43 @@ class MailSenderDaemon(FakeDaemon):
         # When _stop_requested at False, tracim.lib.daemons.RQWorker
         # will raise StopRequested exception in worker thread after receive a
         # job.
+        self._stopped.set()
         self.worker._stop_requested = True
         redis_connection = get_redis_connection(self.config)
-        queue = get_rq_queue(redis_connection, 'mail_sender')
+        queue = get_rq_queue(redis_connection, MAIL_SENDER_QUEUE_NAME)
         queue.enqueue(do_nothing)
 
+    def _enqueue_pending_notifications_jobs(self) -> None:
+        """
+        Periodically ask worker to send due held notifications.
+        """
+        redis_connection = get_redis_connection(self.config)
+        queue = get_rq_queue(redis_connection, MAIL_SENDER_QUEUE_NAME)
+        interval = self.config.EMAIL_NOTIFICATION_PENDING_CHECK_INTERVAL
+        while not self._stopped.wait(interval):
+            queue.enqueue(send_pending_notifications)
+
     def run(self) -> None:
+        if self.session_factory:
+            set_notification_worker_context(self.config, self.session_factory)
+            if self.config.EMAIL_NOTIFICATION_COALESCING_DELAY > 0 \
+                    or self.config.EMAIL_NOTIFICATION_DIGEST != 'none':
+                threading.Thread(
+                    target=self._enqueue_pending_notifications_jobs,
+                    daemon=True,
+                ).start()
 
         with RQConnection(get_redis_connection(self.config)):
-            self.worker = RQWorker(['mail_sender'])
-            self.worker.work()
+            self.worker = RQWorker([MAIL_SENDER_QUEUE_NAME])
+            try:
+                self.worker.work()
+            finally:
+                close_smtp_connection_pools()
 
 
 class RQWorker(BaseRQWorker):
+    # INFO - G.M - 2018-08-16 - Jobs are run in worker process (no fork by
+    # job) so that SMTP connection pool is kept between jobs.
     def _install_signal_handlers(self):
         # RQ Worker is designed to work in main thread
         # So we have to disable these signals (we implement server stop in
@@ -0,0 +1,400 @@
+# -*- coding: utf-8 -*-
+import datetime
+import threading
+import typing
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+from sqlalchemy.orm import sessionmaker
+
+from tracim import CFG
+from tracim.lib.utils.logger import logger
+from tracim.lib.utils.utils import get_redis_connection
+from tracim.lib.utils.utils import get_rq_queue
+from tracim.models.auth import User
+from tracim.models.data import Content
+
+MAIL_SENDER_QUEUE_NAME = 'mail_sender'
+# INFO - G.M - 2018-08-17 - Keys of session info used to keep contents to
+# notify until transaction commit.
+SESSION_CONTENTS_KEY = 'tracim_notification_contents'
+SESSION_EVENTS_KEY = 'tracim_notification_events'
+SESSION_BULK_CONTENTS_KEY = 'tracim_notification_bulk_contents'
+SESSION_BULK_EVENTS_KEY = 'tracim_notification_bulk_events'
+SESSION_LISTENED_KEY = 'tracim_notification_listened'
+SESSION_CONFIG_KEY = 'tracim_notification_config'
+
+# INFO - G.M - 2018-08-17 - Content update event: actor_id, content_id,
+# revision_id
+ContentUpdateEvent = typing.Tuple[int, int, int]
+# INFO - G.M - 2018-08-30 - Update of several contents by one operation
+# (bulk move, copy, ...): actor_id, content_ids
+ContentsUpdateEvent = typing.Tuple[int, typing.List[int]]
+
+# INFO - G.M - 2018-08-17 - config and session factory of worker process,
+# set by mail sender daemon, used by rq jobs.
+_worker_context = None  # type: typing.Tuple[CFG, sessionmaker]
+
+
+def set_notification_worker_context(
+        config: CFG,
+        session_factory: sessionmaker,
+) -> None:
+    """
+    Give configuration and database access to notification jobs run by
+    current process.
+    """
+    global _worker_context
+    _worker_context = (config, session_factory)
+
+
+def process_content_update_event(
+        config: CFG,
+        session_factory: sessionmaker,
+        actor_id: int,
+        content_id: int,
+        revision_id: int,
+) -> None:
+    """
+    Build and send emails of a content update event, with a new session.
+    """
+    # FIXME - G.M - 2018-08-17 - Dirty import. It's here in order to avoid
+    # circular import
+    from tracim.lib.mail_notifier.notifier import get_email_manager
+    session = session_factory()
+    try:
+        current_revision_id = session.query(Content.revision_id) \
+            .filter(Content.content_id == content_id) \
+            .scalar()
+        if current_revision_id != revision_id:
+            logger.info(
+                process_content_update_event,
+                'Content {} changed since revision {}, notifying its '
+                'current state'.format(content_id, revision_id),
+            )
+        get_email_manager(
+            config,
+            session,
+            retry_transient_errors=True,
+        ).notify_content_update(
+            actor_id,
+            content_id,
+        )
+        # INFO - G.M - 2018-08-17 - Events may have been held (coalescing or
+        # digest mode)
+        session.commit()
+    finally:
+        session.close()
+
+
+def process_contents_update_event(
+        config: CFG,
+        session_factory: sessionmaker,
+        actor_id: int,
+        content_ids: typing.List[int],
+) -> None:
+    """
+    Build and send emails of an update of several contents, with a new
+    session.
+    """
+    # FIXME - G.M - 2018-08-30 - Dirty import. It's here in order to avoid
+    # circular import
+    from tracim.lib.mail_notifier.notifier import get_email_manager
+    session = session_factory()
+    try:
+        get_email_manager(
+            config,
+            session,
+            retry_transient_errors=True,
+        ).notify_contents_update(
+            actor_id,
+            content_ids,
+        )
+        # INFO - G.M - 2018-08-30 - Events may have been held (coalescing or
+        # digest mode)
+        session.commit()
+    finally:
+        session.close()
+
+
+def process_pending_notifications(
+        config: CFG,
+        session_factory: sessionmaker,
+        now: datetime.datetime=None,
+) -> int:
+    """
+    Send due held notifications, with a new session.
+    :return: number of sent emails
+    """
+    # FIXME - G.M - 2018-08-17 - Dirty import. It's here in order to avoid
+    # circular import
+    from tracim.lib.mail_notifier.notifier import get_email_manager
+    session = session_factory()
+    try:
+        sent = get_email_manager(
+            config,
+            session,
+            retry_transient_errors=True,
+        ).send_pending_notifications(
+            now,
+        )
+        session.commit()
+        return sent
+    finally:
+        session.close()
+
+
+def notify_content_update(
+        actor_id: int,
+        content_id: int,
+        revision_id: int,
+) -> None:
+    """
+    Content update notification job, run by mail sender daemon.
+    """
+    if _worker_context is None:
+        raise RuntimeError(
+            'Notification jobs must be run by mail sender daemon'
+        )
+    config, session_factory = _worker_context
+    process_content_update_event(
+        config,
+        session_factory,
+        actor_id,
+        content_id,
+        revision_id,
+    )
+
+
+def notify_contents_update(
+        actor_id: int,
+        content_ids: typing.List[int],
+) -> None:
+    """
+    Update of several contents notification job, run by mail sender daemon.
+    """
+    if _worker_context is None:
+        raise RuntimeError(
+            'Notification jobs must be run by mail sender daemon'
+        )
+    config, session_factory = _worker_context
+    process_contents_update_event(
+        config,
+        session_factory,
+        actor_id,
+        content_ids,
+    )
+
+
+def send_pending_notifications() -> None:
+    """
+    Held notifications job, enqueued periodically by mail sender daemon.
+    """
+    if _worker_context is None:
+        raise RuntimeError(
+            'Notification jobs must be run by mail sender daemon'
+        )
+    config, session_factory = _worker_context
+    process_pending_notifications(config, session_factory)
+
+
+class NotificationQueue(object):
+    """
+    Queue of content update events, waiting to be notified by email.
+    """
+
+    def enqueue(self, events: typing.List[ContentUpdateEvent]) -> None:
+        raise NotImplementedError()
+
+    def enqueue_bulk(self, events: typing.List[ContentsUpdateEvent]) -> None:
+        raise NotImplementedError()
+
+
+class RQNotificationQueue(NotificationQueue):
+    """
+    Events are sent as jobs to "mail_sender" rq queue, processed by mail
+    sender daemon.
+    """
+
+    def __init__(self, config: CFG) -> None:
+        self._config = config
+
+    def enqueue(self, events: typing.List[ContentUpdateEvent]) -> None:
+        redis_connection = get_redis_connection(self._config)
+        queue = get_rq_queue(redis_connection, MAIL_SENDER_QUEUE_NAME)
+        for actor_id, content_id, revision_id in events:
+            queue.enqueue(
+                notify_content_update,
+                actor_id,
+                content_id,
+                revision_id,
+            )
+
+    def enqueue_bulk(self, events: typing.List[ContentsUpdateEvent]) -> None:
+        redis_connection = get_redis_connection(self._config)
+        queue = get_rq_queue(redis_connection, MAIL_SENDER_QUEUE_NAME)
+        for actor_id, content_ids in events:
+            queue.enqueue(notify_contents_update, actor_id, content_ids)
+
+
+class MemoryNotificationQueue(NotificationQueue):
+    """
+    Events are kept in process memory, until processed by work(). Used by
+    tests.
+    """
+
+    def __init__(self) -> None:
+        self.events = []  # type: typing.List[ContentUpdateEvent]
+        self.bulk_events = []  # type: typing.List[ContentsUpdateEvent]
+        self._lock = threading.Lock()
+
+    def enqueue(self, events: typing.List[ContentUpdateEvent]) -> None:
+        with self._lock:
+            self.events.extend(events)
+
+    def enqueue_bulk(self, events: typing.List[ContentsUpdateEvent]) -> None:
+        with self._lock:
+            self.bulk_events.extend(events)
+
+    def work(self, config: CFG, session_factory: sessionmaker) -> int:
+        """
+        Notify all queued events.
+        :return: number of processed events
+        """
+        with self._lock:
+            events = self.events
+            self.events = []
+            bulk_events = self.bulk_events
+            self.bulk_events = []
+        for actor_id, content_id, revision_id in events:
+            process_content_update_event(
+                config,
+                session_factory,
+                actor_id,
+                content_id,
+                revision_id,
+            )
+        for actor_id, content_ids in bulk_events:
+            process_contents_update_event(
+                config,
+                session_factory,
+                actor_id,
+                content_ids,
+            )
+        return len(events) + len(bulk_events)
+
+
+_memory_notification_queue = MemoryNotificationQueue()
+
+
+def get_notification_queue(config: CFG) -> NotificationQueue:
+    """
+    :return: notification queue of email.notification.queue_backend
+    """
+    if config.EMAIL_NOTIFICATION_QUEUE_BACKEND == 'memory':
+        return _memory_notification_queue
+    return RQNotificationQueue(config)
+
+
+def _before_commit(session: Session) -> None:
+    # INFO - G.M - 2018-08-17 - Revision ids are known once flushed, and
+    # objects should not be loaded after commit.
+    contents = session.info.pop(SESSION_CONTENTS_KEY, [])
+    bulk_contents = session.info.pop(SESSION_BULK_CONTENTS_KEY, [])
+    if not contents and not bulk_contents:
+        return
+    session.flush()
+    events = session.info.setdefault(SESSION_EVENTS_KEY, [])
+    for actor_id, content in contents:
+        events.append((actor_id, content.content_id, content.revision_id))
+    bulk_events = session.info.setdefault(SESSION_BULK_EVENTS_KEY, [])
+    for actor_id, operation_contents in bulk_contents:
+        bulk_events.append((
+            actor_id,
+            [content.content_id for content in operation_contents],
+        ))
+
+
+def _after_commit(session: Session) -> None:
+    events = session.info.pop(SESSION_EVENTS_KEY, [])
+    bulk_events = session.info.pop(SESSION_BULK_EVENTS_KEY, [])
+    if not events and not bulk_events:
+        return
+    config = session.info[SESSION_CONFIG_KEY]
+    try:
+        queue = get_notification_queue(config)
+        if events:
+            queue.enqueue(events)
+        if bulk_events:
+            queue.enqueue_bulk(bulk_events)
+    except Exception as exc:
+        logger.error(
+            _after_commit,
+            'Unable to enqueue notification of {} event(s): {}'.format(
+                len(events) + len(bulk_events),
+                exc,
+            ),
+        )
+
+
+def _after_transaction_end(session: Session, transaction) -> None:
+    # INFO - G.M - 2018-08-17 - Nothing to notify once transaction ended
+    # without commit (rollback, session closed).
+    if transaction.parent is not None:
+        return
+    session.info.pop(SESSION_CONTENTS_KEY, None)
+    session.info.pop(SESSION_EVENTS_KEY, None)
+    session.info.pop(SESSION_BULK_CONTENTS_KEY, None)
+    session.info.pop(SESSION_BULK_EVENTS_KEY, None)
+
+
+class NotificationQueueApi(object):
+    """
+    Enqueue content update events once transaction is committed, so that
+    emails are built and sent by a worker, out of the request.
+    """
+
+    def __init__(
+            self,
+            session: Session,
+            config: CFG,
+    ) -> None:
+        self._session = session
+        self._config = config
+
+    def schedule_content_update(self, actor: User, content: Content) -> None:
+        """
+        Notify update of content by actor after transaction commit.
+        """
+        self._listen_session()
+        self._session.info[SESSION_CONFIG_KEY] = self._config
+        self._session.info.setdefault(SESSION_CONTENTS_KEY, []).append(
+            (actor.user_id, content),
+        )
+
+    def schedule_contents_update(
+            self,
+            actor: User,
+            contents: typing.List[Content],
+    ) -> None:
+        """
+        Notify update of contents by one operation of actor after
+        transaction commit, with a single job.
+        """
+        self._listen_session()
+        self._session.info[SESSION_CONFIG_KEY] = self._config
+        self._session.info.setdefault(SESSION_BULK_CONTENTS_KEY, []).append(
+            (actor.user_id, list(contents)),
+        )
+
+    def _listen_session(self) -> None:
+        if self._session.info.get(SESSION_LISTENED_KEY):
+            return
+        event.listen(self._session, 'before_commit', _before_commit)
+        event.listen(self._session, 'after_commit', _after_commit)
+        event.listen(
+            self._session,
+            'after_transaction_end',
+            _after_transaction_end,
+        )
+        self._session.info[SESSION_LISTENED_KEY] = True
@@ -1,4 +1,5 @@
 # -*- coding: utf-8 -*-
+import collections
 import datetime
 import typing
 
@@ -7,25 +8,33 @@ from email.mime.text import MIMEText
 from email.utils import formataddr
 
 from lxml.html.diff import htmldiff
-from mako.template import Template
+from sqlalchemy import and_
+from sqlalchemy import func
 from sqlalchemy.orm import Session
 
 from tracim import CFG
 from tracim.lib.core.notifications import INotifier
+from tracim.lib.mail_notifier.notification_queue import NotificationQueueApi
 from tracim.lib.mail_notifier.sender import EmailSender
 from tracim.lib.mail_notifier.utils import SmtpConfiguration, EST
-from tracim.lib.mail_notifier.sender import send_email_through
+from tracim.lib.mail_notifier.utils import get_template
+from tracim.lib.mail_notifier.sender import send_emails_through
 from tracim.lib.core.workspace import WorkspaceApi
 from tracim.lib.utils.logger import logger
+from tracim.lib.utils.render_cache import get_render_cache
 from tracim.models import User
 from tracim.models.auth import User
 from tracim.models.data import ActionDescription
 from tracim.models.data import Content
+from tracim.models.data import ContentRevisionRO
 from tracim.models.data import ContentType
 from tracim.models.data import UserRoleInWorkspace
+from tracim.models.notification import PendingNotification
 from tracim.lib.utils.translation import fake_translator as l_, \
     fake_translator as _
 
+CONTENT_UPDATE_CONTEXT_CACHE_NAME = 'content_update_context'
+
 
 class EmailNotifier(INotifier):
     """
@@ -111,11 +120,12 @@ class EmailNotifier(INotifier):
         # (SQLA objects are related to a given thread/session)
         #
         try:
-            if self.config.EMAIL_NOTIFICATION_PROCESSING_MODE.lower() == self.config.CST.ASYNC.lower():
+            if self.config.EMAIL_NOTIFICATION_PROCESSING_MODE == self.config.CST.ASYNC:  # nopep8
                 logger.info(self, 'Sending email in ASYNC mode')
-                # TODO - D.A - 2014-11-06
-                # This feature must be implemented in order to be able to scale to large communities
-                raise NotImplementedError('Sending emails through ASYNC mode is not working yet')
+                NotificationQueueApi(
+                    self.session,
+                    self.config,
+                ).schedule_content_update(self._user, content)
             else:
                 logger.info(self, 'Sending email in SYNC mode')
                 EmailManager(
@@ -126,6 +136,46 @@ class EmailNotifier(INotifier):
         except TypeError as e:
             logger.error(self, 'Exception catched during email notification: {}'.format(e.__str__()))
 
+    def notify_contents_update(self, contents: typing.List[Content]):
+        """
+        Notify update of contents modified by one operation: only given
+        contents are notified, not their children, with one email by
+        recipient listing all of them.
+        """
+        contents = [
+            content for content in contents
+            if content.get_last_action().id in self.config.EMAIL_NOTIFICATION_NOTIFIED_EVENTS  # nopep8
+            and content.type in self.config.EMAIL_NOTIFICATION_NOTIFIED_CONTENTS  # nopep8
+        ]
+        if not contents:
+            logger.info(
+                self,
+                'Skip email notification of contents update by user {}'.format(  # nopep8
+                    self._user.user_id if self._user else 0,
+                )
+            )
+            return
+
+        try:
+            if self.config.EMAIL_NOTIFICATION_PROCESSING_MODE == self.config.CST.ASYNC:  # nopep8
+                logger.info(self, 'Sending email in ASYNC mode')
+                NotificationQueueApi(
+                    self.session,
+                    self.config,
+                ).schedule_contents_update(self._user, contents)
+            else:
+                logger.info(self, 'Sending email in SYNC mode')
+                EmailManager(
+                    self._smtp_config,
+                    self.config,
+                    self.session,
+                ).notify_contents_update(
+                    self._user.user_id,
+                    [content.content_id for content in contents],
+                )
+        except TypeError as e:
+            logger.error(self, 'Exception catched during email notification: {}'.format(e.__str__()))
+
 
 class EmailManager(object):
     """
@@ -138,11 +188,17 @@ class EmailManager(object):
             self,
             smtp_config: SmtpConfiguration,
             config: CFG,
-            session: Session
+            session: Session,
+            retry_transient_errors: bool=None,
     ) -> None:
+        """
+        :param retry_transient_errors: retry emails failing because of a
+        transient error, see EmailSender
+        """
         self._smtp_config = smtp_config
         self.config = config
         self.session = session
+        self._retry_transient_errors = retry_transient_errors
         # FIXME - G.M - We need to have a session for the emailNotifier
 
         # if not self.session:
@@ -234,7 +290,6 @@ class EmailManager(object):
             show_archived=True,
             show_deleted=True,
         ).get_one(event_content_id, ContentType.Any)
-        main_content = content.parent if content.type == ContentType.Comment else content
         notifiable_roles = WorkspaceApi(
             current_user=user,
             session=self.session,
@@ -246,80 +301,511 @@ class EmailManager(object):
             return
 
 
+        if self._holds_notifications():
+            self._hold_content_update(user, content, notifiable_roles)
+            return
+
         logger.info(self, 'Sending asynchronous emails to {} user(s)'.format(len(notifiable_roles)))
+        # INFO - G.M - 2018-08-14 - Parts of emails depending only on content
+        # (headers, diffs, intro) are built once, then rendered for each
+        # recipient. All emails are sent in one batch (one async job).
+        headers = self._get_content_update_headers(content, user)
+        content_context = self._get_content_update_context(content, user)
+
+        messages = []
+        for role in notifiable_roles:
+            logger.info(self, 'Sending email to {}'.format(role.user.email))
+            messages.append(self._build_content_update_message(
+                headers,
+                role,
+                content_context,
+            ))
+
+        send_emails_through(
+            self.config,
+            self._get_email_sender().send_mails,
+            messages,
+        )
+
+    def notify_contents_update(
+            self,
+            event_actor_id: int,
+            event_content_ids: typing.List[int],
+    ) -> None:
+        """
+        Notify update of several contents by one operation (bulk move,
+        copy, ...): each recipient gets one email listing all contents it is
+        notified of, instead of one email by content.
+        :param event_actor_id: id of the user that has triggered the event
+        :param event_content_ids: ids of updated contents
+        """
+        if len(event_content_ids) == 1:
+            self.notify_content_update(event_actor_id, event_content_ids[0])
+            return
+        # FIXME - G.M - 2018-08-30 - Dirty import. It's here in order to
+        # avoid circular import
+        from tracim.lib.core.user import UserApi
+        user = UserApi(
+            None,
+            config=self.config,
+            session=self.session,
+        ).get_one(event_actor_id)
+        contents = self.session.query(Content) \
+            .filter(Content.content_id.in_(event_content_ids)) \
+            .all()
+        contents.sort(key=lambda content: event_content_ids.index(content.content_id))  # nopep8
+        workspace_api = WorkspaceApi(
+            current_user=user,
+            session=self.session,
+            config=self.config,
+        )
+
+        notifiable_roles_by_workspace = {}
+        recipients = {}
+        # INFO - G.M - 2018-08-30 - (content, role, context) to notify, by
+        # recipient id
+        notifications = collections.OrderedDict()
+        for content in contents:
+            if content.workspace_id not in notifiable_roles_by_workspace:
+                notifiable_roles_by_workspace[content.workspace_id] = \
+                    workspace_api.get_notifiable_roles(content.workspace)
+            notifiable_roles = notifiable_roles_by_workspace[content.workspace_id]  # nopep8
+            if not notifiable_roles:
+                continue
+            if self._holds_notifications():
+                self._hold_content_update(user, content, notifiable_roles)
+                continue
+            try:
+                content_context = self._get_content_update_context(
+                    content,
+                    user,
+                )
+            except ValueError:
+                # INFO - G.M - 2018-08-30 - Unexpected empty notification
+                # (already logged): content is not notified.
+                continue
+            for role in notifiable_roles:
+                recipients[role.user_id] = role.user
+                notifications.setdefault(role.user_id, []).append(
+                    (content, role, content_context),
+                )
+
+        if not notifications:
+            logger.info(self, 'No email to send for update of contents {}'.format(  # nopep8
+                ', '.join(str(content_id) for content_id in event_content_ids),
+            ))
+            return
+
+        logger.info(self, 'Sending asynchronous emails to {} user(s)'.format(len(notifications)))  # nopep8
+        messages = []
+        for recipient_id, recipient_notifications in notifications.items():
+            if len(recipient_notifications) == 1:
+                content, role, content_context = recipient_notifications[0]
+                messages.append(self._build_content_update_message(
+                    self._get_content_update_headers(content, user),
+                    role,
+                    content_context,
+                ))
+                continue
+            items = [
+                dict(
+                    content_context,
+                    workspace=content.workspace,
+                    role_label=role.role_as_label(),
+                )
+                for content, role, content_context in recipient_notifications
+            ]
+            messages.append(self._build_digest_message(
+                recipients[recipient_id],
+                items,
+                items_intro=l_('{} updated {} content(s):').format(
+                    user.display_name,
+                    len(items),
+                ),
+            ))
+
+        send_emails_through(
+            self.config,
+            self._get_email_sender().send_mails,
+            messages,
+        )
+
+    def _get_email_sender(self) -> EmailSender:
         # INFO - D.A. - 2014-11-06
         # The following email sender will send emails in the async task queue
         # This allow to build all mails through current thread but really send them (including SMTP connection)
         # In the other thread.
         #
         # This way, the webserver will return sooner (actually before notification emails are sent
-        async_email_sender = EmailSender(
+        return EmailSender(
             self.config,
             self._smtp_config,
-            self.config.EMAIL_NOTIFICATION_ACTIVATED
+            self.config.EMAIL_NOTIFICATION_ACTIVATED,
+            retry_transient_errors=self._retry_transient_errors,
         )
-        for role in notifiable_roles:
-            logger.info(self, 'Sending email to {}'.format(role.user.email))
-            to_addr = formataddr((role.user.display_name, role.user.email))
-            #
-            # INFO - G.M - 2017-11-15 - set content_id in header to permit reply
-            # references can have multiple values, but only one in this case.
-            replyto_addr = self.config.EMAIL_NOTIFICATION_REPLY_TO_EMAIL.replace( # nopep8
-                '{content_id}',str(content.content_id)
-            )
 
-            reference_addr = self.config.EMAIL_NOTIFICATION_REFERENCES_EMAIL.replace( #nopep8
-                '{content_id}',str(content.content_id)
-             )
-            #
-            #  INFO - D.A. - 2014-11-06
-            # We do not use .format() here because the subject defined in the .ini file
-            # may not include all required labels. In order to avoid partial format() (which result in an exception)
-            # we do use replace and force the use of .__str__() in order to process LazyString objects
-            #
-            subject = self.config.EMAIL_NOTIFICATION_CONTENT_UPDATE_SUBJECT
-            subject = subject.replace(EST.WEBSITE_TITLE, self.config.WEBSITE_TITLE.__str__())
-            subject = subject.replace(EST.WORKSPACE_LABEL, main_content.workspace.label.__str__())
-            subject = subject.replace(EST.CONTENT_LABEL, main_content.label.__str__())
-            subject = subject.replace(EST.CONTENT_STATUS_LABEL, main_content.get_status().label.__str__())
-            reply_to_label = l_('{username} & all members of {workspace}').format(
-                username=user.display_name,
-                workspace=main_content.workspace.label)
-
-            message = MIMEMultipart('alternative')
-            message['Subject'] = subject
-            message['From'] = self._get_sender(user)
-            message['To'] = to_addr
-            message['Reply-to'] = formataddr((reply_to_label, replyto_addr))
+    def _get_content_update_headers(
+            self,
+            content: Content,
+            actor: User,
+    ) -> typing.Dict[str, str]:
+        """
+        :return: email headers of content update notification, except
+        recipient ("To")
+        """
+        main_content = content.parent if content.type == ContentType.Comment else content
+        # INFO - G.M - 2017-11-15 - set content_id in header to permit reply
+        # references can have multiple values, but only one in this case.
+        replyto_addr = self.config.EMAIL_NOTIFICATION_REPLY_TO_EMAIL.replace( # nopep8
+            '{content_id}',str(content.content_id)
+        )
+
+        reference_addr = self.config.EMAIL_NOTIFICATION_REFERENCES_EMAIL.replace( #nopep8
+            '{content_id}',str(content.content_id)
+         )
+        #
+        #  INFO - D.A. - 2014-11-06
+        # We do not use .format() here because the subject defined in the .ini file
+        # may not include all required labels. In order to avoid partial format() (which result in an exception)
+        # we do use replace and force the use of .__str__() in order to process LazyString objects
+        #
+        subject = self.config.EMAIL_NOTIFICATION_CONTENT_UPDATE_SUBJECT
+        subject = subject.replace(EST.WEBSITE_TITLE, self.config.WEBSITE_TITLE.__str__())
+        subject = subject.replace(EST.WORKSPACE_LABEL, main_content.workspace.label.__str__())
+        subject = subject.replace(EST.CONTENT_LABEL, main_content.label.__str__())
+        subject = subject.replace(EST.CONTENT_STATUS_LABEL, main_content.get_status().label.__str__())
+        reply_to_label = l_('{username} & all members of {workspace}').format(
+            username=actor.display_name,
+            workspace=main_content.workspace.label)
+        return {
+            'Subject': subject,
+            'From': self._get_sender(actor),
+            'Reply-to': formataddr((reply_to_label, replyto_addr)),
             # INFO - G.M - 2017-11-15
             # References can theorically have label, but in pratice, references
             # contains only message_id from parents post in thread.
             # To link this email to a content we create a virtual parent
             # in reference who contain the content_id.
-            message['References'] = formataddr(('',reference_addr))
-            body_text = self._build_email_body_for_content(self.config.EMAIL_NOTIFICATION_CONTENT_UPDATE_TEMPLATE_TEXT, role, content, user)
-            body_html = self._build_email_body_for_content(self.config.EMAIL_NOTIFICATION_CONTENT_UPDATE_TEMPLATE_HTML, role, content, user)
-
-            part1 = MIMEText(body_text, 'plain', 'utf-8')
-            part2 = MIMEText(body_html, 'html', 'utf-8')
-            # Attach parts into message container.
-            # According to RFC 2046, the last part of a multipart message, in this case
-            # the HTML message, is best and preferred.
-            message.attach(part1)
-            message.attach(part2)
-
-            self.log_notification(
-                action='CREATED',
-                recipient=message['To'],
-                subject=message['Subject'],
-                config=self.config,
+            'References': formataddr(('',reference_addr)),
+        }
+
+    def _build_content_update_message(
+            self,
+            headers: typing.Dict[str, str],
+            role: UserRoleInWorkspace,
+            content_context: dict,
+    ) -> MIMEMultipart:
+        """
+        Build content update email of one recipient.
+        :param headers: headers given by _get_content_update_headers()
+        :param role: role of recipient in content workspace
+        :param content_context: template context of content
+        """
+        message = MIMEMultipart('alternative')
+        message['Subject'] = headers['Subject']
+        message['From'] = headers['From']
+        message['To'] = formataddr((role.user.display_name, role.user.email))
+        message['Reply-to'] = headers['Reply-to']
+        message['References'] = headers['References']
+        body_text = self._render_content_update_body(self.config.EMAIL_NOTIFICATION_CONTENT_UPDATE_TEMPLATE_TEXT, role, content_context)  # nopep8
+        body_html = self._render_content_update_body(self.config.EMAIL_NOTIFICATION_CONTENT_UPDATE_TEMPLATE_HTML, role, content_context)  # nopep8
+
+        part1 = MIMEText(body_text, 'plain', 'utf-8')
+        part2 = MIMEText(body_html, 'html', 'utf-8')
+        # Attach parts into message container.
+        # According to RFC 2046, the last part of a multipart message, in this case
+        # the HTML message, is best and preferred.
+        message.attach(part1)
+        message.attach(part2)
+
+        self.log_notification(
+            action='CREATED',
+            recipient=message['To'],
+            subject=message['Subject'],
+            config=self.config,
+        )
+        return message
+
+    # Held notifications (coalescing and digest)
+
+    def _holds_notifications(self) -> bool:
+        return self.config.EMAIL_NOTIFICATION_COALESCING_DELAY > 0 \
+            or self.config.EMAIL_NOTIFICATION_DIGEST != 'none'
+
+    def _hold_content_update(
+            self,
+            actor: User,
+            content: Content,
+            roles: typing.List[UserRoleInWorkspace],
+    ) -> None:
+        """
+        Keep content update event for each recipient, it will be notified
+        by send_pending_notifications().
+        """
+        logger.info(self, 'Holding notification of content {} for {} user(s)'.format(  # nopep8
+            content.content_id,
+            len(roles),
+        ))
+        for role in roles:
+            self.session.add(PendingNotification(
+                recipient_id=role.user_id,
+                content_id=content.content_id,
+                revision_id=content.revision_id,
+                actor_id=actor.user_id,
+            ))
+        self.session.flush()
+
+    def _get_digest_period_start(
+            self,
+            now: datetime.datetime,
+    ) -> datetime.datetime:
+        if self.config.EMAIL_NOTIFICATION_DIGEST == 'hourly':
+            return now.replace(minute=0, second=0, microsecond=0)
+        return now.replace(hour=0, minute=0, second=0, microsecond=0)
+
+    def _get_due_pending_notifications(
+            self,
+            now: datetime.datetime,
+    ) -> typing.List[PendingNotification]:
+        """
+        :return: held events to notify now: in digest mode, events of ended
+        periods, otherwise events of (recipient, content) of which first
+        event is older than coalescing delay.
+        """
+        query = self.session.query(PendingNotification)
+        if self.config.EMAIL_NOTIFICATION_DIGEST != 'none':
+            query = query.filter(
+                PendingNotification.created < self._get_digest_period_start(now)  # nopep8
+            )
+        else:
+            limit = now - datetime.timedelta(
+                seconds=self.config.EMAIL_NOTIFICATION_COALESCING_DELAY,
+            )
+            due_groups = self.session.query(
+                PendingNotification.recipient_id,
+                PendingNotification.content_id,
+            ).group_by(
+                PendingNotification.recipient_id,
+                PendingNotification.content_id,
+            ).having(
+                func.min(PendingNotification.created) <= limit
+            ).subquery()
+            query = query.join(
+                due_groups,
+                and_(
+                    PendingNotification.recipient_id == due_groups.c.recipient_id,  # nopep8
+                    PendingNotification.content_id == due_groups.c.content_id,  # nopep8
+                ),
             )
+        return query.order_by(
+            PendingNotification.recipient_id,
+            PendingNotification.content_id,
+            PendingNotification.revision_id,
+        ).all()
+
+    def send_pending_notifications(
+            self,
+            now: datetime.datetime=None,
+    ) -> int:
+        """
+        Send held content update notifications which are due: one email by
+        content and recipient merging all its updates, or one digest email
+        by recipient. Sent events are deleted, transaction must be committed
+        by caller.
+        :param now: current utc datetime
+        :return: number of sent emails
+        """
+        now = now or datetime.datetime.utcnow()
+        pending_notifications = self._get_due_pending_notifications(now)
+        if not pending_notifications:
+            return 0
+
+        events_by_recipient = collections.OrderedDict()
+        for pending in pending_notifications:
+            events_by_recipient \
+                .setdefault(pending.recipient_id, collections.OrderedDict()) \
+                .setdefault(pending.content_id, []) \
+                .append(pending)
+        content_ids = {pending.content_id for pending in pending_notifications}
+        contents = {
+            content.content_id: content
+            for content in self.session.query(Content)
+            .filter(Content.content_id.in_(content_ids))
+        }
+        user_ids = {pending.recipient_id for pending in pending_notifications}
+        user_ids.update(pending.actor_id for pending in pending_notifications)
+        users = {
+            user.user_id: user
+            for user in self.session.query(User)
+            .filter(User.user_id.in_(user_ids))
+        }
+        roles = {
+            (role.user_id, role.workspace_id): role
+            for role in self.session.query(UserRoleInWorkspace)
+            .filter(UserRoleInWorkspace.user_id.in_(events_by_recipient.keys()))  # nopep8
+            .filter(UserRoleInWorkspace.do_notify == True)
+        }
 
-            send_email_through(
-                self.config,
-                async_email_sender.send_mail,
-                message
+        messages = []
+        for recipient_id, events_by_content in events_by_recipient.items():
+            digest_items = []
+            for content_id, events in events_by_content.items():
+                content = contents[content_id]
+                role = roles.get((recipient_id, content.workspace_id))
+                if not role or not role.user.is_active:
+                    continue
+                actor = users[events[-1].actor_id]
+                try:
+                    content_context = self._get_coalesced_content_update_context(  # nopep8
+                        content,
+                        [users[event.actor_id] for event in events],
+                        events,
+                    )
+                except ValueError:
+                    # INFO - G.M - 2018-08-17 - Unexpected empty notification
+                    # (already logged): events are dropped.
+                    continue
+                if self.config.EMAIL_NOTIFICATION_DIGEST != 'none':
+                    digest_items.append(dict(
+                        content_context,
+                        workspace=content.workspace,
+                        role_label=role.role_as_label(),
+                    ))
+                else:
+                    messages.append(self._build_content_update_message(
+                        self._get_content_update_headers(content, actor),
+                        role,
+                        content_context,
+                    ))
+            if digest_items:
+                messages.append(self._build_digest_message(
+                    users[recipient_id],
+                    digest_items,
+                ))
+
+        pending_ids = [
+            pending.pending_notification_id
+            for pending in pending_notifications
+        ]
+        self.session.query(PendingNotification) \
+            .filter(PendingNotification.pending_notification_id.in_(pending_ids)) \
+            .delete(synchronize_session=False)
+        self.session.flush()
+
+        send_emails_through(
+            self.config,
+            self._get_email_sender().send_mails,
+            messages,
+        )
+        return len(messages)
+
+    def _get_coalesced_content_update_context(
+            self,
+            content: Content,
+            actors: typing.List[User],
+            events: typing.List[PendingNotification],
+    ) -> dict:
+        """
+        Build template context of content notifying all given held events:
+        a single update is notified as usual, many updates are merged in an
+        "N updates" notification showing changes since content revision
+        preceding first event.
+        :param actors: users at the origin of each event
+        :param events: held events of content, sorted by revision
+        """
+        if len(events) == 1:
+            return self._get_content_update_context(content, actors[0])
+
+        actor_names = []
+        for actor in actors:
+            if actor.display_name not in actor_names:
+                actor_names.append(actor.display_name)
+        context = {
+            # TODO - G.M - 11-06-2018 - [emailTemplateURL] correct value for workspace_url  # nopep8
+            'workspace_url': '',
+            'main_title': content.label,
+            'status_label': content.get_status().label,
+            # TODO - G.M - 11-06-2018 - [emailTemplateURL] correct value for status_icon_url  # nopep8
+            'status_icon_url': '',
+            'content_intro': l_('<span id="content-intro-username">{}</span> made {} updates.').format(  # nopep8
+                ', '.join(actor_names),
+                len(events),
+            ),
+            'call_to_action_text': l_('View online'),
+            # TODO - G.M - 11-06-2018 - [emailTemplateURL] correct value for call_to_action_url  # nopep8
+            'call_to_action_url': '',
+            # TODO - G.M - 11-06-2018 - [emailTemplateURL] correct value for logo_url  # nopep8
+            'logo_url': '',
+        }
+        previous_revision = self.session.query(ContentRevisionRO) \
+            .filter(ContentRevisionRO.content_id == content.content_id) \
+            .filter(ContentRevisionRO.revision_id < events[0].revision_id) \
+            .order_by(ContentRevisionRO.revision_id.desc()) \
+            .first()
+        if previous_revision is None:
+            # INFO - G.M - 2018-08-17 - Content was created by first event
+            context['content_text'] = content.description \
+                or '<span id="content-body-only-title">{}</span>'.format(content.label)  # nopep8
+            return context
+
+        title_diff = ''
+        if previous_revision.label != content.label:
+            title_diff = htmldiff(previous_revision.label, content.label)
+        context['content_text'] = str(l_('<p id="content-body-intro">Here is an overview of the changes:</p>')) + \
+            title_diff + \
+            htmldiff(previous_revision.description, content.description)
+        return context
+
+    def _build_digest_message(
+            self,
+            user: User,
+            items: typing.List[dict],
+            items_intro: str=None,
+    ) -> MIMEMultipart:
+        """
+        Build digest email of user.
+        :param items: template contexts of notified contents, with
+        workspace and role_label of user
+        :param items_intro: text introducing notified contents, digest one
+        by default
+        """
+        if items_intro is None:
+            items_intro = l_('Here are the {} content(s) updated since last digest:').format(  # nopep8
+                len(items),
             )
+        subject = self.config.EMAIL_NOTIFICATION_DIGEST_SUBJECT
+        subject = subject.replace(EST.WEBSITE_TITLE, self.config.WEBSITE_TITLE.__str__())  # nopep8
+        subject = subject.replace(EST.CONTENT_COUNT, str(len(items)))
+        message = MIMEMultipart('alternative')
+        message['Subject'] = subject
+        message['From'] = self._get_sender()
+        message['To'] = formataddr((user.display_name, user.email))
+
+        context = {
+            'user': user,
+            'items': items,
+            'items_intro': items_intro,
+            # TODO - G.M - 11-06-2018 - [emailTemplateURL] correct value for logo_url  # nopep8
+            'logo_url': '',
+        }
+        body_text = self._render_template(
+            mako_template_filepath=self.config.EMAIL_NOTIFICATION_DIGEST_TEMPLATE_TEXT,  # nopep8
+            context=context,
+        )
+        body_html = self._render_template(
+            mako_template_filepath=self.config.EMAIL_NOTIFICATION_DIGEST_TEMPLATE_HTML,  # nopep8
+            context=context,
+        )
+        message.attach(MIMEText(body_text, 'plain', 'utf-8'))
+        message.attach(MIMEText(body_html, 'html', 'utf-8'))
+
+        self.log_notification(
+            action='CREATED',
+            recipient=message['To'],
+            subject=message['Subject'],
+            config=self.config,
+        )
+        return message
 
     def notify_created_account(
             self,
@@ -341,7 +827,8 @@ class EmailManager(object):
         async_email_sender = EmailSender(
             self.config,
             self._smtp_config,
-            self.config.EMAIL_NOTIFICATION_ACTIVATED
+            self.config.EMAIL_NOTIFICATION_ACTIVATED,
+            retry_transient_errors=self._retry_transient_errors,
         )
 
         subject = \
@@ -385,10 +872,10 @@ class EmailManager(object):
         message.attach(part1)
         message.attach(part2)
 
-        send_email_through(
+        send_emails_through(
             config=self.config,
-            sendmail_callable=async_email_sender.send_mail,
-            message=message
+            sendmails_callable=async_email_sender.send_mails,
+            messages=[message],
         )
 
     def _render_template(
@@ -404,7 +891,10 @@ class EmailManager(object):
         :return: template rendered string
         """
 
-        template = Template(filename=mako_template_filepath)
+        template = get_template(
+            mako_template_filepath,
+            self.config.EMAIL_NOTIFICATION_TEMPLATE_MODULE_DIRECTORY,
+        )
         return template.render(
             _=_,
             config=self.config,
@@ -427,8 +917,73 @@ class EmailManager(object):
         :param config: the global configuration
         :return: the built email body as string. In case of multipart email, this method must be called one time for text and one time for html
         """
+        return self._render_content_update_body(
+            mako_template_filepath,
+            role,
+            self._get_content_update_context(content, actor),
+        )
+
+    def _render_content_update_body(
+            self,
+            mako_template_filepath: str,
+            role: UserRoleInWorkspace,
+            content_context: dict,
+    ) -> str:
+        """
+        Render email body of content update for one recipient
+        :param mako_template_filepath: the absolute path to the mako template to be used for email body building
+        :param role: the role related to user to whom the email must be sent
+        :param content_context: template context of content, given by
+        _get_content_update_context()
+        :return: the built email body as string
+        """
         logger.debug(self, 'Building email content from MAKO template {}'.format(mako_template_filepath))
+        context = dict(
+            content_context,
+            user=role.user,
+            workspace=role.workspace,
+            role_label=role.role_as_label(),
+        )
+        return self._render_template(
+            mako_template_filepath=mako_template_filepath,
+            context=context,
+        )
+
+    def _get_content_update_context(
+            self,
+            content: Content,
+            actor: User
+    ) -> dict:
+        """
+        Build the part of email template context which does not depend on
+        recipient: it is computed once for all recipients. As revisions are
+        immutable, context is kept in render cache by content revision and
+        actor (job retries, digests of same revision).
+        :param content: the content item related to the notification
+        :param actor: the user at the origin of the action / notification (for example the one who wrote a comment
+        :return: template context without recipient related values
+        """
+        if content.revision_id is None:
+            # INFO - G.M - 2018-08-20 - Not flushed revision can't be cached
+            return self._build_content_update_context(content, actor)
+        render_cache = get_render_cache(
+            CONTENT_UPDATE_CONTEXT_CACHE_NAME,
+            self.config.EMAIL_NOTIFICATION_RENDER_CACHE_SIZE,
+        )
+        return render_cache.get_or_render(
+            (content.content_id, content.revision_id, actor.user_id),
+            lambda: self._build_content_update_context(content, actor),
+        )
 
+    def _build_content_update_context(
+            self,
+            content: Content,
+            actor: User
+    ) -> dict:
+        """
+        Build template context of content update, see
+        _get_content_update_context()
+        """
         main_title = content.label
         content_intro = ''
         content_text = ''
@@ -532,31 +1087,26 @@ class EmailManager(object):
             )
             raise ValueError('Unexpected empty notification')
 
-        context = {
-            'user': role.user,
-            'workspace': role.workspace,
+        return {
             'workspace_url': workspace_url,
             'main_title': main_title,
             'status_label': content.get_status().label,
             'status_icon_url': status_icon_url,
-            'role_label': role.role_as_label(),
             'content_intro': content_intro,
             'content_text': content_text,
             'call_to_action_text': call_to_action_text,
             'call_to_action_url': call_to_action_url,
             'logo_url': logo_url,
         }
-        user = role.user
-        workspace = role.workspace
-        body_content = self._render_template(
-            mako_template_filepath=mako_template_filepath,
-            context=context,
-        )
-        return body_content
-
 
-def get_email_manager(config: CFG, session: Session):
+def get_email_manager(
+        config: CFG,
+        session: Session,
+        retry_transient_errors: bool=None,
+):
     """
+    :param retry_transient_errors: retry emails failing because of a
+    transient error, see EmailSender
     :return: EmailManager instance
     """
     #  TODO: Find a way to import properly without cyclic import
@@ -568,4 +1118,9 @@ def get_email_manager(config: CFG, session: Session):
         config.EMAIL_NOTIFICATION_SMTP_PASSWORD
     )
 
-    return EmailManager(config=config, smtp_config=smtp_config, session=session)
+    return EmailManager(
+        config=config,
+        smtp_config=smtp_config,
+        session=session,
+        retry_transient_errors=retry_transient_errors,
+    )
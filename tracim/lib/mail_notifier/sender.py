@@ -1,5 +1,7 @@
 # -*- coding: utf-8 -*-
 import smtplib
+import threading
+import time
 import typing
 from email.message import Message
 from email.mime.multipart import MIMEMultipart
@@ -39,76 +41,358 @@ def send_email_through(
         )
 
 
+def send_emails_through(
+        config: CFG,
+        sendmails_callable: typing.Callable[[typing.List[Message]], None],
+        messages: typing.List[Message],
+) -> None:
+    """
+    Send many mails at once, in async or sync mode: in async mode, messages
+    are sent by only one job.
+    :param config: system configuration
+    :param sendmails_callable: A callable who get messages list on first
+    parameter
+    :param messages: The messages who have to be sent
+    """
+    if not messages:
+        return
+    send_email_through(config, sendmails_callable, messages)
+
+
+def _is_transient_smtp_error(exc: Exception) -> bool:
+    """
+    :return: True if sending can be retried later with a new connection:
+    lost connection, network error or 4xx SMTP response.
+    """
+    if isinstance(exc, smtplib.SMTPResponseException):
+        return 400 <= exc.smtp_code < 500
+    if isinstance(exc, smtplib.SMTPServerDisconnected):
+        return True
+    if isinstance(exc, smtplib.SMTPException):
+        return False
+    return isinstance(exc, OSError)
+
+
+def open_smtp_connection(smtp_config: SmtpConfiguration) -> smtplib.SMTP:
+    """
+    Open SMTP connection, with TLS and login if smtp config has login.
+    """
+    log = 'Connecting from SMTP server {}'
+    logger.info(open_smtp_connection, log.format(smtp_config.server))
+    smtp_connection = smtplib.SMTP(
+        smtp_config.server,
+        smtp_config.port
+    )
+    smtp_connection.ehlo()
+
+    if smtp_config.login:
+        try:
+            starttls_result = smtp_connection.starttls()
+            log = 'SMTP start TLS result: {}'
+            logger.debug(open_smtp_connection, log.format(starttls_result))
+        except Exception as e:
+            log = 'SMTP start TLS error: {}'
+            logger.debug(open_smtp_connection, log.format(e.__str__()))
+
+    if smtp_config.login:
+        try:
+            login_res = smtp_connection.login(
+                smtp_config.login,
+                smtp_config.password
+            )
+            log = 'SMTP login result: {}'
+            logger.debug(open_smtp_connection, log.format(login_res))
+        except Exception as e:
+            log = 'SMTP login error: {}'
+            logger.debug(open_smtp_connection, log.format(e.__str__()))
+    logger.info(open_smtp_connection, 'Connection OK')
+    return smtp_connection
+
+
+class PooledSmtpConnection(object):
+    """
+    SMTP connection of a SmtpConnectionPool, with its usage statistics.
+    """
+
+    def __init__(self, smtp: smtplib.SMTP) -> None:
+        self.smtp = smtp
+        self.sent_count = 0
+        self.released_at = time.time()
+        self.reused = False
+
+    def close(self) -> None:
+        try:
+            self.smtp.quit()
+        except (smtplib.SMTPException, OSError):
+            self.smtp.close()
+
+
+class SmtpConnectionPool(object):
+    """
+    Keep authenticated (and TLS) SMTP connections opened between emails,
+    so that a long-lived process, like mail sender daemon, does not open a
+    new connection for each email:
+    - at most max_size idle connections are kept,
+    - idle connections older than idle_timeout seconds are closed instead
+    of being reused,
+    - a connection is closed after max_messages messages, as most SMTP
+    servers limit number of messages by connection.
+    """
+
+    def __init__(
+            self,
+            smtp_config: SmtpConfiguration,
+            max_size: int,
+            idle_timeout: float,
+            max_messages: int,
+    ) -> None:
+        self._smtp_config = smtp_config
+        self.max_size = max_size
+        self.idle_timeout = idle_timeout
+        self.max_messages = max_messages
+        self.opened_count = 0
+        self._idle_connections = []  # type: typing.List[PooledSmtpConnection]  # nopep8
+        self._lock = threading.Lock()
+
+    def acquire(self) -> PooledSmtpConnection:
+        """
+        :return: idle connection if available, new connection otherwise.
+        Connection must be given back with release() or discard().
+        """
+        expired_connections = []
+        connection = None
+        with self._lock:
+            while self._idle_connections:
+                idle_connection = self._idle_connections.pop()
+                idle_time = time.time() - idle_connection.released_at
+                if idle_time < self.idle_timeout:
+                    connection = idle_connection
+                    connection.reused = True
+                    break
+                expired_connections.append(idle_connection)
+        for expired_connection in expired_connections:
+            expired_connection.close()
+        if connection is None:
+            connection = PooledSmtpConnection(
+                open_smtp_connection(self._smtp_config)
+            )
+            with self._lock:
+                self.opened_count += 1
+        return connection
+
+    def release(self, connection: PooledSmtpConnection) -> None:
+        """
+        Give back connection to pool, it is closed if pool is full or if
+        connection sent max_messages messages.
+        """
+        connection.released_at = time.time()
+        with self._lock:
+            if connection.sent_count < self.max_messages \
+                    and len(self._idle_connections) < self.max_size:
+                self._idle_connections.append(connection)
+                return
+        connection.close()
+
+    def discard(self, connection: PooledSmtpConnection) -> None:
+        """
+        Drop a broken connection.
+        """
+        connection.smtp.close()
+
+    def close(self) -> None:
+        """
+        Close all idle connections.
+        """
+        with self._lock:
+            idle_connections = self._idle_connections
+            self._idle_connections = []
+        for connection in idle_connections:
+            connection.close()
+
+
+# INFO - G.M - 2018-08-16 - SMTP connection pools of process, by smtp server
+# and account.
+_smtp_connection_pools = {}  # type: typing.Dict[tuple, SmtpConnectionPool]
+_smtp_connection_pools_lock = threading.Lock()
+
+
+def get_smtp_connection_pool(
+        config: CFG,
+        smtp_config: SmtpConfiguration,
+) -> SmtpConnectionPool:
+    """
+    :return: SMTP connection pool of process for given smtp configuration
+    """
+    key = (
+        smtp_config.server,
+        smtp_config.port,
+        smtp_config.login,
+        smtp_config.password,
+    )
+    with _smtp_connection_pools_lock:
+        pool = _smtp_connection_pools.get(key)
+        if pool is None:
+            pool = SmtpConnectionPool(
+                smtp_config,
+                max_size=config.EMAIL_NOTIFICATION_SMTP_POOL_SIZE,
+                idle_timeout=config.EMAIL_NOTIFICATION_SMTP_POOL_IDLE_TIMEOUT,
+                max_messages=config.EMAIL_NOTIFICATION_SMTP_MAX_MESSAGES_BY_CONNECTION,  # nopep8
+            )
+            _smtp_connection_pools[key] = pool
+    return pool
+
+
+def close_smtp_connection_pools() -> None:
+    """
+    Close all idle SMTP connections of process.
+    """
+    with _smtp_connection_pools_lock:
+        pools = list(_smtp_connection_pools.values())
+        _smtp_connection_pools.clear()
+    for pool in pools:
+        pool.close()
+
+
 class EmailSender(object):
     """
     Independent email sender class.
 
     To allow its use in any thread, as an asyncjob_perform() call for
     example, it has no dependencies on SQLAlchemy nor tg HTTP request.
+
+    SMTP connections are taken from the connection pool of process: a
+    connection is given back to pool on disconnect().
+    Emails failing because of a transient error (lost connection, 4xx
+    response) are sent again through a new connection, after a delay
+    doubled at each attempt, if sender does not run in a HTTP request.
     """
 
     def __init__(
             self,
             config: CFG,
             smtp_config: SmtpConfiguration,
-            really_send_messages
+            really_send_messages,
+            retry_transient_errors: bool=None,
     ) -> None:
+        """
+        :param retry_transient_errors: retry emails failing because of a
+        transient error, by default only in ASYNC mode (emails sent by mail
+        sender daemon): in SYNC mode, emails are sent during request, which
+        must not wait for retries.
+        """
         self._smtp_config = smtp_config
         self.config = config
         self._smtp_connection = None
+        self._pooled_connection = None
         self._is_active = really_send_messages
+        if retry_transient_errors is None:
+            retry_transient_errors = \
+                config.EMAIL_PROCESSING_MODE == config.CST.ASYNC
+        self._retry_transient_errors = retry_transient_errors
+
+    def __getstate__(self) -> dict:
+        # INFO - G.M - 2018-08-16 - Sender is given to async jobs (through
+        # its send_mail/send_mails methods): connection is not pickled.
+        state = self.__dict__.copy()
+        state['_smtp_connection'] = None
+        state['_pooled_connection'] = None
+        return state
+
+    @property
+    def _pool(self) -> SmtpConnectionPool:
+        return get_smtp_connection_pool(self.config, self._smtp_config)
 
     def connect(self):
         if not self._smtp_connection:
-            log = 'Connecting from SMTP server {}'
-            logger.info(self, log.format(self._smtp_config.server))
-            self._smtp_connection = smtplib.SMTP(
-                self._smtp_config.server,
-                self._smtp_config.port
-            )
-            self._smtp_connection.ehlo()
-
-            if self._smtp_config.login:
-                try:
-                    starttls_result = self._smtp_connection.starttls()
-                    log = 'SMTP start TLS result: {}'
-                    logger.debug(self, log.format(starttls_result))
-                except Exception as e:
-                    log = 'SMTP start TLS error: {}'
-                    logger.debug(self, log.format(e.__str__()))
-
-            if self._smtp_config.login:
-                try:
-                    login_res = self._smtp_connection.login(
-                        self._smtp_config.login,
-                        self._smtp_config.password
-                    )
-                    log = 'SMTP login result: {}'
-                    logger.debug(self, log.format(login_res))
-                except Exception as e:
-                    log = 'SMTP login error: {}'
-                    logger.debug(self, log.format(e.__str__()))
-            logger.info(self, 'Connection OK')
+            self._pooled_connection = self._pool.acquire()
+            self._smtp_connection = self._pooled_connection.smtp
 
     def disconnect(self):
         if self._smtp_connection:
-            log = 'Disconnecting from SMTP server {}'
-            logger.info(self, log.format(self._smtp_config.server))
-            self._smtp_connection.quit()
-            logger.info(self, 'Connection closed.')
+            self._pool.release(self._pooled_connection)
+            self._smtp_connection = None
+            self._pooled_connection = None
+
+    def _discard_connection(self) -> None:
+        if self._smtp_connection:
+            self._pool.discard(self._pooled_connection)
+            self._smtp_connection = None
+            self._pooled_connection = None
+
+    def send_mails(self, messages: typing.List[MIMEMultipart]):
+        """
+        Send messages through the same SMTP connection. A message which
+        can't be sent does not prevent sending of next ones: first error is
+        raised once all messages have been processed.
+        """
+        from tracim.lib.mail_notifier.notifier import EmailManager
+        first_error = None
+        for message in messages:
+            try:
+                self.send_mail(message)
+            except Exception as exc:
+                logger.error(
+                    self,
+                    'Email to {} not sent: {}'.format(message['To'], exc),
+                )
+                EmailManager.log_notification(
+                    action=' FAILED',
+                    recipient=message['To'],
+                    subject=message['Subject'],
+                    config=self.config,
+                )
+                first_error = first_error or exc
+        self.disconnect()
+        if first_error:
+            raise first_error
 
     def send_mail(self, message: MIMEMultipart):
         if not self._is_active:
             log = 'Not sending email to {} (service disabled)'
             logger.info(self, log.format(message['To']))
-        else:
-            self.connect()  # Actually, this connects to SMTP only if required
-            logger.info(self, 'Sending email to {}'.format(message['To']))
-            self._smtp_connection.send_message(message)
-            from tracim.lib.mail_notifier.notifier import EmailManager
-            EmailManager.log_notification(
-                action='   SENT',
-                recipient=message['To'],
-                subject=message['Subject'],
-                config=self.config,
-            )
+            return
+
+        attempt = 0
+        while True:
+            try:
+                self.connect()  # Actually, this connects to SMTP only if required  # nopep8
+                logger.info(self, 'Sending email to {}'.format(message['To']))
+                self._smtp_connection.send_message(message)
+                break
+            except Exception as exc:
+                stale_connection = self._pooled_connection is not None \
+                    and self._pooled_connection.reused
+                self._discard_connection()
+                if stale_connection and isinstance(
+                        exc,
+                        smtplib.SMTPServerDisconnected,
+                ):
+                    # INFO - G.M - 2018-08-16 - Idle connection closed by
+                    # server: retry at once with a new connection.
+                    continue
+                if not self._retry_transient_errors \
+                        or not _is_transient_smtp_error(exc) \
+                        or attempt >= self.config.EMAIL_NOTIFICATION_SMTP_RETRY_ATTEMPTS:  # nopep8
+                    raise
+                delay = self.config.EMAIL_NOTIFICATION_SMTP_RETRY_BACKOFF * 2 ** attempt  # nopep8
+                attempt += 1
+                logger.warning(
+                    self,
+                    'Email to {} not sent ({}), retrying in {} s'.format(
+                        message['To'],
+                        exc,
+                        delay,
+                    )
+                )
+                time.sleep(delay)
+
+        from tracim.lib.mail_notifier.notifier import EmailManager
+        self._pooled_connection.sent_count += 1
+        if self._pooled_connection.sent_count >= self._pool.max_messages:
+            self.disconnect()
+        EmailManager.log_notification(
+            action='   SENT',
+            recipient=message['To'],
+            subject=message['Subject'],
+            config=self.config,
+        )
@@ -1,3 +1,37 @@
+import os
+import typing
+
+from mako.lookup import TemplateLookup
+from mako.template import Template
+
+# INFO - G.M - 2018-08-14 - Template lookups by module directory: mako
+# templates are compiled once by process (and once on disk if a module
+# directory is given), not at each rendered email.
+_template_lookups = {}  # type: typing.Dict[typing.Optional[str], TemplateLookup]  # nopep8
+
+
+def get_template(
+        template_filepath: str,
+        module_directory: typing.Optional[str]=None,
+) -> Template:
+    """
+    Get compiled mako template. Template is compiled again only if its file
+    changed.
+    :param template_filepath: file path of mako template
+    :param module_directory: directory where compiled templates are kept,
+    None to keep them in memory only
+    :return: compiled template
+    """
+    lookup = _template_lookups.get(module_directory)
+    if lookup is None:
+        lookup = TemplateLookup(
+            directories=['/'],
+            module_directory=module_directory,
+        )
+        _template_lookups[module_directory] = lookup
+    return lookup.get_template(os.path.abspath(template_filepath))
+
+
 class SmtpConfiguration(object):
     """Container class for SMTP configuration used in Tracim."""
 
@@ -20,10 +54,12 @@ class EST(object):
     WORKSPACE_LABEL = '{workspace_label}'
     CONTENT_LABEL = '{content_label}'
     CONTENT_STATUS_LABEL = '{content_status_label}'
+    CONTENT_COUNT = '{content_count}'
 
     @classmethod
     def all(cls):
         return [
+            cls.CONTENT_COUNT,
             cls.CONTENT_LABEL,
             cls.CONTENT_STATUS_LABEL,
             cls.WEBSITE_TITLE,
@@ -0,0 +1,112 @@
+# -*- coding: utf-8 -*-
+import json
+import threading
+import time
+import typing
+import weakref
+from collections import OrderedDict
+
+from redis import Redis
+
+from tracim.config import CFG
+from tracim.lib.utils.utils import get_redis_connection
+
+REDIS_AUTH_STORE_PREFIX = 'tracim:auth:'
+
+# INFO - G.M - 2018-08-10 - One store by app config: memory stores are
+# shared by all requests of an application.
+_auth_stores = weakref.WeakKeyDictionary()  # type: typing.MutableMapping[CFG, AuthStore]  # nopep8
+
+
+class AuthStore(object):
+    """
+    Key/value store with expiration of authentication data (session tokens,
+    verified credentials). Values are json serializable dicts.
+    """
+
+    def get(self, key: str) -> typing.Optional[dict]:
+        raise NotImplementedError()
+
+    def set(self, key: str, value: dict, ttl: int) -> None:
+        """
+        :param ttl: validity of value, in seconds
+        """
+        raise NotImplementedError()
+
+    def delete(self, key: str) -> None:
+        raise NotImplementedError()
+
+
+class MemoryAuthStore(AuthStore):
+    """
+    In process LRU store, for single process deployments.
+    """
+
+    def __init__(self, max_size: int) -> None:
+        self._max_size = max_size
+        self._values = OrderedDict()  # type: typing.Dict[str, typing.Tuple[float, dict]]  # nopep8
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> typing.Optional[dict]:
+        with self._lock:
+            try:
+                expire_at, value = self._values[key]
+            except KeyError:
+                return None
+            if expire_at <= time.time():
+                del self._values[key]
+                return None
+            self._values.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: dict, ttl: int) -> None:
+        with self._lock:
+            self._values[key] = (time.time() + ttl, value)
+            self._values.move_to_end(key)
+            while len(self._values) > self._max_size:
+                self._values.popitem(last=False)
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._values.pop(key, None)
+
+
+class RedisAuthStore(AuthStore):
+    """
+    Redis store, shared by all tracim processes.
+    """
+
+    def __init__(self, redis_connection: Redis) -> None:
+        self._redis = redis_connection
+
+    def get(self, key: str) -> typing.Optional[dict]:
+        value = self._redis.get(REDIS_AUTH_STORE_PREFIX + key)
+        if value is None:
+            return None
+        return json.loads(value.decode('utf-8'))
+
+    def set(self, key: str, value: dict, ttl: int) -> None:
+        self._redis.setex(
+            REDIS_AUTH_STORE_PREFIX + key,
+            ttl,
+            json.dumps(value),
+        )
+
+    def delete(self, key: str) -> None:
+        self._redis.delete(REDIS_AUTH_STORE_PREFIX + key)
+
+
+def get_auth_store(config: CFG) -> AuthStore:
+    """
+    :return: authentication store set by user.session.store config parameter
+    """
+    if config not in _auth_stores:
+        if config.USER_SESSION_STORE == 'redis':
+            _auth_stores[config] = RedisAuthStore(
+                get_redis_connection(config),
+            )
+        else:
+            _auth_stores[config] = MemoryAuthStore(
+                config.USER_SESSION_STORE_MAX_SIZE,
+            )
+    return _auth_stores[config]
@@ -1,14 +1,14 @@
 import typing
 
+from pyramid.authentication import BasicAuthAuthenticationPolicy
+from pyramid.authentication import extract_http_basic_credentials
 from pyramid.request import Request
-from sqlalchemy.orm.exc import NoResultFound
 
 from tracim import TracimRequest
-from tracim.exceptions import UserDoesNotExist
-from tracim.lib.core.user import UserApi
-from tracim.models import User
+from tracim.lib.core.user_session import UserSessionApi
 
 BASIC_AUTH_WEBUI_REALM = "tracim"
+SESSION_TOKEN_AUTH_METHOD = 'bearer'
 
 
 ###
@@ -27,31 +27,71 @@ def basic_auth_check_credentials(
     :param request: Pyramid request
     :return: None if auth failed, list of permissions if auth succeed
     """
-
-    # Do not accept invalid user
-    user = _get_basic_auth_unsafe_user(request)
-    if not user \
-            or user.email != login \
-            or not user.is_active \
-            or not user.validate_password(cleartext_password):
+    # INFO - G.M - 2018-08-10 - Credentials are checked once by request,
+    # and without database query if they were recently verified.
+    if request.authenticated_user_id is None:
+        request.authenticated_user_id = _get_user_session_api(request) \
+            .authenticate(login, cleartext_password)
+    if request.authenticated_user_id is None:
         return None
     return []
 
 
-def _get_basic_auth_unsafe_user(
-    request: Request,
-) -> typing.Optional[User]:
+def get_session_token(request: Request) -> typing.Optional[str]:
     """
-    :param request: pyramid request
-    :return: User or None
+    :return: session token of "Authorization: Bearer <token>" header, None
+    if there is not
     """
-    app_config = request.registry.settings['CFG']
-    uapi = UserApi(None, session=request.dbsession, config=app_config)
+    authorization = request.headers.get('Authorization')
+    if not authorization:
+        return None
     try:
-        login = request.unauthenticated_userid
-        if not login:
-            return None
-        user = uapi.get_one_by_email(login)
-    except UserDoesNotExist:
+        method, token = authorization.split(' ', 1)
+    except ValueError:
+        return None
+    if method.lower() != SESSION_TOKEN_AUTH_METHOD:
         return None
-    return user
+    return token.strip() or None
+
+
+def _get_user_session_api(request: TracimRequest) -> UserSessionApi:
+    return UserSessionApi(
+        session=request.dbsession,
+        config=request.registry.settings['CFG'],
+    )
+
+
+class TracimAuthenticationPolicy(BasicAuthAuthenticationPolicy):
+    """
+    Authenticate user with session token given at login
+    ("Authorization: Bearer <token>" header) or with http basic auth
+    credentials. Authenticated userid is user id.
+    """
+
+    def __init__(self, realm: str=BASIC_AUTH_WEBUI_REALM, debug: bool=False):
+        super().__init__(
+            check=basic_auth_check_credentials,
+            realm=realm,
+            debug=debug,
+        )
+
+    def authenticated_userid(
+            self,
+            request: TracimRequest,
+    ) -> typing.Optional[int]:
+        if request.authenticated_user_id is not None:
+            return request.authenticated_user_id
+        token = get_session_token(request)
+        if token:
+            request.authenticated_user_id = _get_user_session_api(request) \
+                .get_token_user_id(token)
+            return request.authenticated_user_id
+        credentials = extract_http_basic_credentials(request)
+        if not credentials:
+            return None
+        basic_auth_check_credentials(
+            credentials.username,
+            credentials.password,
+            request,
+        )
+        return request.authenticated_user_id
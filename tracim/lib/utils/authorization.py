@@ -101,9 +101,9 @@ def require_workspace_role(minimal_required_role: int) -> typing.Callable:
     def decorator(func: typing.Callable) -> typing.Callable:
         @functools.wraps(func)
         def wrapper(self, context, request: 'TracimRequest') -> typing.Callable:
-            user = request.current_user
             workspace = request.current_workspace
-            if workspace.get_user_role(user) >= minimal_required_role:
+            role = request.get_current_user_role(workspace)
+            if role >= minimal_required_role:
                 return func(self, context, request)
             raise InsufficientUserRoleInWorkspace()
 
@@ -122,10 +122,9 @@ def require_candidate_workspace_role(minimal_required_role: int) -> typing.Calla
     def decorator(func: typing.Callable) -> typing.Callable:
 
         def wrapper(self, context, request: 'TracimRequest') -> typing.Callable:
-            user = request.current_user
             workspace = request.candidate_workspace
-
-            if workspace.get_user_role(user) >= minimal_required_role:
+            role = request.get_current_user_role(workspace)
+            if role >= minimal_required_role:
                 return func(self, context, request)
             raise InsufficientUserRoleInWorkspace()
 
@@ -178,7 +177,8 @@ def require_comment_ownership_or_role(
             else:
                 minimal_required_role = minimal_required_role_for_anyone
             # INFO - G.M - 2018-06-178 - normal role test
-            if workspace.get_user_role(user) >= minimal_required_role:
+            role = request.get_current_user_role(workspace)
+            if role >= minimal_required_role:
                 return func(self, context, request)
             raise InsufficientUserRoleInWorkspace()
         return wrapper
@@ -59,7 +59,8 @@ def cors_options_view(context, request):
             'OPTIONS,HEAD,GET,POST,PUT,DELETE'
         )
     response.headers['Access-Control-Allow-Headers'] = (
-        'Content-Type,Accept,Accept-Language,Authorization,X-Request-ID'
+        'Content-Type,Accept,Accept-Language,Authorization,X-Request-ID,'
+        'Range,If-None-Match,If-Modified-Since'
     )
     return response
 
@@ -70,7 +71,9 @@ def add_cors_to_response(event):
     response = event.response
     if 'Origin' in request.headers:
         response.headers['Access-Control-Expose-Headers'] = (
-            'Content-Type,Date,Content-Length,Authorization,X-Request-ID'
+            'Content-Type,Date,Content-Length,Authorization,X-Request-ID,'
+            'X-Tracim-Next-Cursor,X-Tracim-Session-Token,ETag,Last-Modified,'
+            'Accept-Ranges,Content-Range'
         )
         # TODO - G.M - 17-05-2018 - Allow to configure this header in config
         response.headers['Access-Control-Allow-Origin'] = '*'
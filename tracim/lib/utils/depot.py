@@ -0,0 +1,222 @@
+# -*- coding: utf-8 -*-
+import datetime
+import io
+import json
+import os
+import shutil
+import typing
+import uuid
+
+from depot.io.interfaces import StoredFile
+from depot.io.local import LocalFileStorage
+from depot.io.local import LocalStoredFile
+from depot.io.utils import timestamp
+
+from tracim.lib.utils.utils import get_file_hash_and_size
+from tracim.lib.utils.utils import get_spooled_file
+
+# INFO - G.M - 2018-08-07 - Content addressed files ids are uuid built with
+# the sha256 hash of their content, uuid version 5 (name based) is used to
+# distinguish them from legacy uuid1 ids.
+CONTENT_ADDRESSED_ID_VERSION = 5
+FILE_NAME = 'file'
+METADATA_FILE_NAME = 'metadata.json'
+# INFO - G.M - 2018-08-07 - Prefix of directories of files being written or
+# purged, not listed as stored files.
+HIDDEN_PREFIX = '.'
+
+
+def get_content_addressed_id(file_hash: str) -> str:
+    """
+    :param file_hash: hexadecimal sha256 hash of file content
+    :return: depot file id of file content
+    """
+    return str(uuid.UUID(hex=file_hash[:32], version=CONTENT_ADDRESSED_ID_VERSION))  # nopep8
+
+
+def is_content_addressed_id(file_id: str) -> bool:
+    try:
+        return uuid.UUID(file_id).version == CONTENT_ADDRESSED_ID_VERSION
+    except ValueError:
+        return False
+
+
+class SeekableLocalStoredFile(LocalStoredFile):
+    """
+    Local stored file allowing to seek in it, to serve only a range of file.
+    """
+
+    def _open(self) -> None:
+        if self._file is None:
+            self._file = open(self._file_path, 'rb')
+
+    def seekable(self) -> bool:
+        return True
+
+    def seek(self, offset: int, whence: int=io.SEEK_SET) -> int:
+        self._open()
+        return self._file.seek(offset, whence)
+
+    def tell(self) -> int:
+        self._open()
+        return self._file.tell()
+
+
+class ContentAddressedFileStorage(LocalFileStorage):
+    """
+    Local depot storage where file id is computed from sha256 hash of file
+    content: a file content is stored once, whatever the number of revisions
+    (or copies of content) using it.
+
+    As a stored file may be shared, deletion asked by depot (transaction
+    rollback, replaced field value...) is ignored for content addressed
+    files: files no longer referenced by any revision are deleted by
+    garbage collection (see tracimcli depot gc) with purge().
+    Files stored before (with uuid1 id) are still readable and deletable.
+    """
+
+    def _get_local_path(self, file_id: str) -> str:
+        return os.path.join(self.storage_path, file_id)
+
+    def get(self, file_or_id) -> SeekableLocalStoredFile:
+        file_id = self.fileid(file_or_id)
+        return SeekableLocalStoredFile(file_id, self._get_local_path(file_id))
+
+    def list(self) -> typing.List[str]:
+        return [
+            file_id for file_id in super().list()
+            if not file_id.startswith(HIDDEN_PREFIX)
+        ]
+
+    def _get_hidden_path(self, file_id: str, suffix: str) -> str:
+        return self._get_local_path('{}{}.{}.{}'.format(
+            HIDDEN_PREFIX,
+            file_id,
+            suffix,
+            uuid.uuid1(),
+        ))
+
+    def _touch_if_exists(self, file_id: str) -> bool:
+        """
+        Touch stored file if it exists.
+        :return: False if file doesn't exist (or was purged meanwhile)
+        """
+        if not self.exists(file_id):
+            return False
+        try:
+            self.touch(file_id)
+        except FileNotFoundError:
+            return False
+        return True
+
+    def create(self, content, filename=None, content_type=None) -> str:
+        content, filename, content_type = self.fileinfo(
+            content,
+            filename,
+            content_type,
+        )
+        # INFO - G.M - 2018-08-07 - Content already stored, given as stored
+        # file (new revision, copy): new reference only, nothing to read.
+        if isinstance(content, StoredFile) \
+                and is_content_addressed_id(content.file_id) \
+                and self._touch_if_exists(content.file_id):
+            return content.file_id
+
+        if isinstance(content, bytes):
+            content = io.BytesIO(content)
+        new_file = get_spooled_file()
+        file_hash, file_size = get_file_hash_and_size(content, new_file)
+        new_file.seek(0)
+        file_id = get_content_addressed_id(file_hash)
+        if self._touch_if_exists(file_id):
+            return file_id
+
+        # INFO - G.M - 2018-08-07 - File is written in a temporary directory
+        # then moved, so a partially written file is never visible with its
+        # final id, even if same content is uploaded concurrently.
+        temporary_path = self._get_hidden_path(file_id, 'tmp')
+        os.makedirs(temporary_path)
+        with open(os.path.join(temporary_path, FILE_NAME), 'wb') as file_:
+            shutil.copyfileobj(new_file, file_)
+        with open(os.path.join(temporary_path, METADATA_FILE_NAME), 'w') as metadata_file:  # nopep8
+            metadata_file.write(json.dumps({
+                'filename': filename,
+                'content_type': content_type,
+                'content_length': file_size,
+                'last_modified': timestamp(),
+            }))
+        try:
+            os.rename(temporary_path, self._get_local_path(file_id))
+        except OSError:
+            # INFO - G.M - 2018-08-07 - Same content stored meanwhile
+            shutil.rmtree(temporary_path, ignore_errors=True)
+            if not self._touch_if_exists(file_id):
+                # INFO - G.M - 2018-08-07 - ... and purged since
+                new_file.seek(0)
+                return self.create(new_file, filename, content_type)
+        return file_id
+
+    def touch(self, file_or_id) -> None:
+        """
+        Update last modification date of stored file, so a file used again
+        is not deleted by a garbage collection in progress.
+        """
+        file_id = self.fileid(file_or_id)
+        metadata_path = os.path.join(
+            self._get_local_path(file_id),
+            METADATA_FILE_NAME,
+        )
+        with open(metadata_path, 'r') as metadata_file:
+            metadata = json.loads(metadata_file.read())
+        metadata['last_modified'] = timestamp()
+        temporary_metadata_path = '{}.{}'.format(metadata_path, uuid.uuid1())
+        with open(temporary_metadata_path, 'w') as metadata_file:
+            metadata_file.write(json.dumps(metadata))
+        os.replace(temporary_metadata_path, metadata_path)
+
+    def delete(self, file_or_id) -> None:
+        if is_content_addressed_id(self.fileid(file_or_id)):
+            return
+        self.purge(file_or_id)
+
+    def purge(self, file_or_id) -> None:
+        """
+        Really delete file, even if content addressed.
+        """
+        super().delete(file_or_id)
+
+    def purge_if_unmodified(
+            self,
+            file_or_id,
+            modified_since: datetime.datetime,
+    ) -> bool:
+        """
+        Delete file, unless it was modified (stored or used again, see
+        touch()) after given date.
+        :param modified_since: utc date
+        :return: True if file was deleted
+        """
+        file_id = self.fileid(file_or_id)
+        local_path = self._get_local_path(file_id)
+        # INFO - G.M - 2018-08-07 - File is first moved atomically, then its
+        # modification date is checked: a concurrent create() either touched
+        # the file before the move (and file is restored below), or doesn't
+        # find it anymore and stores it again.
+        purged_path = self._get_hidden_path(file_id, 'purged')
+        try:
+            os.rename(local_path, purged_path)
+        except FileNotFoundError:
+            return False
+        try:
+            last_modified = LocalStoredFile(file_id, purged_path).last_modified
+        except (IOError, ValueError):
+            last_modified = None
+        if last_modified and last_modified > modified_since:
+            try:
+                os.rename(purged_path, local_path)
+            except OSError:
+                # INFO - G.M - 2018-08-07 - Stored again meanwhile
+                shutil.rmtree(purged_path, ignore_errors=True)
+            return False
+        shutil.rmtree(purged_path, ignore_errors=True)
+        return True
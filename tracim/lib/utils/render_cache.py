@@ -0,0 +1,110 @@
+# -*- coding: utf-8 -*-
+import threading
+import time
+import typing
+from collections import OrderedDict
+
+# INFO - G.M - 2018-08-20 - Rendered output caches by name, shared by all
+# requests (and threads) of process.
+_render_caches = {}  # type: typing.Dict[str, RenderCache]
+_render_caches_lock = threading.Lock()
+
+
+class RenderCache(object):
+    """
+    Bounded cache of rendered output (html, template contexts...), keyed by
+    immutable data, like (content_id, revision_id): revisions are never
+    modified, so their rendering is done once. Least recently used entries
+    are dropped when cache is full.
+    """
+
+    def __init__(self, max_size: int, validity: int=0) -> None:
+        """
+        :param max_size: max number of kept entries, 0 to disable cache
+        :param validity: lifetime of entries in seconds, 0 for no limit. Use
+        it when rendering depends on current time (relative dates).
+        """
+        self.max_size = max_size
+        self.validity = validity
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()  # type: typing.Dict[typing.Hashable, typing.Tuple[float, typing.Any]]  # nopep8
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: typing.Hashable, default: typing.Any=None) -> typing.Any:  # nopep8
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return default
+            created, value = entry
+            if self.validity and time.time() - created > self.validity:
+                del self._entries[key]
+                self.misses += 1
+                return default
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key: typing.Hashable, value: typing.Any) -> None:
+        if self.max_size <= 0:
+            return
+        with self._lock:
+            self._entries[key] = (time.time(), value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def get_or_render(
+            self,
+            key: typing.Hashable,
+            render: typing.Callable[[], typing.Any],
+    ) -> typing.Any:
+        """
+        Get rendered output of key, render (and keep) it if not cached.
+        :param key: hashable key, must identify everything rendering
+        depends on
+        :param render: callable doing rendering
+        :return: rendered output
+        """
+        if self.max_size <= 0:
+            return render()
+        value = self.get(key)
+        if value is None:
+            # INFO - G.M - 2018-08-20 - Rendering is done without lock: the
+            # same output may be rendered twice by concurrent requests, which
+            # is harmless.
+            value = render()
+            self.set(key, value)
+        return value
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+
+def get_render_cache(
+        name: str,
+        max_size: int,
+        validity: int=0,
+) -> RenderCache:
+    """
+    Get process wide render cache, created at first call.
+    :param name: name of cache
+    :param max_size: max number of entries, used when cache is created
+    :param validity: lifetime of entries, used when cache is created
+    :return: render cache
+    """
+    render_cache = _render_caches.get(name)
+    if render_cache is None:
+        with _render_caches_lock:
+            render_cache = _render_caches.setdefault(
+                name,
+                RenderCache(max_size, validity),
+            )
+    return render_cache
@@ -1,5 +1,8 @@
 # -*- coding: utf-8 -*-
+import typing
+
 from pyramid.request import Request
+from sqlalchemy.orm import joinedload
 from sqlalchemy.orm.exc import NoResultFound
 
 from tracim.exceptions import NotAuthenticated
@@ -18,6 +21,7 @@ from tracim.exceptions import ImmutableAttribute
 from tracim.models.contents import ContentTypeLegacy as ContentType
 from tracim.lib.core.content import ContentApi
 from tracim.lib.core.user import UserApi
+from tracim.lib.core.userworkspace import WorkspaceAccessIndex
 from tracim.lib.core.workspace import WorkspaceApi
 from tracim.lib.utils.authorization import JSONDecodeError
 
@@ -60,6 +64,9 @@ class TracimRequest(Request):
         # Authenticated user
         self._current_user = None  # type: User
 
+        # Id of authenticated user, set by authentication policy
+        self.authenticated_user_id = None  # type: int
+
         # User found from request headers, content, distinct from authenticated
         # user
         self._candidate_user = None  # type: User
@@ -109,6 +116,26 @@ class TracimRequest(Request):
             )
         self._current_user = user
 
+    @property
+    def current_user_roles(self) -> typing.Dict[int, int]:
+        """
+        Roles of current user by workspace id, computed once by request from
+        user roles loaded with user.
+        """
+        return self._get_current_user_access().roles
+
+    def get_current_user_role(self, workspace: Workspace) -> int:
+        """
+        :return: role of current user in workspace, without database query
+        """
+        return self._get_current_user_access().get_role(workspace.workspace_id)
+
+    def _get_current_user_access(self) -> WorkspaceAccessIndex:
+        return WorkspaceAccessIndex.get_for_user(
+            self.dbsession,
+            self.current_user,
+        )
+
     @property
     def current_content(self) -> Content:
         """
@@ -189,6 +216,10 @@ class TracimRequest(Request):
         """
         self._current_user = None
         self._current_workspace = None
+        self._current_content = None
+        self._current_comment = None
+        self._candidate_user = None
+        self._candidate_workspace = None
         self.dbsession.close()
 
     @candidate_user.setter
@@ -314,18 +345,24 @@ class TracimRequest(Request):
         :param request: pyramid request
         :return: current authenticated user
         """
-        app_config = request.registry.settings['CFG']
-        uapi = UserApi(None, session=request.dbsession, config=app_config)
-        login = ''
+        user_id = None
         try:
-            login = request.authenticated_userid
-            if not login:
+            user_id = request.authenticated_userid
+            if not user_id:
                 raise UserNotFoundInTracimRequest('You request a current user but the context not permit to found one')  # nopep8
-            user = uapi.get_one_by_email(login)
+            # INFO - G.M - 2018-08-10 - Load user roles and groups in same
+            # query, they are needed by authorization checks. User already
+            # loaded for authentication is not queried again.
+            user = request.dbsession.query(User).options(
+                joinedload(User.roles),
+                joinedload(User.groups),
+            ).get(user_id)
+            if user is None:
+                raise UserDoesNotExist('User {} not found'.format(user_id))
             if not user.is_active:
-                raise UserNotActive('User {} is not active'.format(login))
+                raise UserNotActive('User {} is not active'.format(user_id))
         except (UserDoesNotExist, UserNotFoundInTracimRequest) as exc:
-            raise NotAuthenticated('User {} not found'.format(login)) from exc
+            raise NotAuthenticated('User {} not found'.format(user_id)) from exc
         return user
 
     def _get_current_workspace(
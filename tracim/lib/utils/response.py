@@ -0,0 +1,161 @@
+# -*- coding: utf-8 -*-
+import datetime
+import typing
+
+from depot.io.interfaces import StoredFile
+from pyramid.request import Request
+from pyramid.response import FileIter
+from pyramid.response import FileResponse
+from pyramid.response import Response
+from webob.datetime_utils import UTC
+
+try:  # Python 3.5+
+    from http import HTTPStatus
+except ImportError:
+    from http import client as HTTPStatus
+
+from tracim.lib.utils.utils import FILE_CHUNK_SIZE
+
+
+def get_revision_etag(revision_id: int, *variant: typing.Any) -> str:
+    """
+    Revisions are immutable: an etag built from revision id (and from
+    variant of file served, like preview page or size) is a strong
+    validator of served file.
+    :param revision_id: id of revision of served file
+    :param variant: optional parts identifying representation of revision
+    :return: etag value (not quoted)
+    """
+    return '-'.join(str(part) for part in (revision_id,) + variant)
+
+
+def _get_http_date(date: datetime.datetime) -> datetime.datetime:
+    # INFO - G.M - 2018-08-08 - Http dates have second precision and database
+    # dates are naive utc dates.
+    return date.replace(microsecond=0, tzinfo=UTC)
+
+
+def is_not_modified(
+        request: Request,
+        etag: str,
+        last_modified: datetime.datetime=None,
+) -> bool:
+    """
+    Check conditional headers (If-None-Match, then If-Modified-Since) of
+    request against served file validators.
+    """
+    if request.method not in ('GET', 'HEAD'):
+        return False
+    if request.if_none_match:
+        return etag in request.if_none_match
+    if request.if_modified_since and last_modified:
+        return _get_http_date(last_modified) <= request.if_modified_since
+    return False
+
+
+def get_not_modified_response(
+        request: Request,
+        etag: str,
+        last_modified: datetime.datetime=None,
+) -> Response:
+    """
+    :return: response 304, with validators of served file
+    """
+    response = request.response
+    response.status_code = HTTPStatus.NOT_MODIFIED
+    response.content_type = None
+    response.etag = etag
+    if last_modified:
+        response.last_modified = _get_http_date(last_modified)
+    return response
+
+
+class DepotFileIter(FileIter):
+    """
+    FileIter of depot stored file, seek in file when serving a range of it.
+    """
+
+    def __init__(self, file: StoredFile, block_size: int=FILE_CHUNK_SIZE):
+        super().__init__(file, block_size)
+
+    def app_iter_range(self, start: int, stop: typing.Optional[int]):
+        if self.file.seekable():
+            self.file.seek(start)
+        else:
+            # INFO - G.M - 2018-08-08 - Skip start of file, chunk by chunk
+            remaining = start
+            while remaining > 0:
+                skipped = self.file.read(min(self.block_size, remaining))
+                if not skipped:
+                    break
+                remaining -= len(skipped)
+        if stop is None:
+            return self
+        return _RangeFileIter(self, stop - start)
+
+
+class _RangeFileIter(object):
+    def __init__(self, file_iter: FileIter, length: int):
+        self.file_iter = file_iter
+        self.remaining = length
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        if self.remaining <= 0:
+            raise StopIteration
+        chunk = self.file_iter.file.read(
+            min(self.file_iter.block_size, self.remaining)
+        )
+        if not chunk:
+            raise StopIteration
+        self.remaining -= len(chunk)
+        return chunk
+
+    def close(self):
+        self.file_iter.close()
+
+
+def get_depot_file_response(
+        request: Request,
+        file: StoredFile,
+        content_type: str,
+        etag: str,
+        last_modified: datetime.datetime=None,
+) -> Response:
+    """
+    Response serving depot stored file, supporting conditional and range
+    requests.
+    """
+    response = request.response
+    response.conditional_response = True
+    response.content_type = content_type
+    response.accept_ranges = 'bytes'
+    response.etag = etag
+    if last_modified:
+        response.last_modified = _get_http_date(last_modified)
+    response.app_iter = DepotFileIter(file)
+    # INFO - G.M - 2018-08-08 - content length must be set after app_iter,
+    # range requests are only served when it is known.
+    if file.content_length is not None:
+        response.content_length = file.content_length
+    return response
+
+
+def get_preview_response(
+        request: Request,
+        preview_path: str,
+        etag: str,
+        last_modified: datetime.datetime=None,
+) -> Response:
+    """
+    Response serving preview file, supporting conditional and range
+    requests.
+    """
+    response = FileResponse(preview_path, request=request)
+    response.accept_ranges = 'bytes'
+    response.etag = etag
+    if last_modified:
+        response.last_modified = _get_http_date(last_modified)
+    return response
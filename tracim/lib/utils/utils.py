@@ -1,11 +1,23 @@
 # -*- coding: utf-8 -*-
+import base64
+import binascii
 import datetime
+import hashlib
+import json
+import tempfile
+import typing
 from redis import Redis
 from rq import Queue
 
 from tracim.config import CFG
 
 DATETIME_FORMAT = '%Y-%m-%dT%H:%M:%SZ'
+CURSOR_DATETIME_FORMAT = '%Y-%m-%dT%H:%M:%S.%f'
+NEXT_CURSOR_HEADER = 'X-Tracim-Next-Cursor'
+SESSION_TOKEN_HEADER = 'X-Tracim-Session-Token'
+FILE_CHUNK_SIZE = 64 * 1024
+# INFO - G.M - 2018-08-06 - Files bigger than this are spooled on disk
+SPOOLED_FILE_MAX_MEMORY_SIZE = 1024 * 1024
 DEFAULT_WEBDAV_CONFIG_FILE = "wsgidav.conf"
 DEFAULT_TRACIM_CONFIG_FILE = "development.ini"
 
@@ -31,6 +43,102 @@ def get_rq_queue(redis_connection: Redis, queue_name: str ='default') -> Queue:
     return Queue(name=queue_name, connection=redis_connection)
 
 
+def get_keyset_cursor(last_datetime: datetime.datetime, last_id: int) -> str:
+    """
+    Build keyset pagination cursor from last element of a page sorted by
+    datetime then id. Datetime is kept with full precision.
+    :param last_datetime: datetime of last element of page
+    :param last_id: id of last element of page
+    :return: cursor as string
+    """
+    return '{}_{}'.format(
+        last_datetime.strftime(CURSOR_DATETIME_FORMAT),
+        last_id,
+    )
+
+
+def parse_keyset_cursor(cursor: str) -> typing.Tuple[datetime.datetime, int]:
+    """
+    Parse cursor built with get_keyset_cursor()
+    :param cursor: cursor as string
+    :return: datetime and id of last element of previous page
+    :raise ValueError: if cursor is not valid
+    """
+    datetime_str, _, id_str = cursor.rpartition('_')
+    return (
+        datetime.datetime.strptime(datetime_str, CURSOR_DATETIME_FORMAT),
+        int(id_str),
+    )
+
+
+def get_label_keyset_cursor(
+        last_type: str,
+        last_label: str,
+        last_id: int,
+) -> str:
+    """
+    Build keyset pagination cursor from last element of a page sorted by
+    type, label then id. Cursor is url safe.
+    :param last_type: type of last element of page
+    :param last_label: label of last element of page
+    :param last_id: id of last element of page
+    :return: cursor as string
+    """
+    cursor = json.dumps([last_type, last_label, last_id])
+    return base64.urlsafe_b64encode(cursor.encode('utf-8')).decode('ascii')
+
+
+def parse_label_keyset_cursor(cursor: str) -> typing.Tuple[str, str, int]:
+    """
+    Parse cursor built with get_label_keyset_cursor()
+    :param cursor: cursor as string
+    :return: type, label and id of last element of previous page
+    :raise ValueError: if cursor is not valid
+    """
+    try:
+        values = json.loads(
+            base64.urlsafe_b64decode(cursor.encode('ascii')).decode('utf-8')
+        )
+    except (binascii.Error, UnicodeError) as exc:
+        raise ValueError('Invalid cursor') from exc
+    if not isinstance(values, list) \
+            or len(values) != 3 \
+            or not isinstance(values[0], str) \
+            or not isinstance(values[1], str) \
+            or not isinstance(values[2], int):
+        raise ValueError('Invalid cursor')
+    return values[0], values[1], values[2]
+
+
+def get_spooled_file() -> typing.BinaryIO:
+    """
+    :return: temporary file, kept in memory while small, written to disk
+    once bigger than SPOOLED_FILE_MAX_MEMORY_SIZE
+    """
+    return tempfile.SpooledTemporaryFile(max_size=SPOOLED_FILE_MAX_MEMORY_SIZE)  # nopep8
+
+
+def get_file_hash_and_size(
+        file_: typing.BinaryIO,
+        spooled_file: typing.Optional[typing.BinaryIO] = None,
+) -> typing.Tuple[str, int]:
+    """
+    Compute sha256 hash and size of a file by reading it by chunks, so
+    whole file is never loaded in memory.
+    :param file_: file to read, from its current position
+    :param spooled_file: if given, read chunks are written to it too
+    :return: hexadecimal sha256 hash and size in bytes
+    """
+    file_hash = hashlib.sha256()
+    size = 0
+    for chunk in iter(lambda: file_.read(FILE_CHUNK_SIZE), b''):
+        file_hash.update(chunk)
+        size += len(chunk)
+        if spooled_file:
+            spooled_file.write(chunk)
+    return file_hash.hexdigest(), size
+
+
 def cmp_to_key(mycmp):
     """
     List sort related function
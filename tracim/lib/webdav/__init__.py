@@ -12,11 +12,12 @@ from tracim.lib.utils.utils import DEFAULT_TRACIM_CONFIG_FILE, \
     DEFAULT_WEBDAV_CONFIG_FILE
 from tracim.lib.webdav.dav_provider import Provider
 from tracim.lib.webdav.authentification import TracimDomainController
+from tracim.lib.webdav.lock_storage import LockStorage
 from wsgidav.dir_browser import WsgiDavDirBrowser
 from wsgidav.http_authenticator import HTTPAuthenticator
 from wsgidav.error_printer import ErrorPrinter
 from tracim.lib.webdav.middlewares import TracimWsgiDavDebugFilter, \
-    TracimEnforceHTTPS, TracimEnv, TracimUserSession
+    TracimEnforceHTTPS, TracimEnv, TracimUserSession, TracimWebdavMetrics
 
 from inspect import isfunction
 import traceback
@@ -64,16 +65,22 @@ class WebdavAppFactory(object):
                 "consider installing lxml from http://codespeak.net/lxml/."
             )
 
+        # INFO - G.M - 2018-08-27 - Last middleware wraps the others:
+        # metrics need database session of TracimEnv.
         config['middleware_stack'] = [
             TracimEnforceHTTPS,
             WsgiDavDirBrowser,
             TracimUserSession,
             HTTPAuthenticator,
             ErrorPrinter,
-            TracimWsgiDavDebugFilter,
-            TracimEnv,
-
         ]
+        # INFO - G.M - 2018-08-27 - Debug filter prints requests and may dump
+        # them to files: it's only enabled with "debug_filter" option.
+        if config.get('debug_filter', False):
+            config['middleware_stack'].append(TracimWsgiDavDebugFilter)
+        if config.get('metrics', True):
+            config['middleware_stack'].append(TracimWebdavMetrics)
+        config['middleware_stack'].append(TracimEnv)
         config['provider_mapping'] = {
             config['root_path']: Provider(
                 # TODO: Test to Re enabme archived and deleted
@@ -89,6 +96,12 @@ class WebdavAppFactory(object):
             presetserver=None,
             app_config=app_config,
         )
+        # INFO - G.M - 2018-08-24 - Locks are stored in database, to be
+        # shared by all webdav processes.
+        config['locksmanager'] = LockStorage(
+            get_session_factory(get_engine(settings)),
+            cleanup_interval=app_config.WEBDAV_LOCK_CLEANUP_INTERVAL,
+        )
         return config
 
     def _get_tracim_settings(
@@ -1,6 +1,7 @@
 # coding: utf8
 from tracim.exceptions import DigestAuthNotImplemented
 from tracim.lib.core.user import UserApi
+from tracim.lib.core.user_session import UserSessionApi
 
 DEFAULT_TRACIM_WEBDAV_REALM = '/'
 
@@ -44,6 +45,13 @@ class TracimDomainController(object):
         If you ever feel the need to send a request al-mano with a curl, this is the function that'll be called by
         http_authenticator to validate the password sent
         """
-        api = UserApi(None, environ['tracim_dbsession'], self.app_config)
-        return self.isRealmUser(realmname, username, environ) and \
-             api.get_one_by_email(username).validate_password(password)
+        user_id = UserSessionApi(
+            session=environ['tracim_dbsession'],
+            config=self.app_config,
+        ).authenticate(username, password)
+        if user_id is None:
+            return False
+        # INFO - G.M - 2018-08-10 - Used by TracimUserSession to load
+        # authenticated user without new email lookup.
+        environ['tracim_user_id'] = user_id
+        return True
@@ -10,10 +10,7 @@ from tracim.lib.webdav.utils import transform_to_bdd, HistoryType, \
     SpecialFolderExtension
 
 from wsgidav.dav_provider import DAVProvider
-from wsgidav.lock_manager import LockManager
 
-
-from tracim.lib.webdav.lock_storage import LockStorage
 from tracim.lib.core.content import ContentApi
 from tracim.lib.core.content import ContentRevisionRO
 from tracim.lib.core.workspace import WorkspaceApi
@@ -27,6 +24,10 @@ class Provider(DAVProvider):
     This class' role is to provide to wsgidav _DAVResource. Wsgidav will then use them to execute action and send
     informations to the client
     """
+    # INFO - G.M - 2018-08-01 - Resolved paths are cached in environ during
+    # requests who can't modify contents.
+    RESOLUTION_CACHE_KEY = 'tracim_resolution_cache'
+    RESOLUTION_CACHEABLE_METHODS = ('GET', 'HEAD', 'OPTIONS', 'PROPFIND')
 
     def __init__(
             self,
@@ -34,13 +35,10 @@ class Provider(DAVProvider):
             show_history=True,
             show_deleted=True,
             show_archived=True,
-            manage_locks=True,
     ):
+        # INFO - G.M - 2018-08-24 - Lock manager is set by WsgiDAVApp, from
+        # "locksmanager" config (see WebdavAppFactory)
         super(Provider, self).__init__()
-
-        if manage_locks:
-            self.lockManager = LockManager(LockStorage())
-
         self.app_config = app_config
         self._show_archive = show_archived
         self._show_delete = show_deleted
@@ -55,6 +53,90 @@ class Provider(DAVProvider):
     def show_archive(self):
         return self._show_archive
 
+    def get_resolution_cache(self, environ: dict) -> dict:
+        """
+        Return request scoped cache of resolved paths. If request may modify
+        contents, return a new dict which will not be kept.
+        :param environ: wsgi environ of request
+        :return: dict of cached resolutions
+        """
+        if environ.get('REQUEST_METHOD') not in \
+                self.RESOLUTION_CACHEABLE_METHODS:
+            return {}
+        return environ.setdefault(self.RESOLUTION_CACHE_KEY, {})
+
+    def cache_content(self, path: str, content: Content, environ: dict):
+        """
+        Add already known content of given path to request resolution cache
+        :param path: webdav path of content
+        :param content: content of this path
+        :param environ: wsgi environ of request
+        """
+        cache = self.get_resolution_cache(environ)
+        cache[('content', self.reduce_path(normpath(path)))] = content
+
+    def cache_workspace(self, path: str, workspace: Workspace, environ: dict):
+        """
+        Add already known workspace of given path to request resolution cache
+        :param path: webdav path of workspace
+        :param workspace: workspace of this path
+        :param environ: wsgi environ of request
+        """
+        cache = self.get_resolution_cache(environ)
+        cache[('workspace', normpath(path).split('/')[1])] = workspace
+
+    def _get_cached_workspace(self, path: str, environ: dict) -> Workspace:
+        cache = self.get_resolution_cache(environ)
+        key = ('workspace', path.split('/')[1])
+        if key not in cache:
+            cache[key] = self.get_workspace_from_path(
+                path,
+                WorkspaceApi(
+                    current_user=environ['tracim_user'],
+                    session=environ['tracim_dbsession'],
+                    config=self.app_config,
+                ),
+            )
+        return cache[key]
+
+    def _get_cached_content(
+            self,
+            path: str,
+            environ: dict,
+            content_api: ContentApi,
+            workspace: Workspace,
+    ) -> Content:
+        cache = self.get_resolution_cache(environ)
+        key = ('content', self.reduce_path(path))
+        if key not in cache:
+            cache[key] = self.get_content_from_path(
+                path,
+                content_api,
+                workspace,
+            )
+        return cache[key]
+
+    def _get_cached_revision(
+            self,
+            revision_id: int,
+            environ: dict,
+            content_api: ContentApi,
+    ) -> ContentRevisionRO:
+        cache = self.get_resolution_cache(environ)
+        key = ('revision', int(revision_id))
+        if key not in cache:
+            cache[key] = content_api.get_one_revision(revision_id)
+        return cache[key]
+
+    def _get_content_api(self, environ: dict) -> ContentApi:
+        return ContentApi(
+            current_user=environ['tracim_user'],
+            session=environ['tracim_dbsession'],
+            config=self.app_config,
+            show_archived=False,  # self._show_archive,
+            show_deleted=False,  # self._show_delete
+        )
+
     #########################################################
     # Everything override from DAVProvider
     def getResourceInst(self, path: str, environ: dict):
@@ -77,12 +159,7 @@ class Provider(DAVProvider):
                 session=session
             )
 
-        workspace_api = WorkspaceApi(
-            current_user=user,
-            session=session,
-            config=self.app_config,
-        )
-        workspace = self.get_workspace_from_path(path, workspace_api)
+        workspace = self._get_cached_workspace(path, environ)
 
         # If the request path is in the form root/name, then we return a WorkspaceResource resource
         parent_path = dirname(path)
@@ -99,16 +176,11 @@ class Provider(DAVProvider):
 
         # And now we'll work on the path to establish which type or resource is requested
 
-        content_api = ContentApi(
-            current_user=user,
-            session=session,
-            config=self.app_config,
-            show_archived=False,  # self._show_archive,
-            show_deleted=False,  # self._show_delete
-        )
+        content_api = self._get_content_api(environ)
 
-        content = self.get_content_from_path(
+        content = self._get_cached_content(
             path=path,
+            environ=environ,
             content_api=content_api,
             workspace=workspace
         )
@@ -171,7 +243,11 @@ class Provider(DAVProvider):
 
             revision_id = re.search(r'/\.history/[^/]+/\((\d+) - [a-zA-Z]+\) ([^/].+)$', path).group(1)
 
-            content_revision = content_api.get_one_revision(revision_id)
+            content_revision = self._get_cached_revision(
+                revision_id,
+                environ,
+                content_api,
+            )
             content = self.get_content_from_revision(content_revision, content_api)
 
             if content.type == ContentType.File:
@@ -233,32 +309,17 @@ class Provider(DAVProvider):
         working_path = self.reduce_path(path)
         root_path = environ['http_authenticator.realm']
         parent_path = dirname(working_path)
-        user = environ['tracim_user']
-        session = environ['tracim_dbsession']
         if path == root_path:
             return True
 
-        workspace = self.get_workspace_from_path(
-            path,
-            WorkspaceApi(
-                current_user=user,
-                session=session,
-                config=self.app_config,
-            )
-        )
+        workspace = self._get_cached_workspace(path, environ)
 
         if parent_path == root_path or workspace is None:
             return workspace is not None
 
         # TODO bastien: Arnaud avait mis a True, verif le comportement
         # lorsque l'on explore les dossiers archive et deleted
-        content_api = ContentApi(
-            current_user=user,
-            session=session,
-            config=self.app_config,
-            show_archived=False,
-            show_deleted=False
-        )
+        content_api = self._get_content_api(environ)
 
         revision_id = re.search(r'/\.history/[^/]+/\((\d+) - [a-zA-Z]+\) ([^/].+)$', path)
 
@@ -268,9 +329,18 @@ class Provider(DAVProvider):
 
         if revision_id:
             revision_id = revision_id.group(1)
-            content = content_api.get_one_revision(revision_id)
+            content = self._get_cached_revision(
+                revision_id,
+                environ,
+                content_api,
+            )
         else:
-            content = self.get_content_from_path(working_path, content_api, workspace)
+            content = self._get_cached_content(
+                working_path,
+                environ,
+                content_api,
+                workspace,
+            )
 
         return content is not None \
             and content.is_deleted == is_deleted \
@@ -1,112 +1,229 @@
+# -*- coding: utf-8 -*-
+import threading
 import time
-
-from tracim.lib.webdav.model import Lock, Url2Token
+import typing
+from contextlib import contextmanager
+
+from sqlalchemy import and_
+from sqlalchemy import or_
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+from sqlalchemy.orm import sessionmaker
 from wsgidav import util
-from wsgidav.lock_manager import normalizeLockRoot, lockString, generateLockToken, validateLock
-from wsgidav.rw_lock import ReadWriteLock
+from wsgidav.dav_error import DAVError
+from wsgidav.dav_error import DAVErrorCondition
+from wsgidav.dav_error import HTTP_LOCKED
+from wsgidav.dav_error import PRECONDITION_CODE_LockConflict
+from wsgidav.lock_manager import generateLockToken
+from wsgidav.lock_manager import lockString
+from wsgidav.lock_manager import normalizeLockRoot
+from wsgidav.lock_manager import validateLock
+
+from tracim.models.webdav import WebdavLock
+from tracim.models.webdav import WebdavLockGuard
 
 _logger = util.getModuleLogger(__name__)
 
+LOCK_GUARD_ID = 1
+
+LOCK_FIELDS = (
+    'token',
+    'root',
+    'depth',
+    'type',
+    'scope',
+    'owner',
+    'principal',
+    'timeout',
+    'expire',
+)
+
+
+def from_base_to_dict(lock: WebdavLock) -> dict:
+    return {field: getattr(lock, field) for field in LOCK_FIELDS}
 
-def from_dict_to_base(lock):
-    return Lock(
-        token=lock["token"],
-        depth=lock["depth"],
-        root=lock["root"],
-        type=lock["type"],
-        scopre=lock["scope"],
-        owner=lock["owner"],
-        timeout=lock["timeout"],
-        principal=lock["principal"],
-        expire=lock["expire"]
-    )
-
-
-def from_base_to_dict(lock):
-    return {
-        'token': lock.token,
-        'depth': lock.depth,
-        'root': lock.root,
-        'type': lock.type,
-        'scope': lock.scope,
-        'owner': lock.owner,
-        'timeout': lock.timeout,
-        'principal': lock.principal,
-        'expire': lock.expire
-    }
+
+def escape_like(value: str, escape_char: str='\\') -> str:
+    """
+    Escape LIKE wildcards of value, to use it as a literal prefix.
+    """
+    return value \
+        .replace(escape_char, escape_char * 2) \
+        .replace('%', escape_char + '%') \
+        .replace('_', escape_char + '_')
 
 
 class LockStorage(object):
+    """
+    WsgiDAV lock storage (see wsgidav.lock_storage.LockStorageDict) kept in
+    database, so that locks are shared by all webdav server processes and
+    survive restarts. Each call uses its own short transaction.
+    """
     LOCK_TIME_OUT_DEFAULT = 604800  # 1 week, in seconds
     LOCK_TIME_OUT_MAX = 4 * 604800  # 1 month, in seconds
 
-    def __init__(self):
-        self._session = None# todo Session()
-        self._lock = ReadWriteLock()
+    def __init__(
+            self,
+            session_factory: sessionmaker,
+            cleanup_interval: int=600,
+    ) -> None:
+        """
+        :param session_factory: factory of database sessions
+        :param cleanup_interval: minimal delay in seconds between two purges
+        of expired locks, 0 to purge only when cleanup() is called.
+        """
+        self._session_factory = session_factory
+        self._cleanup_interval = cleanup_interval
+        self._last_cleanup = time.time()
+        self._cleanup_lock = threading.Lock()
 
     def __repr__(self):
-        return "C'est bien mon verrou..."
-
-    def __del__(self):
-        pass
+        return '{}({!r})'.format(
+            self.__class__.__name__,
+            self._session_factory.kw.get('bind'),
+        )
+
+    @contextmanager
+    def _session_scope(self) -> typing.Iterator[Session]:
+        session = self._session_factory()
+        try:
+            yield session
+            session.commit()
+        except Exception:
+            session.rollback()
+            raise
+        finally:
+            session.close()
 
-    def get_lock_db_from_token(self, token):
-        return self._session.query(Lock).filter(Lock.token == token).one_or_none()
+    def _valid_locks(self, session: Session, now: float=None):
+        now = now or time.time()
+        return session.query(WebdavLock).filter(
+            or_(WebdavLock.expire >= now, WebdavLock.expire < 0),
+        )
 
-    def _flush(self):
-        """Overloaded by Shelve implementation."""
-        pass
+    def _acquire_guard(self, session: Session) -> None:
+        """
+        Update guard row: concurrent lock creations (of any process) wait
+        until current transaction ends (row lock, or database write lock
+        with sqlite).
+        """
+        updated = session.query(WebdavLockGuard) \
+            .filter(WebdavLockGuard.guard_id == LOCK_GUARD_ID) \
+            .update(
+                {WebdavLockGuard.version: WebdavLockGuard.version + 1},
+                synchronize_session=False,
+            )
+        if updated:
+            return
+        # INFO - G.M - 2018-08-28 - First lock creation: guard row is
+        # created, by only one of concurrent transactions.
+        try:
+            with session.begin_nested():
+                session.add(WebdavLockGuard(
+                    guard_id=LOCK_GUARD_ID,
+                    version=0,
+                ))
+        except IntegrityError:
+            self._acquire_guard(session)
+
+    def _check_conflicts(self, session: Session, lock: dict) -> None:
+        """
+        Raise DAVError(HTTP_LOCKED) if lock conflicts with an existing one
+        (same rules as wsgidav.lock_manager.LockManager): exclusive locks
+        conflict with any lock on same path, depth infinity locks of parents
+        and, for depth infinity locks, locks of children.
+        """
+        path = lock['root']
+        parents = []
+        parent = util.getUriParent(path)
+        while parent:
+            parents.append(normalizeLockRoot(parent))
+            parent = util.getUriParent(parent)
+        conditions = [WebdavLock.root == path]
+        if parents:
+            conditions.append(and_(
+                WebdavLock.root.in_(parents),
+                WebdavLock.depth == 'infinity',
+            ))
+        if lock['depth'] == 'infinity':
+            conditions.append(self._get_children_condition(path))
+        query = self._valid_locks(session).filter(or_(*conditions))
+        if lock['scope'] == 'shared':
+            query = query.filter(WebdavLock.scope != 'shared')
+        conflicting_roots = [
+            root for root, in query.with_entities(WebdavLock.root)
+        ]
+        if conflicting_roots:
+            errcond = DAVErrorCondition(PRECONDITION_CODE_LockConflict)
+            for root in conflicting_roots:
+                errcond.add_href(root)
+            raise DAVError(HTTP_LOCKED, errcondition=errcond)
+
+    def _get_children_condition(self, path: str):
+        # INFO - G.M - 2018-08-24 - Children are found with root index,
+        # by prefix: /foo/% matches /foo/bar but not /foobar
+        children_prefix = escape_like(path.rstrip('/') + '/')
+        return and_(
+            WebdavLock.root.like(children_prefix + '%', escape='\\'),
+            WebdavLock.root != path,
+        )
+
+    def _cleanup_if_due(self) -> None:
+        if not self._cleanup_interval:
+            return
+        if time.time() - self._last_cleanup < self._cleanup_interval:
+            return
+        # INFO - G.M - 2018-08-24 - Only one thread of process purges locks,
+        # others don't wait for it.
+        if not self._cleanup_lock.acquire(blocking=False):
+            return
+        try:
+            self._last_cleanup = time.time()
+            self.cleanup()
+        finally:
+            self._cleanup_lock.release()
 
     def open(self):
-        """Called before first use.
-
-        May be implemented to initialize a storage.
-        """
+        """Called before first use."""
         pass
 
     def close(self):
         """Called on shutdown."""
         pass
 
-    def cleanup(self):
-        """Purge expired locks (optional)."""
-        pass
-
-    def clear(self):
+    def cleanup(self) -> int:
+        """
+        Purge expired locks.
+        :return: number of purged locks
+        """
+        with self._session_scope() as session:
+            purged = session.query(WebdavLock) \
+                .filter(WebdavLock.expire >= 0) \
+                .filter(WebdavLock.expire < time.time()) \
+                .delete(synchronize_session=False)
+        if purged:
+            _logger.debug('Purged {} expired lock(s)'.format(purged))
+        return purged
+
+    def clear(self) -> None:
         """Delete all entries."""
-        self._session.query(Lock).all().delete(synchronize_session=False)
-        self._session.commit()
+        with self._session_scope() as session:
+            session.query(WebdavLock).delete(synchronize_session=False)
 
-    def get(self, token):
+    def get(self, token: str) -> typing.Optional[dict]:
         """Return a lock dictionary for a token.
 
         If the lock does not exist or is expired, None is returned.
-
-        token:
-            lock token
-        Returns:
-            Lock dictionary or <None>
-
-        Side effect: if lock is expired, it will be purged and None is returned.
         """
-        self._lock.acquireRead()
-        try:
-            lock_base = self._session.query(Lock).filter(Lock.token == token).one_or_none()
-            if lock_base is None:
-                # Lock not found: purge dangling URL2TOKEN entries
-                _logger.debug("Lock purged dangling: %s" % token)
-                self.delete(token)
-                return None
-            expire = float(lock_base.expire)
-            if 0 <= expire < time.time():
-                _logger.debug("Lock timed-out(%s): %s" % (expire, lockString(from_base_to_dict(lock_base))))
-                self.delete(token)
+        with self._session_scope() as session:
+            lock = self._valid_locks(session) \
+                .filter(WebdavLock.token == token) \
+                .one_or_none()
+            if lock is None:
                 return None
-            return from_base_to_dict(lock_base)
-        finally:
-            self._lock.release()
+            return from_base_to_dict(lock)
 
-    def create(self, path, lock):
+    def create(self, path: str, lock: dict) -> dict:
         """Create a direct lock for a resource path.
 
         path:
@@ -114,63 +231,52 @@ class LockStorage(object):
         lock:
             lock dictionary, without a token entry
         Returns:
-            New unique lock token.: <lock
+            Lock dictionary
 
-        **Note:** the lock dictionary may be modified on return:
+        **Note:** the lock dictionary is modified on return:
 
         - lock['root'] is ignored and set to the normalized <path>
         - lock['timeout'] may be normalized and shorter than requested
-        - lock['token'] is added
+        - lock['token'] and lock['expire'] are added
         """
-        self._lock.acquireWrite()
-        try:
-            # We expect only a lock definition, not an existing lock
-            assert lock.get("token") is None
-            assert lock.get("expire") is None, "Use timeout instead of expire"
-            assert path and "/" in path
-
-            # Normalize root: /foo/bar
-            org_path = path
-            path = normalizeLockRoot(path)
-            lock["root"] = path
-
-            # Normalize timeout from ttl to expire-date
-            timeout = float(lock.get("timeout"))
-            if timeout is None:
-                timeout = LockStorage.LOCK_TIME_OUT_DEFAULT
-            elif timeout < 0 or timeout > LockStorage.LOCK_TIME_OUT_MAX:
-                timeout = LockStorage.LOCK_TIME_OUT_MAX
-
-            lock["timeout"] = timeout
-            lock["expire"] = time.time() + timeout
-
-            validateLock(lock)
+        # We expect only a lock definition, not an existing lock
+        assert lock.get('token') is None
+        assert lock.get('expire') is None, 'Use timeout instead of expire'
+        assert path and '/' in path
+        self._cleanup_if_due()
 
-            token = generateLockToken()
-            lock["token"] = token
-
-            # Store lock
-            lock_db = from_dict_to_base(lock)
-
-            self._session.add(lock_db)
-
-            # Store locked path reference
-            url2token = Url2Token(
-                path=path,
-                token=token
-            )
-
-            self._session.add(url2token)
-            self._session.commit()
-
-            self._flush()
-            _logger.debug("LockStorageDict.set(%r): %s" % (org_path, lockString(lock)))
-            #            print("LockStorageDict.set(%r): %s" % (org_path, lockString(lock)))
-            return lock
-        finally:
-            self._lock.release()
-
-    def refresh(self, token, timeout):
+        path = normalizeLockRoot(path)
+        lock['root'] = path
+
+        # Normalize timeout from ttl to expire-date
+        timeout = lock.get('timeout')
+        if timeout is None:
+            timeout = self.LOCK_TIME_OUT_DEFAULT
+        timeout = float(timeout)
+        if timeout < 0 or timeout > self.LOCK_TIME_OUT_MAX:
+            timeout = float(self.LOCK_TIME_OUT_MAX)
+        lock['timeout'] = timeout
+        lock['expire'] = time.time() + timeout
+
+        validateLock(lock)
+        lock['token'] = generateLockToken()
+
+        # INFO - G.M - 2018-08-28 - Conflicts are checked by LockManager in
+        # current process, and again in insert transaction for concurrent
+        # lock creations of other processes.
+        with self._session_scope() as session:
+            self._acquire_guard(session)
+            self._check_conflicts(session, lock)
+            session.add(WebdavLock(
+                **{field: lock[field] for field in LOCK_FIELDS}
+            ))
+        _logger.debug('LockStorage.create({!r}): {}'.format(
+            path,
+            lockString(lock),
+        ))
+        return lock
+
+    def refresh(self, token: str, timeout: float) -> dict:
         """Modify an existing lock's timeout.
 
         token:
@@ -182,50 +288,40 @@ class LockStorage(object):
             Lock dictionary.
             Raises ValueError, if token is invalid.
         """
-        lock_db = self._session.query(Lock).filter(Lock.token == token).one_or_none()
-        assert lock_db is not None, "Lock must exist"
         assert timeout == -1 or timeout > 0
-        if timeout < 0 or timeout > LockStorage.LOCK_TIME_OUT_MAX:
-            timeout = LockStorage.LOCK_TIME_OUT_MAX
-
-        self._lock.acquireWrite()
-        try:
-            # Note: shelve dictionary returns copies, so we must reassign values:
-            lock_db.timeout = timeout
-            lock_db.expire = time.time() + timeout
-            self._session.commit()
-            self._flush()
-        finally:
-            self._lock.release()
-        return from_base_to_dict(lock_db)
-
-    def delete(self, token):
+        if timeout < 0 or timeout > self.LOCK_TIME_OUT_MAX:
+            timeout = self.LOCK_TIME_OUT_MAX
+
+        with self._session_scope() as session:
+            lock = self._valid_locks(session) \
+                .filter(WebdavLock.token == token) \
+                .with_for_update() \
+                .one_or_none()
+            if lock is None:
+                raise ValueError('Invalid lock token {}'.format(token))
+            lock.timeout = float(timeout)
+            lock.expire = time.time() + timeout
+            return from_base_to_dict(lock)
+
+    def delete(self, token: str) -> bool:
         """Delete lock.
 
         Returns True on success. False, if token does not exist, or is expired.
         """
-        self._lock.acquireWrite()
-        try:
-            lock_db = self._session.query(Lock).filter(Lock.token == token).one_or_none()
-            _logger.debug("delete %s" % lockString(from_base_to_dict(lock_db)))
-            if lock_db is None:
-                return False
-            # Remove url to lock mapping
-            url2token = self._session.query(Url2Token).filter(
-                Url2Token.path == lock_db.root,
-                Url2Token.token == token).one_or_none()
-            if url2token is not None:
-                self._session.delete(url2token)
-            # Remove the lock
-            self._session.delete(lock_db)
-            self._session.commit()
-
-            self._flush()
-        finally:
-            self._lock.release()
-        return True
-
-    def getLockList(self, path, includeRoot, includeChildren, tokenOnly):
+        with self._session_scope() as session:
+            deleted = self._valid_locks(session) \
+                .filter(WebdavLock.token == token) \
+                .delete(synchronize_session=False)
+        _logger.debug('LockStorage.delete({}): {}'.format(token, deleted))
+        return bool(deleted)
+
+    def getLockList(
+            self,
+            path: str,
+            includeRoot: bool,
+            includeChildren: bool,
+            tokenOnly: bool,
+    ) -> typing.List[typing.Union[str, dict]]:
         """Return a list of direct locks for <path>.
 
         Expired locks are *not* returned (but may be purged).
@@ -238,38 +334,28 @@ class LockStorage(object):
         includeChildren:
             True: Also check all sub-paths for existing locks.
         tokenOnly:
-            True: only a list of token is returned. This may be implemented
-            more efficiently by some providers.
+            True: only a list of token is returned.
         Returns:
             List of valid lock dictionaries (may be empty).
         """
-        assert path and path.startswith("/")
+        assert path and path.startswith('/')
         assert includeRoot or includeChildren
-
-        def __appendLocks(toklist):
-            # Since we can do this quickly, we use self.get() even if
-            # tokenOnly is set, so expired locks are purged.
-            for token in toklist:
-                lock_db = self.get_lock_db_from_token(token)
-                if lock_db:
-                    if tokenOnly:
-                        lockList.append(lock_db.token)
-                    else:
-                        lockList.append(from_base_to_dict(lock_db))
+        self._cleanup_if_due()
 
         path = normalizeLockRoot(path)
-        self._lock.acquireRead()
-        try:
-            tokList = self._session.query(Url2Token.token).filter(Url2Token.path == path).all()
-            lockList = []
-            if includeRoot:
-                __appendLocks(tokList)
-
-            if includeChildren:
-                for url, in self._session.query(Url2Token.path).group_by(Url2Token.path):
-                    if util.isChildUri(path, url):
-                        __appendLocks(self._session.query(Url2Token.token).filter(Url2Token.path == url))
-
-            return lockList
-        finally:
-            self._lock.release()
\ No newline at end of file
+        conditions = []
+        if includeRoot:
+            conditions.append(WebdavLock.root == path)
+        if includeChildren:
+            conditions.append(self._get_children_condition(path))
+
+        with self._session_scope() as session:
+            if tokenOnly:
+                query = self._valid_locks(session) \
+                    .with_entities(WebdavLock.token)
+            else:
+                query = self._valid_locks(session)
+            query = query.filter(or_(*conditions)).order_by(WebdavLock.root)
+            if tokenOnly:
+                return [token for token, in query]
+            return [from_base_to_dict(lock) for lock in query]
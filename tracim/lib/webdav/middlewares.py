@@ -1,18 +1,23 @@
+import bisect
 import os
 import sys
 import threading
 import time
+import typing
 from datetime import datetime
 from xml.etree import ElementTree
 
 import transaction
 import yaml
 from pyramid.paster import get_appsettings
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
 from wsgidav import util, compat
 from wsgidav.middleware import BaseMiddleware
 
 from tracim import CFG
 from tracim.lib.core.user import UserApi
+from tracim.lib.utils.logger import logger
 from tracim.models import get_engine, get_session_factory, get_tm_session
 
 
@@ -231,6 +236,209 @@ class TracimWsgiDavDebugFilter(BaseMiddleware):
             f.write(yaml.dump(dump_content, default_flow_style=False))
 
 
+class WebdavMetrics(object):
+    """
+    Metrics of webdav requests by method: number of requests, latency
+    histogram, database queries and transferred bytes.
+    """
+    # INFO - G.M - 2018-08-27 - Upper bounds (in seconds) of latency
+    # histogram buckets, last bucket is for slower requests.
+    LATENCY_BUCKETS = (0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+
+    def __init__(self) -> None:
+        self._methods = {}  # type: typing.Dict[str, typing.Dict[str, typing.Any]]  # nopep8
+        self._lock = threading.Lock()
+
+    def record(
+            self,
+            method: str,
+            duration: float,
+            queries: int,
+            bytes_received: int,
+            bytes_sent: int,
+    ) -> None:
+        with self._lock:
+            stats = self._methods.get(method)
+            if stats is None:
+                stats = self._methods[method] = {
+                    'count': 0,
+                    'duration': 0.0,
+                    'max_duration': 0.0,
+                    'queries': 0,
+                    'max_queries': 0,
+                    'bytes_received': 0,
+                    'bytes_sent': 0,
+                    'histogram': [0] * (len(self.LATENCY_BUCKETS) + 1),
+                }
+            stats['count'] += 1
+            stats['duration'] += duration
+            stats['max_duration'] = max(stats['max_duration'], duration)
+            stats['queries'] += queries
+            stats['max_queries'] = max(stats['max_queries'], queries)
+            stats['bytes_received'] += bytes_received
+            stats['bytes_sent'] += bytes_sent
+            bucket = bisect.bisect_left(self.LATENCY_BUCKETS, duration)
+            stats['histogram'][bucket] += 1
+
+    def get_stats(self) -> typing.Dict[str, typing.Dict[str, typing.Any]]:
+        """
+        :return: copy of metrics, by method
+        """
+        with self._lock:
+            return {
+                method: dict(stats, histogram=list(stats['histogram']))
+                for method, stats in self._methods.items()
+            }
+
+    def reset(self) -> None:
+        with self._lock:
+            self._methods = {}
+
+    def format(self) -> str:
+        """
+        :return: one line summary of metrics
+        """
+        bucket_labels = [
+            '<={}s'.format(bound) for bound in self.LATENCY_BUCKETS
+        ] + ['>{}s'.format(self.LATENCY_BUCKETS[-1])]
+        summaries = []
+        for method, stats in sorted(self.get_stats().items()):
+            histogram = ' '.join(
+                '{}:{}'.format(label, count)
+                for label, count in zip(bucket_labels, stats['histogram'])
+                if count
+            )
+            summaries.append(
+                '{method} {count} req, avg {avg:.0f}ms, max {max:.0f}ms, '
+                '{queries:.1f} queries/req (max {max_queries}), '
+                '{bytes_received}B in, {bytes_sent}B out [{histogram}]'.format(
+                    method=method,
+                    count=stats['count'],
+                    avg=stats['duration'] / stats['count'] * 1000,
+                    max=stats['max_duration'] * 1000,
+                    queries=stats['queries'] / stats['count'],
+                    max_queries=stats['max_queries'],
+                    bytes_received=stats['bytes_received'],
+                    bytes_sent=stats['bytes_sent'],
+                    histogram=histogram,
+                )
+            )
+        return '; '.join(summaries) or 'no request'
+
+
+class QueryCounter(object):
+    """
+    Count sql queries executed by each thread, between start() and stop(),
+    on listened engines.
+    """
+
+    def __init__(self) -> None:
+        self._local = threading.local()
+        self._engines = set()  # type: typing.Set[Engine]
+        self._lock = threading.Lock()
+
+    def listen(self, engine: Engine) -> None:
+        # INFO - G.M - 2018-08-27 - Listener is registered once by engine:
+        # registering events is not thread safe.
+        with self._lock:
+            if engine in self._engines:
+                return
+            event.listen(engine, 'before_cursor_execute', self._count_query)
+            self._engines.add(engine)
+
+    def _count_query(self, *args, **kwargs) -> None:
+        if getattr(self._local, 'count', None) is not None:
+            self._local.count += 1
+
+    def start(self) -> None:
+        self._local.count = 0
+
+    def stop(self) -> int:
+        """
+        :return: number of queries counted in current thread
+        """
+        count = getattr(self._local, 'count', None) or 0
+        self._local.count = None
+        return count
+
+
+class TracimWebdavMetrics(BaseMiddleware):
+    """
+    Record latency, database queries and transferred bytes of requests, by
+    method. Metrics are logged every "metrics_log_interval" seconds, and
+    requests slower than "metrics_slow_request" seconds are logged.
+    Must be wrapped by TracimEnv (placed before it in middleware stack).
+    """
+
+    def __init__(self, application, config):
+        super().__init__(application, config)
+        self._application = application
+        self._config = config
+        self.metrics = WebdavMetrics()
+        self.query_counter = QueryCounter()
+        self.log_interval = config.get('metrics_log_interval', 300)
+        self.slow_request = config.get('metrics_slow_request', 1.0)
+        self._last_log = time.time()
+
+    def __call__(self, environ, start_response):
+        start = time.time()
+        method = environ['REQUEST_METHOD']
+        if 'tracim_dbsession' in environ:
+            self.query_counter.listen(environ['tracim_dbsession'].get_bind())
+        self.query_counter.start()
+        bytes_sent = 0
+        app_iter = self._application(environ, start_response)
+        try:
+            for data in app_iter:
+                bytes_sent += len(data)
+                yield data
+        finally:
+            if hasattr(app_iter, 'close'):
+                app_iter.close()
+            queries = self.query_counter.stop()
+            self._record(environ, method, start, queries, bytes_sent)
+
+    def _record(
+            self,
+            environ: dict,
+            method: str,
+            start: float,
+            queries: int,
+            bytes_sent: int,
+    ) -> None:
+        now = time.time()
+        duration = now - start
+        try:
+            bytes_received = int(environ.get('CONTENT_LENGTH') or 0)
+        except ValueError:
+            bytes_received = 0
+        self.metrics.record(
+            method,
+            duration,
+            queries,
+            bytes_received,
+            bytes_sent,
+        )
+        if self.slow_request and duration >= self.slow_request:
+            logger.warning(
+                self,
+                'Slow request: {} {} (depth {}) took {:.0f}ms, '
+                '{} queries, {}B out'.format(
+                    method,
+                    environ.get('PATH_INFO', ''),
+                    environ.get('HTTP_DEPTH', '-'),
+                    duration * 1000,
+                    queries,
+                    bytes_sent,
+                )
+            )
+        if self.log_interval and now - self._last_log >= self.log_interval:
+            self._last_log = now
+            logger.info(self, 'Webdav metrics: {}'.format(
+                self.metrics.format()
+            ))
+
+
 class TracimEnforceHTTPS(BaseMiddleware):
 
     def __init__(self, application, config):
@@ -287,9 +495,15 @@ class TracimUserSession(BaseMiddleware):
         self._config = config
 
     def __call__(self, environ, start_response):
-        environ['tracim_user'] = UserApi(
+        uapi = UserApi(
             None,
             session=environ['tracim_dbsession'],
             config=environ['tracim_cfg'],
-        ).get_one_by_email(environ['http_authenticator.username'])
+        )
+        if 'tracim_user_id' in environ:
+            environ['tracim_user'] = uapi.get_one(environ['tracim_user_id'])
+        else:
+            environ['tracim_user'] = uapi.get_one_by_email(
+                environ['http_authenticator.username'],
+            )
         return self._application(environ, start_response)
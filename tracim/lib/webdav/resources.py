@@ -10,6 +10,7 @@ from datetime import datetime
 from time import mktime
 from os.path import dirname, basename
 
+from depot.io.interfaces import StoredFile
 from sqlalchemy.orm import Session
 
 from tracim.config import CFG
@@ -19,6 +20,8 @@ from tracim.lib.webdav.utils import transform_to_display, HistoryType, \
     FakeFileStream
 from tracim.lib.webdav.utils import transform_to_bdd
 from tracim.lib.core.workspace import WorkspaceApi
+from tracim.lib.utils.render_cache import get_render_cache
+from tracim.lib.utils.response import get_revision_etag
 from tracim.models.data import User, ContentRevisionRO
 from tracim.models.data import Workspace
 from tracim.models.data import Content, ActionDescription
@@ -37,6 +40,8 @@ from tracim.models.revision_protection import new_revision
 
 logger = logging.getLogger()
 
+WEBDAV_RENDER_CACHE_NAME = 'webdav_html'
+
 
 class ManageActions(object):
     """
@@ -170,6 +175,11 @@ class RootResource(DAVCollection):
         members = []
         for workspace in self.workspace_api.get_all():
             workspace_path = '%s%s%s' % (self.path, '' if self.path == '/' else '/', workspace.label)
+            self.provider.cache_workspace(
+                workspace_path,
+                workspace,
+                self.environ,
+            )
             members.append(
                 WorkspaceResource(
                     path=workspace_path,
@@ -335,6 +345,7 @@ class WorkspaceResource(DAVCollection):
 
         for content in children:
             content_path = '%s/%s' % (self.path, transform_to_display(content.get_label_as_file()))
+            self.provider.cache_content(content_path, content, self.environ)
 
             if content.type == ContentType.Folder:
                 members.append(
@@ -528,19 +539,22 @@ class FolderResource(WorkspaceResource):
             workspace
         )
 
-        with new_revision(
-            content=self.content,
-            tm=transaction.manager,
-            session=self.session,
-        ):
-            if basename(destpath) != self.getDisplayName():
-                self.content_api.update_content(self.content, transform_to_bdd(basename(destpath)))
-                self.content_api.save(self.content)
-            else:
-                if workspace.workspace_id == self.content.workspace.workspace_id:
-                    self.content_api.move(self.content, parent)
+        if basename(destpath) == self.getDisplayName() \
+                and workspace.workspace_id != self.content.workspace.workspace_id:  # nopep8
+            # INFO - G.M - 2018-08-13 - Children are moved to new workspace
+            # too, with set-based queries.
+            self.content_api.bulk_move([self.content], parent, workspace)
+        else:
+            with new_revision(
+                content=self.content,
+                tm=transaction.manager,
+                session=self.session,
+            ):
+                if basename(destpath) != self.getDisplayName():
+                    self.content_api.update_content(self.content, transform_to_bdd(basename(destpath)))
+                    self.content_api.save(self.content)
                 else:
-                    self.content_api.move_recursively(self.content, parent, workspace)
+                    self.content_api.move(self.content, parent)
 
         transaction.commit()
 
@@ -559,6 +573,7 @@ class FolderResource(WorkspaceResource):
 
         for content in visible_children:
             content_path = '%s/%s' % (self.path, transform_to_display(content.get_label_as_file()))
+            self.provider.cache_content(content_path, content, self.environ)
 
             try:
                 if content.type == ContentType.Folder:
@@ -1125,6 +1140,7 @@ class FileResource(DAVNonCollection):
             config=self.provider.app_config,
             session=self.session,
         )
+        self._stored_file = None  # type: StoredFile
 
         # this is the property that windows client except to check if the file is read-write or read-only,
         # but i wasn't able to set this property so you'll have to look into it >.>
@@ -1133,11 +1149,33 @@ class FileResource(DAVNonCollection):
     def __repr__(self) -> str:
         return "<DAVNonCollection: FileResource (%d)>" % self.content.revision_id
 
+    def _get_served_revision(self) -> typing.Union[Content, ContentRevisionRO]:  # nopep8
+        """
+        :return: content (its current revision) or revision whose file is
+        served
+        """
+        return self.content
+
+    def _get_stored_file(self) -> StoredFile:
+        """
+        :return: stored file of served revision, opened once by resource
+        (each access to depot_file.file opens a new one). It's closed by
+        wsgidav once served, see getContent().
+        """
+        if self._stored_file is None:
+            self._stored_file = self._get_served_revision().depot_file.file
+        return self._stored_file
+
     def getContentLength(self) -> int:
-        return self.content.depot_file.file.content_length
+        revision = self._get_served_revision()
+        # INFO - G.M - 2018-08-23 - Stored file is opened only for revisions
+        # without file size, see "tracimcli depot update file infos".
+        if revision.file_size is not None:
+            return revision.file_size
+        return self._get_stored_file().content_length
 
     def getContentType(self) -> str:
-        return self.content.file_mimetype
+        return self._get_served_revision().file_mimetype
 
     def getCreationDate(self) -> float:
         return mktime(self.content.created.timetuple())
@@ -1148,12 +1186,21 @@ class FileResource(DAVNonCollection):
     def getLastModified(self) -> float:
         return mktime(self.content.updated.timetuple())
 
-    def getContent(self) -> typing.BinaryIO:
-        filestream = compat.BytesIO()
-        filestream.write(self.content.depot_file.file.read())
-        filestream.seek(0)
+    def getEtag(self) -> str:
+        return get_revision_etag(self._get_served_revision().revision_id)
 
-        return filestream
+    def supportEtag(self) -> bool:
+        return True
+
+    def supportRanges(self) -> bool:
+        # INFO - G.M - 2018-08-22 - wsgidav seeks in file when ranges are
+        # supported, local depot files are seekable.
+        return self._get_stored_file().seekable()
+
+    def getContent(self) -> typing.BinaryIO:
+        # INFO - G.M - 2018-08-22 - Depot stored file is returned as is, read
+        # by chunks by wsgidav: file is never loaded in memory.
+        return self._get_stored_file()
 
     def beginWrite(self, contentType: str=None) -> FakeFileStream:
         return FakeFileStream(
@@ -1325,14 +1372,12 @@ class FileResource(DAVNonCollection):
             content_api,
             destination_workspace,
         )
-        workspace = self.content.workspace
-        parent = self.content.parent
-        new_content = self.content_api.copy(
-            item=self.content,
-            new_label=new_file_name,
+        self.content_api.bulk_copy(
+            [self.content],
             new_parent=destination_parent,
+            new_workspace=destination_workspace,
+            new_label=new_file_name,
         )
-        self.content_api.copy_children(self.content, new_content)
         transaction.commit()
 
     def supportRecursiveMove(self, destPath):
@@ -1362,18 +1407,8 @@ class HistoryFileResource(FileResource):
         left_side = '(%d - %s) ' % (self.content_revision.revision_id, self.content_revision.revision_type)
         return '%s%s' % (left_side, transform_to_display(self.content_revision.file_name))
 
-    def getContent(self):
-        filestream = compat.BytesIO()
-        filestream.write(self.content_revision.depot_file.file.read())
-        filestream.seek(0)
-
-        return filestream
-
-    def getContentLength(self):
-        return self.content_revision.depot_file.file.content_length
-
-    def getContentType(self) -> str:
-        return self.content_revision.file_mimetype
+    def _get_served_revision(self) -> ContentRevisionRO:
+        return self.content_revision
 
     def beginWrite(self, contentType=None):
         raise DAVError(HTTP_FORBIDDEN)
@@ -1417,21 +1452,60 @@ class OtherFileResource(FileResource):
     def getContentType(self) -> str:
         return 'text/html'
 
-    def getContent(self):
-        filestream = compat.BytesIO()
+    def getEtag(self) -> None:
+        # INFO - G.M - 2018-08-22 - Html depends on comments too, it is not
+        # identified by revision.
+        return None
 
-        filestream.write(bytes(self.content_designed, 'utf-8'))
-        filestream.seek(0)
-        return filestream
+    def supportEtag(self) -> bool:
+        return False
+
+    def supportRanges(self) -> bool:
+        return True
+
+    def getContent(self) -> typing.BinaryIO:
+        # INFO - G.M - 2018-08-22 - BytesIO shares rendered html buffer, it is
+        # not copied.
+        return compat.BytesIO(self.content_designed)
 
     def design(self):
+        # INFO - G.M - 2018-08-20 - Html is rendered (and encoded) once by
+        # revision: key contains shown revision and current one (history is
+        # shown), and comment revisions for threads.
+        render_cache = get_render_cache(
+            WEBDAV_RENDER_CACHE_NAME,
+            self.provider.app_config.WEBDAV_RENDER_CACHE_SIZE,
+            self.provider.app_config.WEBDAV_RENDER_CACHE_VALIDITY,
+        )
         if self.content.type == ContentType.Page:
-            return designPage(self.content, self.content_revision)
+            return render_cache.get_or_render(
+                (
+                    self.content.content_id,
+                    self.content_revision.revision_id,
+                    self.content.revision_id,
+                ),
+                lambda: designPage(
+                    self.content,
+                    self.content_revision,
+                ).encode('utf-8'),
+            )
         else:
-            return designThread(
-                self.content,
-                self.content_revision,
-                self.content_api.get_all(self.content.content_id, ContentType.Comment)
+            comments = self.content_api.get_all(
+                self.content.content_id,
+                ContentType.Comment,
+            )
+            return render_cache.get_or_render(
+                (
+                    self.content.content_id,
+                    self.content_revision.revision_id,
+                    self.content.revision_id,
+                    tuple(comment.revision_id for comment in comments),
+                ),
+                lambda: designThread(
+                    self.content,
+                    self.content_revision,
+                    comments,
+                ).encode('utf-8'),
             )
 
 
@@ -1463,14 +1537,6 @@ class HistoryOtherFile(OtherFileResource):
         left_side = '(%d - %s) ' % (self.content_revision.revision_id, self.content_revision.revision_type)
         return '%s%s' % (left_side, transform_to_display(self.content_revision.get_label_as_file()))
 
-    def getContent(self):
-        filestream = compat.BytesIO()
-
-        filestream.write(bytes(self.content_designed, 'utf-8'))
-        filestream.seek(0)
-
-        return filestream
-
     def delete(self):
         raise DAVError(HTTP_FORBIDDEN)
 
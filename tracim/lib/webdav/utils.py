@@ -5,9 +5,10 @@ from os.path import normpath as base_normpath
 
 from sqlalchemy.orm import Session
 from wsgidav import util
-from wsgidav import compat
 
+from tracim.exceptions import SameValueError
 from tracim.lib.core.content import ContentApi
+from tracim.lib.utils.utils import get_spooled_file
 from tracim.models.data import Workspace, Content, ContentType, \
     ActionDescription
 from tracim.models.revision_protection import new_revision
@@ -116,7 +117,9 @@ class FakeFileStream(object):
         :param content:
         :param parent:
         """
-        self._file_stream = compat.BytesIO()
+        # INFO - G.M - 2018-08-06 - Uploaded data are spooled to a temporary
+        # file instead of being kept in memory.
+        self._file_stream = get_spooled_file()
         self._session = session
         self._file_name = file_name if file_name != '' else self._content.file_name
         self._content = content
@@ -149,7 +152,7 @@ class FakeFileStream(object):
 
     def write(self, s: str):
         """
-        Called by request_server when writing content to files, we put it inside a filestream
+        Called by request_server when writing content to files, we put it inside a spooled temporary file
         """
         self._file_stream.write(s)
 
@@ -167,6 +170,7 @@ class FakeFileStream(object):
             self.update_file()
 
         transaction.commit()
+        self._file_stream.close()
 
     def create_file(self):
         """
@@ -187,7 +191,7 @@ class FakeFileStream(object):
             file,
             self._file_name,
             util.guessMimeType(self._file_name),
-            self._file_stream.read()
+            self._file_stream,
         )
 
         self._api.save(file, ActionDescription.CREATION)
@@ -197,16 +201,21 @@ class FakeFileStream(object):
         Called when we're updating an existing content; we create a new revision and update the file content
         """
 
-        with new_revision(
-                session=self._session,
-                content=self._content,
-                tm=transaction.manager,
-        ):
-            self._api.update_file_data(
-                self._content,
-                self._file_name,
-                util.guessMimeType(self._content.file_name),
-                self._file_stream.read()
-            )
-
-            self._api.save(self._content, ActionDescription.REVISION)
\ No newline at end of file
+        try:
+            with new_revision(
+                    session=self._session,
+                    content=self._content,
+                    tm=transaction.manager,
+            ):
+                self._api.update_file_data(
+                    self._content,
+                    self._file_name,
+                    util.guessMimeType(self._content.file_name),
+                    self._file_stream,
+                )
+
+                self._api.save(self._content, ActionDescription.REVISION)
+        except SameValueError:
+            # INFO - G.M - 2018-08-06 - Same file uploaded again (same
+            # hash), no new revision needed.
+            pass
\ No newline at end of file
@@ -0,0 +1,27 @@
+"""add webdav lock guards
+
+Revision ID: 1c5e8a4f7b29
+Revises: 7f3a9d2c6b18
+Create Date: 2018-08-28 14:07:51.628304
+
+"""
+
+# revision identifiers, used by Alembic.
+revision = '1c5e8a4f7b29'
+down_revision = '7f3a9d2c6b18'
+
+from alembic import op
+from sqlalchemy import Column, Integer
+
+
+def upgrade():
+    # INFO - G.M - 2018-08-28 - Guard row is created by first lock creation
+    op.create_table(
+        'webdav_lock_guards',
+        Column('guard_id', Integer(), primary_key=True, autoincrement=False),
+        Column('version', Integer(), nullable=False),
+    )
+
+
+def downgrade():
+    op.drop_table('webdav_lock_guards')
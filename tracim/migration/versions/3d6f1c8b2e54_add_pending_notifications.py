@@ -0,0 +1,73 @@
+"""add pending notifications
+
+Revision ID: 3d6f1c8b2e54
+Revises: 8c4f2e9a1d07
+Create Date: 2018-08-17 10:24:12.503719
+
+"""
+
+# revision identifiers, used by Alembic.
+revision = '3d6f1c8b2e54'
+down_revision = '8c4f2e9a1d07'
+
+from alembic import op
+from sqlalchemy import Column, DateTime, ForeignKey, Integer
+
+
+def upgrade():
+    op.create_table(
+        'pending_notifications',
+        Column(
+            'pending_notification_id',
+            Integer(),
+            autoincrement=True,
+            primary_key=True,
+        ),
+        Column(
+            'recipient_id',
+            Integer(),
+            ForeignKey('users.user_id'),
+            nullable=False,
+        ),
+        Column(
+            'content_id',
+            Integer(),
+            ForeignKey('content.id'),
+            nullable=False,
+        ),
+        Column(
+            'revision_id',
+            Integer(),
+            ForeignKey('content_revisions.revision_id'),
+            nullable=False,
+        ),
+        Column(
+            'actor_id',
+            Integer(),
+            ForeignKey('users.user_id'),
+            nullable=False,
+        ),
+        Column('created', DateTime(), nullable=False),
+    )
+    op.create_index(
+        'idx__pending_notifications__recipient_id__content_id',
+        'pending_notifications',
+        ['recipient_id', 'content_id'],
+    )
+    op.create_index(
+        'idx__pending_notifications__created',
+        'pending_notifications',
+        ['created'],
+    )
+
+
+def downgrade():
+    op.drop_index(
+        'idx__pending_notifications__created',
+        'pending_notifications',
+    )
+    op.drop_index(
+        'idx__pending_notifications__recipient_id__content_id',
+        'pending_notifications',
+    )
+    op.drop_table('pending_notifications')
@@ -0,0 +1,28 @@
+"""add revision file size and hash
+
+Revision ID: 4e2b7c9d5a13
+Revises: 3d6f1c8b2e54
+Create Date: 2018-08-23 10:41:12.318426
+
+"""
+
+# revision identifiers, used by Alembic.
+revision = '4e2b7c9d5a13'
+down_revision = '3d6f1c8b2e54'
+
+from alembic import op
+from sqlalchemy import BigInteger, Column, Unicode
+
+
+def upgrade():
+    # INFO - G.M - 2018-08-23 - Values are computed from stored files with
+    # "tracimcli depot update file infos"
+    with op.batch_alter_table('content_revisions') as batch_op:
+        batch_op.add_column(Column('file_size', BigInteger, nullable=True))
+        batch_op.add_column(Column('file_hash', Unicode(64), nullable=True))
+
+
+def downgrade():
+    with op.batch_alter_table('content_revisions') as batch_op:
+        batch_op.drop_column('file_hash')
+        batch_op.drop_column('file_size')
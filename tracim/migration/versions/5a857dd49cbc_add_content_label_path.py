@@ -0,0 +1,73 @@
+"""add content label_path
+
+Revision ID: 5a857dd49cbc
+Revises: 6b1f04939296
+Create Date: 2018-07-30 15:41:09.311532
+
+"""
+
+# revision identifiers, used by Alembic.
+revision = '5a857dd49cbc'
+down_revision = '6b1f04939296'
+
+from alembic import op
+from sqlalchemy import Column, Text
+from sqlalchemy.sql import text
+
+
+def _get_label_as_file(label: str, file_extension: str, type_: str) -> str:
+    if type_ in ('thread', 'html-documents'):
+        file_extension = '.html'
+    return '{0}{1}'.format(label, file_extension or '')
+
+
+def upgrade():
+    with op.batch_alter_table('content') as batch_op:
+        batch_op.add_column(Column('label_path', Text(), nullable=True))
+    op.create_index(
+        'idx__content__label_path',
+        'content',
+        ['label_path'],
+        mysql_length=255,
+    )
+
+    # INFO - G.M - 2018-07-30 - Fill label path of existing contents
+    connection = op.get_bind()
+    rows = connection.execute(text(
+        'SELECT content.id, content_revisions.parent_id, '
+        'content_revisions.label, content_revisions.file_extension, '
+        'content_revisions.type '
+        'FROM content JOIN content_revisions '
+        'ON content_revisions.revision_id = content.current_revision_id '
+        "WHERE content_revisions.type != 'comment'"
+    )).fetchall()
+    contents = {
+        row[0]: (row[1], _get_label_as_file(row[2], row[3], row[4]))
+        for row in rows
+    }
+    label_paths = {}
+
+    def get_label_path(content_id: int) -> str:
+        if content_id not in label_paths:
+            parent_id, label_as_file = contents[content_id]
+            parent_label_path = ''
+            if parent_id in contents:
+                parent_label_path = get_label_path(parent_id)
+            label_paths[content_id] = '{}/{}'.format(
+                parent_label_path,
+                label_as_file,
+            )
+        return label_paths[content_id]
+
+    for content_id in contents:
+        connection.execute(
+            text('UPDATE content SET label_path = :label_path WHERE id = :id'),
+            label_path=get_label_path(content_id),
+            id=content_id,
+        )
+
+
+def downgrade():
+    op.drop_index('idx__content__label_path', 'content')
+    with op.batch_alter_table('content') as batch_op:
+        batch_op.drop_column('label_path')
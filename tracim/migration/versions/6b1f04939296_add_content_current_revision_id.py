@@ -0,0 +1,44 @@
+"""add content current_revision_id
+
+Revision ID: 6b1f04939296
+Revises: ad79f58ec2bf
+Create Date: 2018-07-27 10:12:31.542172
+
+"""
+
+# revision identifiers, used by Alembic.
+revision = '6b1f04939296'
+down_revision = 'ad79f58ec2bf'
+
+from alembic import op
+from sqlalchemy import Column, ForeignKey, Integer
+
+
+def upgrade():
+    with op.batch_alter_table('content') as batch_op:
+        batch_op.add_column(
+            Column(
+                'current_revision_id',
+                Integer,
+                ForeignKey(
+                    'content_revisions.revision_id',
+                    name='fk_content_current_revision_id_content_revisions',
+                ),
+                nullable=True,
+            )
+        )
+    op.execute(
+        'UPDATE content SET current_revision_id = ('
+        'SELECT MAX(content_revisions.revision_id) FROM content_revisions '
+        'WHERE content_revisions.content_id = content.id'
+        ')'
+    )
+
+
+def downgrade():
+    with op.batch_alter_table('content') as batch_op:
+        batch_op.drop_constraint(
+            'fk_content_current_revision_id_content_revisions',
+            type_='foreignkey',
+        )
+        batch_op.drop_column('current_revision_id')
@@ -0,0 +1,46 @@
+"""add webdav locks
+
+Revision ID: 7f3a9d2c6b18
+Revises: 4e2b7c9d5a13
+Create Date: 2018-08-24 09:52:37.146023
+
+"""
+
+# revision identifiers, used by Alembic.
+revision = '7f3a9d2c6b18'
+down_revision = '4e2b7c9d5a13'
+
+from alembic import op
+from sqlalchemy import Column, Float, LargeBinary, Text, Unicode
+
+
+def upgrade():
+    op.create_table(
+        'webdav_locks',
+        Column('token', Unicode(255), primary_key=True),
+        Column('root', Text(), nullable=False),
+        Column('depth', Unicode(32), nullable=False),
+        Column('type', Unicode(32), nullable=False),
+        Column('scope', Unicode(32), nullable=False),
+        Column('owner', LargeBinary(), nullable=False),
+        Column('principal', Unicode(255), nullable=True),
+        Column('timeout', Float(), nullable=False),
+        Column('expire', Float(), nullable=False),
+    )
+    op.create_index(
+        'idx__webdav_locks__root',
+        'webdav_locks',
+        ['root'],
+        mysql_length=255,
+    )
+    op.create_index(
+        'idx__webdav_locks__expire',
+        'webdav_locks',
+        ['expire'],
+    )
+
+
+def downgrade():
+    op.drop_index('idx__webdav_locks__expire', 'webdav_locks')
+    op.drop_index('idx__webdav_locks__root', 'webdav_locks')
+    op.drop_table('webdav_locks')
@@ -0,0 +1,45 @@
+"""add content search index
+
+Revision ID: 8c4f2e9a1d07
+Revises: 5a857dd49cbc
+Create Date: 2018-08-09 11:02:47.184326
+
+"""
+
+# revision identifiers, used by Alembic.
+revision = '8c4f2e9a1d07'
+down_revision = '5a857dd49cbc'
+
+from alembic import op
+from sqlalchemy import Column, ForeignKey, Integer, Unicode
+
+from tracim.models.search import create_search_index
+from tracim.models.search import drop_search_index
+
+
+def upgrade():
+    op.create_table(
+        'content_search_terms',
+        Column(
+            'content_id',
+            Integer(),
+            ForeignKey('content.id'),
+            primary_key=True,
+            autoincrement=False,
+        ),
+        Column('term', Unicode(255), primary_key=True),
+        Column('weight', Integer(), nullable=False),
+    )
+    op.create_index(
+        'idx__content_search_terms__term',
+        'content_search_terms',
+        ['term'],
+    )
+    # INFO - G.M - 2018-08-09 - Index is filled by "tracimcli search index"
+    create_search_index(op.get_bind())
+
+
+def downgrade():
+    drop_search_index(op.get_bind())
+    op.drop_index('idx__content_search_terms__term', 'content_search_terms')
+    op.drop_table('content_search_terms')
@@ -10,6 +10,10 @@ from .revision_protection import prevent_content_revision_delete
 # Base.metadata prior to any initialization routines
 from tracim.models.auth import User, Group, Permission
 from tracim.models.data import Content, ContentRevisionRO
+from tracim.models.notification import PendingNotification
+from tracim.models.search import ContentSearchTerm
+from tracim.models.webdav import WebdavLock
+from tracim.models.webdav import WebdavLockGuard
 
 # run configure_mappers after defining all of the models to ensure
 # all relationships can be setup
@@ -7,6 +7,8 @@ from slugify import slugify
 from sqlalchemy.orm import Session
 from tracim import CFG
 from tracim.config import PreviewDim
+from tracim.lib.utils.utils import parse_keyset_cursor
+from tracim.lib.utils.utils import parse_label_keyset_cursor
 from tracim.models import User
 from tracim.models.auth import Profile
 from tracim.models.data import Content
@@ -39,6 +41,28 @@ class MoveParams(object):
         self.new_workspace_id = new_workspace_id
 
 
+class BulkContentsParams(object):
+    """
+    Json body params for bulk actions on contents
+    """
+    def __init__(self, contents_ids: typing.List[int]) -> None:
+        self.contents_ids = contents_ids
+
+
+class BulkMoveParams(MoveParams):
+    """
+    Json body params for bulk move and copy actions
+    """
+    def __init__(
+            self,
+            contents_ids: typing.List[int],
+            new_parent_id: int,
+            new_workspace_id: int = None,
+    ) -> None:
+        super().__init__(new_parent_id, new_workspace_id)
+        self.contents_ids = contents_ids
+
+
 class LoginCredentials(object):
     """
     Login credentials model for login model
@@ -211,6 +235,8 @@ class ContentFilter(object):
             content_type: str = None,
             offset: int = None,
             limit: int = None,
+            after: str = None,
+            fields: str = None,
     ) -> None:
         self.parent_id = parent_id
         self.workspace_id = workspace_id
@@ -220,6 +246,12 @@ class ContentFilter(object):
         self.limit = limit
         self.offset = offset
         self.content_type = content_type
+        self.after = None
+        if after:
+            self.after = parse_label_keyset_cursor(after)
+        self.fields = None
+        if fields:
+            self.fields = fields.split(',')
 
 
 class ActiveContentFilter(object):
@@ -227,9 +259,30 @@ class ActiveContentFilter(object):
             self,
             limit: int = None,
             before_datetime: datetime = None,
+            cursor: str = None,
     ):
         self.limit = limit
         self.before_datetime = before_datetime
+        self.before_content_id = None
+        if cursor:
+            self.before_datetime, self.before_content_id = parse_keyset_cursor(cursor)  # nopep8
+
+
+class SearchQuery(object):
+    """
+    Full text search query
+    """
+    def __init__(
+            self,
+            q: str,
+            workspace_id: int = None,
+            limit: int = 0,
+            offset: int = 0,
+    ):
+        self.q = q
+        self.workspace_id = workspace_id
+        self.limit = limit
+        self.offset = offset
 
 
 class ContentIdsQuery(object):
@@ -545,16 +598,59 @@ class UserRoleWorkspaceInContext(object):
         )
 
 
+class SparseFieldset(object):
+    """
+    Expose only some attributes of a context object (ContentInContext...):
+    other attributes are missing for serializer, which neither computes nor
+    returns them.
+    """
+
+    def __init__(self, context_object: typing.Any, fields: typing.List[str]):
+        self._context_object = context_object
+        self._fields = frozenset(fields)
+
+    def __getattr__(self, name: str) -> typing.Any:
+        if name in self._fields:
+            return getattr(self._context_object, name)
+        raise AttributeError(name)
+
+    def filter_dumped(self, data: dict) -> dict:
+        """
+        :param data: serialized object
+        :return: serialized object restricted to exposed fields
+        """
+        return {
+            key: value for key, value in data.items() if key in self._fields
+        }
+
+
 class ContentInContext(object):
     """
     Interface to get Content data and Content data related to context.
     """
 
-    def __init__(self, content: Content, dbsession: Session, config: CFG, user: User=None):  # nopep8
+    def __init__(
+            self,
+            content: Content,
+            dbsession: Session,
+            config: CFG,
+            user: User=None,
+            author: User=None,
+            last_modifier: User=None,
+            read_by_user: bool=None,
+    ):
+        """
+        author, last_modifier and read_by_user can be given when already
+        loaded (see ContentApi.get_contents_in_context), else they are
+        computed from content.
+        """
         self.content = content
         self.dbsession = dbsession
         self.config = config
         self._user = user
+        self._author = author
+        self._last_modifier = last_modifier
+        self._read_by_user = read_by_user
 
     # Default
     @property
@@ -601,12 +697,24 @@ class ContentInContext(object):
     def raw_content(self):
         return self.content.description
 
+    @property
+    def mimetype(self) -> str:
+        return self.content.file_mimetype
+
+    @property
+    def size(self) -> typing.Optional[int]:
+        return self.content.file_size
+
+    @property
+    def file_hash(self) -> typing.Optional[str]:
+        return self.content.file_hash
+
     @property
     def author(self):
         return UserInContext(
             dbsession=self.dbsession,
             config=self.config,
-            user=self.content.first_revision.owner
+            user=self._author or self.content.first_revision.owner
         )
 
     @property
@@ -630,7 +738,7 @@ class ContentInContext(object):
         return UserInContext(
             dbsession=self.dbsession,
             config=self.config,
-            user=self.content.last_revision.owner
+            user=self._last_modifier or self.content.last_revision.owner
         )
 
     # Context-related
@@ -650,6 +758,8 @@ class ContentInContext(object):
     @property
     def read_by_user(self):
         assert self._user
+        if self._read_by_user is not None:
+            return self._read_by_user
         return not self.content.has_new_information_for(self._user)
 
 
@@ -717,6 +827,18 @@ class RevisionInContext(object):
     def raw_content(self) -> str:
         return self.revision.description
 
+    @property
+    def mimetype(self) -> str:
+        return self.revision.file_mimetype
+
+    @property
+    def size(self) -> typing.Optional[int]:
+        return self.revision.file_size
+
+    @property
+    def file_hash(self) -> typing.Optional[str]:
+        return self.revision.file_hash
+
     @property
     def author(self) -> UserInContext:
         return UserInContext(
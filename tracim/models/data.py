@@ -16,6 +16,7 @@ from sqlalchemy.orm import backref
 from sqlalchemy.orm import relationship
 from sqlalchemy.orm.attributes import InstrumentedAttribute
 from sqlalchemy.orm.collections import attribute_mapped_collection
+from sqlalchemy.types import BigInteger
 from sqlalchemy.types import Boolean
 from sqlalchemy.types import DateTime
 from sqlalchemy.types import Integer
@@ -613,6 +614,12 @@ class ContentRevisionRO(DeclarativeBase):
     # http://depot.readthedocs.io/en/latest/#attaching-files-to-models
     # http://depot.readthedocs.io/en/latest/api.html#module-depot.fields
     depot_file = Column(UploadedFileField, unique=False, nullable=True)
+    # INFO - G.M - 2018-08-23 - Size (bytes) and sha256 hash (hexadecimal) of
+    # depot file, kept to get them without opening stored file. They are
+    # None for revisions stored before their introduction, see
+    # DepotApi.update_revisions_file_infos().
+    file_size = Column(BigInteger, unique=False, nullable=True)
+    file_hash = Column(Unicode(64), unique=False, nullable=True)
     properties = Column('properties', Text(), unique=False, nullable=False, default='')
 
     type = Column(Unicode(32), unique=False, nullable=False)
@@ -641,6 +648,8 @@ class ContentRevisionRO(DeclarativeBase):
         'description',
         'file_mimetype',
         'file_extension',
+        'file_size',
+        'file_hash',
         'is_archived',
         'is_deleted',
         'label',
@@ -695,8 +704,11 @@ class ContentRevisionRO(DeclarativeBase):
 
         new_rev.updated = datetime.utcnow()
         if revision.depot_file:
+            # INFO - G.M - 2018-08-07 - Stored file is given instead of its
+            # content: content addressed storage only add a new reference
+            # to it.
             new_rev.depot_file = FileIntent(
-                revision.depot_file.file.read(),
+                revision.depot_file.file,
                 revision.file_name,
                 revision.file_mimetype,
             )
@@ -726,7 +738,7 @@ class ContentRevisionRO(DeclarativeBase):
         # copy attached_file
         if revision.depot_file:
             copy_rev.depot_file = FileIntent(
-                revision.depot_file.file.read(),
+                revision.depot_file.file,
                 revision.file_name,
                 revision.file_mimetype,
             )
@@ -810,8 +822,9 @@ class Content(DeclarativeBase):
 
     # QUERY CONTENTS
 
-    To query contents you will need to join your content query with ContentRevisionRO. Join
-    condition is available at tracim.lib.content.ContentApi#_get_revision_join:
+    To query contents you will need to join your content query with ContentRevisionRO on
+    content.current_revision_id. Join condition is available at
+    tracim.lib.content.ContentApi#_get_revision_join:
 
     content = DBSession.query(Content).join(ContentRevisionRO, ContentApi._get_revision_join())
                   .filter(Content.label == 'foo')
@@ -843,6 +856,23 @@ class Content(DeclarativeBase):
     children_revisions = relationship("ContentRevisionRO",
                                       foreign_keys=[ContentRevisionRO.parent_id],
                                       back_populates="parent")
+    # INFO - G.M - 2018-07-27 - Denormalized pointer to the most recent
+    # revision. It's maintained by Content.new_revision() and allow to join
+    # content with its current revision without correlated subquery.
+    current_revision_id = Column(
+        Integer,
+        ForeignKey('content_revisions.revision_id', use_alter=True),
+        nullable=True,
+        default=None,
+    )
+    current_revision = relationship("ContentRevisionRO",
+                                    foreign_keys=[current_revision_id],
+                                    post_update=True)
+    # INFO - G.M - 2018-07-30 - Materialized path of content in its workspace,
+    # made of labels as file of all its parents, ex: "/folder/subfolder/file.txt"
+    # It's maintained by ContentApi and allow to find content from a
+    # webdav-like path with one query.
+    label_path = Column(Text(), unique=False, nullable=True, default=None)
 
     @hybrid_property
     def content_id(self) -> int:
@@ -948,6 +978,30 @@ class Content(DeclarativeBase):
     def file_mimetype(cls) -> InstrumentedAttribute:
         return ContentRevisionRO.file_mimetype
 
+    @hybrid_property
+    def file_size(self) -> typing.Optional[int]:
+        return self.revision.file_size
+
+    @file_size.setter
+    def file_size(self, value: typing.Optional[int]) -> None:
+        self.revision.file_size = value
+
+    @file_size.expression
+    def file_size(cls) -> InstrumentedAttribute:
+        return ContentRevisionRO.file_size
+
+    @hybrid_property
+    def file_hash(self) -> typing.Optional[str]:
+        return self.revision.file_hash
+
+    @file_hash.setter
+    def file_hash(self, value: typing.Optional[str]) -> None:
+        self.revision.file_hash = value
+
+    @file_hash.expression
+    def file_hash(cls) -> InstrumentedAttribute:
+        return ContentRevisionRO.file_hash
+
     @hybrid_property
     def _properties(self) -> str:
         return self.revision.properties
@@ -1168,6 +1222,9 @@ class Content(DeclarativeBase):
         self.revision.depot_file = value
 
     def get_current_revision(self) -> ContentRevisionRO:
+        if self.current_revision is not None:
+            return self.current_revision
+
         if not self.revisions:
             return self.new_revision()
 
@@ -1187,11 +1244,11 @@ class Content(DeclarativeBase):
         :return:
         """
         if not self.revisions:
-            self.revisions.append(ContentRevisionRO())
-            return self.revisions[0]
-
-        new_rev = ContentRevisionRO.new_from(self.get_current_revision())
+            new_rev = ContentRevisionRO()
+        else:
+            new_rev = ContentRevisionRO.new_from(self.get_current_revision())
         self.revisions.append(new_rev)
+        self.current_revision = new_rev
         return new_rev
 
     def get_valid_children(self, content_types: list=None) -> ['Content']:
@@ -1393,9 +1450,13 @@ class Content(DeclarativeBase):
         for rev in self.revisions:
             cpy_rev = ContentRevisionRO.copy(rev, parent)
             cpy_content.revisions.append(cpy_rev)
+            cpy_content.current_revision = cpy_rev
         return cpy_content
 
 
+Index('idx__content__label_path', Content.label_path, mysql_length=255)
+
+
 class RevisionReadStatus(DeclarativeBase):
 
     __tablename__ = 'revision_read_status'
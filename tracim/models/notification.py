@@ -0,0 +1,49 @@
+# -*- coding: utf-8 -*-
+from datetime import datetime
+
+from sqlalchemy import Column
+from sqlalchemy import DateTime
+from sqlalchemy import ForeignKey
+from sqlalchemy import Index
+from sqlalchemy import Integer
+
+from tracim.models.meta import DeclarativeBase
+
+
+class PendingNotification(DeclarativeBase):
+    """
+    Content update event held for a recipient, to be notified later with
+    next events of same content (coalescing) or in a digest.
+    """
+
+    __tablename__ = 'pending_notifications'
+
+    pending_notification_id = Column(
+        Integer,
+        autoincrement=True,
+        primary_key=True,
+    )
+    recipient_id = Column(
+        Integer,
+        ForeignKey('users.user_id'),
+        nullable=False,
+    )
+    content_id = Column(Integer, ForeignKey('content.id'), nullable=False)
+    revision_id = Column(
+        Integer,
+        ForeignKey('content_revisions.revision_id'),
+        nullable=False,
+    )
+    actor_id = Column(Integer, ForeignKey('users.user_id'), nullable=False)
+    created = Column(DateTime, nullable=False, default=datetime.utcnow)
+
+
+Index(
+    'idx__pending_notifications__recipient_id__content_id',
+    PendingNotification.recipient_id,
+    PendingNotification.content_id,
+)
+Index(
+    'idx__pending_notifications__created',
+    PendingNotification.created,
+)
@@ -0,0 +1,98 @@
+# -*- coding: utf-8 -*-
+from sqlalchemy import Column
+from sqlalchemy import ForeignKey
+from sqlalchemy import Index
+from sqlalchemy import Integer
+from sqlalchemy import Unicode
+from sqlalchemy.engine import Connection
+from sqlalchemy.event import listen
+
+from tracim.models.meta import DeclarativeBase
+from tracim.models.meta import metadata
+
+SEARCH_INDEX_TABLE_NAME = 'content_search_index'
+SEARCH_TERM_MAX_LENGTH = 255
+
+# INFO - G.M - 2018-08-09 - Full text index tables use database specific
+# types (tsvector, fts5 virtual table): they are not declared as models but
+# created with metadata (see create_search_index).
+POSTGRESQL_SEARCH_INDEX_DDL = (
+    'CREATE TABLE IF NOT EXISTS content_search_index ('
+    'content_id INTEGER NOT NULL PRIMARY KEY, '
+    'document TSVECTOR NOT NULL'
+    ')',
+    'CREATE INDEX IF NOT EXISTS idx__content_search_index__document '
+    'ON content_search_index USING GIN (document)',
+)
+# INFO - G.M - 2018-08-09 - rowid of fts5 table is content id, prefix
+# indexes speed up prefix queries.
+SQLITE_SEARCH_INDEX_DDL = (
+    'CREATE VIRTUAL TABLE IF NOT EXISTS content_search_index USING fts5('
+    "label, description, file_text, prefix='2 3'"
+    ')',
+)
+
+
+class ContentSearchTerm(DeclarativeBase):
+    """
+    Inverted index used by python search engine: weight of each term
+    found in current revision of content (and in its comments).
+    """
+
+    __tablename__ = 'content_search_terms'
+
+    content_id = Column(
+        Integer,
+        ForeignKey('content.id'),
+        primary_key=True,
+        autoincrement=False,
+    )
+    term = Column(
+        Unicode(SEARCH_TERM_MAX_LENGTH),
+        primary_key=True,
+    )
+    weight = Column(Integer, nullable=False, default=0)
+
+
+Index('idx__content_search_terms__term', ContentSearchTerm.term)
+
+
+def is_fts5_available(connection: Connection) -> bool:
+    """
+    :return: True if sqlite database support fts5 full text index
+    """
+    options = connection.execute('PRAGMA compile_options').fetchall()
+    return ('ENABLE_FTS5',) in [tuple(option) for option in options]
+
+
+def create_search_index(connection: Connection) -> None:
+    """
+    Create database specific full text index, if database support it.
+    """
+    statements = ()
+    if connection.dialect.name == 'postgresql':
+        statements = POSTGRESQL_SEARCH_INDEX_DDL
+    elif connection.dialect.name == 'sqlite' \
+            and is_fts5_available(connection):
+        statements = SQLITE_SEARCH_INDEX_DDL
+    for statement in statements:
+        connection.execute(statement)
+
+
+def drop_search_index(connection: Connection) -> None:
+    if connection.dialect.name in ('postgresql', 'sqlite'):
+        connection.execute(
+            'DROP TABLE IF EXISTS {}'.format(SEARCH_INDEX_TABLE_NAME)
+        )
+
+
+def _after_create(target, connection: Connection, **kw) -> None:
+    create_search_index(connection)
+
+
+def _before_drop(target, connection: Connection, **kw) -> None:
+    drop_search_index(connection)
+
+
+listen(metadata, 'after_create', _after_create)
+listen(metadata, 'before_drop', _before_drop)
@@ -0,0 +1,47 @@
+# -*- coding: utf-8 -*-
+from sqlalchemy import Column
+from sqlalchemy import Float
+from sqlalchemy import Index
+from sqlalchemy import Integer
+from sqlalchemy import LargeBinary
+from sqlalchemy import Text
+from sqlalchemy import Unicode
+
+from tracim.models.meta import DeclarativeBase
+
+
+class WebdavLock(DeclarativeBase):
+    """
+    WebDAV lock, shared by all webdav server processes.
+    """
+
+    __tablename__ = 'webdav_locks'
+
+    token = Column(Unicode(255), primary_key=True)
+    # INFO - G.M - 2018-08-24 - Normalized locked path: /foo/bar
+    root = Column(Text, nullable=False)
+    depth = Column(Unicode(32), nullable=False, default='infinity')
+    type = Column(Unicode(32), nullable=False, default='write')
+    scope = Column(Unicode(32), nullable=False, default='exclusive')
+    # INFO - G.M - 2018-08-24 - Owner is a xml bytestring, given by client
+    owner = Column(LargeBinary, nullable=False, default=b'')
+    principal = Column(Unicode(255), nullable=True)
+    timeout = Column(Float, nullable=False)
+    # INFO - G.M - 2018-08-24 - Expiration timestamp, -1 for no expiration
+    expire = Column(Float, nullable=False)
+
+
+Index('idx__webdav_locks__root', WebdavLock.root, mysql_length=255)
+Index('idx__webdav_locks__expire', WebdavLock.expire)
+
+
+class WebdavLockGuard(DeclarativeBase):
+    """
+    Row updated by each lock creation, before checking conflicts with
+    existing locks: lock creations of all webdav processes are serialized.
+    """
+
+    __tablename__ = 'webdav_lock_guards'
+
+    guard_id = Column(Integer, primary_key=True, autoincrement=False)
+    version = Column(Integer, nullable=False, default=0)
@@ -0,0 +1,30 @@
+## -*- coding: utf-8 -*-
+
+Dear ${user.display_name},
+
+This email is intended to be read as HTML content.
+Please configure your email client to get the best of Tracim notifications.
+
+${items_intro}
+
+% for item in items:
+- /${item['workspace'].label}/ ${item['main_title']} (${item['status_label']})
+% endfor
+
+--------------------------------------------------------------------------------
+
+
+You receive this email because you are registered on /${config.WEBSITE_TITLE}/
+and you subscribed to notifications of these workspaces.
+
+----
+
+This email was automatically sent by *Tracim*,
+a collaborative software developped by Algoo.
+
+**Algoo SAS**
+340 Rue de l'Eygala
+38430 Moirans
+France
+http://algoo.fr
+
@@ -1,4 +1,7 @@
 # -*- coding: utf-8 -*-
+import asyncore
+import smtpd
+import threading
 import unittest
 
 import plaster
@@ -10,6 +13,7 @@ from sqlalchemy.exc import IntegrityError
 
 from tracim.lib.core.content import ContentApi
 from tracim.lib.core.workspace import WorkspaceApi
+from tracim.lib.mail_notifier.sender import close_smtp_connection_pools
 from tracim.models import get_engine
 from tracim.models import DeclarativeBase
 from tracim.models import get_session_factory
@@ -76,6 +80,7 @@ class FunctionalTest(unittest.TestCase):
         self.settings = {
             'sqlalchemy.url': self.sqlalchemy_url,
             'user.auth_token.validity': '604800',
+            'user.session.store': 'memory',
             'depot_storage_dir': '/tmp/test/depot',
             'depot_storage_name': 'test',
             'preview_cache_dir': '/tmp/test/preview_cache',
@@ -291,3 +296,67 @@ class MailHogTest(DefaultTest):
     def tearDown(self):
         logger.debug(self, 'Cleanup MailHog list...')
         requests.delete('http://127.0.0.1:8025/api/v1/messages')
+
+
+class LocalSmtpServer(smtpd.SMTPServer):
+    """
+    SMTP server running in a thread of test process, keeping received
+    messages in memory. It can reply temporary errors to test retries.
+    """
+
+    def __init__(self) -> None:
+        self._map = {}
+        super().__init__(
+            ('127.0.0.1', 0),
+            None,
+            map=self._map,
+            decode_data=False,
+        )
+        self.port = self.socket.getsockname()[1]
+        self.messages = []
+        self.connection_count = 0
+        # INFO - G.M - 2018-08-16 - Number of next messages to refuse with
+        # a temporary error
+        self.temporary_failures = 0
+        self._running = False
+        self._thread = None
+
+    def handle_accepted(self, conn, addr):
+        self.connection_count += 1
+        return super().handle_accepted(conn, addr)
+
+    def process_message(self, peer, mailfrom, rcpttos, data, **kwargs):
+        if self.temporary_failures:
+            self.temporary_failures -= 1
+            return '451 Temporary failure, try again later'
+        self.messages.append((mailfrom, rcpttos, data))
+
+    def start(self) -> None:
+        self._running = True
+        self._thread = threading.Thread(target=self._serve, daemon=True)
+        self._thread.start()
+
+    def _serve(self) -> None:
+        while self._running:
+            asyncore.loop(timeout=0.01, count=1, map=self._map)
+
+    def stop(self) -> None:
+        self._running = False
+        self._thread.join()
+        asyncore.close_all(map=self._map)
+
+
+class LocalSmtpTest(DefaultTest):
+    """
+    Tests sending emails to a LocalSmtpServer
+    """
+
+    def setUp(self):
+        super().setUp()
+        self.smtp_server = LocalSmtpServer()
+        self.smtp_server.start()
+
+    def tearDown(self):
+        close_smtp_connection_pools()
+        self.smtp_server.stop()
+        super().tearDown()
@@ -2,13 +2,19 @@
 import os
 import subprocess
 import pytest
+import transaction
+from zope.sqlalchemy import mark_changed
 import tracim
 from tracim.command import TracimCLI
 from tracim.exceptions import UserAlreadyExistError
 from tracim.exceptions import BadCommandError
 from tracim.exceptions import GroupDoesNotExist
 from tracim.exceptions import UserDoesNotExist
+from tracim.lib.core.content import ContentApi
+from tracim.lib.core.search import SearchApi
 from tracim.lib.core.user import UserApi
+from tracim.lib.core.workspace import WorkspaceApi
+from tracim.models.data import ContentType
 from tracim.tests import CommandFunctionalTest
 
 
@@ -34,6 +40,7 @@ class TestCommands(CommandFunctionalTest):
         assert output.find('db init') > 0
         assert output.find('db delete') > 0
         assert output.find('webdav start') > 0
+        assert output.find('mail sender start') > 0
 
     def test_func__user_create_command__ok__nominal_case(self) -> None:
         """
@@ -197,4 +204,45 @@ class TestCommands(CommandFunctionalTest):
         assert new_user.email == 'admin@admin.admin'
         assert new_user.validate_password('new_password')
         assert not new_user.validate_password('admin@admin.admin')
-        assert new_user.profile.name == 'managers'
\ No newline at end of file
+        assert new_user.profile.name == 'managers'
+
+    def test_func__search_index_command__ok__nominal_case(self) -> None:
+        """
+        Test rebuild of search index: index must be saved
+        """
+        user_api = UserApi(
+            current_user=None,
+            session=self.session,
+            config=self.app_config,
+        )
+        admin = user_api.get_one_by_email('admin@admin.admin')
+        workspace = WorkspaceApi(
+            current_user=admin,
+            session=self.session,
+            config=self.app_config,
+        ).create_workspace('test workspace', save_now=True)
+        api = ContentApi(
+            current_user=admin,
+            session=self.session,
+            config=self.app_config,
+        )
+        api.create(ContentType.Page, workspace, None, 'chocolate cake', '', True)  # nopep8
+        SearchApi(
+            session=self.session,
+            config=self.app_config,
+        ).get_engine().clear()
+        mark_changed(self.session)
+        transaction.commit()
+        assert api.search_contents('chocolate') == []
+
+        app = TracimCLI()
+        result = app.run([
+            'search', 'index',
+            '-c', 'tests_configs.ini#command_test',
+            '--debug',
+        ])
+        assert result == 0
+        transaction.commit()
+        assert [
+            content.label for content in api.search_contents('chocolate')
+        ] == ['chocolate cake']
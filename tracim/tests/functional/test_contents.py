@@ -1,4 +1,5 @@
 # -*- coding: utf-8 -*-
+import hashlib
 import transaction
 
 from tracim import models
@@ -1012,6 +1013,152 @@ class TestFiles(FunctionalTest):
         assert res.content_type == 'text/plain'
         assert res.content_length == len(b'Test file')
 
+    def test_api__get_file_raw__ok_304__conditional_request(self) -> None:
+        """
+        Get one file of a content, not modified since last request
+        """
+        dbsession = get_tm_session(self.session_factory, transaction.manager)
+        admin = dbsession.query(models.User) \
+            .filter(models.User.email == 'admin@admin.admin') \
+            .one()
+        workspace_api = WorkspaceApi(
+            current_user=admin,
+            session=dbsession,
+            config=self.app_config
+        )
+        content_api = ContentApi(
+            current_user=admin,
+            session=dbsession,
+            config=self.app_config
+        )
+        business_workspace = workspace_api.get_one(1)
+        tool_folder = content_api.get_one(1, content_type=ContentType.Any)
+        test_file = content_api.create(
+            content_type=ContentType.File,
+            workspace=business_workspace,
+            parent=tool_folder,
+            label='Test file',
+            do_save=False,
+            do_notify=False,
+        )
+        test_file.file_extension = '.txt'
+        test_file.depot_file = FileIntent(
+            b'Test file',
+            'Test_file.txt',
+            'text/plain',
+        )
+        content_api.update_content(test_file, 'Test_file', '<p>description</p>')  # nopep8
+        dbsession.flush()
+        transaction.commit()
+        content_id = int(test_file.content_id)
+        revision_id = int(test_file.revision_id)
+        self.testapp.authorization = (
+            'Basic',
+            (
+                'admin@admin.admin',
+                'admin@admin.admin'
+            )
+        )
+        res = self.testapp.get(
+            '/api/v2/workspaces/1/files/{}/raw'.format(content_id),
+            status=200
+        )
+        assert res.headers['ETag'] == '"{}"'.format(revision_id)
+        assert res.headers['Accept-Ranges'] == 'bytes'
+        etag = res.headers['ETag']
+        last_modified = res.headers['Last-Modified']
+        res = self.testapp.get(
+            '/api/v2/workspaces/1/files/{}/raw'.format(content_id),
+            headers={'If-None-Match': etag},
+            status=304
+        )
+        assert res.body == b''
+        assert res.headers['ETag'] == etag
+        self.testapp.get(
+            '/api/v2/workspaces/1/files/{}/raw'.format(content_id),
+            headers={'If-Modified-Since': last_modified},
+            status=304
+        )
+        res = self.testapp.get(
+            '/api/v2/workspaces/1/files/{}/raw'.format(content_id),
+            headers={'If-None-Match': '"other"'},
+            status=200
+        )
+        assert res.body == b'Test file'
+        res = self.testapp.get(
+            '/api/v2/workspaces/1/files/{}/revisions/{}/raw'.format(
+                content_id,
+                revision_id,
+            ),
+            headers={'If-None-Match': etag},
+            status=304
+        )
+
+    def test_api__get_file_raw__ok_206__range_request(self) -> None:
+        """
+        Get a range of one file of a content
+        """
+        dbsession = get_tm_session(self.session_factory, transaction.manager)
+        admin = dbsession.query(models.User) \
+            .filter(models.User.email == 'admin@admin.admin') \
+            .one()
+        workspace_api = WorkspaceApi(
+            current_user=admin,
+            session=dbsession,
+            config=self.app_config
+        )
+        content_api = ContentApi(
+            current_user=admin,
+            session=dbsession,
+            config=self.app_config
+        )
+        business_workspace = workspace_api.get_one(1)
+        tool_folder = content_api.get_one(1, content_type=ContentType.Any)
+        test_file = content_api.create(
+            content_type=ContentType.File,
+            workspace=business_workspace,
+            parent=tool_folder,
+            label='Test file',
+            do_save=False,
+            do_notify=False,
+        )
+        test_file.file_extension = '.txt'
+        test_file.depot_file = FileIntent(
+            b'Test file',
+            'Test_file.txt',
+            'text/plain',
+        )
+        content_api.update_content(test_file, 'Test_file', '<p>description</p>')  # nopep8
+        dbsession.flush()
+        transaction.commit()
+        content_id = int(test_file.content_id)
+        self.testapp.authorization = (
+            'Basic',
+            (
+                'admin@admin.admin',
+                'admin@admin.admin'
+            )
+        )
+        res = self.testapp.get(
+            '/api/v2/workspaces/1/files/{}/raw'.format(content_id),
+            headers={'Range': 'bytes=5-'},
+            status=206
+        )
+        assert res.body == b'file'
+        assert res.headers['Content-Range'] == 'bytes 5-8/9'
+        res = self.testapp.get(
+            '/api/v2/workspaces/1/files/{}/raw'.format(content_id),
+            headers={'Range': 'bytes=0-3'},
+            status=206
+        )
+        assert res.body == b'Test'
+        assert res.content_length == 4
+        self.testapp.get(
+            '/api/v2/workspaces/1/files/{}/raw'.format(content_id),
+            headers={'Range': 'bytes=20-'},
+            status=416
+        )
+
     def test_api__set_file_raw__ok_200__nominal_case(self) -> None:
         """
         Set one file of a content
@@ -1065,6 +1212,82 @@ class TestFiles(FunctionalTest):
         assert res.body == image.getvalue()
         assert res.content_type == 'image/png'
         assert res.content_length == len(image.getvalue())
+        res = self.testapp.get(
+            '/api/v2/workspaces/1/files/{}'.format(content_id),
+            status=200
+        )
+        assert res.json_body['mimetype'] == 'image/png'
+        assert res.json_body['size'] == len(image.getvalue())
+        assert res.json_body['file_hash'] == hashlib.sha256(image.getvalue()).hexdigest()  # nopep8
+
+    def test_api__set_file_raw__ok_200__same_file(self) -> None:
+        """
+        Set same file twice, only one new revision is created
+        """
+        dbsession = get_tm_session(self.session_factory, transaction.manager)
+        admin = dbsession.query(models.User) \
+            .filter(models.User.email == 'admin@admin.admin') \
+            .one()
+        workspace_api = WorkspaceApi(
+            current_user=admin,
+            session=dbsession,
+            config=self.app_config
+        )
+        content_api = ContentApi(
+            current_user=admin,
+            session=dbsession,
+            config=self.app_config
+        )
+        business_workspace = workspace_api.get_one(1)
+        tool_folder = content_api.get_one(1, content_type=ContentType.Any)
+        test_file = content_api.create(
+            content_type=ContentType.File,
+            workspace=business_workspace,
+            parent=tool_folder,
+            label='Test file',
+            do_save=True,
+            do_notify=False,
+        )
+        dbsession.flush()
+        transaction.commit()
+        content_id = int(test_file.content_id)
+        image = create_1000px_png_test_image()
+        self.testapp.authorization = (
+            'Basic',
+            (
+                'admin@admin.admin',
+                'admin@admin.admin'
+            )
+        )
+        self.testapp.put(
+            '/api/v2/workspaces/1/files/{}/raw'.format(content_id),
+            upload_files=[
+                ('files', image.name, image.getvalue())
+            ],
+            status=204,
+        )
+        res = self.testapp.get(
+            '/api/v2/workspaces/1/files/{}/revisions'.format(content_id),
+            status=200
+        )
+        revisions_count = len(res.json_body)
+        self.testapp.put(
+            '/api/v2/workspaces/1/files/{}/raw'.format(content_id),
+            upload_files=[
+                ('files', image.name, image.getvalue())
+            ],
+            status=204,
+        )
+        res = self.testapp.get(
+            '/api/v2/workspaces/1/files/{}/revisions'.format(content_id),
+            status=200
+        )
+        assert len(res.json_body) == revisions_count
+        res = self.testapp.get(
+            '/api/v2/workspaces/1/files/{}/raw'.format(content_id),
+            status=200
+        )
+        assert res.body == image.getvalue()
 
     def test_api__get_allowed_size_dim__ok__nominal_case(self) -> None:
         dbsession = get_tm_session(self.session_factory, transaction.manager)
@@ -0,0 +1,89 @@
+# coding=utf-8
+from tracim.fixtures.content import Content as ContentFixtures
+from tracim.fixtures.users_and_groups import Base as BaseFixture
+from tracim.tests import FunctionalTest
+
+"""
+Tests for /api/v2/search endpoint.
+"""
+
+
+class TestSearchEndpoint(FunctionalTest):
+    """
+    Tests for /api/v2/search
+    """
+    fixtures = [BaseFixture, ContentFixtures]
+
+    def test_api__search__ok_200__nominal_case(self):
+        """
+        Search contents readable by user: archived and deleted contents, and
+        contents of workspaces of other users are excluded.
+        """
+        self.testapp.authorization = (
+            'Basic',
+            (
+                'admin@admin.admin',
+                'admin@admin.admin'
+            )
+        )
+        res = self.testapp.get(
+            '/api/v2/search',
+            params={'q': 'fruit salad'},
+            status=200,
+        )
+        res = res.json_body
+        assert len(res) == 1
+        assert res[0]['content_id'] == 12
+        assert res[0]['label'] == 'New Fruit Salad'
+        assert res[0]['workspace_id'] == 2
+
+    def test_api__search__ok_200__comment_match_parent(self):
+        """
+        Search words of comment return commented content
+        """
+        self.testapp.authorization = (
+            'Basic',
+            (
+                'admin@admin.admin',
+                'admin@admin.admin'
+            )
+        )
+        res = self.testapp.get(
+            '/api/v2/search',
+            params={'q': 'kouign', 'workspace_id': 2},
+            status=200,
+        )
+        res = res.json_body
+        assert len(res) == 1
+        assert res[0]['content_id'] == 7
+        assert res[0]['label'] == 'Best Cakes?'
+        res = self.testapp.get(
+            '/api/v2/search',
+            params={'q': 'kouign', 'workspace_id': 1},
+            status=200,
+        )
+        assert res.json_body == []
+
+    def test_api__search__err_400__missing_search_string(self):
+        self.testapp.authorization = (
+            'Basic',
+            (
+                'admin@admin.admin',
+                'admin@admin.admin'
+            )
+        )
+        self.testapp.get('/api/v2/search', status=400)
+
+    def test_api__search__err_401__unregistered_user(self):
+        self.testapp.authorization = (
+            'Basic',
+            (
+                'john@doe.doe',
+                'lapin'
+            )
+        )
+        self.testapp.get(
+            '/api/v2/search',
+            params={'q': 'fruit'},
+            status=401,
+        )
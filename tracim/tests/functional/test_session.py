@@ -64,6 +64,25 @@ class TestLoginEndpoint(FunctionalTest):
         assert res.json_body['caldav_url'] is None
         assert res.json_body['avatar_url'] is None
 
+    def test_api__try_login_enpoint__ok_200__session_token(self):
+        params = {
+            'email': 'admin@admin.admin',
+            'password': 'admin@admin.admin',
+        }
+        res = self.testapp.post_json(
+            '/api/v2/sessions/login',
+            params=params,
+            status=200,
+        )
+        token = res.headers['X-Tracim-Session-Token']
+        assert token
+        self.testapp.authorization = ('Bearer', token)
+        res = self.testapp.get('/api/v2/sessions/whoami', status=200)
+        assert res.json_body['email'] == 'admin@admin.admin'
+
+        self.testapp.get('/api/v2/sessions/logout', status=204)
+        self.testapp.get('/api/v2/sessions/whoami', status=401)
+
     def test_api__try_login_enpoint__err_401__user_not_activated(self):
         dbsession = get_tm_session(self.session_factory, transaction.manager)
         admin = dbsession.query(models.User) \
@@ -199,6 +218,12 @@ class TestWhoamiEndpoint(FunctionalTest):
 
         res = self.testapp.get('/api/v2/sessions/whoami', status=401)
 
+    def test_api__try_whoami_enpoint__err_401__unknown_session_token(self):
+        self.testapp.authorization = ('Bearer', 'unknown-token')
+        res = self.testapp.get('/api/v2/sessions/whoami', status=401)
+        assert isinstance(res.json, dict)
+        assert 'code' in res.json.keys()
+
     def test_api__try_whoami_enpoint__err_401__unauthenticated(self):
         self.testapp.authorization = (
             'Basic',
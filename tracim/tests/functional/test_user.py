@@ -242,6 +242,67 @@ class TestUserRecentlyActiveContentEndpoint(FunctionalTest):
         assert res[1]['content_id'] == secondly_created_but_not_updated.content_id
 
 
+    def test_api__get_recently_active_content__ok__200__cursor(self):
+        # init DB
+        dbsession = get_tm_session(self.session_factory, transaction.manager)
+        admin = dbsession.query(models.User) \
+            .filter(models.User.email == 'admin@admin.admin') \
+            .one()
+        workspace = WorkspaceApi(
+            current_user=admin,
+            session=dbsession,
+            config=self.app_config,
+        ).create_workspace(
+            'test workspace',
+            save_now=True
+        )
+        api = ContentApi(
+            current_user=admin,
+            session=dbsession,
+            config=self.app_config,
+        )
+        first_page = api.create(ContentType.Page, workspace, None, 'first page', '', True)  # nopep8
+        second_page = api.create(ContentType.Page, workspace, None, 'second page', '', True)  # nopep8
+        third_page = api.create(ContentType.Page, workspace, None, 'third page', '', True)  # nopep8
+        api.create_comment(workspace, first_page, 'juste a super comment', True)  # nopep8
+        dbsession.flush()
+        transaction.commit()
+
+        self.testapp.authorization = (
+            'Basic',
+            (
+                'admin@admin.admin',
+                'admin@admin.admin'
+            )
+        )
+        res = self.testapp.get(
+            '/api/v2/users/1/workspaces/{}/contents/recently_active'.format(workspace.workspace_id),  # nopep8
+            status=200,
+            params={'limit': 2},
+        )
+        assert [elem['content_id'] for elem in res.json_body] == [
+            first_page.content_id,
+            third_page.content_id,
+        ]
+        cursor = res.headers['X-Tracim-Next-Cursor']
+
+        res = self.testapp.get(
+            '/api/v2/users/1/workspaces/{}/contents/recently_active'.format(workspace.workspace_id),  # nopep8
+            status=200,
+            params={'limit': 2, 'cursor': cursor},
+        )
+        assert [elem['content_id'] for elem in res.json_body] == [
+            second_page.content_id,
+        ]
+        assert 'X-Tracim-Next-Cursor' not in res.headers
+
+        self.testapp.get(
+            '/api/v2/users/1/workspaces/{}/contents/recently_active'.format(workspace.workspace_id),  # nopep8
+            status=400,
+            params={'limit': 2, 'cursor': 'not a cursor'},
+        )
+
+
 class TestUserReadStatusEndpoint(FunctionalTest):
     """
     Tests for /api/v2/users/{user_id}/workspaces/{workspace_id}/contents/read_status # nopep8
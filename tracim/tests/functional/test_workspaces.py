@@ -700,6 +700,71 @@ class TestWorkspaceContents(FunctionalTest):
         assert set(content['sub_content_types']) == {'thread', 'html-documents', 'folder', 'file'}  # nopep8
         assert content['workspace_id'] == 1
 
+    def test_api__get_workspace_content__ok_200__paginated_with_cursor(self):
+        """
+        Check obtain workspace contents page by page, sorted by type, label
+        and id
+        """
+        self.testapp.authorization = (
+            'Basic',
+            (
+                'admin@admin.admin',
+                'admin@admin.admin'
+            )
+        )
+        params = {
+            'limit': 2,
+        }
+        res = self.testapp.get('/api/v2/workspaces/1/contents', status=200, params=params)   # nopep8
+        assert [content['content_id'] for content in res.json_body] == [2, 1]
+        next_cursor = res.headers['X-Tracim-Next-Cursor']
+
+        params = {
+            'limit': 2,
+            'after': next_cursor,
+        }
+        res = self.testapp.get('/api/v2/workspaces/1/contents', status=200, params=params)   # nopep8
+        assert [content['content_id'] for content in res.json_body] == [11]
+        assert 'X-Tracim-Next-Cursor' not in res.headers
+
+    def test_api__get_workspace_content__ok_200__sparse_fieldset(self):
+        """
+        Check obtain only some fields of workspace contents
+        """
+        self.testapp.authorization = (
+            'Basic',
+            (
+                'admin@admin.admin',
+                'admin@admin.admin'
+            )
+        )
+        params = {
+            'fields': 'content_id,label',
+        }
+        res = self.testapp.get('/api/v2/workspaces/1/contents', status=200, params=params).json_body   # nopep8
+        assert res == [
+            {'content_id': 1, 'label': 'Tools'},
+            {'content_id': 2, 'label': 'Menus'},
+            {'content_id': 11, 'label': 'Current Menu'},
+        ]
+
+    def test_api__get_workspace_content__err_400__invalid_cursor_and_fields(self):  # nopep8
+        """
+        Check invalid cursor and unknown fields are refused
+        """
+        self.testapp.authorization = (
+            'Basic',
+            (
+                'admin@admin.admin',
+                'admin@admin.admin'
+            )
+        )
+        params = {
+            'after': 'not-a-cursor',
+            'fields': 'content_id,password',
+        }
+        self.testapp.get('/api/v2/workspaces/1/contents', status=400, params=params)   # nopep8
+
     # Root related
     def test_api__get_workspace_content__ok_200__get_all_root_content__legacy_html_slug(self):  # nopep8
         """
@@ -1833,6 +1898,134 @@ class TestWorkspaceContents(FunctionalTest):
             status=400,
         )
 
+    def test_api_put_bulk_move_contents__ok_204__to_another_workspace(self):
+        """
+        Move Desserts folder (content_id: 3) with its children from
+        workspace Recipes to root of workspace Business
+        """
+        self.testapp.authorization = (
+            'Basic',
+            (
+                'admin@admin.admin',
+                'admin@admin.admin'
+            )
+        )
+        params = {
+            'contents_ids': [3],
+            'new_parent_id': None,  # root
+            'new_workspace_id': 1,
+        }
+        self.testapp.put_json(
+            '/api/v2/workspaces/2/contents/bulk/move',
+            params=params,
+            status=204
+        )
+        root_contents = self.testapp.get('/api/v2/workspaces/1/contents', params={'parent_id': 0}, status=200).json_body  # nopep8
+        desserts_contents = self.testapp.get('/api/v2/workspaces/1/contents', params={'parent_id': 3}, status=200).json_body  # nopep8
+        old_root_contents = self.testapp.get('/api/v2/workspaces/2/contents', params={'parent_id': 0}, status=200).json_body  # nopep8
+        assert [content for content in root_contents if content['content_id'] == 3]  # nopep8
+        assert [content for content in desserts_contents if content['content_id'] == 8]  # nopep8
+        assert not [content for content in old_root_contents if content['content_id'] == 3]  # nopep8
+
+    def test_api_put_bulk_move_contents__err_400__move_in_itself(self):
+        """
+        Move Desserts folder (content_id: 3) in its Fruits Desserts
+        subfolder (content_id: 10)
+        """
+        self.testapp.authorization = (
+            'Basic',
+            (
+                'admin@admin.admin',
+                'admin@admin.admin'
+            )
+        )
+        params = {
+            'contents_ids': [3],
+            'new_parent_id': 10,
+            'new_workspace_id': 2,
+        }
+        self.testapp.put_json(
+            '/api/v2/workspaces/2/contents/bulk/move',
+            params=params,
+            status=400
+        )
+
+    def test_api_put_bulk_copy_contents__ok_200__nominal_case(self):
+        """
+        Copy Apple_Pie (content_id: 8) and Brownie Recipe (content_id: 9)
+        to Salads folder (content_id: 4)
+        """
+        self.testapp.authorization = (
+            'Basic',
+            (
+                'admin@admin.admin',
+                'admin@admin.admin'
+            )
+        )
+        params = {
+            'contents_ids': [8, 9],
+            'new_parent_id': 4,
+            'new_workspace_id': 2,
+        }
+        res = self.testapp.put_json(
+            '/api/v2/workspaces/2/contents/bulk/copy',
+            params=params,
+            status=200
+        )
+        assert len(res.json_body) == 2
+        copies_ids = [content['content_id'] for content in res.json_body]
+        assert not set(copies_ids) & {8, 9}
+        assert {content['label'] for content in res.json_body} == {'Apple_Pie', 'Brownie Recipe'}  # nopep8
+        for content in res.json_body:
+            assert content['parent_id'] == 4
+            assert content['workspace_id'] == 2
+        salads_contents = self.testapp.get('/api/v2/workspaces/2/contents', params={'parent_id': 4}, status=200).json_body  # nopep8
+        assert {content['content_id'] for content in salads_contents} >= set(copies_ids)  # nopep8
+        desserts_contents = self.testapp.get('/api/v2/workspaces/2/contents', params={'parent_id': 3}, status=200).json_body  # nopep8
+        assert {8, 9} <= {content['content_id'] for content in desserts_contents}  # nopep8
+
+    def test_api_put_bulk_delete_contents__ok_204__nominal_case(self):
+        """
+        Delete Apple_Pie (content_id: 8) and Brownie Recipe (content_id: 9)
+        """
+        self.testapp.authorization = (
+            'Basic',
+            (
+                'admin@admin.admin',
+                'admin@admin.admin'
+            )
+        )
+        params_deleted = {
+            'parent_id': 3,
+            'show_archived': 0,
+            'show_deleted': 1,
+            'show_active': 0,
+        }
+        self.testapp.put_json(
+            '/api/v2/workspaces/2/contents/bulk/delete',
+            params={'contents_ids': [8, 9]},
+            status=204
+        )
+        deleted_contents = self.testapp.get('/api/v2/workspaces/2/contents', params=params_deleted, status=200).json_body  # nopep8
+        assert {8, 9} <= {content['content_id'] for content in deleted_contents}  # nopep8
+
+    def test_api_put_bulk_archive_contents__err_400__content_of_other_workspace(self):  # nopep8
+        """
+        Archive Apple_Pie (content_id: 8) through workspace Business
+        """
+        self.testapp.authorization = (
+            'Basic',
+            (
+                'admin@admin.admin',
+                'admin@admin.admin'
+            )
+        )
+        self.testapp.put_json(
+            '/api/v2/workspaces/1/contents/bulk/archive',
+            params={'contents_ids': [8]},
+            status=400
+        )
+
     def test_api_put_delete_content__ok_200__nominal_case(self):
         """
         delete content
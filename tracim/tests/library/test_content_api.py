@@ -1,7 +1,9 @@
 # -*- coding: utf-8 -*-
 import datetime
+import io
 import transaction
 import pytest
+from sqlalchemy.orm.exc import NoResultFound
 
 from tracim.config import CFG
 from tracim.lib.core.content import compare_content_for_sorting_by_type_and_name
@@ -10,6 +12,8 @@ from tracim.lib.core.content import ContentApi
 from tracim.lib.core.group import GroupApi
 from tracim.lib.core.user import UserApi
 from tracim.exceptions import SameValueError
+from tracim.exceptions import ConflictingMoveInItself
+from tracim.exceptions import ContentLabelAlreadyUsedHere
 # TODO - G.M - 28-03-2018 - [RoleApi] Re-enable RoleApi
 from tracim.lib.core.workspace import RoleApi
 # TODO - G.M - 28-03-2018 - [WorkspaceApi] Re-enable WorkspaceApi
@@ -1056,6 +1060,97 @@ class TestContentApi(DefaultTest):
         for rev in page_4.revisions:
             eq_(user_b in rev.read_by.keys(), True)
 
+    def test_unit__mark_read__ok__subtree(self):
+        uapi = UserApi(
+            session=self.session,
+            config=self.app_config,
+            current_user=None,
+        )
+        group_api = GroupApi(
+            current_user=None,
+            session=self.session,
+            config=self.app_config,
+        )
+        groups = [group_api.get_one(Group.TIM_USER),
+                  group_api.get_one(Group.TIM_MANAGER),
+                  group_api.get_one(Group.TIM_ADMIN)]
+
+        user_a = uapi.create_minimal_user(email='this.is@user',
+                                          groups=groups, save_now=True)
+        user_b = uapi.create_minimal_user(email='this.is@another.user',
+                                          groups=groups, save_now=True)
+        workspace = WorkspaceApi(
+            current_user=user_a,
+            session=self.session,
+            config=self.app_config,
+        ).create_workspace(
+            'test workspace',
+            save_now=True
+        )
+        RoleApi(
+            current_user=user_a,
+            session=self.session,
+            config=self.app_config,
+        ).create_one(
+            user_b,
+            workspace,
+            UserRoleInWorkspace.READER,
+            False
+        )
+        cont_api_a = ContentApi(
+            current_user=user_a,
+            session=self.session,
+            config=self.app_config,
+        )
+        cont_api_b = ContentApi(
+            current_user=user_b,
+            session=self.session,
+            config=self.app_config,
+        )
+        folder = cont_api_a.create(ContentType.Folder, workspace, None, 'folder', '', True)  # nopep8
+        subfolder = cont_api_a.create(ContentType.Folder, workspace, folder, 'subfolder', '', True)  # nopep8
+        page = cont_api_a.create(ContentType.Page, workspace, subfolder, 'page', '', True)  # nopep8
+        comment = cont_api_a.create_comment(workspace, page, 'comment', True)
+        other_page = cont_api_a.create(ContentType.Page, workspace, None, 'other', '', True)  # nopep8
+        content_ids = [
+            folder.content_id,
+            subfolder.content_id,
+            page.content_id,
+            comment.content_id,
+            other_page.content_id,
+        ]
+        assert cont_api_b.get_unread_content_ids(content_ids) == set(content_ids)  # nopep8
+
+        cont_api_b.mark_read(subfolder)
+        # INFO - G.M - 2018-08-02 - folder itself is still not read
+        assert cont_api_b.get_unread_content_ids(content_ids) == {
+            folder.content_id,
+            other_page.content_id,
+        }
+        for content in (subfolder, page, comment):
+            for rev in content.revisions:
+                assert user_b in rev.read_by.keys()
+            assert not content.has_new_information_for(user_b)
+        assert folder.has_new_information_for(user_b)
+
+        cont_api_b.mark_unread(page)
+        assert cont_api_b.get_unread_content_ids(content_ids) == {
+            folder.content_id,
+            subfolder.content_id,
+            page.content_id,
+            comment.content_id,
+            other_page.content_id,
+        }
+        for rev in comment.revisions:
+            assert user_b not in rev.read_by.keys()
+
+        # INFO - G.M - 2018-08-02 - reading a comment mean reading its parent
+        cont_api_b.mark_read(comment)
+        assert cont_api_b.get_unread_content_ids(content_ids) == {
+            folder.content_id,
+            other_page.content_id,
+        }
+
     def test_mark_read(self):
         uapi = UserApi(
             session=self.session,
@@ -1657,6 +1752,21 @@ class TestContentApi(DefaultTest):
         api2.save(content2)
         transaction.commit()
 
+        # INFO - G.M - 2018-08-06 - Same check with a file object
+        content2 = api2.get_one(page.content_id, ContentType.Any, workspace)
+        with new_revision(
+            session=self.session,
+            tm=transaction.manager,
+            content=content2,
+        ):
+            with pytest.raises(SameValueError):
+                api2.update_file_data(
+                    content2,
+                    'index.html',
+                    'text/html',
+                    io.BytesIO(b'<html>Same Content Here</html>'),
+                )
+
     def test_archive_unarchive(self):
         uapi = UserApi(
             session=self.session,
@@ -1977,6 +2087,369 @@ class TestContentApi(DefaultTest):
         eq_(ActionDescription.UNDELETION, updated2.revision_type)
         eq_(u1id, updated2.owner_id)
 
+    def test_unit__current_revision_id__ok__nominal_case(self):
+        uapi = UserApi(
+            session=self.session,
+            config=self.app_config,
+            current_user=None,
+        )
+        group_api = GroupApi(
+            current_user=None,
+            session=self.session,
+            config=self.app_config,
+        )
+        groups = [group_api.get_one(Group.TIM_USER),
+                  group_api.get_one(Group.TIM_MANAGER),
+                  group_api.get_one(Group.TIM_ADMIN)]
+
+        user = uapi.create_minimal_user(email='this.is@user',
+                                        groups=groups, save_now=True)
+        workspace = WorkspaceApi(
+            current_user=user,
+            session=self.session,
+            config=self.app_config,
+        ).create_workspace(
+            'test workspace',
+            save_now=True
+        )
+        api = ContentApi(
+            current_user=user,
+            session=self.session,
+            config=self.app_config,
+        )
+        page = api.create(ContentType.Page, workspace, None, 'page', '', True)  # nopep8
+        assert page.current_revision_id == page.revisions[-1].revision_id
+        with new_revision(
+            session=self.session,
+            tm=transaction.manager,
+            content=page,
+        ):
+            api.update_content(page, 'new page', 'new content')
+        api.save(page)
+        assert len(page.revisions) == 2
+        assert page.current_revision_id == page.revisions[-1].revision_id
+        content_id = page.content_id
+        transaction.commit()
+
+        self.session.query(Content).update(
+            {Content.current_revision_id: None},
+            synchronize_session=False,
+        )
+        self.session.expire_all()
+        assert api.get_canonical_query().filter(
+            Content.id == content_id
+        ).count() == 0
+        assert api.update_current_revision_ids() == 1
+        self.session.expire_all()
+        page = api.get_canonical_query().filter(Content.id == content_id).one()
+        assert page.label == 'new page'
+        assert page.revision_id == page.revisions[-1].revision_id
+
+    def test_unit__label_path__ok__nominal_case(self):
+        uapi = UserApi(
+            session=self.session,
+            config=self.app_config,
+            current_user=None,
+        )
+        group_api = GroupApi(
+            current_user=None,
+            session=self.session,
+            config=self.app_config,
+        )
+        groups = [group_api.get_one(Group.TIM_USER),
+                  group_api.get_one(Group.TIM_MANAGER),
+                  group_api.get_one(Group.TIM_ADMIN)]
+
+        user = uapi.create_minimal_user(email='this.is@user',
+                                        groups=groups, save_now=True)
+        workspace = WorkspaceApi(
+            current_user=user,
+            session=self.session,
+            config=self.app_config,
+        ).create_workspace(
+            'test workspace',
+            save_now=True
+        )
+        api = ContentApi(
+            current_user=user,
+            session=self.session,
+            config=self.app_config,
+        )
+        folder_a = api.create(ContentType.Folder, workspace, None, 'a', '', True)  # nopep8
+        folder_b = api.create(ContentType.Folder, workspace, folder_a, 'b', '', True)  # nopep8
+        folder_c = api.create(ContentType.Folder, workspace, None, 'c', '', True)  # nopep8
+        page = api.create(ContentType.Page, workspace, folder_b, 'page', '', True)  # nopep8
+        comment = api.create_comment(workspace, page, 'comment', True)
+        assert folder_b.label_path == '/a/b'
+        assert page.label_path == '/a/b/page.html'
+        assert comment.label_path is None
+        assert api.get_folder_with_workspace_path_labels(
+            ['a', 'b'],
+            workspace,
+        ) == folder_b
+        assert api.get_one_by_label_and_parent_labels(
+            'page.html',
+            workspace,
+            ['a', 'b'],
+        ) == page
+
+        with new_revision(
+            session=self.session,
+            tm=transaction.manager,
+            content=folder_b,
+        ):
+            api.move(folder_b, folder_c)
+        api.save(folder_b)
+        assert folder_b.label_path == '/c/b'
+        assert page.label_path == '/c/b/page.html'
+        assert api.get_one_by_label_and_parent_labels(
+            'page.html',
+            workspace,
+            ['c', 'b'],
+        ) == page
+        with pytest.raises(NoResultFound):
+            api.get_one_by_label_and_parent_labels(
+                'page.html',
+                workspace,
+                ['a', 'b'],
+            )
+
+        with new_revision(
+            session=self.session,
+            tm=transaction.manager,
+            content=folder_c,
+        ):
+            api.delete(folder_c)
+        api.save(folder_c)
+        assert page.label_path == '{}/b/page.html'.format(
+            folder_c.label_path,
+        )
+        with pytest.raises(NoResultFound):
+            api.get_folder_with_workspace_path_labels(['c', 'b'], workspace)
+
+    def _create_bulk_test_tree(self):
+        uapi = UserApi(
+            session=self.session,
+            config=self.app_config,
+            current_user=None,
+        )
+        group_api = GroupApi(
+            current_user=None,
+            session=self.session,
+            config=self.app_config,
+        )
+        groups = [group_api.get_one(Group.TIM_USER),
+                  group_api.get_one(Group.TIM_MANAGER),
+                  group_api.get_one(Group.TIM_ADMIN)]
+
+        user = uapi.create_minimal_user(email='this.is@user',
+                                        groups=groups, save_now=True)
+        wapi = WorkspaceApi(
+            current_user=user,
+            session=self.session,
+            config=self.app_config,
+        )
+        workspace = wapi.create_workspace('test workspace', save_now=True)
+        workspace2 = wapi.create_workspace('test workspace 2', save_now=True)
+        api = ContentApi(
+            current_user=user,
+            session=self.session,
+            config=self.app_config,
+        )
+        folder_a = api.create(ContentType.Folder, workspace, None, 'a', '', True)  # nopep8
+        folder_b = api.create(ContentType.Folder, workspace, folder_a, 'b', '', True)  # nopep8
+        page = api.create(ContentType.Page, workspace, folder_b, 'page', '', True)  # nopep8
+        comment = api.create_comment(workspace, page, 'comment', True)
+        return api, workspace, workspace2, folder_a, folder_b, page, comment
+
+    def test_unit__bulk_move__ok__other_workspace(self):
+        api, workspace, workspace2, folder_a, folder_b, page, comment = \
+            self._create_bulk_test_tree()
+        folder_c = api.create(ContentType.Folder, workspace2, None, 'c', '', True)  # nopep8
+        page_revisions_count = len(page.revisions)
+
+        api.bulk_move([folder_a], new_parent=folder_c)
+
+        assert folder_a.parent_id == folder_c.content_id
+        assert folder_a.revision_type == ActionDescription.MOVE
+        for content in (folder_a, folder_b, page, comment):
+            assert content.workspace_id == workspace2.workspace_id
+        assert len(page.revisions) == page_revisions_count + 1
+        assert folder_b.label_path == '/c/a/b'
+        assert page.label_path == '/c/a/b/page.html'
+        assert comment.label_path is None
+        assert api.get_one_by_label_and_parent_labels(
+            'page.html',
+            workspace2,
+            ['c', 'a', 'b'],
+        ) == page
+
+    def test_unit__bulk_move__err__move_in_itself(self):
+        api, workspace, workspace2, folder_a, folder_b, page, comment = \
+            self._create_bulk_test_tree()
+        with pytest.raises(ConflictingMoveInItself):
+            api.bulk_move([folder_a], new_parent=folder_b)
+
+    def test_unit__bulk_copy__ok__subtree(self):
+        api, workspace, workspace2, folder_a, folder_b, page, comment = \
+            self._create_bulk_test_tree()
+
+        copies = api.bulk_copy(
+            [folder_a],
+            new_workspace=workspace2,
+            new_label='a copy',
+        )
+
+        assert len(copies) == 1
+        folder_a_copy = copies[0]
+        assert folder_a_copy.content_id != folder_a.content_id
+        assert folder_a_copy.label == 'a copy'
+        assert folder_a_copy.label_path == '/a copy'
+        assert folder_a_copy.revision_type == ActionDescription.COPY
+        assert len(folder_a_copy.revisions) == len(folder_a.revisions) + 1
+        page_copy = api.get_one_by_label_and_parent_labels(
+            'page.html',
+            workspace2,
+            ['a copy', 'b'],
+        )
+        assert page_copy.content_id != page.content_id
+        assert page_copy.workspace_id == workspace2.workspace_id
+        assert page_copy.parent.parent_id == folder_a_copy.content_id
+        assert page_copy.revisions[0].parent_id == page_copy.parent_id
+        comment_copy = page_copy.get_comments()[0]
+        assert comment_copy.content_id != comment.content_id
+        assert comment_copy.description == 'comment'
+        assert not api.get_unread_content_ids([folder_a_copy.content_id])
+        # original contents are not modified
+        assert folder_a.workspace_id == workspace.workspace_id
+        assert page.label_path == '/a/b/page.html'
+        assert page.parent_id == folder_b.content_id
+
+    def test_unit__bulk_copy__err__label_path_already_used(self):
+        api, workspace, workspace2, folder_a, folder_b, page, comment = \
+            self._create_bulk_test_tree()
+        folder_c = api.create(ContentType.Folder, workspace, None, 'c', '', True)  # nopep8
+        page_c = api.create(ContentType.Page, workspace, folder_c, 'page', '', True)  # nopep8
+        contents_count = self.session.query(Content).count()
+
+        with pytest.raises(ContentLabelAlreadyUsedHere):
+            api.bulk_copy([folder_a], new_workspace=workspace)
+        with pytest.raises(ContentLabelAlreadyUsedHere):
+            api.bulk_copy([page], new_parent=folder_c)
+        with pytest.raises(ContentLabelAlreadyUsedHere):
+            api.bulk_copy([page, page_c], new_workspace=workspace2)
+        assert self.session.query(Content).count() == contents_count
+
+    def test_unit__bulk_delete__ok__label_paths(self):
+        api, workspace, workspace2, folder_a, folder_b, page, comment = \
+            self._create_bulk_test_tree()
+        folder_c = api.create(ContentType.Folder, workspace, None, 'c', '', True)  # nopep8
+
+        api.bulk_delete([folder_a, folder_c])
+
+        assert folder_a.is_deleted
+        assert folder_c.is_deleted
+        assert folder_a.revision_type == ActionDescription.DELETION
+        assert folder_a.label.startswith('a-deleted-')
+        assert not folder_b.is_deleted
+        assert page.label_path == '/{}/b/page.html'.format(folder_a.label)
+        with pytest.raises(NoResultFound):
+            api.get_folder_with_workspace_path_labels(['a', 'b'], workspace)
+
+    def test_unit__bulk_archive__ok__nominal_case(self):
+        api, workspace, workspace2, folder_a, folder_b, page, comment = \
+            self._create_bulk_test_tree()
+
+        api.bulk_archive([folder_b])
+
+        assert folder_b.is_archived
+        assert folder_b.revision_type == ActionDescription.ARCHIVING
+        assert not page.is_archived
+        assert page.label_path == '/a/{}/page.html'.format(folder_b.label)
+
+    def test_unit__get_contents_in_context__ok__nominal_case(self):
+        uapi = UserApi(
+            session=self.session,
+            config=self.app_config,
+            current_user=None,
+        )
+        group_api = GroupApi(
+            current_user=None,
+            session=self.session,
+            config=self.app_config,
+        )
+        groups = [group_api.get_one(Group.TIM_USER),
+                  group_api.get_one(Group.TIM_MANAGER),
+                  group_api.get_one(Group.TIM_ADMIN)]
+
+        user = uapi.create_minimal_user(email='this.is@user',
+                                        groups=groups, save_now=True)
+        user2 = uapi.create_minimal_user(email='this.is@user2',
+                                         groups=groups, save_now=True)
+        workspace = WorkspaceApi(
+            current_user=user,
+            session=self.session,
+            config=self.app_config,
+        ).create_workspace(
+            'test workspace',
+            save_now=True
+        )
+        RoleApi(
+            current_user=user,
+            session=self.session,
+            config=self.app_config,
+        ).create_one(
+            user2,
+            workspace,
+            UserRoleInWorkspace.WORKSPACE_MANAGER,
+            with_notif=False,
+        )
+        api = ContentApi(
+            current_user=user,
+            session=self.session,
+            config=self.app_config,
+        )
+        api2 = ContentApi(
+            current_user=user2,
+            session=self.session,
+            config=self.app_config,
+        )
+        folder = api.create(ContentType.Folder, workspace, None, 'folder', '', True)  # nopep8
+        subfolder = api.create(ContentType.Folder, workspace, folder, 'subfolder', '', True)  # nopep8
+        page = api.create(ContentType.Page, workspace, subfolder, 'page', '', True)  # nopep8
+        other_folder = api.create(ContentType.Folder, workspace, None, 'other', '', True)  # nopep8
+        api2.create_comment(workspace, page, 'comment', True)
+        with new_revision(
+            session=self.session,
+            tm=transaction.manager,
+            content=other_folder,
+        ):
+            api2.update_content(other_folder, 'other folder')
+        api2.save(other_folder)
+        transaction.commit()
+
+        contents = api.get_all(workspace=workspace)
+        contents_in_context = api.get_contents_in_context(contents)
+        assert len(contents_in_context) == 5
+        for content, content_in_context in zip(contents, contents_in_context):
+            assert content_in_context.content == content
+            assert content_in_context.read_by_user == \
+                (not content.has_new_information_for(user))
+            assert content_in_context.author.user_id == \
+                content.first_revision.owner.user_id
+            assert content_in_context.last_modifier.user_id == \
+                content.last_revision.owner.user_id
+
+        other_folder_in_context = [
+            content_in_context for content_in_context in contents_in_context
+            if content_in_context.content == other_folder
+        ][0]
+        assert other_folder_in_context.author.user_id == user.user_id
+        assert other_folder_in_context.last_modifier.user_id == user2.user_id
+        assert api.get_unread_content_ids(
+            [folder.content_id, other_folder.content_id]
+        ) == {folder.content_id, other_folder.content_id}
+
     def test_unit__get_last_active__ok__nominal_case(self):
         uapi = UserApi(
             session=self.session,
@@ -0,0 +1,204 @@
+# coding=utf-8
+import datetime
+import hashlib
+import os
+import shutil
+import tempfile
+import uuid
+
+import transaction
+from depot.io.utils import FileIntent
+from depot.manager import DepotManager
+
+from tracim.lib.core.content import ContentApi
+from tracim.lib.core.depot import DepotApi
+from tracim.lib.core.workspace import WorkspaceApi
+from tracim.lib.utils.depot import is_content_addressed_id
+from tracim.models.auth import User
+from tracim.models.data import ContentType
+from tracim.models.revision_protection import new_revision
+from tracim.tests import DefaultTest
+
+
+class TestDepotApi(DefaultTest):
+
+    def setUp(self) -> None:
+        super().setUp()
+        self.depot_dir = tempfile.mkdtemp()
+        DepotManager._clear()
+        DepotManager.configure(
+            'test',
+            {
+                'depot.backend': 'tracim.lib.utils.depot.ContentAddressedFileStorage',  # nopep8
+                'depot.storage_path': self.depot_dir,
+            }
+        )
+
+    def tearDown(self) -> None:
+        super().tearDown()
+        DepotManager._clear()
+        shutil.rmtree(self.depot_dir)
+
+    def test_unit__create__ok__same_content_stored_once(self) -> None:
+        depot = DepotManager.get()
+        file_id = depot.create(b'same content', 'a.txt', 'text/plain')
+        other_file_id = depot.create(b'same content', 'b.txt', 'text/plain')
+        assert is_content_addressed_id(file_id)
+        assert file_id == other_file_id
+        assert depot.create(b'other content') != file_id
+        assert depot.create(depot.get(file_id)) == file_id
+        assert len(depot.list()) == 2
+        assert depot.get(file_id).read() == b'same content'
+        stored_file = depot.get(file_id)
+        assert stored_file.seekable()
+        stored_file.seek(5)
+        assert stored_file.read() == b'content'
+
+        # INFO - G.M - 2018-08-07 - file may be shared, only purge delete it
+        depot.delete(file_id)
+        assert depot.exists(file_id)
+        depot.purge(file_id)
+        assert not depot.exists(file_id)
+
+    def test_unit__new_revision_and_copy__ok__file_shared(self) -> None:
+        admin = self.session.query(User) \
+            .filter(User.email == 'admin@admin.admin').one()
+        workspace = WorkspaceApi(
+            current_user=admin,
+            session=self.session,
+            config=self.app_config,
+        ).create_workspace('test workspace', save_now=True)
+        api = ContentApi(
+            current_user=admin,
+            session=self.session,
+            config=self.app_config,
+        )
+        folder = api.create(ContentType.Folder, workspace, None, 'folder', '', True)  # nopep8
+        file = api.create(ContentType.File, workspace, None, 'file', '', False)  # nopep8
+        file.depot_file = FileIntent(b'file content', 'file.txt', 'text/plain')
+        api.save(file)
+        transaction.commit()
+        file = api.get_one(file.content_id, ContentType.Any)
+        file_id = file.depot_file.file_id
+
+        with new_revision(
+            session=self.session,
+            tm=transaction.manager,
+            content=file,
+        ):
+            api.update_content(file, 'new label')
+        api.save(file)
+        api.copy(file, folder, 'copy')
+        transaction.commit()
+
+        depot_api = DepotApi(session=self.session, config=self.app_config)
+        references = depot_api.get_file_references()
+        # INFO - G.M - 2018-08-07 - every revision of file and of its copy
+        # use the same stored file
+        assert list(references.keys()) == [file_id]
+        assert references[file_id] >= 3
+        assert DepotManager.get().list() == [file_id]
+
+    def test_unit__collect_garbage__ok__nominal_case(self) -> None:
+        depot = DepotManager.get()
+        admin = self.session.query(User) \
+            .filter(User.email == 'admin@admin.admin').one()
+        workspace = WorkspaceApi(
+            current_user=admin,
+            session=self.session,
+            config=self.app_config,
+        ).create_workspace('test workspace', save_now=True)
+        api = ContentApi(
+            current_user=admin,
+            session=self.session,
+            config=self.app_config,
+        )
+        file = api.create(ContentType.File, workspace, None, 'file', '', False)  # nopep8
+        file.depot_file = FileIntent(b'file content', 'file.txt', 'text/plain')
+        api.save(file)
+        transaction.commit()
+        file = api.get_one(file.content_id, ContentType.Any)
+        used_file_id = file.depot_file.file_id
+        unused_file_id = depot.create(b'unused content')
+
+        depot_api = DepotApi(session=self.session, config=self.app_config)
+        # INFO - G.M - 2018-08-07 - recently stored file are kept
+        assert depot_api.collect_garbage(
+            grace_delay=datetime.timedelta(hours=1),
+        ) == []
+        assert depot_api.collect_garbage(
+            grace_delay=datetime.timedelta(0),
+            dry_run=True,
+        ) == [unused_file_id]
+        assert depot.exists(unused_file_id)
+        assert depot_api.collect_garbage(
+            grace_delay=datetime.timedelta(0),
+        ) == [unused_file_id]
+        assert not depot.exists(unused_file_id)
+        assert depot.exists(used_file_id)
+
+    def test_unit__collect_garbage__ok__file_used_again_or_unreadable(self) -> None:  # nopep8
+        depot = DepotManager.get()
+        file_id = depot.create(b'unused content')
+        # INFO - G.M - 2018-08-07 - File used again (touched by create())
+        # after garbage collection checked its modification date.
+        assert depot.purge_if_unmodified(
+            file_id,
+            datetime.datetime.utcnow() - datetime.timedelta(hours=1),
+        ) is False
+        assert depot.get(file_id).read() == b'unused content'
+        assert depot.purge_if_unmodified(
+            file_id,
+            datetime.datetime.utcnow() + datetime.timedelta(hours=1),
+        ) is True
+        assert not depot.exists(file_id)
+        assert depot.create(b'unused content') == file_id
+
+        # INFO - G.M - 2018-08-07 - Legacy file being written, without
+        # metadata yet
+        partial_file_id = str(uuid.uuid1())
+        os.makedirs(os.path.join(self.depot_dir, partial_file_id))
+        os.makedirs(os.path.join(self.depot_dir, '.{}.tmp'.format(file_id)))
+        assert sorted(depot.list()) == sorted([file_id, partial_file_id])
+
+        depot_api = DepotApi(session=self.session, config=self.app_config)
+        assert depot_api.collect_garbage(
+            grace_delay=datetime.timedelta(0),
+        ) == [file_id]
+        assert depot.list() == [partial_file_id]
+
+    def test_unit__update_revisions_file_infos__ok__nominal_case(self) -> None:  # nopep8
+        admin = self.session.query(User) \
+            .filter(User.email == 'admin@admin.admin').one()
+        workspace = WorkspaceApi(
+            current_user=admin,
+            session=self.session,
+            config=self.app_config,
+        ).create_workspace('test workspace', save_now=True)
+        api = ContentApi(
+            current_user=admin,
+            session=self.session,
+            config=self.app_config,
+        )
+        # INFO - G.M - 2018-08-23 - File set without file infos, like files
+        # stored before their introduction
+        old_file = api.create(ContentType.File, workspace, None, 'old', '', False)  # nopep8
+        old_file.depot_file = FileIntent(b'old content', 'old.txt', 'text/plain')  # nopep8
+        api.save(old_file)
+        new_file = api.create(ContentType.File, workspace, None, 'new', '', False)  # nopep8
+        api.update_file_data(new_file, 'new.txt', 'text/plain', b'new content')  # nopep8
+        api.save(new_file)
+        transaction.commit()
+        assert new_file.file_size == len(b'new content')
+        assert new_file.file_hash == hashlib.sha256(b'new content').hexdigest()  # nopep8
+        assert old_file.file_size is None
+
+        depot_api = DepotApi(session=self.session, config=self.app_config)
+        assert depot_api.update_revisions_file_infos() == 1
+        transaction.commit()
+        self.session.expire_all()
+        old_file = api.get_one(old_file.content_id, ContentType.Any)
+        assert old_file.file_size == len(b'old content')
+        assert old_file.file_hash == hashlib.sha256(b'old content').hexdigest()  # nopep8
+        assert depot_api.update_revisions_file_infos() == 0
+        assert depot_api.update_revisions_file_infos(only_missing=False) == 2
@@ -1,18 +1,66 @@
 # -*- coding: utf-8 -*-
+import datetime
 import os
 import re
+import smtplib
+import socket
+import time
+from email.mime.text import MIMEText
+from email.utils import formataddr
+from unittest.mock import patch
 
+import pytest
+import transaction
+from lxml.html.diff import htmldiff
+from zope.sqlalchemy import mark_changed
 
+from tracim import CFG
 from tracim.lib.core.notifications import DummyNotifier
 
 from tracim.lib.core.notifications import NotifierFactory
+from tracim.fixtures.users_and_groups import Base as BaseFixture
+from tracim.lib.core.content import ContentApi
+from tracim.lib.core.user import UserApi
+from tracim.lib.core.userworkspace import RoleApi
+from tracim.lib.mail_notifier.notification_queue import get_notification_queue  # nopep8
+from tracim.lib.mail_notifier.notifier import CONTENT_UPDATE_CONTEXT_CACHE_NAME  # nopep8
 from tracim.lib.mail_notifier.notifier import EmailNotifier
+from tracim.lib.mail_notifier.notifier import get_email_manager
+from tracim.lib.mail_notifier.sender import EmailSender
+from tracim.lib.mail_notifier.sender import get_smtp_connection_pool
+from tracim.lib.mail_notifier.utils import SmtpConfiguration
+from tracim.lib.mail_notifier.utils import get_template
+from tracim.lib.utils.render_cache import get_render_cache
+from tracim.models import get_session_factory
 from tracim.models.auth import User
 from tracim.models.data import Content
+from tracim.models.data import ContentType
+from tracim.models.notification import PendingNotification
+from tracim.models.revision_protection import new_revision
+from tracim.models.roles import WorkspaceRoles
 from tracim.tests import DefaultTest
+from tracim.tests import LocalSmtpTest
 from tracim.tests import eq_
 
 
+def set_content_update_config(config: CFG) -> None:
+    templates_dir = os.path.join(
+        os.path.dirname(__file__), '..', '..', 'templates', 'mail',
+    )
+    config.EMAIL_NOTIFICATION_CONTENT_UPDATE_TEMPLATE_HTML = \
+        os.path.join(templates_dir, 'content_update_body_html.mak')
+    config.EMAIL_NOTIFICATION_CONTENT_UPDATE_TEMPLATE_TEXT = \
+        os.path.join(templates_dir, 'content_update_body_text.mak')
+    config.EMAIL_NOTIFICATION_CONTENT_UPDATE_SUBJECT = \
+        '[{website_title}] [{workspace_label}] {content_label} ({content_status_label})'  # nopep8
+    config.EMAIL_NOTIFICATION_REPLY_TO_EMAIL = \
+        'reply+{content_id}@trac.im'
+    config.EMAIL_NOTIFICATION_REFERENCES_EMAIL = \
+        'thread+{content_id}@trac.im'
+    config.EMAIL_NOTIFICATION_FROM_EMAIL = \
+        'noreply+{user_id}@trac.im'
+
+
 class TestDummyNotifier(DefaultTest):
 
     def test_dummy_notifier__notify_content_update(self):
@@ -39,3 +87,477 @@ class TestNotifierFactory(DefaultTest):
 class TestEmailNotifier(DefaultTest):
     # TODO - G.M - 04-03-2017 -  [emailNotif] - Restore test for email Notif
     pass
+
+
+class TestNotificationQueue(DefaultTest):
+
+    fixtures = [BaseFixture]
+
+    def setUp(self):
+        super().setUp()
+        set_content_update_config(self.app_config)
+        self.app_config.EMAIL_NOTIFICATION_ACTIVATED = True
+        self.app_config.EMAIL_NOTIFICATION_PROCESSING_MODE = 'ASYNC'
+        self.app_config.EMAIL_NOTIFICATION_QUEUE_BACKEND = 'memory'
+        self.queue = get_notification_queue(self.app_config)
+        self.queue.events = []
+        self.queue.bulk_events = []
+        self.admin = self.session.query(User) \
+            .filter(User.email == 'admin@admin.admin') \
+            .one()
+        self.workspace = self._create_workspace_and_test(
+            'workspace_1',
+            self.admin,
+        )
+        self.bob = UserApi(
+            current_user=self.admin,
+            session=self.session,
+            config=self.app_config,
+        ).create_minimal_user('bob@fsf.local', save_now=True)
+        RoleApi(
+            current_user=self.admin,
+            session=self.session,
+            config=self.app_config,
+        ).create_one(
+            self.bob,
+            self.workspace,
+            WorkspaceRoles.READER.level,
+            with_notif=True,
+        )
+
+    def _create_page(self) -> Content:
+        return ContentApi(
+            current_user=self.admin,
+            session=self.session,
+            config=self.app_config,
+        ).create(
+            ContentType.Page,
+            self.workspace,
+            label='page',
+            do_save=True,
+            do_notify=True,
+        )
+
+    def test_unit__notify_content_update__ok__enqueued_after_commit(self):
+        with patch.object(EmailSender, 'send_mails') as send_mails:
+            page = self._create_page()
+            assert self.queue.events == []
+            transaction.commit()
+            assert send_mails.call_count == 0
+        assert self.queue.events == [
+            (self.admin.user_id, page.content_id, page.revision_id),
+        ]
+
+        with patch.object(EmailSender, 'send_mails') as send_mails:
+            processed = self.queue.work(
+                self.app_config,
+                get_session_factory(self.engine),
+            )
+        assert processed == 1
+        assert self.queue.events == []
+        assert send_mails.call_count == 1
+        messages = send_mails.call_args[0][0]
+        assert [message['To'] for message in messages] == [
+            formataddr((self.bob.display_name, self.bob.email)),
+        ]
+
+    def test_unit__notify_content_update__ok__not_enqueued_on_rollback(self):
+        self._create_page()
+        transaction.abort()
+        assert self.queue.events == []
+
+    def test_unit__notify_contents_update__ok__one_event_by_operation(self):
+        api = ContentApi(
+            current_user=self.admin,
+            session=self.session,
+            config=self.app_config,
+        )
+        pages = [
+            api.create(ContentType.Page, self.workspace, label=label, do_save=True)  # nopep8
+            for label in ('page 1', 'page 2')
+        ]
+        transaction.commit()
+        self.queue.events = []
+
+        api.do_notify_contents(pages)
+        # INFO - G.M - 2018-08-30 - Bulk operations write with core
+        # statements, as events are only enqueued by a commit.
+        mark_changed(self.session)
+        transaction.commit()
+        assert self.queue.events == []
+        assert self.queue.bulk_events == [
+            (self.admin.user_id, [page.content_id for page in pages]),
+        ]
+
+        with patch.object(EmailSender, 'send_mails') as send_mails:
+            processed = self.queue.work(
+                self.app_config,
+                get_session_factory(self.engine),
+            )
+        assert processed == 1
+        assert self.queue.bulk_events == []
+        assert send_mails.call_count == 1
+        messages = send_mails.call_args[0][0]
+        assert [message['To'] for message in messages] == [
+            formataddr((self.bob.display_name, self.bob.email)),
+        ]
+
+
+class TestHeldNotifications(DefaultTest):
+
+    fixtures = [BaseFixture]
+
+    def setUp(self):
+        super().setUp()
+        set_content_update_config(self.app_config)
+        self.app_config.EMAIL_NOTIFICATION_ACTIVATED = True
+        self.admin = self.session.query(User) \
+            .filter(User.email == 'admin@admin.admin') \
+            .one()
+        self.workspace = self._create_workspace_and_test(
+            'workspace_1',
+            self.admin,
+        )
+        self.bob = UserApi(
+            current_user=self.admin,
+            session=self.session,
+            config=self.app_config,
+        ).create_minimal_user('bob@fsf.local', save_now=True)
+        RoleApi(
+            current_user=self.admin,
+            session=self.session,
+            config=self.app_config,
+        ).create_one(
+            self.bob,
+            self.workspace,
+            WorkspaceRoles.READER.level,
+            with_notif=True,
+        )
+        self.api = ContentApi(
+            current_user=self.admin,
+            session=self.session,
+            config=self.app_config,
+        )
+
+    def _create_page(self, label: str) -> Content:
+        return self.api.create(
+            ContentType.Page,
+            self.workspace,
+            label=label,
+            do_save=True,
+            do_notify=True,
+        )
+
+    def _update_page(self, page: Content, description: str) -> None:
+        with new_revision(
+            session=self.session,
+            tm=transaction.manager,
+            content=page,
+        ):
+            self.api.update_content(page, page.label, description)
+        self.api.save(page)
+
+    def test_unit__send_pending_notifications__ok__coalesced_updates(self):
+        self.app_config.EMAIL_NOTIFICATION_COALESCING_DELAY = 300
+        manager = get_email_manager(self.app_config, self.session)
+        with patch.object(EmailSender, 'send_mails') as send_mails:
+            page = self._create_page('page')
+            self._update_page(page, '<p>first version</p>')
+            self._update_page(page, '<p>second version</p>')
+            assert send_mails.call_count == 0
+            assert self.session.query(PendingNotification).count() == 3
+
+            assert manager.send_pending_notifications() == 0
+            assert send_mails.call_count == 0
+
+            now = datetime.datetime.utcnow() + datetime.timedelta(seconds=301)  # nopep8
+            assert manager.send_pending_notifications(now) == 1
+        assert send_mails.call_count == 1
+        messages = send_mails.call_args[0][0]
+        assert len(messages) == 1
+        assert messages[0]['To'] == formataddr(
+            (self.bob.display_name, self.bob.email),
+        )
+        assert messages[0]['Subject'] == '[TRACIM] [workspace_1] page (Open)'
+        body_html = messages[0].get_payload()[1] \
+            .get_payload(decode=True) \
+            .decode('utf-8')
+        assert 'made 3 updates' in body_html
+        assert 'second version' in body_html
+        assert self.session.query(PendingNotification).count() == 0
+
+    def test_unit__send_pending_notifications__ok__daily_digest(self):
+        self.app_config.EMAIL_NOTIFICATION_DIGEST = 'daily'
+        manager = get_email_manager(self.app_config, self.session)
+        with patch.object(EmailSender, 'send_mails') as send_mails:
+            page = self._create_page('page')
+            self._update_page(page, '<p>new version</p>')
+            self._create_page('other page')
+            assert manager.send_pending_notifications() == 0
+
+            now = datetime.datetime.utcnow() + datetime.timedelta(days=1)
+            assert manager.send_pending_notifications(now) == 1
+        messages = send_mails.call_args[0][0]
+        assert len(messages) == 1
+        assert messages[0]['Subject'] == '[TRACIM] 2 updated content(s)'
+        body_text = messages[0].get_payload()[0] \
+            .get_payload(decode=True) \
+            .decode('utf-8')
+        assert '/workspace_1/ page (Open)' in body_text
+        assert '/workspace_1/ other page (Open)' in body_text
+        assert self.session.query(PendingNotification).count() == 0
+
+
+class TestEmailManager(DefaultTest):
+
+    fixtures = [BaseFixture]
+
+    def test_unit__notify_content_update__ok__one_batch_for_all_recipients(self):  # nopep8
+        set_content_update_config(self.app_config)
+        admin = self.session.query(User) \
+            .filter(User.email == 'admin@admin.admin') \
+            .one()
+        uapi = UserApi(
+            current_user=admin,
+            session=self.session,
+            config=self.app_config,
+        )
+        workspace = self._create_workspace_and_test('workspace_1', admin)
+        rapi = RoleApi(
+            current_user=admin,
+            session=self.session,
+            config=self.app_config,
+        )
+        recipients = []
+        for email in ('bob@fsf.local', 'alice@fsf.local', 'eve@fsf.local'):
+            recipient = uapi.create_minimal_user(email, save_now=True)
+            rapi.create_one(
+                recipient,
+                workspace,
+                WorkspaceRoles.READER.level,
+                with_notif=True,
+            )
+            recipients.append(recipient)
+        page = ContentApi(
+            current_user=admin,
+            session=self.session,
+            config=self.app_config,
+        ).create(
+            ContentType.Page,
+            workspace,
+            label='page',
+            do_save=True,
+            do_notify=False,
+        )
+
+        manager = get_email_manager(self.app_config, self.session)
+        with patch.object(EmailSender, 'send_mails') as send_mails, \
+                patch.object(EmailSender, 'send_mail') as send_mail, \
+                patch(
+                    'tracim.lib.mail_notifier.notifier.htmldiff',
+                    wraps=htmldiff,
+                ) as diff:
+            manager.notify_content_update(admin.user_id, page.content_id)
+
+        assert send_mail.call_count == 0
+        assert send_mails.call_count == 1
+        messages = send_mails.call_args[0][0]
+        assert sorted(message['To'] for message in messages) == sorted(
+            formataddr((recipient.display_name, recipient.email))
+            for recipient in recipients
+        )
+        assert len({message['Subject'] for message in messages}) == 1
+        assert diff.call_count == 0
+        for message in messages:
+            assert message['Subject'] == '[TRACIM] [workspace_1] page (Open)'
+            text_part, html_part = message.get_payload()
+            body_text = text_part.get_payload(decode=True).decode('utf-8')
+            body_html = html_part.get_payload(decode=True).decode('utf-8')
+            recipient_name = message['To'].split(' <')[0]
+            assert 'Dear {},'.format(recipient_name) in body_text
+            assert 'page' in body_html
+            assert 'workspace_1' in body_html
+
+    def test_unit__notify_contents_update__ok__one_email_by_recipient(self):  # nopep8
+        set_content_update_config(self.app_config)
+        # INFO - G.M - 2018-08-30 - Ids of contents of previous tests are
+        # reused, their rendered contexts must not be.
+        get_render_cache(
+            CONTENT_UPDATE_CONTEXT_CACHE_NAME,
+            self.app_config.EMAIL_NOTIFICATION_RENDER_CACHE_SIZE,
+        ).clear()
+        admin = self.session.query(User) \
+            .filter(User.email == 'admin@admin.admin') \
+            .one()
+        workspace = self._create_workspace_and_test('workspace_1', admin)
+        bob = UserApi(
+            current_user=admin,
+            session=self.session,
+            config=self.app_config,
+        ).create_minimal_user('bob@fsf.local', save_now=True)
+        RoleApi(
+            current_user=admin,
+            session=self.session,
+            config=self.app_config,
+        ).create_one(
+            bob,
+            workspace,
+            WorkspaceRoles.READER.level,
+            with_notif=True,
+        )
+        api = ContentApi(
+            current_user=admin,
+            session=self.session,
+            config=self.app_config,
+        )
+        pages = [
+            api.create(ContentType.Page, workspace, label=label, do_save=True)  # nopep8
+            for label in ('page 1', 'page 2')
+        ]
+
+        manager = get_email_manager(self.app_config, self.session)
+        with patch.object(EmailSender, 'send_mails') as send_mails:
+            manager.notify_contents_update(
+                admin.user_id,
+                [page.content_id for page in pages],
+            )
+
+        assert send_mails.call_count == 1
+        messages = send_mails.call_args[0][0]
+        assert len(messages) == 1
+        assert messages[0]['To'] == formataddr((bob.display_name, bob.email))
+        assert messages[0]['Subject'] == '[TRACIM] 2 updated content(s)'
+        body_text = messages[0].get_payload()[0] \
+            .get_payload(decode=True) \
+            .decode('utf-8')
+        assert '{} updated 2 content(s):'.format(admin.display_name) \
+            in body_text
+        assert '/workspace_1/ page 1 (Open)' in body_text
+        assert '/workspace_1/ page 2 (Open)' in body_text
+
+    def test_unit__get_template__ok__compiled_once(self):
+        set_content_update_config(self.app_config)
+        template_path = \
+            self.app_config.EMAIL_NOTIFICATION_CONTENT_UPDATE_TEMPLATE_TEXT
+        template = get_template(template_path)
+        assert get_template(template_path) is template
+
+
+class TestEmailSender(LocalSmtpTest):
+
+    def _get_sender(
+            self,
+            retry_transient_errors: bool=True,
+    ) -> EmailSender:
+        self.app_config.EMAIL_NOTIFICATION_SMTP_RETRY_BACKOFF = 0
+        smtp_config = SmtpConfiguration(
+            '127.0.0.1',
+            self.smtp_server.port,
+            '',
+            '',
+        )
+        return EmailSender(
+            self.app_config,
+            smtp_config,
+            True,
+            retry_transient_errors=retry_transient_errors,
+        )
+
+    def _get_messages(self, count: int) -> list:
+        messages = []
+        for index in range(count):
+            message = MIMEText('message {}'.format(index), 'plain', 'utf-8')
+            message['Subject'] = 'message {}'.format(index)
+            message['From'] = 'sender@localhost'
+            message['To'] = 'receiver{}@localhost'.format(index)
+            messages.append(message)
+        return messages
+
+    def test_unit__send_mails__ok__connection_reused(self):
+        self._get_sender().send_mails(self._get_messages(5))
+        self._get_sender().send_mails(self._get_messages(5))
+        assert len(self.smtp_server.messages) == 10
+        assert self.smtp_server.connection_count == 1
+
+    def test_unit__send_mails__ok__max_messages_by_connection(self):
+        self.app_config.EMAIL_NOTIFICATION_SMTP_MAX_MESSAGES_BY_CONNECTION = 3  # nopep8
+        self._get_sender().send_mails(self._get_messages(7))
+        assert len(self.smtp_server.messages) == 7
+        assert self.smtp_server.connection_count == 3
+
+    def test_unit__send_mails__ok__retry_temporary_failures(self):
+        self.smtp_server.temporary_failures = 2
+        self._get_sender().send_mails(self._get_messages(3))
+        assert len(self.smtp_server.messages) == 3
+        assert self.smtp_server.connection_count == 3
+
+    def test_unit__send_mails__err__too_many_temporary_failures(self):
+        self.app_config.EMAIL_NOTIFICATION_SMTP_RETRY_ATTEMPTS = 1
+        self.smtp_server.temporary_failures = 2
+        with pytest.raises(smtplib.SMTPDataError):
+            self._get_sender().send_mails(self._get_messages(2))
+        # INFO - G.M - 2018-08-16 - first message failed, second is sent
+        assert len(self.smtp_server.messages) == 1
+
+    def test_unit__send_mails__err__no_retry_in_sync_mode(self):
+        self.app_config.EMAIL_PROCESSING_MODE = self.app_config.CST.SYNC
+        self.app_config.EMAIL_NOTIFICATION_SMTP_RETRY_BACKOFF = 10
+        self.smtp_server.temporary_failures = 1
+        sender = EmailSender(
+            self.app_config,
+            SmtpConfiguration('127.0.0.1', self.smtp_server.port, '', ''),
+            True,
+        )
+        with patch('tracim.lib.mail_notifier.sender.time.sleep') as sleep:
+            with pytest.raises(smtplib.SMTPDataError):
+                sender.send_mails(self._get_messages(2))
+        assert sleep.call_count == 0
+        # INFO - G.M - 2018-08-16 - first message failed, second is sent
+        assert len(self.smtp_server.messages) == 1
+
+    def test_unit__send_mails__ok__stale_connection_replaced(self):
+        sender = self._get_sender()
+        sender.send_mails(self._get_messages(1))
+        pool = get_smtp_connection_pool(self.app_config, sender._smtp_config)
+        # INFO - G.M - 2018-08-16 - connection lost while idle
+        pool._idle_connections[0].smtp.sock.shutdown(socket.SHUT_RDWR)
+        sender.send_mails(self._get_messages(1))
+        assert len(self.smtp_server.messages) == 2
+        assert pool.opened_count == 2
+
+    def test_unit__send_mails__ok__connection_renewed_after_max_messages(self):  # nopep8
+        message_count = 10
+        self.app_config.EMAIL_NOTIFICATION_SMTP_MAX_MESSAGES_BY_CONNECTION = 1  # nopep8
+        self._get_sender().send_mails(self._get_messages(message_count))
+        assert self.smtp_server.connection_count == message_count
+
+        # INFO - G.M - 2018-08-16 - new smtp server, so a new pool
+        self.tearDown()
+        self.setUp()
+        self._get_sender().send_mails(self._get_messages(message_count))
+        assert self.smtp_server.connection_count == 1
+
+    @pytest.mark.skipif(
+        not os.environ.get('TRACIM_BENCHMARK'),
+        reason='Benchmark, run it with TRACIM_BENCHMARK=1',
+    )
+    def test_benchmark__send_mails__throughput(self):
+        message_count = 50
+        self.app_config.EMAIL_NOTIFICATION_SMTP_MAX_MESSAGES_BY_CONNECTION = 1  # nopep8
+        start = time.time()
+        self._get_sender().send_mails(self._get_messages(message_count))
+        unpooled_duration = time.time() - start
+
+        self.tearDown()
+        self.setUp()
+        start = time.time()
+        self._get_sender().send_mails(self._get_messages(message_count))
+        pooled_duration = time.time() - start
+        print(
+            '{} emails, one connection by email: {:.0f} emails/s, '
+            'pooled connection: {:.0f} emails/s'.format(
+                message_count,
+                message_count / unpooled_duration,
+                message_count / pooled_duration,
+            )
+        )
@@ -0,0 +1,154 @@
+# coding=utf-8
+import shutil
+import tempfile
+
+import pytest
+import transaction
+from depot.manager import DepotManager
+
+from tracim.exceptions import PreviewPending
+from tracim.lib.core.content import ContentApi
+from tracim.lib.core.preview import _get_local_executor
+from tracim.lib.core.preview import PreviewGenerationApi
+from tracim.lib.core.preview import SESSION_JOBS_KEY
+from tracim.lib.core.preview import SESSION_REVISIONS_KEY
+from tracim.lib.core.workspace import WorkspaceApi
+from tracim.models.auth import User
+from tracim.models.data import ContentType
+from tracim.models.revision_protection import new_revision
+from tracim.tests import DefaultTest
+
+
+class TestPreviewGenerationApi(DefaultTest):
+
+    def setUp(self) -> None:
+        super().setUp()
+        self.depot_dir = tempfile.mkdtemp()
+        self.preview_cache_dir = tempfile.mkdtemp()
+        DepotManager._clear()
+        DepotManager.configure(
+            'test',
+            {
+                'depot.backend': 'tracim.lib.utils.depot.ContentAddressedFileStorage',  # nopep8
+                'depot.storage_path': self.depot_dir,
+            }
+        )
+        self.app_config.PREVIEW_CACHE_DIR = self.preview_cache_dir
+        self.app_config.PREVIEW_GENERATION_PROCESSING_MODE = self.app_config.CST.LOCAL  # nopep8
+
+    def tearDown(self) -> None:
+        super().tearDown()
+        DepotManager._clear()
+        shutil.rmtree(self.depot_dir)
+        shutil.rmtree(self.preview_cache_dir)
+
+    def _create_file(self) -> ContentApi:
+        admin = self.session.query(User) \
+            .filter(User.email == 'admin@admin.admin').one()
+        workspace = WorkspaceApi(
+            current_user=admin,
+            session=self.session,
+            config=self.app_config,
+        ).create_workspace('test workspace', save_now=True)
+        api = ContentApi(
+            current_user=admin,
+            session=self.session,
+            config=self.app_config,
+        )
+        file = api.create(ContentType.File, workspace, None, 'file', '', True)  # nopep8
+        transaction.commit()
+        return api.get_one(file.content_id, ContentType.Any)
+
+    def test_unit__is_pending__ok__nominal_case(self) -> None:
+        api = PreviewGenerationApi(session=self.session, config=self.app_config)  # nopep8
+        assert not api.is_pending(42)
+        api.mark_pending(42)
+        assert api.is_pending(42)
+        content_api = ContentApi(
+            current_user=None,
+            session=self.session,
+            config=self.app_config,
+        )
+        with pytest.raises(PreviewPending):
+            content_api.get_jpg_preview_path(1, 42, page=0)
+        with pytest.raises(PreviewPending):
+            content_api.get_full_pdf_preview_path(42)
+
+        # INFO - G.M - 2018-08-08 - generation not ended after timeout
+        # is considered as failed
+        self.app_config.PREVIEW_GENERATION_PENDING_TIMEOUT = 0
+        assert not api.is_pending(42)
+        self.app_config.PREVIEW_GENERATION_PENDING_TIMEOUT = 600
+        self.app_config.PREVIEW_GENERATION_PROCESSING_MODE = self.app_config.CST.SYNC  # nopep8
+        assert not api.is_pending(42)
+
+    def test_unit__schedule_generation__ok__after_commit(self) -> None:
+        file = self._create_file()
+        api = ContentApi(
+            current_user=file.owner,
+            session=self.session,
+            config=self.app_config,
+        )
+        with new_revision(
+            session=self.session,
+            tm=transaction.manager,
+            content=file,
+        ):
+            api.update_file_data(file, 'file.txt', 'text/plain', b'content')
+        api.save(file)
+        revision_id = file.revision_id
+        assert len(self.session.info[SESSION_REVISIONS_KEY]) == 1
+        transaction.commit()
+
+        assert not self.session.info.get(SESSION_REVISIONS_KEY)
+        assert not self.session.info.get(SESSION_JOBS_KEY)
+        # INFO - G.M - 2018-08-08 - local jobs are run one by one, wait for
+        # generation end.
+        _get_local_executor().submit(lambda: None).result()
+        preview_api = PreviewGenerationApi(
+            session=self.session,
+            config=self.app_config,
+        )
+        assert not preview_api.is_pending(revision_id)
+
+    def test_unit__schedule_generation__ok__rollback(self) -> None:
+        file = self._create_file()
+        api = ContentApi(
+            current_user=file.owner,
+            session=self.session,
+            config=self.app_config,
+        )
+        with new_revision(
+            session=self.session,
+            tm=transaction.manager,
+            content=file,
+        ):
+            api.update_file_data(file, 'file.txt', 'text/plain', b'content')
+        api.save(file)
+        revision_id = file.revision_id
+        self.session.rollback()
+
+        assert not self.session.info.get(SESSION_REVISIONS_KEY)
+        preview_api = PreviewGenerationApi(
+            session=self.session,
+            config=self.app_config,
+        )
+        assert not preview_api.is_pending(revision_id)
+
+    def test_unit__schedule_generation__ok__sync_mode(self) -> None:
+        self.app_config.PREVIEW_GENERATION_PROCESSING_MODE = self.app_config.CST.SYNC  # nopep8
+        file = self._create_file()
+        api = ContentApi(
+            current_user=file.owner,
+            session=self.session,
+            config=self.app_config,
+        )
+        with new_revision(
+            session=self.session,
+            tm=transaction.manager,
+            content=file,
+        ):
+            api.update_file_data(file, 'file.txt', 'text/plain', b'content')
+        api.save(file)
+        assert not self.session.info.get(SESSION_REVISIONS_KEY)
+        transaction.commit()
@@ -3,6 +3,7 @@ import pytest
 from sqlalchemy.orm.exc import NoResultFound
 
 from tracim.lib.core.userworkspace import RoleApi
+from tracim.lib.core.userworkspace import WorkspaceAccessIndex
 from tracim.models import User
 from tracim.models.roles import WorkspaceRoles
 from tracim.tests import DefaultTest
@@ -75,3 +76,41 @@ class TestRoleApi(DefaultTest):
         roles[0].user_id == admin.user_id
         roles[0].role == WorkspaceRoles.WORKSPACE_MANAGER.level
 
+    def test_unit__workspace_access_index__ok__invalidated_on_role_change(self):
+        admin = self.session.query(User)\
+            .filter(User.email == 'admin@admin.admin').one()
+        workspace = self._create_workspace_and_test(
+            'workspace_1',
+            admin
+        )
+        bob = self.session.query(User)\
+            .filter(User.email == 'bob@fsf.local').one()
+        rapi = RoleApi(
+            current_user=admin,
+            session=self.session,
+            config=self.config,
+        )
+        access = WorkspaceAccessIndex.get(self.session, bob.user_id)
+        assert workspace.workspace_id not in access.get_workspace_ids()
+        assert WorkspaceAccessIndex.get(self.session, bob.user_id) is access
+
+        role = rapi.create_one(
+            user=bob,
+            workspace=workspace,
+            role_level=WorkspaceRoles.READER.level,
+            with_notif=False,
+        )
+        access = WorkspaceAccessIndex.get(self.session, bob.user_id)
+        assert access.get_role(workspace.workspace_id) == WorkspaceRoles.READER.level  # nopep8
+
+        rapi.update_role(
+            role,
+            role_level=WorkspaceRoles.CONTRIBUTOR.level,
+            save_now=True,
+        )
+        access = WorkspaceAccessIndex.get(self.session, bob.user_id)
+        assert access.get_role(workspace.workspace_id) == WorkspaceRoles.CONTRIBUTOR.level  # nopep8
+
+        rapi.delete_one(bob.user_id, workspace.workspace_id)
+        access = WorkspaceAccessIndex.get(self.session, bob.user_id)
+        assert workspace.workspace_id not in access.get_workspace_ids()
@@ -0,0 +1,126 @@
+# coding=utf-8
+import transaction
+
+from tracim.lib.core.content import ContentApi
+from tracim.lib.core.search import PythonSearchEngine
+from tracim.lib.core.search import SearchApi
+from tracim.lib.core.search import SqliteSearchEngine
+from tracim.lib.core.workspace import WorkspaceApi
+from tracim.models.auth import User
+from tracim.models.data import ContentRevisionRO
+from tracim.models.data import ContentType
+from tracim.models.revision_protection import new_revision
+from tracim.models.search import ContentSearchTerm
+from tracim.tests import DefaultTest
+
+
+class TestSearchApi(DefaultTest):
+
+    def _create_contents(self) -> ContentApi:
+        admin = self.session.query(User) \
+            .filter(User.email == 'admin@admin.admin').one()
+        workspace = WorkspaceApi(
+            current_user=admin,
+            session=self.session,
+            config=self.app_config,
+        ).create_workspace('test workspace', save_now=True)
+        api = ContentApi(
+            current_user=admin,
+            session=self.session,
+            config=self.app_config,
+        )
+        folder = api.create(ContentType.Folder, workspace, None, 'recipes', '', True)  # nopep8
+        cake = api.create(ContentType.Page, workspace, folder, 'chocolate cake', '', True)  # nopep8
+        with new_revision(
+            session=self.session,
+            tm=transaction.manager,
+            content=cake,
+        ):
+            api.update_content(cake, 'chocolate cake', '<p>A cake recipe</p>')
+        api.save(cake)
+        thread = api.create(ContentType.Thread, workspace, folder, 'desserts', '', True)  # nopep8
+        api.create_comment(workspace, thread, '<p>I prefer apple pie</p>', True)  # nopep8
+        deleted = api.create(ContentType.Page, workspace, folder, 'apple cake', '', True)  # nopep8
+        with new_revision(
+            session=self.session,
+            tm=transaction.manager,
+            content=deleted,
+        ):
+            api.delete(deleted)
+        api.save(deleted)
+        file = api.create(ContentType.File, workspace, folder, 'notes', '', True)  # nopep8
+        with new_revision(
+            session=self.session,
+            tm=transaction.manager,
+            content=file,
+        ):
+            api.update_file_data(
+                file,
+                'notes.txt',
+                'text/plain',
+                b'buy flour and chocolate',
+            )
+        api.save(file)
+        transaction.commit()
+        return api
+
+    def _search(self, api: ContentApi, search_string: str, **kwargs):
+        return [
+            content.label
+            for content in api.search_contents(search_string, **kwargs)
+        ]
+
+    def _check_search(self) -> None:
+        api = self._create_contents()
+        # INFO - G.M - 2018-08-09 - label match rank better than
+        # description or file text match
+        assert self._search(api, 'chocolate') == ['chocolate cake', 'notes']
+        assert self._search(api, 'choco') == ['chocolate cake', 'notes']
+        assert self._search(api, 'chocolate flour') == ['notes']
+        assert self._search(api, 'cake') == ['chocolate cake']
+        assert self._search(api, 'apple') == ['desserts']
+        assert self._search(api, 'banana') == []
+        assert self._search(api, ' ,; ') == []
+        assert self._search(api, 'chocolate', limit=1) == ['chocolate cake']
+        assert self._search(api, 'chocolate', limit=1, offset=1) == ['notes']
+
+        other_user = User(email='other@other.other')
+        self.session.add(other_user)
+        self.session.flush()
+        other_user_api = ContentApi(
+            current_user=other_user,
+            session=self.session,
+            config=self.app_config,
+        )
+        assert self._search(other_user_api, 'chocolate') == []
+
+    def test_unit__search_contents__ok__sqlite_engine(self) -> None:
+        self.app_config.SEARCH_ENGINE = 'sqlite'
+        search_api = SearchApi(session=self.session, config=self.app_config)
+        assert isinstance(search_api.get_engine(), SqliteSearchEngine)
+        self._check_search()
+
+    def test_unit__search_contents__ok__python_engine(self) -> None:
+        self.app_config.SEARCH_ENGINE = 'python'
+        search_api = SearchApi(session=self.session, config=self.app_config)
+        assert isinstance(search_api.get_engine(), PythonSearchEngine)
+        self._check_search()
+
+    def test_unit__index_all_contents__ok__nominal_case(self) -> None:
+        self.app_config.SEARCH_ENGINE = 'python'
+        api = self._create_contents()
+        search_api = SearchApi(session=self.session, config=self.app_config)
+        search_api.get_engine().clear()
+        assert self._search(api, 'chocolate') == []
+        # INFO - G.M - 2018-08-09 - comments are indexed with their parent
+        assert search_api.index_all_contents() == 5
+        assert self._search(api, 'chocolate') == ['chocolate cake', 'notes']
+        assert self._search(api, 'apple') == ['desserts']
+        comment_ids = [
+            content.content_id for content in api.get_canonical_query()
+            .filter(ContentRevisionRO.type == ContentType.Comment)
+        ]
+        assert len(comment_ids) == 1
+        assert self.session.query(ContentSearchTerm) \
+            .filter(ContentSearchTerm.content_id.in_(comment_ids)) \
+            .count() == 0
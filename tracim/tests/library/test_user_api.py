@@ -76,7 +76,7 @@ class TestUserApi(DefaultTest):
         api = UserApi(
             current_user=None,
             session=self.session,
-            config=self.config,
+            config=self.app_config,
         )
         u = api.create_minimal_user('bibi@bibi')
         self.session.flush()
@@ -176,7 +176,7 @@ class TestUserApi(DefaultTest):
         api = UserApi(
             current_user=None,
             session=self.session,
-            config=self.config,
+            config=self.app_config,
         )
         gapi = GroupApi(
             current_user=None,
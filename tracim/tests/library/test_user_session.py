@@ -0,0 +1,87 @@
+# -*- coding: utf-8 -*-
+import time
+
+from tracim.lib.core.user import UserApi
+from tracim.lib.core.user_session import UserSessionApi
+from tracim.lib.utils.auth_store import MemoryAuthStore
+from tracim.models import User
+from tracim.tests import DefaultTest
+
+
+class TestMemoryAuthStore(object):
+
+    def test_unit__set_get__ok__lru_eviction(self):
+        store = MemoryAuthStore(max_size=2)
+        store.set('a', {'value': 1}, 60)
+        store.set('b', {'value': 2}, 60)
+        assert store.get('a') == {'value': 1}
+        store.set('c', {'value': 3}, 60)
+        # INFO - G.M - 2018-08-10 - 'b' is least recently used
+        assert store.get('b') is None
+        assert store.get('a') == {'value': 1}
+        assert store.get('c') == {'value': 3}
+        store.delete('a')
+        assert store.get('a') is None
+
+    def test_unit__get__ok__expired(self):
+        store = MemoryAuthStore(max_size=2)
+        store.set('a', {'value': 1}, 0)
+        time.sleep(0.01)
+        assert store.get('a') is None
+
+
+class TestUserSessionApi(DefaultTest):
+
+    def _get_admin(self) -> User:
+        return self.session.query(User) \
+            .filter(User.email == 'admin@admin.admin').one()
+
+    def test_unit__authenticate__ok__verified_credentials_cache(self):
+        admin = self._get_admin()
+        api = UserSessionApi(
+            session=self.session,
+            config=self.app_config,
+            store=MemoryAuthStore(max_size=10),
+        )
+        assert api.authenticate('admin@admin.admin', 'wrong') is None
+        assert api.authenticate('admin@admin.admin', 'admin@admin.admin') == admin.user_id  # nopep8
+
+        # INFO - G.M - 2018-08-10 - Cached credentials are accepted without
+        # checking database
+        admin._password = 'not a password hash'
+        self.session.flush()
+        assert api.authenticate('admin@admin.admin', 'admin@admin.admin') == admin.user_id  # nopep8
+        assert api.authenticate('admin@admin.admin', 'wrong') is None
+
+        api.invalidate_user(admin)
+        assert api.authenticate('admin@admin.admin', 'admin@admin.admin') is None  # nopep8
+
+    def test_unit__authenticate__ok__invalidated_by_password_change(self):
+        admin = self._get_admin()
+        api = UserSessionApi(session=self.session, config=self.app_config)
+        assert api.authenticate('admin@admin.admin', 'admin@admin.admin') == admin.user_id  # nopep8
+        token = api.create_token(admin)
+        assert api.get_token_user_id(token) == admin.user_id
+
+        UserApi(
+            current_user=admin,
+            session=self.session,
+            config=self.app_config,
+        ).update(admin, password='new password', do_save=True)
+        assert api.get_token_user_id(token) is None
+        assert api.authenticate('admin@admin.admin', 'admin@admin.admin') is None  # nopep8
+        time.sleep(0.01)
+        assert api.authenticate('admin@admin.admin', 'new password') == admin.user_id  # nopep8
+
+    def test_unit__token__ok__nominal_case(self):
+        admin = self._get_admin()
+        api = UserSessionApi(
+            session=self.session,
+            config=self.app_config,
+            store=MemoryAuthStore(max_size=10),
+        )
+        token = api.create_token(admin)
+        assert api.get_token_user_id(token) == admin.user_id
+        assert api.get_token_user_id('unknown') is None
+        api.delete_token(token)
+        assert api.get_token_user_id(token) is None
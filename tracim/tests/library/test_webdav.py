@@ -2,21 +2,33 @@
 import io
 
 import pytest
+from depot.io.interfaces import StoredFile
 from sqlalchemy.exc import InvalidRequestError
 from wsgidav.wsgidav_app import DEFAULT_CONFIG
 from tracim import WebdavAppFactory
+from tracim.lib.core.content import ContentApi
 from tracim.lib.core.user import UserApi
+from tracim.lib.utils.render_cache import get_render_cache
 from tracim.lib.webdav import TracimDomainController
 from tracim.tests import eq_
 from tracim.lib.core.notifications import DummyNotifier
 from tracim.lib.webdav.dav_provider import Provider
+from tracim.lib.webdav.lock_storage import LockStorage
+from tracim.lib.webdav.middlewares import TracimWebdavMetrics
+from tracim.lib.webdav.middlewares import TracimWsgiDavDebugFilter
 from tracim.lib.webdav.resources import RootResource
+from tracim.lib.webdav.resources import WEBDAV_RENDER_CACHE_NAME
 from tracim.models import Content
+from tracim.models import User
 from tracim.models import ContentRevisionRO
+from tracim.models import get_session_factory
 from tracim.tests import StandardTest
 from tracim.fixtures.content import Content as ContentFixtures
 from tracim.fixtures.users_and_groups import Base as BaseFixture
 from wsgidav import util
+from wsgidav.dav_error import DAVError
+from wsgidav.dav_error import HTTP_LOCKED
+from wsgidav.lock_manager import LockManager
 from unittest.mock import MagicMock
 
 
@@ -31,6 +43,7 @@ class TestWebdavFactory(StandardTest):
         tracim_settings = {
             'sqlalchemy.url': 'sqlite:///:memory:',
             'user.auth_token.validity': '604800',
+            'user.session.store': 'memory',
             'depot_storage_dir': '/tmp/test/depot',
             'depot_storage_name': 'test',
             'preview_cache_dir': '/tmp/test/preview_cache',
@@ -58,12 +71,216 @@ class TestWebdavFactory(StandardTest):
         # TODO - G.M - 25-05-2018 - Better check for middleware stack config
         assert 'middleware_stack' in config
         assert len(config['middleware_stack']) == 7
+        assert TracimWsgiDavDebugFilter not in config['middleware_stack']
+        assert TracimWebdavMetrics in config['middleware_stack']
         assert 'root_path' in config
         assert 'provider_mapping' in config
         assert config['root_path'] in config['provider_mapping']
         assert isinstance(config['provider_mapping'][config['root_path']], Provider)  # nopep8
         assert 'domaincontroller' in config
         assert isinstance(config['domaincontroller'], TracimDomainController)
+        assert isinstance(config['locksmanager'], LockStorage)
+
+        wsgidav_setting['debug_filter'] = True
+        config = mock._initConfig(mock)
+        assert len(config['middleware_stack']) == 8
+        assert TracimWsgiDavDebugFilter in config['middleware_stack']
+
+
+class TestWebdavMetrics(StandardTest):
+
+    def test_unit__metrics__ok__nominal_case(self):
+        def application(environ, start_response):
+            start_response('207 Multi-Status', [])
+            environ['tracim_dbsession'].query(User).all()
+            environ['tracim_dbsession'].query(User).count()
+            return [b'<xml>', b'</xml>']
+
+        middleware = TracimWebdavMetrics(
+            application,
+            {'metrics_log_interval': 0, 'metrics_slow_request': 0},
+        )
+        for method in ('PROPFIND', 'PROPFIND', 'PUT'):
+            response = middleware(
+                {
+                    'REQUEST_METHOD': method,
+                    'CONTENT_LENGTH': '10',
+                    'tracim_dbsession': self.session,
+                },
+                lambda status, headers, exc_info=None: None,
+            )
+            assert b''.join(response) == b'<xml></xml>'
+        self.session.query(User).all()
+
+        stats = middleware.metrics.get_stats()
+        assert stats['PROPFIND']['count'] == 2
+        assert stats['PROPFIND']['queries'] == 4
+        assert stats['PROPFIND']['max_queries'] == 2
+        assert stats['PROPFIND']['bytes_sent'] == 22
+        assert stats['PROPFIND']['bytes_received'] == 20
+        assert sum(stats['PROPFIND']['histogram']) == 2
+        assert stats['PUT']['count'] == 1
+        assert 'PROPFIND 2 req' in middleware.metrics.format()
+
+
+class TestLockStorage(StandardTest):
+
+    def _get_lock_storage(self) -> LockStorage:
+        return LockStorage(get_session_factory(self.engine))
+
+    def _new_lock(
+            self,
+            timeout: int=3600,
+            depth: str='infinity',
+            scope: str='exclusive',
+    ) -> dict:
+        return {
+            'type': 'write',
+            'scope': scope,
+            'depth': depth,
+            'owner': b'<owner>bob</owner>',
+            'timeout': timeout,
+            'principal': 'bob@fsf.local',
+        }
+
+    def test_unit__create_and_get__ok__nominal_case(self):
+        storage = self._get_lock_storage()
+        lock = storage.create('/w1/folder/', self._new_lock())
+        assert lock['root'] == '/w1/folder'
+        assert lock['token']
+
+        stored_lock = storage.get(lock['token'])
+        assert stored_lock == lock
+        # INFO - G.M - 2018-08-24 - Locks are shared through database
+        assert self._get_lock_storage().get(lock['token']) == lock
+
+        assert storage.delete(lock['token']) is True
+        assert storage.get(lock['token']) is None
+        assert storage.delete(lock['token']) is False
+
+    def test_unit__get_lock_list__ok__root_and_children(self):
+        storage = self._get_lock_storage()
+        folder_lock = storage.create('/w1/folder', self._new_lock(scope='shared'))  # nopep8
+        file_lock = storage.create('/w1/folder/file.txt', self._new_lock(scope='shared'))  # nopep8
+        storage.create('/w1/folder_2/file.txt', self._new_lock())
+        storage.create('/w1/fol%er/file.txt', self._new_lock())
+
+        assert storage.getLockList(
+            '/w1/folder',
+            includeRoot=True,
+            includeChildren=False,
+            tokenOnly=True,
+        ) == [folder_lock['token']]
+        assert storage.getLockList(
+            '/w1/folder',
+            includeRoot=False,
+            includeChildren=True,
+            tokenOnly=True,
+        ) == [file_lock['token']]
+        locks = storage.getLockList(
+            '/w1/folder',
+            includeRoot=True,
+            includeChildren=True,
+            tokenOnly=False,
+        )
+        assert locks == [folder_lock, file_lock]
+        assert len(storage.getLockList(
+            '/',
+            includeRoot=True,
+            includeChildren=True,
+            tokenOnly=True,
+        )) == 4
+
+    def test_unit__acquire__err__conflict_between_processes(self):
+        # INFO - G.M - 2018-08-28 - Lock managers of two webdav processes
+        manager = LockManager(self._get_lock_storage())
+        other_manager = LockManager(self._get_lock_storage())
+        lock = manager.acquire(
+            '/w1/folder',
+            'write',
+            'exclusive',
+            'infinity',
+            b'<owner>bob</owner>',
+            3600,
+            'bob@fsf.local',
+            [],
+        )
+        for path, depth in (
+                ('/w1/folder', '0'),
+                ('/w1/folder/file.txt', '0'),
+                ('/w1', 'infinity'),
+        ):
+            with pytest.raises(DAVError) as exc_info:
+                other_manager.acquire(
+                    path,
+                    'write',
+                    'exclusive',
+                    depth,
+                    b'<owner>alice</owner>',
+                    3600,
+                    'alice@fsf.local',
+                    [],
+                )
+            assert exc_info.value.value == HTTP_LOCKED
+
+        # INFO - G.M - 2018-08-28 - Lock created by other process after
+        # check of lock manager is refused by storage
+        for path, depth in (
+                ('/w1/folder', '0'),
+                ('/w1/folder/file.txt', '0'),
+                ('/w1', 'infinity'),
+        ):
+            with pytest.raises(DAVError) as exc_info:
+                other_manager.storage.create(
+                    path,
+                    self._new_lock(depth=depth),
+                )
+            assert exc_info.value.value == HTTP_LOCKED
+        assert other_manager.storage.create(
+            '/w1/other_folder',
+            self._new_lock(),
+        )
+
+        manager.release(lock['token'])
+        assert other_manager.acquire(
+            '/w1/folder',
+            'write',
+            'shared',
+            'infinity',
+            b'<owner>alice</owner>',
+            3600,
+            'alice@fsf.local',
+            [],
+        )
+        assert manager.storage.create(
+            '/w1/folder',
+            self._new_lock(scope='shared'),
+        )
+
+    def test_unit__cleanup__ok__expired_locks(self):
+        storage = self._get_lock_storage()
+        lock = storage.create('/w1/file.txt', self._new_lock())
+        expired_lock = storage.create('/w1/file_2.txt', self._new_lock())
+        session = get_session_factory(self.engine)()
+        session.execute(
+            'UPDATE webdav_locks SET expire = 1 WHERE token = :token',
+            {'token': expired_lock['token']},
+        )
+        session.commit()
+        session.close()
+
+        assert storage.get(expired_lock['token']) is None
+        assert storage.getLockList(
+            '/w1',
+            includeRoot=False,
+            includeChildren=True,
+            tokenOnly=True,
+        ) == [lock['token']]
+        with pytest.raises(ValueError):
+            storage.refresh(expired_lock['token'], 3600)
+        assert storage.cleanup() == 1
+        assert storage.cleanup() == 0
+        assert storage.get(lock['token'])
 
 
 class TestWebDav(StandardTest):
@@ -271,6 +488,46 @@ class TestWebDav(StandardTest):
                 content_names,
         )
 
+    def test_unit__list_content__ok__resolution_cache_seeded(self):
+        provider = self._get_provider(self.app_config)
+        environ = self._get_environ(
+            provider,
+            'bob@fsf.local',
+        )
+        environ['REQUEST_METHOD'] = 'PROPFIND'
+        desserts = provider.getResourceInst(
+            '/Recipes/Desserts',
+            environ,
+        )
+        assert desserts
+        cache = environ[Provider.RESOLUTION_CACHE_KEY]
+        assert cache[('workspace', 'Recipes')].label == 'Recipes'
+        assert cache[('content', '/Recipes/Desserts')].label == 'Desserts'
+
+        children = desserts.getMemberList()
+        pie = [c for c in children if c.name == 'Apple_Pie.txt'][0]
+        assert cache[('content', '/Recipes/Desserts/Apple_Pie.txt')] \
+            == pie.content
+
+        # INFO - G.M - 2018-08-01 - Path is resolved from cache
+        assert provider.exists('/Recipes/Desserts/Apple_Pie.txt', environ)
+        cache[('content', '/Recipes/Desserts/Apple_Pie.txt')] = None
+        assert not provider.exists('/Recipes/Desserts/Apple_Pie.txt', environ)
+
+    def test_unit__get_content__ok__no_resolution_cache_on_write(self):
+        provider = self._get_provider(self.app_config)
+        environ = self._get_environ(
+            provider,
+            'bob@fsf.local',
+        )
+        environ['REQUEST_METHOD'] = 'PUT'
+        pie = provider.getResourceInst(
+            '/Recipes/Desserts/Apple_Pie.txt',
+            environ,
+        )
+        assert pie
+        assert Provider.RESOLUTION_CACHE_KEY not in environ
+
     def test_unit__get_content__ok(self):
         provider = self._get_provider(self.app_config)
         pie = provider.getResourceInst(
@@ -284,6 +541,77 @@ class TestWebDav(StandardTest):
         assert pie, 'Apple_Pie should be found'
         eq_('Apple_Pie.txt', pie.name)
 
+    def test_unit__get_content__ok__depot_file_stream(self):
+        provider = self._get_provider(self.app_config)
+        pie = provider.getResourceInst(
+            '/Recipes/Desserts/Apple_Pie.txt',
+            self._get_environ(
+                provider,
+                'bob@fsf.local',
+            )
+        )
+        file_content = pie.content.depot_file.file.read()
+        assert pie.getContentLength() == len(file_content)
+        assert pie.getEtag() == str(pie.content.revision_id)
+        assert pie.supportEtag()
+        # INFO - G.M - 2018-08-22 - Memory depot of tests is not seekable
+        assert pie.supportRanges() is False
+        # INFO - G.M - 2018-08-22 - Depot stored file itself is served, it's
+        # opened once by resource
+        stream = pie.getContent()
+        assert isinstance(stream, StoredFile)
+        assert stream is pie.getContent()
+        assert stream.read() == file_content
+        stream.close()
+
+    def test_unit__get_content__ok__thread_html_rendered_once(self):
+        provider = self._get_provider(self.app_config)
+        environ = self._get_environ(
+            provider,
+            'bob@fsf.local',
+        )
+        render_cache = get_render_cache(
+            WEBDAV_RENDER_CACHE_NAME,
+            self.app_config.WEBDAV_RENDER_CACHE_SIZE,
+            self.app_config.WEBDAV_RENDER_CACHE_VALIDITY,
+        )
+        render_cache.clear()
+        thread = provider.getResourceInst(
+            '/Recipes/Desserts/Best Cakesʔ.html',
+            environ,
+        )
+        assert thread, 'Best Cake thread should be found'
+        assert render_cache.misses == 1
+        assert render_cache.hits == 0
+
+        same_thread = provider.getResourceInst(
+            '/Recipes/Desserts/Best Cakesʔ.html',
+            environ,
+        )
+        assert render_cache.hits == 1
+        assert same_thread.content_designed is thread.content_designed
+        assert 'Chocolate cake of course'.encode('utf-8') not in thread.content_designed
+
+        # INFO - G.M - 2018-08-20 - A new comment gives a new rendering
+        content_api = ContentApi(
+            current_user=self._get_user('bob@fsf.local'),
+            session=self.session,
+            config=self.app_config,
+        )
+        content_api.create_comment(
+            workspace=thread.content.workspace,
+            parent=thread.content,
+            content='Chocolate cake of course',
+            do_save=True,
+        )
+        commented_thread = provider.getResourceInst(
+            '/Recipes/Desserts/Best Cakesʔ.html',
+            environ,
+        )
+        assert render_cache.misses == 2
+        assert 'Chocolate cake of course'.encode('utf-8') in commented_thread.content_designed
+        render_cache.clear()
+
     def test_unit__delete_content__ok(self):
         provider = self._get_provider(self.app_config)
         pie = provider.getResourceInst(
@@ -10,7 +10,6 @@ except ImportError:
 from tracim import TracimRequest
 from tracim.extensions import hapic
 from tracim.lib.core.content import ContentApi
-from tracim.lib.core.workspace import WorkspaceApi
 from tracim.lib.utils.authorization import require_workspace_role
 from tracim.lib.utils.authorization import require_comment_ownership_or_role
 from tracim.views.controllers import Controller
@@ -45,15 +44,14 @@ class CommentController(Controller):
             session=request.dbsession,
             config=app_config,
         )
-        content = api.get_one(
-            hapic_data.path.content_id,
-            content_type=ContentType.Any
+        content = request.current_content
+        comments = api.get_all(
+            parent_id=content.content_id,
+            content_type=ContentType.Comment,
+            workspace=request.current_workspace,
         )
-        comments = content.get_comments()
         comments.sort(key=lambda comment: comment.created)
-        return [api.get_content_in_context(comment)
-                for comment in comments
-        ]
+        return api.get_contents_in_context(comments)
 
     @hapic.with_api_doc(tags=[SWAGGER_TAG__COMMENT_ENDPOINTS])
     @hapic.handle_exception(EmptyCommentContentNotAllowed, HTTPStatus.BAD_REQUEST)  # nopep8
@@ -72,10 +70,7 @@ class CommentController(Controller):
             session=request.dbsession,
             config=app_config,
         )
-        content = api.get_one(
-            hapic_data.path.content_id,
-            content_type=ContentType.Any
-        )
+        content = request.current_content
         comment = api.create_comment(
             content.workspace,
             content,
@@ -101,23 +96,7 @@ class CommentController(Controller):
             session=request.dbsession,
             config=app_config,
         )
-        wapi = WorkspaceApi(
-            current_user=request.current_user,
-            session=request.dbsession,
-            config=app_config,
-        )
-        workspace = wapi.get_one(hapic_data.path.workspace_id)
-        parent = api.get_one(
-            hapic_data.path.content_id,
-            content_type=ContentType.Any,
-            workspace=workspace
-        )
-        comment = api.get_one(
-            hapic_data.path.comment_id,
-            content_type=ContentType.Comment,
-            workspace=workspace,
-            parent=parent,
-        )
+        comment = request.current_comment
         with new_revision(
                 session=request.dbsession,
                 tm=transaction.manager,
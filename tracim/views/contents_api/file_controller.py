@@ -5,7 +5,6 @@ import transaction
 from depot.manager import DepotManager
 from preview_generator.exception import UnavailablePreviewType
 from pyramid.config import Configurator
-from pyramid.response import FileResponse, FileIter
 
 try:  # Python 3.5+
     from http import HTTPStatus
@@ -29,15 +28,21 @@ from tracim.views.core_api.schemas import WorkspaceAndContentIdPathSchema
 from tracim.views.core_api.schemas import NoContentSchema
 from tracim.lib.utils.authorization import require_content_types
 from tracim.lib.utils.authorization import require_workspace_role
+from tracim.lib.utils.response import get_depot_file_response
+from tracim.lib.utils.response import get_not_modified_response
+from tracim.lib.utils.response import get_preview_response
+from tracim.lib.utils.response import get_revision_etag
+from tracim.lib.utils.response import is_not_modified
 from tracim.models.data import UserRoleInWorkspace
 from tracim.models.context_models import ContentInContext
 from tracim.models.context_models import RevisionInContext
-from tracim.models.contents import ContentTypeLegacy as ContentType
 from tracim.models.contents import file_type
 from tracim.models.revision_protection import new_revision
 from tracim.exceptions import EmptyLabelNotAllowed
 from tracim.exceptions import PageOfPreviewNotFound
 from tracim.exceptions import PreviewDimNotAllowed
+from tracim.exceptions import PreviewPending
+from tracim.exceptions import SameValueError
 
 SWAGGER_TAG__FILE_ENDPOINTS = 'Files'
 
@@ -57,7 +62,7 @@ class FileController(Controller):
     def upload_file(self, context, request: TracimRequest, hapic_data=None):
         """
         Upload a new version of raw file of content. This will create a new
-        revision.
+        revision, unless the same file is uploaded again.
         """
         app_config = request.registry.settings['CFG']
         api = ContentApi(
@@ -65,22 +70,26 @@ class FileController(Controller):
             session=request.dbsession,
             config=app_config,
         )
-        content = api.get_one(
-            hapic_data.path.content_id,
-            content_type=ContentType.Any
-        )
+        content = request.current_content
         file = request.POST['files']
-        with new_revision(
-                session=request.dbsession,
-                tm=transaction.manager,
-                content=content
-        ):
-            api.update_file_data(
-                content,
-                new_filename=file.filename,
-                new_mimetype=file.type,
-                new_content=file.file,
-            )
+        try:
+            # INFO - G.M - 2018-08-06 - Use request transaction manager, so
+            # the new revision is dropped if file did not change.
+            with new_revision(
+                    session=request.dbsession,
+                    tm=request.tm,
+                    content=content
+            ):
+                api.update_file_data(
+                    content,
+                    new_filename=file.filename,
+                    new_mimetype=file.type,
+                    new_content=file.file,
+                )
+        except SameValueError:
+            # INFO - G.M - 2018-08-06 - Same file uploaded again (same hash),
+            # no new revision needed.
+            pass
 
         return
 
@@ -93,21 +102,20 @@ class FileController(Controller):
         """
         Download raw file of last revision of content.
         """
-        app_config = request.registry.settings['CFG']
-        api = ContentApi(
-            current_user=request.current_user,
-            session=request.dbsession,
-            config=app_config,
-        )
-        content = api.get_one(
-            hapic_data.path.content_id,
-            content_type=ContentType.Any
-        )
+        content = request.current_content
+        etag = get_revision_etag(content.revision_id)
+        if is_not_modified(request, etag, content.updated):
+            return get_not_modified_response(request, etag, content.updated)
         file = DepotManager.get().get(content.depot_file)
-        response = request.response
-        response.content_type = file.content_type
-        response.app_iter = FileIter(file)
-        return response
+        # INFO - G.M - 2018-08-07 - Stored file may be shared with other
+        # contents, use mimetype of content.
+        return get_depot_file_response(
+            request,
+            file,
+            content_type=content.file_mimetype or file.content_type,
+            etag=etag,
+            last_modified=content.updated,
+        )
 
     @hapic.with_api_doc(tags=[SWAGGER_TAG__FILE_ENDPOINTS])
     @require_workspace_role(UserRoleInWorkspace.READER)
@@ -124,25 +132,29 @@ class FileController(Controller):
             session=request.dbsession,
             config=app_config,
         )
-        content = api.get_one(
-            hapic_data.path.content_id,
-            content_type=ContentType.Any
-        )
+        content = request.current_content
         revision = api.get_one_revision(
             revision_id=hapic_data.path.revision_id,
             content=content
         )
+        etag = get_revision_etag(revision.revision_id)
+        if is_not_modified(request, etag, revision.updated):
+            return get_not_modified_response(request, etag, revision.updated)
         file = DepotManager.get().get(revision.depot_file)
-        response = request.response
-        response.content_type = file.content_type
-        response.app_iter = FileIter(file)
-        return response
+        return get_depot_file_response(
+            request,
+            file,
+            content_type=revision.file_mimetype or file.content_type,
+            etag=etag,
+            last_modified=revision.updated,
+        )
 
     # preview
     # pdf
     @hapic.with_api_doc(tags=[SWAGGER_TAG__FILE_ENDPOINTS])
     @require_workspace_role(UserRoleInWorkspace.READER)
     @require_content_types([file_type])
+    @hapic.handle_exception(PreviewPending, HTTPStatus.ACCEPTED)
     @hapic.handle_exception(UnavailablePreviewType, HTTPStatus.BAD_REQUEST)
     @hapic.handle_exception(PageOfPreviewNotFound, HTTPStatus.BAD_REQUEST)
     @hapic.input_query(PageQuerySchema())
@@ -158,20 +170,30 @@ class FileController(Controller):
             session=request.dbsession,
             config=app_config,
         )
-        content = api.get_one(
-            hapic_data.path.content_id,
-            content_type=ContentType.Any
+        content = request.current_content
+        etag = get_revision_etag(
+            content.revision_id,
+            'pdf',
+            hapic_data.query.page,
         )
+        if is_not_modified(request, etag, content.updated):
+            return get_not_modified_response(request, etag, content.updated)
         pdf_preview_path = api.get_pdf_preview_path(
             content.content_id,
             content.revision_id,
             page=hapic_data.query.page
         )
-        return FileResponse(pdf_preview_path)
+        return get_preview_response(
+            request,
+            pdf_preview_path,
+            etag=etag,
+            last_modified=content.updated,
+        )
 
     @hapic.with_api_doc(tags=[SWAGGER_TAG__FILE_ENDPOINTS])
     @require_workspace_role(UserRoleInWorkspace.READER)
     @require_content_types([file_type])
+    @hapic.handle_exception(PreviewPending, HTTPStatus.ACCEPTED)
     @hapic.handle_exception(UnavailablePreviewType, HTTPStatus.BAD_REQUEST)
     @hapic.input_path(WorkspaceAndContentIdPathSchema())
     @hapic.output_file([])
@@ -185,16 +207,22 @@ class FileController(Controller):
             session=request.dbsession,
             config=app_config,
         )
-        content = api.get_one(
-            hapic_data.path.content_id,
-            content_type=ContentType.Any
-        )
+        content = request.current_content
+        etag = get_revision_etag(content.revision_id, 'pdf', 'full')
+        if is_not_modified(request, etag, content.updated):
+            return get_not_modified_response(request, etag, content.updated)
         pdf_preview_path = api.get_full_pdf_preview_path(content.revision_id)
-        return FileResponse(pdf_preview_path)
+        return get_preview_response(
+            request,
+            pdf_preview_path,
+            etag=etag,
+            last_modified=content.updated,
+        )
 
     @hapic.with_api_doc(tags=[SWAGGER_TAG__FILE_ENDPOINTS])
     @require_workspace_role(UserRoleInWorkspace.READER)
     @require_content_types([file_type])
+    @hapic.handle_exception(PreviewPending, HTTPStatus.ACCEPTED)
     @hapic.handle_exception(UnavailablePreviewType, HTTPStatus.BAD_REQUEST)
     @hapic.input_path(WorkspaceAndContentRevisionIdPathSchema())
     @hapic.input_query(PageQuerySchema())
@@ -209,25 +237,35 @@ class FileController(Controller):
             session=request.dbsession,
             config=app_config,
         )
-        content = api.get_one(
-            hapic_data.path.content_id,
-            content_type=ContentType.Any
-        )
+        content = request.current_content
         revision = api.get_one_revision(
             revision_id=hapic_data.path.revision_id,
             content=content
         )
+        etag = get_revision_etag(
+            revision.revision_id,
+            'pdf',
+            hapic_data.query.page,
+        )
+        if is_not_modified(request, etag, revision.updated):
+            return get_not_modified_response(request, etag, revision.updated)
         pdf_preview_path = api.get_pdf_preview_path(
             revision.content_id,
             revision.revision_id,
             page=hapic_data.query.page
         )
-        return FileResponse(pdf_preview_path)
+        return get_preview_response(
+            request,
+            pdf_preview_path,
+            etag=etag,
+            last_modified=revision.updated,
+        )
 
     # jpg
     @hapic.with_api_doc(tags=[SWAGGER_TAG__FILE_ENDPOINTS])
     @require_workspace_role(UserRoleInWorkspace.READER)
     @require_content_types([file_type])
+    @hapic.handle_exception(PreviewPending, HTTPStatus.ACCEPTED)
     @hapic.handle_exception(PageOfPreviewNotFound, HTTPStatus.BAD_REQUEST)
     @hapic.input_path(WorkspaceAndContentIdPathSchema())
     @hapic.input_query(PageQuerySchema())
@@ -242,23 +280,36 @@ class FileController(Controller):
             session=request.dbsession,
             config=app_config,
         )
-        content = api.get_one(
-            hapic_data.path.content_id,
-            content_type=ContentType.Any
-        )
+        content = request.current_content
         allowed_dim = api.get_jpg_preview_allowed_dim()
+        width = allowed_dim.dimensions[0].width
+        height = allowed_dim.dimensions[0].height
+        etag = get_revision_etag(
+            content.revision_id,
+            'jpg',
+            '{}x{}'.format(width, height),
+            hapic_data.query.page,
+        )
+        if is_not_modified(request, etag, content.updated):
+            return get_not_modified_response(request, etag, content.updated)
         jpg_preview_path = api.get_jpg_preview_path(
             content_id=content.content_id,
             revision_id=content.revision_id,
             page=hapic_data.query.page,
-            width=allowed_dim.dimensions[0].width,
-            height=allowed_dim.dimensions[0].height,
+            width=width,
+            height=height,
+        )
+        return get_preview_response(
+            request,
+            jpg_preview_path,
+            etag=etag,
+            last_modified=content.updated,
         )
-        return FileResponse(jpg_preview_path)
 
     @hapic.with_api_doc(tags=[SWAGGER_TAG__FILE_ENDPOINTS])
     @require_workspace_role(UserRoleInWorkspace.READER)
     @require_content_types([file_type])
+    @hapic.handle_exception(PreviewPending, HTTPStatus.ACCEPTED)
     @hapic.handle_exception(PageOfPreviewNotFound, HTTPStatus.BAD_REQUEST)
     @hapic.handle_exception(PreviewDimNotAllowed, HTTPStatus.BAD_REQUEST)
     @hapic.input_query(PageQuerySchema())
@@ -274,10 +325,15 @@ class FileController(Controller):
             session=request.dbsession,
             config=app_config,
         )
-        content = api.get_one(
-            hapic_data.path.content_id,
-            content_type=ContentType.Any
+        content = request.current_content
+        etag = get_revision_etag(
+            content.revision_id,
+            'jpg',
+            '{}x{}'.format(hapic_data.path.width, hapic_data.path.height),
+            hapic_data.query.page,
         )
+        if is_not_modified(request, etag, content.updated):
+            return get_not_modified_response(request, etag, content.updated)
         jpg_preview_path = api.get_jpg_preview_path(
             content_id=content.content_id,
             revision_id=content.revision_id,
@@ -285,11 +341,17 @@ class FileController(Controller):
             height=hapic_data.path.height,
             width=hapic_data.path.width,
         )
-        return FileResponse(jpg_preview_path)
+        return get_preview_response(
+            request,
+            jpg_preview_path,
+            etag=etag,
+            last_modified=content.updated,
+        )
 
     @hapic.with_api_doc(tags=[SWAGGER_TAG__FILE_ENDPOINTS])
     @require_workspace_role(UserRoleInWorkspace.READER)
     @require_content_types([file_type])
+    @hapic.handle_exception(PreviewPending, HTTPStatus.ACCEPTED)
     @hapic.handle_exception(PageOfPreviewNotFound, HTTPStatus.BAD_REQUEST)
     @hapic.handle_exception(PreviewDimNotAllowed, HTTPStatus.BAD_REQUEST)
     @hapic.input_path(RevisionPreviewSizedPathSchema())
@@ -305,14 +367,19 @@ class FileController(Controller):
             session=request.dbsession,
             config=app_config,
         )
-        content = api.get_one(
-            hapic_data.path.content_id,
-            content_type=ContentType.Any
-        )
+        content = request.current_content
         revision = api.get_one_revision(
             revision_id=hapic_data.path.revision_id,
             content=content
         )
+        etag = get_revision_etag(
+            revision.revision_id,
+            'jpg',
+            '{}x{}'.format(hapic_data.path.width, hapic_data.path.height),
+            hapic_data.query.page,
+        )
+        if is_not_modified(request, etag, revision.updated):
+            return get_not_modified_response(request, etag, revision.updated)
         jpg_preview_path = api.get_jpg_preview_path(
             content_id=content.content_id,
             revision_id=revision.revision_id,
@@ -320,7 +387,12 @@ class FileController(Controller):
             height=hapic_data.path.height,
             width=hapic_data.path.width,
         )
-        return FileResponse(jpg_preview_path)
+        return get_preview_response(
+            request,
+            jpg_preview_path,
+            etag=etag,
+            last_modified=revision.updated,
+        )
 
     @hapic.with_api_doc(tags=[SWAGGER_TAG__FILE_ENDPOINTS])
     @require_workspace_role(UserRoleInWorkspace.READER)
@@ -356,10 +428,7 @@ class FileController(Controller):
             session=request.dbsession,
             config=app_config,
         )
-        content = api.get_one(
-            hapic_data.path.content_id,
-            content_type=ContentType.Any
-        )
+        content = request.current_content
         return api.get_content_in_context(content)
 
     @hapic.with_api_doc(tags=[SWAGGER_TAG__FILE_ENDPOINTS])
@@ -379,10 +448,7 @@ class FileController(Controller):
             session=request.dbsession,
             config=app_config,
         )
-        content = api.get_one(
-            hapic_data.path.content_id,
-            content_type=ContentType.Any
-        )
+        content = request.current_content
         with new_revision(
                 session=request.dbsession,
                 tm=transaction.manager,
@@ -417,10 +483,7 @@ class FileController(Controller):
             session=request.dbsession,
             config=app_config,
         )
-        content = api.get_one(
-            hapic_data.path.content_id,
-            content_type=ContentType.Any
-        )
+        content = request.current_content
         revisions = content.revisions
         return [
             api.get_revision_in_context(revision)
@@ -444,10 +507,7 @@ class FileController(Controller):
             session=request.dbsession,
             config=app_config,
         )
-        content = api.get_one(
-            hapic_data.path.content_id,
-            content_type=ContentType.Any
-        )
+        content = request.current_content
         with new_revision(
                 session=request.dbsession,
                 tm=transaction.manager,
@@ -26,7 +26,6 @@ from tracim.lib.utils.authorization import require_workspace_role
 from tracim.exceptions import EmptyLabelNotAllowed
 from tracim.models.context_models import ContentInContext
 from tracim.models.context_models import RevisionInContext
-from tracim.models.contents import ContentTypeLegacy as ContentType
 from tracim.models.contents import html_documents_type
 from tracim.models.revision_protection import new_revision
 
@@ -50,10 +49,7 @@ class HTMLDocumentController(Controller):
             session=request.dbsession,
             config=app_config,
         )
-        content = api.get_one(
-            hapic_data.path.content_id,
-            content_type=ContentType.Any
-        )
+        content = request.current_content
         return api.get_content_in_context(content)
 
     @hapic.with_api_doc(tags=[SWAGGER_TAG__HTML_DOCUMENT_ENDPOINTS])
@@ -73,10 +69,7 @@ class HTMLDocumentController(Controller):
             session=request.dbsession,
             config=app_config,
         )
-        content = api.get_one(
-            hapic_data.path.content_id,
-            content_type=ContentType.Any
-        )
+        content = request.current_content
         with new_revision(
                 session=request.dbsession,
                 tm=transaction.manager,
@@ -111,10 +104,7 @@ class HTMLDocumentController(Controller):
             session=request.dbsession,
             config=app_config,
         )
-        content = api.get_one(
-            hapic_data.path.content_id,
-            content_type=ContentType.Any
-        )
+        content = request.current_content
         revisions = content.revisions
         return [
             api.get_revision_in_context(revision)
@@ -142,10 +132,7 @@ class HTMLDocumentController(Controller):
             session=request.dbsession,
             config=app_config,
         )
-        content = api.get_one(
-            hapic_data.path.content_id,
-            content_type=ContentType.Any
-        )
+        content = request.current_content
         with new_revision(
                 session=request.dbsession,
                 tm=transaction.manager,
@@ -1,10 +1,14 @@
 # coding=utf-8
 import marshmallow
+from marshmallow import post_dump
 from marshmallow import post_load
+from marshmallow.validate import Length
 from marshmallow.validate import OneOf
 from marshmallow.validate import Range
 
 from tracim.lib.utils.utils import DATETIME_FORMAT
+from tracim.lib.utils.utils import parse_keyset_cursor
+from tracim.lib.utils.utils import parse_label_keyset_cursor
 from tracim.models.auth import Profile
 from tracim.models.contents import GlobalStatus
 from tracim.models.contents import open_status
@@ -12,6 +16,8 @@ from tracim.models.contents import ContentTypeLegacy as ContentType
 from tracim.models.contents import ContentStatusLegacy as ContentStatus
 from tracim.models.context_models import ActiveContentFilter
 from tracim.models.context_models import ContentIdsQuery
+from tracim.models.context_models import SearchQuery
+from tracim.models.context_models import SparseFieldset
 from tracim.models.context_models import UserWorkspaceAndContentPath
 from tracim.models.context_models import ContentCreation
 from tracim.models.context_models import UserCreation
@@ -31,6 +37,8 @@ from tracim.models.context_models import TextBasedContentUpdate
 from tracim.models.context_models import SetContentStatus
 from tracim.models.context_models import CommentPath
 from tracim.models.context_models import MoveParams
+from tracim.models.context_models import BulkContentsParams
+from tracim.models.context_models import BulkMoveParams
 from tracim.models.context_models import WorkspaceAndContentPath
 from tracim.models.context_models import WorkspaceAndUserPath
 from tracim.models.context_models import ContentFilter
@@ -346,6 +354,42 @@ class FilterContentQuerySchema(marshmallow.Schema):
         default=ContentType.Any,
         validate=OneOf(ContentType.allowed_type_values())
     )
+    limit = marshmallow.fields.Int(
+        example=50,
+        default=0,
+        description='if 0 or not set, return all contents, else return only '
+                    'limit contents, sorted by type, label and id. If there '
+                    'may be more contents, a X-Tracim-Next-Cursor header '
+                    'contains the cursor to use to get the next page',
+        validate=Range(min=0, error="Value must be positive or 0"),
+    )
+    after = marshmallow.fields.String(
+        example='WyJmb2xkZXIiLCAiVG9vbHMiLCAxXQ==',
+        description='keyset cursor of last content of previous page, as '
+                    'given by X-Tracim-Next-Cursor header: return contents '
+                    'sorted by type, label and id after it',
+    )
+    fields = marshmallow.fields.String(
+        example='content_id,label,content_type',
+        description='comma separated list of content fields to return. '
+                    'If not set, all fields are returned',
+    )
+
+    @marshmallow.validates('after')
+    def validate_after(self, value):
+        try:
+            parse_label_keyset_cursor(value)
+        except ValueError:
+            raise marshmallow.ValidationError('Invalid cursor')
+
+    @marshmallow.validates('fields')
+    def validate_fields(self, value):
+        unknown_fields = set(value.split(',')) \
+            - set(ContentDigestSchema().fields)
+        if unknown_fields:
+            raise marshmallow.ValidationError(
+                'Unknown fields: {}'.format(', '.join(sorted(unknown_fields)))
+            )
 
     @post_load
     def make_content_filter(self, data):
@@ -364,11 +408,57 @@ class ActiveContentFilterQuerySchema(marshmallow.Schema):
         format=DATETIME_FORMAT,
         description='return only content lastly updated before this date',
     )
+    cursor = marshmallow.fields.String(
+        example='2018-08-03T10:25:03.123456_12',
+        description='keyset cursor of last content of previous page, as '
+                    'given by X-Tracim-Next-Cursor header. Take precedence '
+                    'over before_datetime',
+    )
+
+    @marshmallow.validates('cursor')
+    def validate_cursor(self, value):
+        try:
+            parse_keyset_cursor(value)
+        except ValueError:
+            raise marshmallow.ValidationError('Invalid cursor')
+
     @post_load
     def make_content_filter(self, data):
         return ActiveContentFilter(**data)
 
 
+class SearchQuerySchema(marshmallow.Schema):
+    q = marshmallow.fields.String(
+        example='meeting report',
+        required=True,
+        description='words to search in contents label, description, '
+                    'comments and text files. Contents must contain all '
+                    'words (or words starting with them)',
+    )
+    workspace_id = marshmallow.fields.Int(
+        example=4,
+        description='search only in this workspace',
+        validate=Range(min=1, error="Value must be greater than 0"),
+    )
+    limit = marshmallow.fields.Int(
+        example=10,
+        default=0,
+        description='if 0 or not set, return all matching contents, else '
+                    'return only limit contents (according to offset)',
+        validate=Range(min=0, error="Value must be positive or 0"),
+    )
+    offset = marshmallow.fields.Int(
+        example=10,
+        default=0,
+        description='number of matching contents to skip',
+        validate=Range(min=0, error="Value must be positive or 0"),
+    )
+
+    @post_load
+    def make_search_query(self, data):
+        return SearchQuery(**data)
+
+
 class ContentIdsQuerySchema(marshmallow.Schema):
     contents_ids = marshmallow.fields.List(
         marshmallow.fields.Int(
@@ -639,6 +729,38 @@ class ContentMoveSchema(marshmallow.Schema):
         return MoveParams(**data)
 
 
+class BulkContentsSchema(marshmallow.Schema):
+    contents_ids = marshmallow.fields.List(
+        marshmallow.fields.Int(
+            example=6,
+            validate=Range(min=1, error="Value must be greater than 0"),
+        ),
+        description='ids of contents, their children are included',
+        required=True,
+        validate=Length(min=1, error="At least one content is required"),
+    )
+
+    @post_load
+    def make_bulk_contents_params(self, data):
+        return BulkContentsParams(**data)
+
+
+class BulkContentsMoveSchema(ContentMoveSchema):
+    contents_ids = marshmallow.fields.List(
+        marshmallow.fields.Int(
+            example=6,
+            validate=Range(min=1, error="Value must be greater than 0"),
+        ),
+        description='ids of contents, their children are included',
+        required=True,
+        validate=Length(min=1, error="At least one content is required"),
+    )
+
+    @post_load
+    def make_move_params(self, data):
+        return BulkMoveParams(**data)
+
+
 class ContentCreationSchema(marshmallow.Schema):
     label = marshmallow.fields.String(
         example='contract for client XXX',
@@ -705,6 +827,19 @@ class ContentDigestSchema(marshmallow.Schema):
                     'In first version of the API, this field is always True',
     )
 
+    @post_dump(pass_many=True, pass_original=True)
+    def keep_sparse_fieldset(self, data, many, original_data):
+        # INFO - G.M - 2018-08-21 - Fields not exposed by a SparseFieldset
+        # are dumped with their default value: drop them.
+        if not many:
+            data, original_data = [data], [original_data]
+        data = [
+            original.filter_dumped(item)
+            if isinstance(original, SparseFieldset) else item
+            for item, original in zip(data, original_data)
+        ]
+        return data if many else data[0]
+
 
 class ReadStatusSchema(marshmallow.Schema):
     content_id = marshmallow.fields.Int(
@@ -740,6 +875,21 @@ class FileInfoAbstractSchema(marshmallow.Schema):
     raw_content = marshmallow.fields.String(
         description='raw text or html description of the file'
     )
+    mimetype = marshmallow.fields.String(
+        example='application/pdf',
+        description='mimetype of the file',
+    )
+    size = marshmallow.fields.Int(
+        example=1024,
+        allow_none=True,
+        description='file size in bytes, null if not known yet',
+    )
+    file_hash = marshmallow.fields.String(
+        example='9f86d081884c7d659a2feaa0c55ad015a3bf4f1b2b0b822cd15d6c15b0f00a08',  # nopep8
+        allow_none=True,
+        description='hexadecimal sha256 hash of the file, null if not known '
+                    'yet',
+    )
 
 
 class TextBasedContentSchema(ContentSchema, TextBasedDataAbstractSchema):
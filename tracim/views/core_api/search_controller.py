@@ -0,0 +1,74 @@
+# coding=utf-8
+from pyramid.config import Configurator
+from sqlalchemy.orm.exc import NoResultFound
+
+try:  # Python 3.5+
+    from http import HTTPStatus
+except ImportError:
+    from http import client as HTTPStatus
+
+from tracim import TracimRequest
+from tracim.exceptions import WorkspaceNotFound
+from tracim.extensions import hapic
+from tracim.lib.core.content import ContentApi
+from tracim.lib.core.workspace import WorkspaceApi
+from tracim.lib.utils.authorization import require_profile
+from tracim.models import Group
+from tracim.views.controllers import Controller
+from tracim.views.core_api.schemas import ContentDigestSchema
+from tracim.views.core_api.schemas import SearchQuerySchema
+
+SWAGGER_TAG__SEARCH_ENDPOINTS = 'Search'
+
+
+class SearchController(Controller):
+
+    @hapic.with_api_doc(tags=[SWAGGER_TAG__SEARCH_ENDPOINTS])
+    @hapic.handle_exception(WorkspaceNotFound, HTTPStatus.BAD_REQUEST)
+    @require_profile(Group.TIM_USER)
+    @hapic.input_query(SearchQuerySchema())
+    @hapic.output_body(ContentDigestSchema(many=True),)
+    def search(self, context, request: TracimRequest, hapic_data=None):
+        """
+        Full text search of contents readable by user, from most to less
+        relevant.
+        """
+        app_config = request.registry.settings['CFG']
+        search_query = hapic_data.query
+        workspace = None
+        if search_query.workspace_id:
+            wapi = WorkspaceApi(
+                current_user=request.current_user,
+                session=request.dbsession,
+                config=app_config,
+            )
+            try:
+                workspace = wapi.get_one(search_query.workspace_id)
+            except NoResultFound as exc:
+                raise WorkspaceNotFound(
+                    'Workspace {} does not exist or is not visible for this user'.format(  # nopep8
+                        search_query.workspace_id,
+                    )
+                ) from exc
+        api = ContentApi(
+            current_user=request.current_user,
+            session=request.dbsession,
+            config=app_config,
+        )
+        contents = api.search_contents(
+            search_query.q,
+            workspace=workspace,
+            limit=search_query.limit,
+            offset=search_query.offset,
+        )
+        return api.get_contents_in_context(contents)
+
+    def bind(self, configurator: Configurator) -> None:
+        """
+        Create all routes and views using pyramid configurator
+        for this controller
+        """
+
+        # Search
+        configurator.add_route('search', '/search', request_method='GET')
+        configurator.add_view(self.search, route_name='search')
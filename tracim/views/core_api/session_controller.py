@@ -8,6 +8,9 @@ except ImportError:
 from tracim import TracimRequest
 from tracim.extensions import hapic
 from tracim.lib.core.user import UserApi
+from tracim.lib.core.user_session import UserSessionApi
+from tracim.lib.utils.authentification import get_session_token
+from tracim.lib.utils.utils import SESSION_TOKEN_HEADER
 from tracim.views.controllers import Controller
 from tracim.views.core_api.schemas import UserSchema
 from tracim.views.core_api.schemas import NoContentSchema
@@ -29,7 +32,9 @@ class SessionController(Controller):
     @hapic.output_body(UserSchema(),)
     def login(self, context, request: TracimRequest, hapic_data=None):
         """
-        Logs user into the system
+        Logs user into the system. Session token is returned in
+        X-Tracim-Session-Token header, use it in following requests with
+        "Authorization: Bearer <token>" header.
         """
 
         login = hapic_data.body
@@ -40,6 +45,14 @@ class SessionController(Controller):
             config=app_config,
         )
         user = uapi.authenticate_user(login.email, login.password)
+        token = UserSessionApi(
+            session=request.dbsession,
+            config=app_config,
+        ).create_token(user)
+
+        def add_session_token_header(request, response):
+            response.headers[SESSION_TOKEN_HEADER] = token
+        request.add_response_callback(add_session_token_header)
         return uapi.get_user_with_context(user)
 
     @hapic.with_api_doc(tags=[SWAGGER_TAG__SESSION_ENDPOINTS_TAG])
@@ -48,7 +61,12 @@ class SessionController(Controller):
         """
         Logs out current logged in user session
         """
-
+        token = get_session_token(request)
+        if token:
+            UserSessionApi(
+                session=request.dbsession,
+                config=request.registry.settings['CFG'],
+            ).delete_token(token)
         return
 
     @hapic.with_api_doc(tags=[SWAGGER_TAG__SESSION_ENDPOINTS_TAG])
@@ -14,6 +14,7 @@ from tracim.lib.core.content import ContentApi
 from tracim.views.controllers import Controller
 from tracim.lib.utils.authorization import require_same_user_or_profile
 from tracim.lib.utils.authorization import require_profile
+from tracim.lib.utils.utils import NEXT_CURSOR_HEADER
 from tracim.exceptions import WrongUserPassword
 from tracim.exceptions import PasswordDoNotMatch
 from tracim.views.core_api.schemas import UserSchema
@@ -248,7 +249,9 @@ class UserController(Controller):
     @hapic.output_body(ContentDigestSchema(many=True))
     def last_active_content(self, context, request: TracimRequest, hapic_data=None):  # nopep8
         """
-        Get last_active_content for user
+        Get last_active_content for user.
+        If there may be more contents, a X-Tracim-Next-Cursor header
+        contains the cursor to use to get the next page.
         """
         app_config = request.registry.settings['CFG']
         content_filter = hapic_data.query
@@ -269,11 +272,18 @@ class UserController(Controller):
             workspace=workspace,
             limit=content_filter.limit or None,
             before_datetime=content_filter.before_datetime or None,
+            before_content_id=content_filter.before_content_id or None,
         )
-        return [
-            api.get_content_in_context(content)
-            for content in last_actives
-        ]
+        if content_filter.limit and len(last_actives) == content_filter.limit:
+            next_cursor = api.get_last_active_cursor(
+                last_actives[-1],
+                workspace=workspace,
+            )
+
+            def add_next_cursor_header(request, response):
+                response.headers[NEXT_CURSOR_HEADER] = next_cursor
+            request.add_response_callback(add_next_cursor_header)
+        return api.get_contents_in_context(last_actives)
 
     @hapic.with_api_doc(tags=[SWAGGER_TAG__USER_ENDPOINTS])
     @require_same_user_or_profile(Group.TIM_ADMIN)
@@ -305,10 +315,7 @@ class UserController(Controller):
             before_datetime=None,
             content_ids=hapic_data.query.contents_ids or None
         )
-        return [
-            api.get_content_in_context(content)
-            for content in last_actives
-        ]
+        return api.get_contents_in_context(last_actives)
 
     @hapic.with_api_doc(tags=[SWAGGER_TAG__USER_ENDPOINTS])
     @require_same_user_or_profile(Group.TIM_ADMIN)
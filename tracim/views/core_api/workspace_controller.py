@@ -16,6 +16,7 @@ from tracim.lib.core.workspace import WorkspaceApi
 from tracim.lib.core.content import ContentApi
 from tracim.lib.core.userworkspace import RoleApi
 from tracim.lib.utils.authorization import require_workspace_role
+from tracim.lib.utils.utils import NEXT_CURSOR_HEADER
 from tracim.lib.utils.authorization import require_profile
 from tracim.models import Group
 from tracim.lib.utils.authorization import require_candidate_workspace_role
@@ -23,12 +24,15 @@ from tracim.models.data import UserRoleInWorkspace
 from tracim.models.data import ActionDescription
 from tracim.models.context_models import UserRoleWorkspaceInContext
 from tracim.models.context_models import ContentInContext
+from tracim.models.context_models import SparseFieldset
 from tracim.exceptions import EmptyLabelNotAllowed
 from tracim.exceptions import EmailValidationFailed
 from tracim.exceptions import UserCreationFailed
 from tracim.exceptions import UserDoesNotExist
 from tracim.exceptions import ContentNotFound
 from tracim.exceptions import WorkspacesDoNotMatch
+from tracim.exceptions import ConflictingMoveInItself
+from tracim.exceptions import ContentLabelAlreadyUsedHere
 from tracim.exceptions import ParentNotFound
 from tracim.views.controllers import Controller
 from tracim.views.core_api.schemas import FilterContentQuerySchema
@@ -39,6 +43,8 @@ from tracim.views.core_api.schemas import WorkspaceCreationSchema
 from tracim.views.core_api.schemas import WorkspaceModifySchema
 from tracim.views.core_api.schemas import WorkspaceAndUserIdPathSchema
 from tracim.views.core_api.schemas import ContentMoveSchema
+from tracim.views.core_api.schemas import BulkContentsSchema
+from tracim.views.core_api.schemas import BulkContentsMoveSchema
 from tracim.views.core_api.schemas import NoContentSchema
 from tracim.views.core_api.schemas import ContentCreationSchema
 from tracim.views.core_api.schemas import WorkspaceAndContentIdPathSchema
@@ -244,7 +250,10 @@ class WorkspaceController(Controller):
             hapic_data=None,
     ) -> typing.List[ContentInContext]:
         """
-        return list of contents found in the workspace
+        return list of contents found in the workspace.
+        If limit is set and there may be more contents, a
+        X-Tracim-Next-Cursor header contains the cursor to use to get the
+        next page.
         """
         app_config = request.registry.settings['CFG']
         content_filter = hapic_data.query
@@ -260,10 +269,22 @@ class WorkspaceController(Controller):
             parent_id=content_filter.parent_id,
             workspace=request.current_workspace,
             content_type=content_filter.content_type or ContentType.Any,
+            limit=content_filter.limit or None,
+            after=content_filter.after,
         )
-        contents = [
-            api.get_content_in_context(content) for content in contents
-        ]
+        if content_filter.limit and len(contents) == content_filter.limit:
+            next_cursor = api.get_all_cursor(contents[-1])
+
+            def add_next_cursor_header(request, response):
+                response.headers[NEXT_CURSOR_HEADER] = next_cursor
+            request.add_response_callback(add_next_cursor_header)
+        contents = api.get_contents_in_context(contents)
+        if content_filter.fields:
+            # INFO - G.M - 2018-08-21 - Only requested fields are computed
+            contents = [
+                SparseFieldset(content, content_filter.fields)
+                for content in contents
+            ]
         return contents
 
     @hapic.with_api_doc(tags=[SWAGGER_TAG__WORKSPACE_ENDPOINTS])
@@ -485,6 +506,139 @@ class WorkspaceController(Controller):
             api.unarchive(content)
         return
 
+    @hapic.with_api_doc(tags=[SWAGGER_TAG__WORKSPACE_ENDPOINTS])
+    @hapic.handle_exception(WorkspacesDoNotMatch, HTTPStatus.BAD_REQUEST)
+    @hapic.handle_exception(ConflictingMoveInItself, HTTPStatus.BAD_REQUEST)
+    @require_workspace_role(UserRoleInWorkspace.CONTENT_MANAGER)
+    @require_candidate_workspace_role(UserRoleInWorkspace.CONTENT_MANAGER)
+    @hapic.input_path(WorkspaceIdPathSchema())
+    @hapic.input_body(BulkContentsMoveSchema())
+    @hapic.output_body(NoContentSchema(), default_http_code=HTTPStatus.NO_CONTENT)  # nopep8
+    def bulk_move_contents(
+            self,
+            context,
+            request: TracimRequest,
+            hapic_data=None,
+    ) -> None:
+        """
+        move contents, with their children
+        """
+        app_config = request.registry.settings['CFG']
+        move_data = hapic_data.body
+        api = ContentApi(
+            current_user=request.current_user,
+            session=request.dbsession,
+            config=app_config,
+        )
+        contents = api.get_many(
+            move_data.contents_ids,
+            workspace=request.current_workspace,
+        )
+        new_parent = api.get_one(
+            move_data.new_parent_id,
+            content_type=ContentType.Any,
+        )
+        api.bulk_move(
+            contents,
+            new_parent=new_parent,
+            new_workspace=request.candidate_workspace,
+        )
+        return
+
+    @hapic.with_api_doc(tags=[SWAGGER_TAG__WORKSPACE_ENDPOINTS])
+    @hapic.handle_exception(WorkspacesDoNotMatch, HTTPStatus.BAD_REQUEST)
+    @hapic.handle_exception(ConflictingMoveInItself, HTTPStatus.BAD_REQUEST)
+    @hapic.handle_exception(ContentLabelAlreadyUsedHere, HTTPStatus.BAD_REQUEST)  # nopep8
+    @require_workspace_role(UserRoleInWorkspace.READER)
+    @require_candidate_workspace_role(UserRoleInWorkspace.CONTRIBUTOR)
+    @hapic.input_path(WorkspaceIdPathSchema())
+    @hapic.input_body(BulkContentsMoveSchema())
+    @hapic.output_body(ContentDigestSchema(many=True))
+    def bulk_copy_contents(
+            self,
+            context,
+            request: TracimRequest,
+            hapic_data=None,
+    ) -> typing.List[ContentInContext]:
+        """
+        copy contents, with their children
+        """
+        app_config = request.registry.settings['CFG']
+        copy_data = hapic_data.body
+        api = ContentApi(
+            current_user=request.current_user,
+            session=request.dbsession,
+            config=app_config,
+        )
+        contents = api.get_many(
+            copy_data.contents_ids,
+            workspace=request.current_workspace,
+        )
+        new_parent = api.get_one(
+            copy_data.new_parent_id,
+            content_type=ContentType.Any,
+        )
+        copies = api.bulk_copy(
+            contents,
+            new_parent=new_parent,
+            new_workspace=request.candidate_workspace,
+        )
+        return api.get_contents_in_context(copies)
+
+    @hapic.with_api_doc(tags=[SWAGGER_TAG__WORKSPACE_ENDPOINTS])
+    @require_workspace_role(UserRoleInWorkspace.CONTENT_MANAGER)
+    @hapic.input_path(WorkspaceIdPathSchema())
+    @hapic.input_body(BulkContentsSchema())
+    @hapic.output_body(NoContentSchema(), default_http_code=HTTPStatus.NO_CONTENT)  # nopep8
+    def bulk_delete_contents(
+            self,
+            context,
+            request: TracimRequest,
+            hapic_data=None,
+    ) -> None:
+        """
+        delete contents
+        """
+        app_config = request.registry.settings['CFG']
+        api = ContentApi(
+            current_user=request.current_user,
+            session=request.dbsession,
+            config=app_config,
+        )
+        contents = api.get_many(
+            hapic_data.body.contents_ids,
+            workspace=request.current_workspace,
+        )
+        api.bulk_delete(contents)
+        return
+
+    @hapic.with_api_doc(tags=[SWAGGER_TAG__WORKSPACE_ENDPOINTS])
+    @require_workspace_role(UserRoleInWorkspace.CONTENT_MANAGER)
+    @hapic.input_path(WorkspaceIdPathSchema())
+    @hapic.input_body(BulkContentsSchema())
+    @hapic.output_body(NoContentSchema(), default_http_code=HTTPStatus.NO_CONTENT)  # nopep8
+    def bulk_archive_contents(
+            self,
+            context,
+            request: TracimRequest,
+            hapic_data=None,
+    ) -> None:
+        """
+        archive contents
+        """
+        app_config = request.registry.settings['CFG']
+        api = ContentApi(
+            current_user=request.current_user,
+            session=request.dbsession,
+            config=app_config,
+        )
+        contents = api.get_many(
+            hapic_data.body.contents_ids,
+            workspace=request.current_workspace,
+        )
+        api.bulk_archive(contents)
+        return
+
     def bind(self, configurator: Configurator) -> None:
         """
         Create all routes and views using
@@ -515,6 +669,16 @@ class WorkspaceController(Controller):
         # Create Generic Content
         configurator.add_route('create_generic_content', '/workspaces/{workspace_id}/contents', request_method='POST')  # nopep8
         configurator.add_view(self.create_generic_empty_content, route_name='create_generic_content')  # nopep8
+        # Bulk actions on contents, registered before single content routes
+        # to not match them
+        configurator.add_route('bulk_move_contents', '/workspaces/{workspace_id}/contents/bulk/move', request_method='PUT')  # nopep8
+        configurator.add_view(self.bulk_move_contents, route_name='bulk_move_contents')  # nopep8
+        configurator.add_route('bulk_copy_contents', '/workspaces/{workspace_id}/contents/bulk/copy', request_method='PUT')  # nopep8
+        configurator.add_view(self.bulk_copy_contents, route_name='bulk_copy_contents')  # nopep8
+        configurator.add_route('bulk_delete_contents', '/workspaces/{workspace_id}/contents/bulk/delete', request_method='PUT')  # nopep8
+        configurator.add_view(self.bulk_delete_contents, route_name='bulk_delete_contents')  # nopep8
+        configurator.add_route('bulk_archive_contents', '/workspaces/{workspace_id}/contents/bulk/archive', request_method='PUT')  # nopep8
+        configurator.add_view(self.bulk_archive_contents, route_name='bulk_archive_contents')  # nopep8
         # Move Content
         configurator.add_route('move_content', '/workspaces/{workspace_id}/contents/{content_id}/move', request_method='PUT')  # nopep8
         configurator.add_view(self.move_content, route_name='move_content')  # nopep8